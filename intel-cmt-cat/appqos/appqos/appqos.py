@@ -47,15 +47,18 @@ import threading
 import time
 from jsonschema import ValidationError
 
-from appqos import cache_ops
 from appqos import caps
 from appqos import common
 from appqos import log
 from appqos import power
+from appqos import rdt_config
+from appqos.mba_arbiter import MBA_ARBITER
+from appqos.mba_sc import MBA_SC
 from appqos.rest import rest_server
 from appqos import sstbf
 from appqos.config_store import ConfigStore
 from appqos.pqos_api import PQOS_API
+from appqos.rate_limiter import TokenBucket
 from appqos.__version__ import __version__
 
 class AppQoS:
@@ -83,7 +86,7 @@ class AppQoS:
             log.error(ex)
             return -1
 
-        data = ConfigStore.get_config()
+        data, generation = ConfigStore.get_config_generation()
 
         log.debug(f"Cores controlled: {data.get_pool_attr('cores', None)}")
 
@@ -132,11 +135,16 @@ class AppQoS:
                 return -1
             log.info(f"RDT MBA CTRL {'en' if PQOS_API.is_mba_bw_enabled() else 'dis'}abled")
 
-        result = cache_ops.configure_rdt(data)
+        result = rdt_config.configure_rdt(data)
         if result != 0:
             log.error("Failed to apply initial RDT configuration, terminating...")
             return -1
 
+        MBA_ARBITER.configure(data)
+
+        # initial configuration generation is applied
+        ConfigStore.config_processed(generation, True)
+
         AppQoS.thread = threading.Thread(target=AppQoS.event_handler)
         AppQoS.thread.start()
 
@@ -149,6 +157,7 @@ class AppQoS:
         Runs main loop.
         """
         AppQoS.stop_event.set()
+        ConfigStore.wakeup()
 
         log.info("Terminating...")
 
@@ -156,41 +165,74 @@ class AppQoS:
             AppQoS.thread.join()
             AppQoS.thread = None
 
+        MBA_SC.stop()
+
+
+    @staticmethod
+    def apply_config():
+        """
+        Applies latest configuration generation
+
+        Returns:
+            0 on success
+        """
+        cfg, generation = ConfigStore.get_config_generation()
+
+        log.info(f"Configuration changed, processing generation {generation}...")
+        result = rdt_config.configure_rdt(cfg)
+        if result != 0:
+            log.error("Failed to apply RDT configuration!")
+        else:
+            MBA_ARBITER.configure(cfg)
+
+            if caps.sstcp_enabled() and not sstbf.is_sstbf_configured():
+                result = power.configure_power(cfg)
+                if result != 0:
+                    log.error("Failed to apply Power Profiles configuration!")
+
+        ConfigStore.config_processed(generation, result == 0)
+        if result == 0:
+            log.info(f"New configuration processed, generation {generation}")
+
+        return result
+
 
     @staticmethod
     def event_handler():
         """
-        Handles config_changed event
+        Handles configuration changes
         """
 
         # rate limiting
-        last_cfg_change_ts = 0
-        min_time_diff = 1 / common.RATE_LIMIT
+        rate_limiter = TokenBucket(common.RATE_LIMIT, common.RATE_LIMIT_BURST)
+        changed = False
+
+        # MBA software controller, runs in this thread not to race with
+        # configuration changes
+        last_mba_sc_ts = 0
 
         while not AppQoS.stop_event.is_set():
-            if ConfigStore().is_config_changed():
-                cfg = ConfigStore.get_config()
+            now = time.monotonic()
+            if now - last_mba_sc_ts >= common.MBA_SC_INTERVAL:
+                MBA_SC.step(now)
+                last_mba_sc_ts = now
 
-                time_diff = time.time() - last_cfg_change_ts
-                if time_diff < min_time_diff:
-                    log.info("Rate Limiter, " \
-                             f"sleeping {round((min_time_diff - time_diff) * 1000)} ms...")
-                    time.sleep(min_time_diff - time_diff)
+            timeout = last_mba_sc_ts + common.MBA_SC_INTERVAL - now
 
-                log.info("Configuration changed, processing new config...")
-                result = cache_ops.configure_rdt(cfg)
-                if result != 0:
-                    log.error("Failed to apply RDT configuration!")
-                    break
-
-                if caps.sstcp_enabled() and not sstbf.is_sstbf_configured():
-                    result = power.configure_power(cfg)
-                    if result != 0:
-                        log.error("Failed to apply Power Profiles configuration!")
+            if changed:
+                if rate_limiter.consume(now):
+                    changed = False
+                    if AppQoS.apply_config() != 0:
                         break
+                    continue
+
+                # changes queued meanwhile are collapsed into one
+                delay = rate_limiter.delay(now)
+                log.debug(f"Rate Limiter, delaying by {round(delay * 1000)} ms...")
+                timeout = min(timeout, delay)
 
-                last_cfg_change_ts = time.time()
-                log.info("New configuration processed")
+            if ConfigStore().wait_config_changed(timeout) is not None:
+                changed = True
 
 
 def load_config(config_file):
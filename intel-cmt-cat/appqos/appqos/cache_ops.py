@@ -38,21 +38,38 @@ Provides RDT related helper functions used to configure RDT.
 from appqos import caps
 from appqos import log
 from appqos import power
-from appqos.config_store import ConfigStore
 from appqos.pqos_api import PQOS_API
 from appqos.pid_ops import set_affinity
 
+
+def cores_to_bitmap(cores):
+    """
+    Convert list of cores to bitmap
+
+    Parameters:
+        cores: list of cores
+
+    Returns:
+        bitmap, bit N set for core N
+    """
+    bitmap = 0
+    for core in cores:
+        bitmap |= 1 << core
+    return bitmap
+
+
 class Apps:
     """
     Apps options
     """
     @staticmethod
-    def configure(config):
+    def configure(config, app_ids=None):
         """
         Configure Apps, based on config content.
 
         Parameters
             config: configuration
+            app_ids: Apps to configure, None to configure all Apps
         """
         if 'apps' not in config:
             return 0
@@ -62,6 +79,9 @@ class Apps:
             if 'pids' not in app:
                 continue
 
+            if app_ids is not None and app['id'] not in app_ids:
+                continue
+
             app_cores = app['cores'] if 'cores' in app else []
             pool_id = config.app_to_pool(app['id'])
             pool_cores = config.get_pool_attr('cores', pool_id)
@@ -86,6 +106,12 @@ class Pool:
     """
     pools = {}
 
+    # last applied configuration
+    config = None
+
+    # PID to pool ID
+    pid_pools = {}
+
     def __init__(self, pool):
         """
         Constructor
@@ -261,6 +287,67 @@ class Pool:
         return Pool.pools[self.pool].get('mba_bw')
 
 
+    def mba_share_set(self, weight, guarantee):
+        """
+        Set pool's weight and guarantee used to divide MBA budget
+
+        Parameters:
+            weight: new mba_weight value
+            guarantee: new mba_guarantee value
+        """
+        Pool.pools[self.pool]['mba_weight'] = weight
+        Pool.pools[self.pool]['mba_guarantee'] = guarantee
+
+
+    def cos_set(self, cos):
+        """
+        Set COS of the pool, shared by pools with the same allocation
+
+        Parameters:
+            cos: COS id
+        """
+        Pool.pools[self.pool]['cos'] = cos
+
+
+    def cos_get(self):
+        """
+        Get COS of the pool
+
+        Returns:
+            COS id, pool id if not set
+        """
+        return Pool.pools[self.pool].get('cos', self.pool)
+
+
+    def domains_set(self, domains):
+        """
+        Set per domain allocation of the pool
+
+        Parameters:
+            domains: per socket and per L2 ID values overriding pool's values,
+                     {'sockets': [{'id': 0, 'l3cbm': 0xf, 'mba': 50}],
+                      'l2ids': [{'id': 0, 'l2cbm': 0x3}]} or None
+        """
+        Pool.pools[self.pool]['domains'] = domains
+
+
+    def domain_values_get(self, domain_type, attr):
+        """
+        Get values of an attribute configured per domain
+
+        Parameters:
+            domain_type: 'sockets' or 'l2ids'
+            attr: attribute e.g. 'l3cbm'
+
+        Returns:
+            dict of domain ID to value, empty if not configured
+        """
+        domains = Pool.pools[self.pool].get('domains') or {}
+
+        return {domain['id']: domain[attr] for domain in domains.get(domain_type, []) \
+                if attr in domain}
+
+
     def configure(self, config):
         """
         Configure Pool, based on config content.
@@ -304,13 +391,36 @@ class Pool:
             if caps.mba_bw_enabled():
                 self.mba_bw_set(config.get_pool_attr('mba_bw', self.pool))
                 self.mba_set(None)
+                self.mba_share_set(None, None)
+            elif caps.mba_sc_supported(iface):
+                # MBps targets are met by MBA software controller
+                self.mba_bw_set(config.get_pool_attr('mba_bw', self.pool))
+                self.mba_set(config.get_pool_attr('mba', self.pool))
+                self.mba_share_set(config.get_pool_attr('mba_weight', self.pool),
+                                   config.get_pool_attr('mba_guarantee', self.pool))
             else:
                 self.mba_bw_set(None)
                 self.mba_set(config.get_pool_attr('mba', self.pool))
+                self.mba_share_set(None, None)
         else:
             self.mba_set(None)
             self.mba_bw_set(None)
+            self.mba_share_set(None, None)
+
+        self.domains_set(config.get_pool_attr('domains', self.pool))
+
+        self.pids_configure(config)
+
+        return Pool.apply(self.pool)
+
 
+    def pids_configure(self, config):
+        """
+        Configure Pool's PIDs, based on config content.
+
+        Parameters
+            config: configuration
+        """
         apps = config.get_pool_attr('apps', self.pool)
         if apps is not None:
             pids = []
@@ -321,8 +431,6 @@ class Pool:
 
             self.pids_set(pids, config.get_pool_attr('cores', 0))
 
-        return Pool.apply(self.pool)
-
 
     def pids_set(self, pids, default_cores):
         """
@@ -333,36 +441,32 @@ class Pool:
             default_cores: cores assigned to pool 0
         """
         old_pids = self.pids_get()
+        new_pids = set(pids)
 
-        # change core affinity for PIDs not assigned to any pool
-        removed_pids = [pid for pid in old_pids if pid not in pids]
+        # remove pids from old pools e.g.: apps moved from other pool
+        pids_moved = {}
+        for pid in new_pids:
+            pool_id = Pool.pid_pool(pid)
+            if pool_id is not None and pool_id != self.pool:
+                pids_moved.setdefault(pool_id, set()).add(pid)
 
-        # skip pids assigned to any pool e.g.: apps moved to other pool
-        # pylint: disable=consider-using-dict-items
-        for pool_id in Pool.pools:
-            if pool_id == self.pool:
-                continue
-            removed_pids = \
-                [pid for pid in removed_pids if pid not in Pool.pools[pool_id]['pids']]
+        for pool_id, moved in pids_moved.items():
+            log.debug(f"PIDs moved from other pools {sorted(moved)}")
 
-        # remove pid form old pool
-        if old_pids:
-            # pylint: disable=consider-using-dict-items
-            for pool_id in Pool.pools:
-                if pool_id == self.pool:
-                    continue
+            # update other pool PIDs
+            Pool(pool_id).pids_update([pid for pid in Pool.pools[pool_id]['pids'] \
+                                       if pid not in moved])
 
-                pids_moved_from_other_pool = \
-                    [pid for pid in Pool.pools[pool_id]['pids'] if pid in pids]
-
-                if pids_moved_from_other_pool:
-                    log.debug(f"PIDs moved from other pools {pids_moved_from_other_pool}")
+        # change core affinity for PIDs not assigned to any pool
+        removed_pids = [pid for pid in old_pids if pid not in new_pids and \
+                        Pool.pid_pool(pid) in (None, self.pool)]
 
-                # update other pool PIDs
-                Pool.pools[pool_id]['pids'] = \
-                    [pid for pid in Pool.pools[pool_id]['pids'] if pid not in pids]
+        for pid in removed_pids:
+            Pool.pid_pools.pop(pid, None)
 
-        Pool.pools[self.pool]['pids'] = pids
+        self.pids_update(pids)
+        for pid in pids:
+            Pool.pid_pools[pid] = self.pool
 
         # set affinity of removed pids to default
         if removed_pids:
@@ -372,6 +476,57 @@ class Pool:
             set_affinity(removed_pids, default_cores)
 
 
+    def pids_update(self, pids):
+        """
+        Update Pool's PIDs list and PIDs set
+
+        Parameters:
+            pids: Pool's PIDs
+        """
+        Pool.pools[self.pool]['pids'] = pids
+        Pool.pools[self.pool]['pid_set'] = (pids, set(pids))
+
+
+    @staticmethod
+    def pid_set(pool_id):
+        """
+        Get set of pool's PIDs, rebuilt if PIDs list was replaced
+
+        Parameters:
+            pool_id: Pool ID
+
+        Returns:
+            set of PIDs
+        """
+        pool = Pool.pools[pool_id]
+        pids = pool.get('pids') or []
+
+        cached = pool.get('pid_set')
+        if cached is None or cached[0] is not pids:
+            cached = (pids, set(pids))
+            pool['pid_set'] = cached
+
+        return cached[1]
+
+
+    @staticmethod
+    def pid_pool(pid):
+        """
+        Get pool PID is assigned to
+
+        Parameters:
+            pid: PID
+
+        Returns:
+            Pool ID, None if PID is not assigned to any pool
+        """
+        pool_id = Pool.pid_pools.get(pid)
+        if pool_id in Pool.pools and pid in Pool.pid_set(pool_id):
+            return pool_id
+
+        return None
+
+
     def pids_get(self):
         """
         Get pids for the pool
@@ -390,30 +545,35 @@ class Pool:
             cores: Pool's cores
         """
         old_cores = self.cores_get()
-
-        # create a diff, create a list of cores that were removed from current pool
-        removed_cores = [core for core in old_cores if core not in cores]
+        old_bitmap = Pool.core_bitmap(self.pool)
+        bitmap = cores_to_bitmap(cores)
 
         # update pool with new core list
-        Pool.pools[self.pool]['cores'] = cores
+        self.cores_update(cores, bitmap)
 
         # updated RDT configuration
-        PQOS_API.alloc_assoc_set(cores, self.pool)
+        PQOS_API.alloc_assoc_set(cores, self.cos_get())
+
+        # create a diff, cores that were removed from current pool
+        removed = old_bitmap & ~bitmap
 
         # process list of removed cores
-        # pylint: disable=consider-using-dict-items
-        for pool_id in Pool.pools:
+        for pool_id in list(Pool.pools):
             if pool_id == self.pool:
                 continue
 
             # check if cores were assigned to another pool,
             # if they were, remove them from that pool
-            Pool.pools[pool_id]['cores'] = \
-                [core for core in Pool.pools[pool_id]['cores'] if core not in cores]
+            other_bitmap = Pool.core_bitmap(pool_id)
+            if other_bitmap & bitmap:
+                other_bitmap &= ~bitmap
+                Pool(pool_id).cores_update([core for core in Pool.pools[pool_id]['cores'] \
+                                            if other_bitmap >> core & 1], other_bitmap)
 
             # filter out cores assigned to other pools
-            removed_cores = \
-                [core for core in removed_cores if core not in Pool.pools[pool_id]['cores']]
+            removed &= ~other_bitmap
+
+        removed_cores = [core for core in old_cores if removed >> core & 1]
 
         # Finally assign removed cores back to COS0/"Default" Pool
         if removed_cores:
@@ -425,6 +585,40 @@ class Pool:
             power.reset(removed_cores)
 
 
+    def cores_update(self, cores, bitmap):
+        """
+        Update Pool's cores list and cores bitmap
+
+        Parameters:
+            cores: Pool's cores
+            bitmap: bitmap of cores
+        """
+        Pool.pools[self.pool]['cores'] = cores
+        Pool.pools[self.pool]['core_bitmap'] = (cores, bitmap)
+
+
+    @staticmethod
+    def core_bitmap(pool_id):
+        """
+        Get bitmap of pool's cores, rebuilt if cores list was replaced
+
+        Parameters:
+            pool_id: Pool ID
+
+        Returns:
+            bitmap of cores
+        """
+        pool = Pool.pools[pool_id]
+        cores = pool.get('cores') or []
+
+        cached = pool.get('core_bitmap')
+        if cached is None or cached[0] is not cores:
+            cached = (cores, cores_to_bitmap(cores))
+            pool['core_bitmap'] = cached
+
+        return cached[1]
+
+
     def cores_get(self):
         """
         Get cores for the pool
@@ -435,13 +629,78 @@ class Pool:
         return Pool.pools[self.pool].get('cores')
 
 
+    @staticmethod
+    def used_domains(cos, get_core_domains):
+        """
+        Get domains the cores of pools using a COS belong to
+
+        Parameters:
+            cos: COS id
+            get_core_domains: function returning dict of core to domain
+
+        Returns:
+            set of domains,
+            None if all domains are used or on error
+        """
+        # COS#0 is also used by cores and tasks not assigned to any pool
+        if cos == 0:
+            return None
+
+        cores = [core for pool_id in Pool.pools if Pool(pool_id).cos_get() == cos \
+                 for core in Pool(pool_id).cores_get()]
+        core_domains = get_core_domains(cores)
+        if core_domains is None:
+            return None
+
+        return set(core_domains.values())
+
+
+    @staticmethod
+    def domain_values(value, domains, used, overrides, min_value):
+        """
+        Resolve values of an allocation on each domain
+
+        Parameters:
+            value: pool's value
+            domains: list of domains
+            used: domains with pool's cores, None if all domains are used
+            overrides: dict of domain to value configured for the pool
+            min_value: value for domains without pool's cores,
+                       None to keep pool's value there
+
+        Returns:
+            value common to all domains or dict of domain to value
+        """
+        if value is None:
+            return None
+
+        values = {}
+        for domain in domains:
+            if domain in overrides:
+                values[domain] = overrides[domain]
+            elif used is not None and min_value is not None and domain not in used:
+                values[domain] = min_value
+            else:
+                values[domain] = value
+
+        if len(set(values.values())) > 1:
+            return values
+
+        return next(iter(values.values()), value)
+
+
     @staticmethod
     def apply(pool_id):
         # pylint: disable=too-many-return-statements
         # pylint: disable=too-many-branches
+        # pylint: disable=too-many-locals
         """
         Apply RDT configuration for Pool
 
+        Allocation is applied on every domain (socket, L2 ID), overridden by
+        pool's per domain values. On domains without pool's cores, cache masks
+        are collapsed to the minimum mask.
+
         Parameters:
             pool_id: Pool to apply RDT config for
 
@@ -463,49 +722,70 @@ class Pool:
         l2cbm_data = pool.l2cbm_get_data()
         l2cbm_code = pool.l2cbm_get_code()
 
+        # without MBA CTRL, MBA rate of MBA BW pool is set by MBA software controller
         mba = pool.mba_bw_get()
-        if mba:
+        if mba and caps.mba_bw_enabled():
             ctrl = True
         else:
             ctrl = False
             mba = pool.mba_get()
 
         cores = pool.cores_get()
+        cos = pool.cos_get()
 
-        # Apply same RDT configuration on all sockets in the system
         sockets = PQOS_API.get_sockets()
         if sockets is None:
             log.error("Failed to get sockets info!")
             return -1
 
-        # pool id to COS, 1:1 mapping
-        if PQOS_API.is_l2_cdp_enabled():
-            if PQOS_API.l2ca_set(PQOS_API.get_l2ids(), pool_id, \
-                                        code_mask=l2cbm_code, data_mask=l2cbm_data) != 0:
+        # pools with the same allocation share COS
+        l2cdp_enabled = PQOS_API.is_l2_cdp_enabled()
+        if l2cdp_enabled or l2cbm:
+            l2ids = PQOS_API.get_l2ids()
+            used = Pool.used_domains(cos, PQOS_API.get_core_l2ids)
+            min_cbm = PQOS_API.get_min_l2_cat_cbm()
+            overrides = pool.domain_values_get('l2ids', 'l2cbm')
+
+        if l2cdp_enabled:
+            if PQOS_API.l2ca_set(l2ids, cos, \
+                    code_mask=Pool.domain_values(l2cbm_code, l2ids, used, {}, min_cbm), \
+                    data_mask=Pool.domain_values(l2cbm_data, l2ids, used, {}, min_cbm)) != 0:
                 log.error("Failed to apply L2 CDP configuration!")
                 return -1
         elif l2cbm:
-            if PQOS_API.l2ca_set(PQOS_API.get_l2ids(), pool_id, mask=l2cbm) != 0:
+            if PQOS_API.l2ca_set(l2ids, cos, \
+                    mask=Pool.domain_values(l2cbm, l2ids, used, overrides, min_cbm)) != 0:
                 log.error("Failed to apply L2 CAT configuration!")
                 return -1
 
-        if PQOS_API.is_l3_cdp_enabled():
-            if PQOS_API.l3ca_set(sockets, pool_id, code_mask=l3cbm_code, \
-                                        data_mask=l3cbm_data) != 0:
+        l3cdp_enabled = PQOS_API.is_l3_cdp_enabled()
+        if l3cdp_enabled or l3cbm:
+            used = Pool.used_domains(cos, PQOS_API.get_core_sockets)
+            min_cbm = PQOS_API.get_min_l3_cat_cbm()
+            overrides = pool.domain_values_get('sockets', 'l3cbm')
+
+        if l3cdp_enabled:
+            if PQOS_API.l3ca_set(sockets, cos, \
+                    code_mask=Pool.domain_values(l3cbm_code, sockets, used, {}, min_cbm), \
+                    data_mask=Pool.domain_values(l3cbm_data, sockets, used, {}, min_cbm)) != 0:
                 log.error("Failed to apply L3 CDP configuration!")
                 return -1
         elif l3cbm:
-            if PQOS_API.l3ca_set(sockets, pool_id, mask=l3cbm) != 0:
+            if PQOS_API.l3ca_set(sockets, cos, \
+                    mask=Pool.domain_values(l3cbm, sockets, used, overrides, min_cbm)) != 0:
                 log.error("Failed to apply CAT configuration!")
                 return -1
 
+        # MBA throttles pool's cores only, nothing to reclaim on other sockets
         if mba:
-            if PQOS_API.mba_set(sockets, pool_id, mba, ctrl) != 0:
+            overrides = {} if ctrl else pool.domain_values_get('sockets', 'mba')
+            if PQOS_API.mba_set(sockets, cos, \
+                    Pool.domain_values(mba, sockets, None, overrides, None), ctrl) != 0:
                 log.error("Failed to apply MBA configuration!")
                 return -1
 
         if cores:
-            if PQOS_API.alloc_assoc_set(cores, pool_id) != 0:
+            if PQOS_API.alloc_assoc_set(cores, cos) != 0:
                 log.error("Failed to associate RDT COS!")
                 return -1
 
@@ -518,155 +798,5 @@ class Pool:
         Reset pool configuration
         """
         Pool.pools = {}
-
-
-def configure_rdt(cfg):
-    """
-    Configure RDT
-
-    Parameters
-        cfg: configuration
-
-    Returns:
-        0 on success
-    """
-    result = 0
-    recreate_default = False
-
-    cfg_rdt_iface = cfg.get_rdt_iface()
-
-    def rdt_interface():
-        """
-        Change RDT interface if needed
-
-        Returns:
-            False interface not changed
-        """
-        if cfg_rdt_iface != PQOS_API.current_iface():
-            if PQOS_API.init(cfg_rdt_iface):
-                raise RuntimeError("Failed to initialize RDT interface!")
-
-            log.info(f"RDT initialized with {cfg_rdt_iface.upper()} interface.")
-            return True
-
-        return False
-
-    def rdt_reset():
-        """
-        Change RDT features enabled status
-
-        Returns:
-            False nothing changed
-        """
-
-        def get_mba_cfg():
-            """
-            Obtain MBA configuration
-            """
-            if caps.mba_supported(cfg_rdt_iface):
-                cfg_mba_ctrl_enabled = cfg.get_mba_ctrl_enabled()
-                # Change MBA BW/CTRL state if needed
-                if cfg_mba_ctrl_enabled == PQOS_API.is_mba_bw_enabled():
-                    return "any"
-
-                if cfg_mba_ctrl_enabled:
-                    return "ctrl"
-                return "default"
-
-            return "any"
-
-        def get_l2cdp_cfg():
-            """
-            Obtain L2 CDP configuration
-            """
-            if caps.cat_l2_supported(cfg_rdt_iface) and caps.cdp_l2_supported(cfg_rdt_iface):
-                cfg_l2cdp_enabled = cfg.get_l2cdp_enabled()
-                # Change L2CDP state if needed
-                if cfg_l2cdp_enabled == PQOS_API.is_l2_cdp_enabled():
-                    return "any"
-
-                if cfg_l2cdp_enabled:
-                    return "on"
-                return "off"
-
-            return "any"
-
-        def get_l3cdp_cfg():
-            """
-            Obtain L3 CDP configuration
-            """
-            if caps.cat_l3_supported(cfg_rdt_iface) and caps.cdp_l3_supported(cfg_rdt_iface):
-                cfg_l3cdp_enabled = cfg.get_l3cdp_enabled()
-                # Change L3CDP state if needed
-                if cfg_l3cdp_enabled == PQOS_API.is_l3_cdp_enabled():
-                    return "any"
-
-                if cfg_l3cdp_enabled:
-                    return "on"
-                return "off"
-
-            return "any"
-
-        l3cdp_cfg = get_l3cdp_cfg()
-        l2cdp_cfg = get_l2cdp_cfg()
-        mba_cfg = get_mba_cfg()
-
-        if l3cdp_cfg != "any" or l2cdp_cfg != "any" or mba_cfg != "any":
-            if PQOS_API.reset(l3_cdp_cfg = l3cdp_cfg, l2_cdp_cfg = l2cdp_cfg, \
-                                     mba_cfg = mba_cfg):
-                if l3cdp_cfg != "any":
-                    raise RuntimeError("Failed to change L3 CDP state!")
-                if l2cdp_cfg != "any":
-                    raise RuntimeError("Failed to change L2 CDP state!")
-                if mba_cfg != "any":
-                    raise RuntimeError("Failed to change MBA BW state!")
-
-            log.info(f"RDT MBA BW {'en' if PQOS_API.is_mba_bw_enabled() else 'dis'}abled.")
-            log.info(f"RDT L3 CDP {'en' if PQOS_API.is_l3_cdp_enabled() else 'dis'}abled.")
-            log.info(f"RDT L2 CDP {'en' if PQOS_API.is_l2_cdp_enabled() else 'dis'}abled.")
-
-    try:
-        if rdt_interface():
-            recreate_default = True
-        if rdt_reset():
-            recreate_default = True
-
-    except Exception as ex:
-        log.error(str(ex))
-        return -1
-
-    if recreate_default:
-        # On interface or MBA BW state change it is needed to recreate Default Pool #0
-        ConfigStore().recreate_default_pool()
-
-    # detect removed pools
-    old_pools = Pool.pools.copy()
-
-    pool_ids = cfg.get_pool_attr('id', None)
-
-    if old_pools:
-        for pool_id in old_pools:
-            if not pool_ids or pool_id not in pool_ids:
-                log.debug(f"Pool {pool_id} removed...")
-                Pool(pool_id).cores_set([])
-
-                # remove pool
-                Pool.pools.pop(pool_id)
-
-    if not pool_ids:
-        log.error("No Pools to configure...")
-        return -1
-
-    for pool_id in pool_ids:
-        Pool(pool_id)
-
-    # Configure Pools, Intel RDT (CAT, MBA)
-    for pool_id in Pool.pools:
-        result = Pool(pool_id).configure(cfg)
-        if result != 0:
-            return result
-
-    # Configure Apps, core affinity
-    result = Apps().configure(cfg)
-
-    return result
+        Pool.pid_pools = {}
+        Pool.config = None
@@ -36,6 +36,7 @@ System capabilities module
 
 from appqos import common
 from appqos import log
+from appqos import mba_sc_api
 from appqos import sstbf
 from appqos import power
 from appqos.pqos_api import PQOS_API
@@ -149,6 +150,13 @@ def mba_supported(iface):
     return common.MBA_CAP in caps_get(iface)
 
 
+def mba_sc_supported(iface):
+    """
+    Returns MBA software controller support status
+    """
+    return common.MBA_SC_CAP in caps_get(iface)
+
+
 def mba_bw_supported():
     """
     Returns MBA BW support status
@@ -206,6 +214,8 @@ def detect_supported_caps():
     # Intel RDT MBA
     if PQOS_API.is_mba_supported():
         result.append(common.MBA_CAP)
+        if mba_sc_api.is_mba_sc_supported():
+            result.append(common.MBA_SC_CAP)
 
     if sstbf.is_sstbf_enabled():
         result.append(common.SSTBF_CAP)
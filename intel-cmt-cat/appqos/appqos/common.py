@@ -47,10 +47,13 @@ NON_CONTIGUOUS_CBM_L3_CAP = "l3_non_contiguous_cbm"
 NON_CONTIGUOUS_CBM_L2_CAP = "l2_non_contiguous_cbm"
 DEFAULT_ADDRESS = "127.0.0.1"
 MBA_CAP = "mba"
+MBA_SC_CAP = "mba_sc"
 SSTBF_CAP = "sstbf"
 POWER_CAP = "power"
 
 RATE_LIMIT = 10 # rate limit of configuration changes in HZ
+RATE_LIMIT_BURST = 3 # number of configuration changes applied without delay
+MBA_SC_INTERVAL = 1.0 # MBA software controller step interval in seconds
 
 def check_link(path, flags):
     """
@@ -42,9 +42,154 @@ from appqos.pqos_api import PQOS_API
 class Config(UserDict):
 #pylint: disable=too-many-public-methods
     """
-    Configuration and helper functions
+    Configuration and helper functions.
+    Pools, Apps, PIDs and cores are indexed on first lookup and indexes are
+    kept up to date by mutation helpers. Pools and apps modified directly,
+    other than by replacing 'pools' or 'apps' list, require reindex().
     """
 
+    def __init__(self, *args, **kwargs):
+        self.index = None
+        super().__init__(*args, **kwargs)
+
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key in ('pools', 'apps'):
+            self.reindex()
+
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        if key in ('pools', 'apps'):
+            self.reindex()
+
+
+    def reindex(self):
+        """
+        Drop lookup indexes, rebuilt on next lookup
+        """
+        self.index = None
+
+
+    def _get_index(self):
+        """
+        Get lookup indexes, build them if needed
+
+        Returns:
+            dict of indexes: pools and apps by id, sets of pools of each app
+            and core, sets of apps of each PID
+        """
+        if self.index is not None:
+            return self.index
+
+        self.index = {'pools': {}, 'apps': {}, 'app_pools': {}, 'core_pools': {},
+                      'pid_apps': {}}
+
+        for pool in self.data.get('pools', []):
+            self._index_pool(pool)
+
+        for app in self.data.get('apps', []):
+            self._index_app(app)
+
+        return self.index
+
+
+    def _index_pool(self, pool):
+        """
+        Add pool to indexes, first pool with an id wins as for linear search
+
+        Parameters:
+            pool: pool (dict)
+        """
+        if 'id' not in pool:
+            return
+
+        self.index['pools'].setdefault(pool['id'], pool)
+        for attr in ['apps', 'cores']:
+            self._index_members(attr, pool['id'], pool.get(attr, []))
+
+
+    def _index_app(self, app):
+        """
+        Add app to indexes, first app with an id wins as for linear search
+
+        Parameters:
+            app: app (dict)
+        """
+        if 'id' not in app:
+            return
+
+        self.index['apps'].setdefault(app['id'], app)
+        self._index_members('pids', app['id'], app.get('pids', []))
+
+
+    def _index_members(self, attr, owner_id, values, add=True):
+        """
+        Add or remove pool's apps or cores, or app's PIDs to/from indexes
+
+        Parameters:
+            attr: 'apps', 'cores' or 'pids'
+            owner_id: pool or app id
+            values: apps, cores or PIDs
+            add: True to add, False to remove
+        """
+        members = self.index[{'apps': 'app_pools', 'cores': 'core_pools',
+                              'pids': 'pid_apps'}[attr]]
+        for value in values:
+            if add:
+                members.setdefault(value, set()).add(owner_id)
+            elif value in members:
+                members[value].discard(owner_id)
+                if not members[value]:
+                    members.pop(value)
+
+
+    def _find_pool(self, pool_id):
+        """
+        Find pool by id
+
+        Parameters:
+            pool_id: pool id
+
+        Returns:
+            pool (dict) or None
+        """
+        return self._get_index()['pools'].get(pool_id)
+
+
+    def _find_app(self, app_id):
+        """
+        Find app by id
+
+        Parameters:
+            app_id: app id
+
+        Returns:
+            app (dict) or None
+        """
+        return self._get_index()['apps'].get(app_id)
+
+
+    def _find_member(self, key, value):
+        """
+        Find id of pool or app which apps, cores or PIDs list contains value
+
+        Parameters:
+            key: 'app_pools', 'core_pools' or 'pid_apps' index
+            value: value to be found
+
+        Returns:
+            pool or app id or None
+        """
+        owners = self._get_index()[key].get(value)
+        if not owners:
+            return None
+
+        # more than one owner in invalid configuration only
+        return min(owners) if len(owners) > 1 else next(iter(owners))
+
+
     def get_pool_attr(self, attr, pool_id):
         """
         Get specific attribute from config
@@ -57,9 +202,9 @@ class Config(UserDict):
             attribute value or None
         """
         if pool_id is not None:
-            for pool in self.data['pools']:
-                if pool['id'] == pool_id:
-                    return pool.get(attr)
+            pool = self._find_pool(pool_id)
+            if pool is not None:
+                return pool.get(attr)
         else:
             result = []
             for pool in self.data['pools']:
@@ -85,10 +230,9 @@ class Config(UserDict):
         Returns:
             attribute value or None
         """
-        for app in self.data['apps']:
-            if app['id'] == app_id:
-                if attr in app:
-                    return app[attr]
+        app = self._find_app(app_id)
+        if app is not None:
+            return app.get(attr)
 
         return None
 
@@ -119,6 +263,19 @@ class Config(UserDict):
         return False
 
 
+    def get_mba_budget(self):
+        """
+        Get per socket MBA budget from config
+
+        Returns:
+            configured MBA budget in MBps or None by default
+        """
+        if 'mba_budget' in self.data:
+            return self.data['mba_budget']['bw']
+
+        return None
+
+
     def get_l3cdp_enabled(self):
         """
         Get RDT L3 CDP Enabled from config
@@ -159,9 +316,9 @@ class Config(UserDict):
         if 'pools' not in self.data:
             raise KeyError("No pools in config")
 
-        for pool in self.data['pools']:
-            if pool['id'] == pool_id:
-                return pool
+        pool = self._find_pool(pool_id)
+        if pool is not None:
+            return pool
 
         raise KeyError(f"Pool {pool_id} does not exists.")
 
@@ -194,11 +351,7 @@ class Config(UserDict):
         if 'pools' not in self.data:
             return False
 
-        for pool in self.data['pools']:
-            if pool['id'] == 0:
-                return True
-
-        return False
+        return self._find_pool(0) is not None
 
 
     def remove_default_pool(self):
@@ -208,10 +361,7 @@ class Config(UserDict):
         if 'pools' not in self.data:
             return
 
-        for pool in self.data['pools'][:]:
-            if pool['id'] == 0:
-                self.data['pools'].remove(pool)
-                break
+        self.remove_pool(0)
 
 
     def add_default_pool(self):
@@ -248,12 +398,152 @@ class Config(UserDict):
         default_pool['name'] = "Default"
 
         # Use all unallocated cores
-        default_pool['cores'] = PQOS_API.get_cores()
-        for pool in self.data['pools']:
-            default_pool['cores'] = \
-                [core for core in default_pool['cores'] if core not in pool['cores']]
+        used_cores = {core for pool in self.data['pools'] for core in pool['cores']}
+        default_pool['cores'] = [core for core in PQOS_API.get_cores() if core not in used_cores]
 
-        self.data['pools'].append(default_pool)
+        self.add_pool(default_pool)
+
+
+    def add_pool(self, pool):
+        """
+        Add pool
+
+        Parameters
+            pool: pool configuration (dict)
+        """
+        if 'pools' not in self.data:
+            self.data['pools'] = []
+
+        self._get_index()
+        self.data['pools'].append(pool)
+        self._index_pool(pool)
+
+
+    def remove_pool(self, pool_id):
+        """
+        Remove pool
+
+        Parameters
+            pool_id: pool id
+        """
+        if 'pools' not in self.data:
+            return
+
+        pool = self._find_pool(pool_id)
+        if pool is None:
+            return
+
+        self.data['pools'].remove(pool)
+        index = self._get_index()
+        index['pools'].pop(pool_id)
+        for attr in ['apps', 'cores']:
+            self._index_members(attr, pool_id, pool.get(attr, []), add=False)
+
+        # other pool with the same id in invalid configuration only
+        for other in self.data['pools']:
+            if other.get('id') == pool_id:
+                self._index_pool(other)
+                break
+
+
+    def set_pool_cores(self, pool_id, cores):
+        """
+        Set pool's cores
+
+        Parameters
+            pool_id: pool id
+            cores: new list of cores
+        """
+        pool = self.get_pool(pool_id)
+
+        self._index_members('cores', pool_id, pool.get('cores', []), add=False)
+        pool['cores'] = cores
+        self._index_members('cores', pool_id, cores)
+
+
+    def add_app(self, app, pool_id):
+        """
+        Add app to pool
+
+        Parameters
+            app: app configuration (dict)
+            pool_id: pool id
+        """
+        pool = self.get_pool(pool_id)
+        if 'apps' not in self.data:
+            self.data['apps'] = []
+
+        self.data['apps'].append(app)
+        self._index_app(app)
+        pool.setdefault('apps', []).append(app['id'])
+        self._index_members('apps', pool_id, [app['id']])
+
+
+    def remove_app(self, app_id):
+        """
+        Remove app and its pool membership
+
+        Parameters
+            app_id: app id
+        """
+        app = self.get_app(app_id)
+
+        self._unassign_app(app_id)
+        self.data['apps'].remove(app)
+        self._get_index()['apps'].pop(app_id)
+        self._index_members('pids', app_id, app.get('pids', []), add=False)
+
+        # other app with the same id in invalid configuration only
+        for other in self.data['apps']:
+            if other.get('id') == app_id:
+                self._index_app(other)
+                break
+
+
+    def move_app(self, app_id, pool_id):
+        """
+        Move app to another pool, app is left unassigned if pool does not exist
+
+        Parameters
+            app_id: app id
+            pool_id: destination pool id
+        """
+        self._unassign_app(app_id)
+
+        pool = self._find_pool(pool_id)
+        if pool is None:
+            return
+
+        pool.setdefault('apps', []).append(app_id)
+        self._index_members('apps', pool_id, [app_id])
+
+
+    def set_app_pids(self, app_id, pids):
+        """
+        Set app's PIDs
+
+        Parameters
+            app_id: app id
+            pids: new list of PIDs
+        """
+        app = self.get_app(app_id)
+
+        self._index_members('pids', app_id, app.get('pids', []), add=False)
+        app['pids'] = pids
+        self._index_members('pids', app_id, pids)
+
+
+    def _unassign_app(self, app_id):
+        """
+        Remove app from its pool
+
+        Parameters
+            app_id: app id
+        """
+        pool_id = self.app_to_pool(app_id)
+        if pool_id is not None:
+            self._find_pool(pool_id)['apps'].remove(app_id)
+            self._index_members('apps', pool_id, [app_id], add=False)
 
 
     def get_app(self, app_id):
@@ -270,9 +560,9 @@ class Config(UserDict):
         if 'apps' not in self.data:
             raise KeyError(f"App {app_id} does not exist. No apps in config.")
 
-        for app in self.data['apps']:
-            if app['id'] == app_id:
-                return app
+        app = self._find_app(app_id)
+        if app is not None:
+            return app
 
         raise KeyError(f"App {app_id} does not exist.")
 
@@ -321,12 +611,7 @@ class Config(UserDict):
         if not pid:
             return None
 
-        for app in self.data['apps']:
-            if not ('id' in app and 'pids' in app):
-                continue
-            if pid in app['pids']:
-                return app['id']
-        return None
+        return self._find_member('pid_apps', pid)
 
 
     def app_to_pool(self, app):
@@ -339,13 +624,20 @@ class Config(UserDict):
         Returns:
             Pool ID or None on error
         """
+        return self._find_member('app_pools', app)
 
-        for pool in self.data['pools']:
-            if not ('id' in pool and 'apps' in pool):
-                continue
-            if app in pool['apps']:
-                return pool['id']
-        return None
+
+    def core_to_pool(self, core):
+        """
+        Gets Pool ID for core
+
+        Parameters:
+            core: core to get Pool ID for
+
+        Returns:
+            Pool ID or None on error
+        """
+        return self._find_member('core_pools', core)
 
 
     def pid_to_pool(self, pid):
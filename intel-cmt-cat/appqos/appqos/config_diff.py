@@ -0,0 +1,116 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Config diff module.
+Compares applied configuration with a new one, so that only pools, cores
+and PIDs affected by a change are reconfigured.
+"""
+
+from appqos.cos_table import ALLOC_ATTRS
+
+# pool attributes defining pool's RDT configuration
+POOL_ATTRS = ALLOC_ATTRS + ['mba_bw', 'mba_weight', 'mba_guarantee', 'cores']
+
+# configuration sections, change of which requires all pools to be reconfigured
+GLOBAL_ATTRS = ['rdt_iface', 'rdt', 'mba_ctrl', 'mba_budget']
+
+
+class ConfigDiff:
+    # pylint: disable=too-few-public-methods
+    """
+    Change set between applied configuration and a new one
+    """
+
+
+    def __init__(self, old, new):
+        """
+        Constructor
+
+        Parameters:
+            old: applied configuration or None
+            new: new configuration
+        """
+        # everything needs to be configured
+        self.full = old is None or \
+            any(old.get(attr) != new.get(attr) for attr in GLOBAL_ATTRS)
+
+        old = old or {}
+        old_pools = {pool['id']: pool for pool in old.get('pools', [])}
+        new_pools = {pool['id']: pool for pool in new.get('pools', [])}
+        old_apps = {app['id']: app for app in old.get('apps', [])}
+        new_apps = {app['id']: app for app in new.get('apps', [])}
+
+        self.pools_removed = sorted(set(old_pools) - set(new_pools))
+        self.pools_added = sorted(set(new_pools) - set(old_pools))
+
+        # pools with changed allocation or cores
+        self.pools_changed = sorted(
+            pool_id for pool_id in set(old_pools) & set(new_pools) \
+            if any(old_pools[pool_id].get(attr) != new_pools[pool_id].get(attr) \
+                   for attr in POOL_ATTRS))
+
+        def pool_pids(pool, apps):
+            return sorted(pid for app_id in pool.get('apps', []) \
+                          for pid in apps.get(app_id, {}).get('pids', []))
+
+        pools_cores = self.pools_added + [
+            pool_id for pool_id in self.pools_changed \
+            if old_pools[pool_id].get('cores') != new_pools[pool_id].get('cores')]
+
+        # pools with changed PIDs of pool's apps
+        self.pools_pids = sorted(
+            pool_id for pool_id in set(old_pools) & set(new_pools) \
+            if pool_pids(old_pools[pool_id], old_apps) != \
+                pool_pids(new_pools[pool_id], new_apps))
+
+        def app_pool(app_id, pools):
+            return next((pool_id for pool_id, pool in pools.items() \
+                         if app_id in pool.get('apps', [])), None)
+
+        # apps, affinity of which needs to be set
+        self.apps_changed = sorted(
+            app_id for app_id, app in new_apps.items() \
+            if app != old_apps.get(app_id) or \
+                app_pool(app_id, new_pools) != app_pool(app_id, old_pools) or \
+                app_pool(app_id, new_pools) in pools_cores)
+
+
+    def is_empty(self):
+        """
+        Checks if there is anything to configure
+
+        Returns:
+            True if nothing has changed
+        """
+        return not (self.full or self.pools_removed or self.pools_added or \
+                    self.pools_changed or self.pools_pids or self.apps_changed)
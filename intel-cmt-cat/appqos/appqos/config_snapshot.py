@@ -0,0 +1,272 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Config snapshot module.
+Configuration shared between processes as immutable serialized snapshots
+in shared memory, published with a seqlock
+"""
+
+import atexit
+import os
+import pickle
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+# seqlock sequence, generation, snapshot length, snapshot segment name
+HEADER = struct.Struct('<QQQ64s')
+SEQ = struct.Struct('<Q')
+
+
+def _untracked(name=None, size=0):
+    """
+    Create or attach snapshot segment not registered with resource tracker,
+    so that it is not removed when a process, which attached it, exits.
+    Segments are removed by publish and close.
+
+    Parameters:
+        name: segment name, None to create new segment
+        size: size of new segment
+
+    Returns:
+        shared memory segment
+    """
+    create = name is None
+    if sys.version_info >= (3, 13):
+        # pylint: disable=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+
+    segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+    # pylint: disable=protected-access
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _unlink(name):
+    """
+    Remove snapshot segment, if it still exists
+
+    Parameters:
+        name: segment name
+    """
+    try:
+        # registered with resource tracker on attach, unregistered by unlink
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+
+    segment.close()
+    segment.unlink()
+
+
+class ConfigSnapshot:
+    """
+    Versioned configuration snapshot.
+    Each published configuration is pickled into a new shared memory segment,
+    header pointing to the current segment is updated under a seqlock.
+    Writers have to be serialized by the caller.
+    Header is created on first publish, which has to happen before processes
+    reading the snapshot are forked.
+    """
+
+
+    def __init__(self):
+        self.header = None
+        self.owner = None
+        # per process cache: seq, generation, payload, decoded payload
+        self.cache = (None, 0, None, None)
+
+
+    def _create_header(self):
+        """
+        Create header, removed by close on exit of creating process
+        """
+        self.header = shared_memory.SharedMemory(create=True, size=HEADER.size)
+        HEADER.pack_into(self.header.buf, 0, 0, 0, 0, b'')
+        self.owner = os.getpid()
+        atexit.register(self.close)
+
+
+    def _read_header(self):
+        """
+        Read consistent header
+
+        Returns:
+            seq, generation, snapshot length, snapshot segment name
+        """
+        if self.header is None:
+            return 0, 0, 0, ''
+
+        while True:
+            seq, generation, length, name = HEADER.unpack_from(self.header.buf)
+            if seq & 1:
+                # writer in progress
+                time.sleep(0)
+                continue
+
+            if SEQ.unpack_from(self.header.buf)[0] == seq:
+                return seq, generation, length, name.rstrip(b'\0').decode()
+
+
+    def _load(self):
+        """
+        Read current snapshot into per process cache
+
+        Returns:
+            seq, generation, payload, decoded payload
+        """
+        while True:
+            seq, generation, length, name = self._read_header()
+            cache = self.cache
+            if cache[0] == seq:
+                return cache
+
+            if not name:
+                return (seq, generation, None, None)
+
+            try:
+                segment = _untracked(name)
+            except FileNotFoundError:
+                # segment replaced by writer meanwhile
+                continue
+
+            try:
+                payload = bytes(segment.buf[:length])
+            finally:
+                segment.close()
+
+            # verify snapshot was not replaced while copying
+            if SEQ.unpack_from(self.header.buf)[0] != seq:
+                continue
+
+            self.cache = (seq, generation, payload, None)
+            return self.cache
+
+
+    def publish(self, data, generation=None):
+        """
+        Publish new configuration snapshot
+
+        Parameters:
+            data: configuration
+            generation: new generation, None to keep current one
+
+        Returns:
+            generation of published snapshot
+        """
+        payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+        if self.header is None:
+            self._create_header()
+
+        segment = _untracked(size=max(len(payload), 1))
+        segment.buf[:len(payload)] = payload
+
+        seq, current, _, old_name = HEADER.unpack_from(self.header.buf)
+        if generation is None:
+            generation = current
+
+        # swap snapshot
+        SEQ.pack_into(self.header.buf, 0, seq + 1)
+        HEADER.pack_into(self.header.buf, 0, seq + 1, generation, len(payload),
+                         segment.name.encode())
+        SEQ.pack_into(self.header.buf, 0, seq + 2)
+
+        segment.close()
+
+        old_name = old_name.rstrip(b'\0').decode()
+        if old_name:
+            _unlink(old_name)
+
+        return generation
+
+
+    def generation(self):
+        """
+        Get generation of current snapshot
+
+        Returns:
+            generation
+        """
+        return self._read_header()[1]
+
+
+    def get(self):
+        """
+        Get private, modifiable copy of current configuration
+
+        Returns:
+            configuration, generation
+        """
+        _, generation, payload, _ = self._load()
+        if payload is None:
+            return {}, generation
+
+        return pickle.loads(payload), generation
+
+
+    def get_snapshot(self):
+        """
+        Get current configuration shared by all readers in the process,
+        decoded once per snapshot, must not be modified
+
+        Returns:
+            configuration, generation
+        """
+        seq, generation, payload, data = self._load()
+        if payload is None:
+            return {}, generation
+
+        if data is None:
+            data = pickle.loads(payload)
+            if self.cache[0] == seq:
+                self.cache = (seq, generation, payload, data)
+
+        return data, generation
+
+
+    def close(self):
+        """
+        Release shared memory, current snapshot is removed by creator only
+        """
+        if os.getpid() != self.owner or self.header is None:
+            return
+
+        name = HEADER.unpack_from(self.header.buf)[3].rstrip(b'\0').decode()
+        if name:
+            _unlink(name)
+
+        self.header.close()
+        self.header.unlink()
+        self.header = None
@@ -35,6 +35,7 @@ Module handling config file
 """
 
 import json
+import queue
 from os.path import join, dirname
 import re
 from pathlib import Path
@@ -46,6 +47,8 @@ from appqos import log
 from appqos import pid_ops
 from appqos import power
 from appqos.config import Config
+from appqos.config_snapshot import ConfigSnapshot
+from appqos.cos_table import map_pools
 from appqos.manager import MANAGER
 from appqos.pqos_api import PQOS_API
 
@@ -55,9 +58,21 @@ class ConfigStore:
     """
 
     namespace = MANAGER.Namespace()
-    namespace.config = {}
     namespace.path = None
-    changed_event = MANAGER.Event()
+    # last processed configuration generation
+    namespace.processed = 0
+    # configuration and its latest generation
+    snapshot = ConfigSnapshot()
+    # configuration of current snapshot, shared with lookup indexes
+    snapshot_config = (None, None)
+    lock = MANAGER.Lock()
+    # generations of configuration changes, 0 wakes up consumer only
+    changed_queue = MANAGER.Queue()
+    # status of recently processed generations
+    generations = MANAGER.dict()
+
+    # number of processed generations to keep status for
+    GENERATIONS_HISTORY = 64
 
     @staticmethod
     def set_path(path):
@@ -105,6 +120,7 @@ class ConfigStore:
         self._validate_pools(cfg)
         self._validate_apps(cfg)
         self._validate_rdt(cfg)
+        self._validate_cos(cfg)
         power.validate_power_profiles(cfg, power_admission_control)
 
 
@@ -149,6 +165,36 @@ class ConfigStore:
             if 'power_profile' in pool:
                 data.get_power(pool['power_profile'])
 
+            if 'domains' in pool:
+                ConfigStore._validate_pool_domains(pool)
+
+
+    @staticmethod
+    def _validate_pool_domains(pool):
+        """
+        Validate Pool's per domain allocation
+
+        Parameters
+            pool: pool configuration (dict)
+        """
+        for domain_type, get_domains in [('sockets', PQOS_API.get_sockets),
+                                          ('l2ids', PQOS_API.get_l2ids)]:
+            if domain_type not in pool['domains']:
+                continue
+
+            domains = get_domains() or []
+            domain_ids = []
+
+            for domain in pool['domains'][domain_type]:
+                if domain['id'] in domain_ids:
+                    raise ValueError(f"Pool {pool['id']}, multiple {domain_type} " \
+                        f"with same id {domain['id']}.")
+                domain_ids.append(domain['id'])
+
+                if domain['id'] not in domains:
+                    raise ValueError(f"Pool {pool['id']}, Invalid {domain_type} " \
+                        f"id {domain['id']}.")
+
 
     @staticmethod
     def _validate_apps(data):
@@ -165,6 +211,11 @@ class ConfigStore:
         pids = set()
         app_ids = []
 
+        app_pools = {}
+        for pool in data['pools']:
+            for app_id in pool.get('apps', []):
+                app_pools.setdefault(app_id, []).append(pool)
+
         for app in data['apps']:
             # id
             if app['id'] in app_ids:
@@ -178,16 +229,14 @@ class ConfigStore:
                         raise ValueError(f"App {app['id']}, Invalid core {core}.")
 
             # app's pool validation
-            app_pool = None
-            for pool in data['pools']:
-                if 'apps' in pool and app['id'] in pool['apps']:
-                    if app_pool:
-                        raise ValueError(f"App {app['id']}, Assigned to more than one pool.")
-                    app_pool = pool
+            if len(app_pools.get(app['id'], [])) > 1:
+                raise ValueError(f"App {app['id']}, Assigned to more than one pool.")
 
-            if app_pool is None:
+            if app['id'] not in app_pools:
                 raise ValueError(f"App {app['id']} not assigned to any pool.")
 
+            app_pool = app_pools[app['id']][0]
+
             if 'cores' in app:
                 diff_cores = set(app['cores']).difference(app_pool['cores'])
                 if diff_cores:
@@ -206,6 +255,39 @@ class ConfigStore:
             pids |= set(app['pids'])
 
 
+    @staticmethod
+    def _validate_domains_cbm(pool, domain_type, cbm, cdp_enabled, non_contiguous_cbm):
+        """
+        Validate per domain CBMs of a Pool
+
+        Parameters
+            pool: Pool configuration (dict)
+            domain_type: 'sockets' for L3 CBMs or 'l2ids' for L2 CBMs
+            cbm: 'l3cbm' or 'l2cbm'
+            cdp_enabled: CDP enabled
+            non_contiguous_cbm: non-contiguous CBMs supported
+        """
+        name = {'sockets': 'socket', 'l2ids': 'L2 ID'}[domain_type]
+        cache = cbm[:2].upper()
+
+        for domain in pool.get('domains', {}).get(domain_type, []):
+            if cbm not in domain:
+                continue
+
+            prefix = f"Pool {pool['id']}, {name} {domain['id']} {cache} CBM"
+
+            if cbm not in pool or cdp_enabled:
+                raise ValueError(f"{prefix} requires Pool's {cache} CBM and {cache} CDP disabled.")
+
+            if domain[cbm] == 0:
+                raise ValueError(f"{prefix} is zero.")
+
+            if not non_contiguous_cbm:
+                result = re.search('1{1,32}0{1,32}1{1,32}', bin(domain[cbm]))
+                if result:
+                    raise ValueError(f"{prefix} {hex(domain[cbm])} is not contiguous.")
+
+
     @staticmethod
     def _validate_rdt_cat_l3(data):
         """
@@ -241,6 +323,9 @@ class ConfigStore:
                     raise ValueError(f"Pool {pool['id']}, " \
                         f"L3 CBM {hex(pool['l3cbm'])}/{bin(pool[cbm])}, L3 CAT is not supported.")
 
+            ConfigStore._validate_domains_cbm(pool, 'sockets', 'l3cbm', l3cdp_enabled,
+                                              non_contiguous_cbm)
+
             if 'l3cbm_data' in pool or 'l3cbm_code' in pool:
                 cdp_pool_ids.append(pool['id'])
 
@@ -284,6 +369,9 @@ class ConfigStore:
                     raise ValueError(f"Pool {pool['id']}, " \
                         f"L2 CBM {hex(pool['l2cbm'])}/{bin(pool[cbm])}, L2 CAT is not supported.")
 
+            ConfigStore._validate_domains_cbm(pool, 'l2ids', 'l2cbm', l2cdp_enabled,
+                                              non_contiguous_cbm)
+
             if 'l2cbm_data' in pool or 'l2cbm_code' in pool:
                 cdp_pool_ids.append(pool['id'])
 
@@ -294,6 +382,21 @@ class ConfigStore:
                 raise ValueError(f"Pools {cdp_pool_ids}, L2 CDP is not enabled.")
 
 
+    @staticmethod
+    def _validate_cos(data):
+        """
+        Validate that Pools can be mapped onto classes of service
+
+        Parameters
+            data: configuration (dict)
+        """
+        if not 'pools' in data:
+            return
+
+        if map_pools(data) is None:
+            raise ValueError("RDT Configuration. Not enough COS for Pools' allocations!")
+
+
     def _validate_rdt(self, data):
         """
         Validate RDT configuration (including MBA CTRL) configuration
@@ -327,19 +430,36 @@ class ConfigStore:
             if 'mba' in pool:
                 mba_pool_ids.append(pool['id'])
 
+            for domain in pool.get('domains', {}).get('sockets', []):
+                if 'mba' in domain and 'mba' not in pool:
+                    raise ValueError(f"Pool {pool['id']}, socket {domain['id']} " \
+                                     "MBA % requires Pool's MBA %.")
+
             if 'mba_bw' in pool:
                 mba_bw_pool_ids.append(pool['id'])
 
         if (mba_pool_ids or mba_bw_pool_ids) and not caps.mba_supported(rdt_iface):
             raise ValueError(f"Pools {mba_pool_ids + mba_bw_pool_ids}, MBA is not supported.")
 
-        if mba_bw_pool_ids and not mba_ctrl_enabled:
+        # without MBA CTRL, MBA BW pools are handled by MBA software controller
+        if mba_bw_pool_ids and not mba_ctrl_enabled and not caps.mba_sc_supported(rdt_iface):
             raise ValueError(f"Pools {mba_bw_pool_ids}, MBA BW is not enabled/supported.")
 
         if mba_pool_ids and mba_ctrl_enabled:
             raise ValueError(f"Pools {mba_pool_ids}, MBA % is not enabled. " \
                              "Disable MBA BW and try again.")
 
+        if 'mba_budget' in data:
+            mba_budget = data['mba_budget']['bw']
+            if mba_ctrl_enabled or not caps.mba_sc_supported(rdt_iface):
+                raise ValueError("RDT Configuration. MBA budget requires MBA software " \
+                                 "controller, MBA CTRL disabled!")
+
+            guarantees = sum(pool.get('mba_guarantee', 0) for pool in data['pools'])
+            if guarantees > mba_budget:
+                raise ValueError(f"RDT Configuration. MBA guarantees {guarantees} MBps " \
+                                 f"exceed MBA budget {mba_budget} MBps!")
+
         return
 
 
@@ -351,7 +471,10 @@ class ConfigStore:
             path: path to config file
         """
         self.set_path(path)
-        ConfigStore.namespace.config = self.load(path).data
+        cfg = self.load(path)
+
+        with ConfigStore.lock:
+            ConfigStore.snapshot.publish(cfg.data)
 
 
     def process_config(self):
@@ -460,50 +583,168 @@ class ConfigStore:
                     if cbm in pool and not isinstance(pool[cbm], int):
                         pool[cbm] = int(pool[cbm], 16)
 
+                if 'domains' in pool:
+                    ConfigStore.domains_cbm_to_int(pool['domains'])
+
             return Config(data)
 
-        return None
+
+    @staticmethod
+    def domains_cbm_to_int(domains):
+        """
+        Convert cbm of Pool's per domain allocation to int
+
+        Parameters:
+            domains: Pool's per domain allocation
+        """
+        for domain_type, cbm in [('sockets', 'l3cbm'), ('l2ids', 'l2cbm')]:
+            for domain in domains.get(domain_type, []):
+                if cbm in domain and not isinstance(domain[cbm], int):
+                    domain[cbm] = int(domain[cbm], 16)
 
 
     @staticmethod
     def set_config(cfg):
         """
-        Set shared (via IPC, namespace) configuration
+        Set shared configuration, creates new configuration generation
 
         Parameters:
             cfg: new configuration
+
+        Returns:
+            generation of new configuration
         """
+        with ConfigStore.lock:
+            generation = ConfigStore.snapshot.publish(cfg.data,
+                                                      ConfigStore.snapshot.generation() + 1)
+            ConfigStore.changed_queue.put(generation)
 
-        ConfigStore.namespace.config = cfg.data
-        ConfigStore.changed_event.set()
+        return generation
 
 
     @staticmethod
     def get_config():
         """
-        Get shared (via IPC, namespace) configuration
+        Get shared configuration
+        Returns:
+            shared configuration (dict), private copy
+        """
+        return Config(ConfigStore.snapshot.get()[0])
+
+
+    @staticmethod
+    def get_config_snapshot():
+        """
+        Get shared configuration, decoded once per configuration change.
+        Must not be modified, use get_config to get modifiable copy
+
         Returns:
             shared configuration (dict)
         """
-        return Config(ConfigStore.namespace.config)
+        data, _ = ConfigStore.snapshot.get_snapshot()
 
+        # indexes are built once per snapshot
+        cached_data, cached_config = ConfigStore.snapshot_config
+        if cached_data is not data:
+            cached_config = Config(data)
+            ConfigStore.snapshot_config = (data, cached_config)
 
-    def is_config_changed(self):
+        return cached_config
+
+
+    @staticmethod
+    def get_config_generation():
         """
-        Check was shared configuration marked as changed
+        Get shared configuration and its generation
 
         Returns:
-            result
+            shared configuration (dict), generation
+        """
+        data, generation = ConfigStore.snapshot.get()
+        return Config(data), generation
+
+
+    def wait_config_changed(self, timeout):
+        """
+        Wait for configuration changes,
+        all changes queued so far are collapsed into the latest one
+
+        Parameters:
+            timeout: max time to wait in seconds
+
+        Returns:
+            latest changed generation, None if there are no new changes
+        """
+        generation = 0
+        try:
+            generation = self.changed_queue.get(timeout=max(timeout, 0))
+            while True:
+                generation = max(generation, self.changed_queue.get_nowait())
+        except queue.Empty:
+            pass
+        except (IOError, EOFError):
+            return None
+
+        if generation <= ConfigStore.namespace.processed:
+            return None
+
+        return generation
+
+
+    @staticmethod
+    def wakeup():
+        """
+        Wake up consumer waiting for configuration changes
         """
         try:
-            self.changed_event.wait(0.1)
-            result = self.changed_event.is_set()
-            if result:
-                self.changed_event.clear()
-        except IOError:
-            result = False
+            ConfigStore.changed_queue.put(0)
+        except (IOError, EOFError):
+            pass
+
+
+    @staticmethod
+    def config_processed(generation, applied):
+        """
+        Record status of processed configuration generation
+        and of all generations collapsed into it
+
+        Parameters:
+            generation: processed generation
+            applied: True if configuration was applied successfully
+        """
+        status = "applied" if applied else "failed"
+
+        with ConfigStore.lock:
+            processed = ConfigStore.namespace.processed
+            if generation <= processed:
+                return
+
+            first = max(processed + 1, generation - ConfigStore.GENERATIONS_HISTORY + 1)
+            ConfigStore.generations.update({gen: status for gen in range(first, generation + 1)})
+            for gen in [gen for gen in ConfigStore.generations.keys() \
+                        if gen <= generation - ConfigStore.GENERATIONS_HISTORY]:
+                ConfigStore.generations.pop(gen, None)
+
+            ConfigStore.namespace.processed = generation
+
+
+    @staticmethod
+    def get_config_status(generation):
+        """
+        Get status of configuration generation
+
+        Parameters:
+            generation: configuration generation
+
+        Returns:
+            "applied", "failed", "pending" or None if not known
+        """
+        with ConfigStore.lock:
+            if ConfigStore.namespace.processed < generation <= \
+                    ConfigStore.snapshot.generation():
+                return "pending"
 
-        return result
+            return ConfigStore.generations.get(generation)
 
 
     @staticmethod
@@ -512,21 +753,23 @@ class ConfigStore:
         Recreate Default pool
         """
         # not using get_config/set_config pair
-        # not to trigger "changed_event"
-        cfg = ConfigStore.get_config()
+        # not to create new configuration generation
+        with ConfigStore.lock:
+            cfg = ConfigStore.get_config()
 
-        if cfg.is_default_pool_defined():
-            cfg.remove_default_pool()
+            if cfg.is_default_pool_defined():
+                cfg.remove_default_pool()
 
-        cfg.add_default_pool()
+            cfg.add_default_pool()
 
-        ConfigStore.namespace.config = cfg.data
+            ConfigStore.snapshot.publish(cfg.data)
 
 
     @staticmethod
     def get_new_pool_id(new_pool_data):
         """
-        Get ID for new Pool
+        Get ID for new Pool, Pools with the same allocation share COS
+        so Pool IDs are not limited by number of COS
 
         Returns:
             ID for new Pool
@@ -540,6 +783,8 @@ class ConfigStore:
         if any(k in new_pool_data for k in ('l3cbm', 'l3cbm_data', 'l3cbm_code')):
             alloc_type.append(common.CAT_L3_CAP)
         max_cos_id = PQOS_API.get_max_cos_id(alloc_type)
+        if max_cos_id is None:
+            return None
 
         data = ConfigStore.get_config()
 
@@ -558,7 +803,7 @@ class ConfigStore:
             new_ids.sort()
             return new_ids[-1]
 
-        return None
+        return max(max_cos_id, *pool_ids) + 1
 
 
     @staticmethod
@@ -0,0 +1,241 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+COS table module.
+Maps pools onto classes of service, pools with identical allocation
+(L2/L3 masks, MBA rate) share a COS, so that there can be more pools than
+classes of service.
+"""
+
+import json
+
+from appqos import common
+from appqos import log
+from appqos.pqos_api import PQOS_API
+from appqos.stats import STATS_STORE
+
+# pool attributes defining allocation of pool's COS
+ALLOC_ATTRS = ['l2cbm', 'l2cbm_code', 'l2cbm_data', 'l3cbm', 'l3cbm_code', 'l3cbm_data',
+               'mba', 'domains']
+
+
+def allocation_key(pool, mba_budget=None):
+    """
+    Gets key of pool's allocation, pools with the same key can share a COS
+
+    Parameters:
+        pool: pool configuration (dict)
+        mba_budget: configured MBA budget
+
+    Returns:
+        allocation key
+    """
+    # MBps targets and shares of MBA budget are met by regulating MBA rate of pool's COS
+    if 'mba_bw' in pool or (mba_budget is not None and 'mba' not in pool):
+        return json.dumps({'pool': pool['id']})
+
+    return json.dumps({attr: pool.get(attr) for attr in ALLOC_ATTRS}, sort_keys=True)
+
+
+def max_cos_id(pool):
+    """
+    Gets max COS id that can be used by pool
+
+    Parameters:
+        pool: pool configuration (dict)
+
+    Returns:
+        max COS id, None if not known
+    """
+    alloc_type = []
+    if 'mba' in pool or 'mba_bw' in pool:
+        alloc_type.append(common.MBA_CAP)
+    if any(k in pool for k in ('l2cbm', 'l2cbm_data', 'l2cbm_code')):
+        alloc_type.append(common.CAT_L2_CAP)
+    if any(k in pool for k in ('l3cbm', 'l3cbm_data', 'l3cbm_code')):
+        alloc_type.append(common.CAT_L3_CAP)
+
+    if alloc_type:
+        return PQOS_API.get_max_cos_id(alloc_type)
+
+    # pool without allocation can use any COS
+    cos_ids = [PQOS_API.get_max_cos_id([alloc]) for alloc in \
+               (common.CAT_L3_CAP, common.CAT_L2_CAP, common.MBA_CAP)]
+    cos_ids = [cos_id for cos_id in cos_ids if cos_id is not None]
+
+    return max(cos_ids) if cos_ids else None
+
+
+def map_pools(config, pool_cos=None, cos_keys=None):
+    """
+    Maps pools onto classes of service, "Default" pool #0 uses COS#0
+
+    Pools keep their COS as long as their allocation has not changed.
+    If all pools of a COS changed allocation, the largest group of pools with
+    the same allocation keeps it. Other pools join a COS with the same
+    allocation or get a free one, the highest one they can use.
+
+    Parameters:
+        config: configuration
+        pool_cos: current dict of pool id to COS id or None
+        cos_keys: current dict of COS id to allocation key or None
+
+    Returns:
+        dict of pool id to COS id,
+        None if there are not enough classes of service
+    """
+    pools = config['pools']
+    pool_cos = pool_cos or {}
+    cos_keys = cos_keys or {}
+    keys = {pool['id']: allocation_key(pool, config.get_mba_budget()) for pool in pools}
+    limits = {pool['id']: max_cos_id(pool) for pool in pools}
+    result = {0: 0} if 0 in keys else {}
+
+    # group pools of each COS by allocation
+    groups = {}
+    for pool_id, key in keys.items():
+        cos = pool_cos.get(pool_id)
+        if pool_id == 0 or not cos:
+            continue
+        if limits[pool_id] is not None and cos > limits[pool_id]:
+            continue
+        groups.setdefault(cos, {}).setdefault(key, []).append(pool_id)
+
+    new_cos_keys = {}
+    for cos, key_pools in sorted(groups.items()):
+        # unchanged pools first, then the largest group
+        for key in sorted(key_pools, key=lambda key, cos=cos, key_pools=key_pools: \
+                          (key != cos_keys.get(cos), -len(key_pools[key]), \
+                           min(key_pools[key]))):
+            if key in new_cos_keys.values():
+                continue
+            new_cos_keys[cos] = key
+            for pool_id in key_pools[key]:
+                result[pool_id] = cos
+            break
+    cos_keys = new_cos_keys
+
+    # remaining pools, most restricted ones first
+    new_keys = {}
+    for pool in pools:
+        if pool['id'] in result:
+            continue
+        cos = next((cos for cos, key in cos_keys.items() if key == keys[pool['id']]), None)
+        if cos is not None:
+            result[pool['id']] = cos
+            continue
+        new_keys.setdefault(keys[pool['id']], {'pools': [], 'max_cos_id': limits[pool['id']]})
+        new_keys[keys[pool['id']]]['pools'].append(pool['id'])
+
+    # unknown number of COS is not limiting
+    def limit(group):
+        return group['max_cos_id'] if group['max_cos_id'] is not None else float('inf')
+
+    for key, group in sorted(new_keys.items(), key=lambda item: limit(item[1])):
+        used = set(cos_keys) | {0}
+        if group['max_cos_id'] is None:
+            cos = max(used) + 1
+        else:
+            free = set(range(1, group['max_cos_id'] + 1)) - used
+            if not free:
+                return None
+            cos = max(free)
+        cos_keys[cos] = key
+        for pool_id in group['pools']:
+            result[pool_id] = cos
+
+    return result
+
+
+class CosTable:
+    """
+    Pool to COS table of configured pools
+    """
+
+
+    def __init__(self):
+        self.pool_cos = {}
+        self.cos_keys = {}
+
+
+    def update(self, config):
+        """
+        Remaps pools onto classes of service incrementally,
+        all pools are remapped if there are not enough free classes of service
+
+        Parameters:
+            config: configuration
+
+        Returns:
+            dict of pool id to COS id,
+            None if there are not enough classes of service
+        """
+        pool_cos = map_pools(config, self.pool_cos, self.cos_keys)
+        if pool_cos is None:
+            log.debug("Not enough free COS, remapping all pools...")
+            pool_cos = map_pools(config)
+
+        if pool_cos is None:
+            return None
+
+        self.pool_cos = pool_cos
+        self.cos_keys = {pool_cos[pool['id']]: allocation_key(pool, config.get_mba_budget()) \
+                         for pool in config['pools']}
+        STATS_STORE.cos_stats_set(pool_cos)
+
+        return pool_cos
+
+
+    def get_cos(self, pool_id):
+        """
+        Gets COS of a pool
+
+        Parameters:
+            pool_id: pool id
+
+        Returns:
+            COS id, pool id if pool is not mapped
+        """
+        return self.pool_cos.get(pool_id, pool_id)
+
+
+    def reset(self):
+        """
+        Clears the table
+        """
+        self.pool_cos = {}
+        self.cos_keys = {}
+        STATS_STORE.cos_stats_set({})
+
+
+COS_TABLE = CosTable()
@@ -0,0 +1,206 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+MBA arbiter module.
+Divides per-socket memory bandwidth budget among pools with weighted max-min
+fairness, pool's MBps share is then met by MBA software controller.
+"""
+
+from appqos import log
+from appqos.cache_ops import Pool
+
+
+# allocations below that are considered fully distributed, MBps
+EPSILON = 1e-6
+
+
+def weighted_max_min(budget, demands, weights, guarantees):
+    """
+    Divides budget among pools with weighted max-min fairness.
+    Each pool gets its guarantee first (scaled down proportionally when
+    guarantees exceed the budget) but no more than it demands. The rest of
+    the budget is water-filled by weights, a pool never gets more than its
+    demand while others are left unsatisfied, whatever is left once all
+    demands are met is divided by weights as a headroom.
+
+    Parameters:
+        budget: bandwidth to divide
+        demands: dict of pool to bandwidth demand
+        weights: dict of pool to weight
+        guarantees: dict of pool to guaranteed bandwidth
+
+    Returns:
+        dict of pool to allocated bandwidth
+    """
+    alloc = {pool: min(guarantees.get(pool, 0), demand) for pool, demand in demands.items()}
+    total = sum(alloc.values())
+    if total > budget:
+        alloc = {pool: value * budget / total for pool, value in alloc.items()}
+    remaining = budget - sum(alloc.values())
+
+    active = {pool for pool in demands if demands[pool] > alloc[pool]}
+    while active and remaining > EPSILON:
+        weight_sum = sum(weights[pool] for pool in active)
+        share = {pool: remaining * weights[pool] / weight_sum for pool in active}
+        satisfied = {pool for pool in active if demands[pool] - alloc[pool] <= share[pool]}
+
+        if not satisfied:
+            for pool in active:
+                alloc[pool] += share[pool]
+            remaining = 0
+            break
+
+        for pool in satisfied:
+            remaining -= demands[pool] - alloc[pool]
+            alloc[pool] = demands[pool]
+        active -= satisfied
+
+    if remaining > EPSILON and demands:
+        weight_sum = sum(weights[pool] for pool in demands)
+        for pool in demands:
+            alloc[pool] += remaining * weights[pool] / weight_sum
+
+    return alloc
+
+
+class MbaArbiter:
+    """
+    Socket-wide memory bandwidth arbiter.
+    When budget is configured, pools without MBA rate % share it according
+    to their weights (mba_weight, 1 by default) and guarantees
+    (mba_guarantee MBps, none by default).
+    """
+
+    def __init__(self):
+        self.budget = None
+        self.allocations = {}
+
+
+    def configure(self, config):
+        """
+        Configures arbiter
+
+        Parameters:
+            config: configuration
+        """
+        budget = config.get_mba_budget()
+        if budget != self.budget:
+            log.info(f"MBA arbiter, budget {budget} MBps per socket.")
+        self.budget = budget
+        if budget is None:
+            self.clear()
+
+
+    def clear(self):
+        """
+        Forgets chosen allocations
+        """
+        self.allocations = {}
+
+
+    def is_arbitrated(self, pool_id):
+        """
+        Checks if bandwidth of pool is arbitrated
+
+        Returns:
+            True if pool shares the budget
+            False otherwise
+        """
+        if self.budget is None or pool_id not in Pool.pools:
+            return False
+
+        return Pool.pools[pool_id].get('mba') is None
+
+
+    def allocate(self, socket, demands):
+        """
+        Divides socket budget among pools
+
+        Parameters:
+            socket: socket id
+            demands: dict of pool id to estimated bandwidth demand in MBps
+
+        Returns:
+            dict of pool id to allocated bandwidth in MBps
+        """
+        weights = {}
+        guarantees = {}
+        for pool_id in demands:
+            pool = Pool.pools.get(pool_id, {})
+            weights[pool_id] = pool.get('mba_weight') or 1
+            guarantees[pool_id] = pool.get('mba_guarantee') or 0
+
+        alloc = weighted_max_min(self.budget, demands, weights, guarantees)
+
+        self.allocations[socket] = {
+            pool_id: {
+                'demand': demands[pool_id],
+                'weight': weights[pool_id],
+                'guarantee': guarantees[pool_id],
+                'allocation': alloc[pool_id]
+            } for pool_id in demands
+        }
+
+        return alloc
+
+
+    def stats(self, bandwidth):
+        """
+        Returns chosen allocations and how close pools were to their guarantees
+
+        Parameters:
+            bandwidth: dict of (pool id, socket) to measured bandwidth in MBps
+
+        Returns:
+            dict of socket to budget and per pool allocation info,
+            guarantee_ratio is measured bandwidth relative to guarantee
+            (or to demand when pool demands less), None without guarantee
+        """
+        result = {}
+        for socket, pools in self.allocations.items():
+            info = {}
+            for pool_id, alloc in pools.items():
+                pool_info = dict(alloc)
+                pool_info['bandwidth'] = bandwidth.get((pool_id, socket))
+                pool_info['guarantee_ratio'] = None
+                expected = min(alloc['guarantee'], alloc['demand'])
+                if expected > 0 and pool_info['bandwidth'] is not None:
+                    pool_info['guarantee_ratio'] = pool_info['bandwidth'] / expected
+                info[pool_id] = pool_info
+
+            result[socket] = {'budget': self.budget, 'pools': info}
+
+        return result
+
+
+MBA_ARBITER = MbaArbiter()
@@ -0,0 +1,414 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+MBA software controller module.
+Meets MBps targets of pools when MBA CTRL is not enabled, a target is
+pool's mba_bw and/or its share of socket budget chosen by MBA arbiter.
+Local memory bandwidth of each pool is monitored on each socket and MBA rate
+of the pool is stepped up or down every interval, as rdtset MBA software
+controller does.
+"""
+
+from appqos import caps
+from appqos import log
+from appqos import mba_sc_api
+from appqos.cache_ops import Pool
+from appqos.mba_arbiter import MBA_ARBITER
+from appqos.pqos_api import PQOS_API
+from appqos.stats import STATS_STORE
+
+
+# monitored bandwidth is reported in bytes, targets are in MBps
+MB = 1024 * 1024
+
+MBA_RATE_MAX = 100
+
+
+class MbaDomain:
+    """
+    Regulation state of a pool on a socket
+    """
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+
+    def __init__(self, cores, limit, now):
+        self.cores = cores
+        self.limit = limit              # configured MBps target (mba_bw)
+        self.target = limit             # MBps target
+        self.group = None               # monitoring group
+        self.rate = MBA_RATE_MAX        # MBA rate in %
+        self.last_time = None           # time of last sample
+        self.bandwidth = None           # last measured bandwidth in MBps
+        self.delta_bw = 0               # bandwidth change caused by a single step
+        self.delta_comp = False         # delta_bw to be measured in next interval
+        self.steps = 0                  # number of MBA rate changes
+        self.converged = False          # bandwidth within hysteresis band
+        self.reg_start = now            # start time of ongoing regulation
+        self.reg_time = None            # duration of last regulation
+
+
+    def info(self):
+        """
+        Returns convergence metrics
+
+        Returns:
+            dict of metrics
+        """
+        error = None
+        if self.bandwidth is not None and self.target:
+            error = (self.bandwidth - self.target) / self.target
+
+        return {
+            'target': self.target,
+            'bandwidth': self.bandwidth,
+            'rate': self.rate,
+            'error': error,
+            'steps': self.steps,
+            'converged': self.converged,
+            'regulation_time': self.reg_time
+        }
+
+
+class MbaController:
+    """
+    MBA software controller.
+    Steps MBA rate of each MBA BW pool on each socket towards pool's MBps target.
+    MBA rate is decreased while bandwidth is above the hysteresis band around
+    the target and increased while it is below the band and a step up is not
+    expected to cross the band, the expected change is measured after each step.
+    """
+
+    def __init__(self, hysteresis=0.05, arbiter=MBA_ARBITER):
+        """
+        Parameters:
+            hysteresis: relative half-width of a band around the target,
+                        where MBA rate is not changed
+            arbiter: MBA arbiter dividing socket budget among pools
+        """
+        self.hysteresis = hysteresis
+        self.arbiter = arbiter
+        self.domains = {}
+        self.cap = None
+        self.generation = None
+
+
+    def targets(self):
+        """
+        Gets pools to be regulated by software controller
+
+        Returns:
+            dict of (pool id, socket) to (cores, mba_bw or None)
+        """
+        if caps.mba_bw_enabled():
+            return {}
+
+        num_cos = None
+        if self.arbiter.budget is not None:
+            num_cos = PQOS_API.get_mba_num_cos()
+
+        result = {}
+        for pool_id, pool in Pool.pools.items():
+            mba_bw = pool.get('mba_bw')
+            cores = pool.get('cores')
+            arbitrated = num_cos is not None and Pool(pool_id).cos_get() < num_cos and \
+                self.arbiter.is_arbitrated(pool_id)
+            if not (mba_bw or arbitrated) or not cores:
+                continue
+
+            core_sockets = PQOS_API.get_core_sockets(cores)
+            if core_sockets is None:
+                continue
+
+            for socket in set(core_sockets.values()):
+                socket_cores = sorted(core for core in cores if core_sockets[core] == socket)
+                result[(pool_id, socket)] = (socket_cores, mba_bw)
+
+        return result
+
+
+    @staticmethod
+    def _set_rate(pool_id, socket, rate):
+        """
+        Sets MBA rate of a pool on a socket, regulated pools do not share COS
+
+        Returns:
+            0 on success
+            -1 otherwise
+        """
+        return PQOS_API.mba_set([socket], Pool(pool_id).cos_get(), rate)
+
+
+    def _remove(self, key):
+        """
+        Stops regulation of a pool on a socket,
+        MBA rate % of the pool or no throttling is restored
+        """
+        domain = self.domains.pop(key)
+        if domain.group is not None:
+            mba_sc_api.mon_stop(domain.group)
+
+        # COS of removed pool is free or already used by another pool
+        pool_id, socket = key
+        if pool_id not in Pool.pools:
+            return
+
+        rate = Pool.pools[pool_id].get('mba') or MBA_RATE_MAX
+        if rate != domain.rate:
+            self._set_rate(pool_id, socket, rate)
+
+
+    def sync(self, now):
+        """
+        Starts/stops regulation to follow MBA BW pools configuration
+
+        Parameters:
+            now: current time in seconds
+        """
+        # libpqos re-initialized, monitoring groups are gone
+        if PQOS_API.cap is not self.cap:
+            self.domains = {}
+            self.cap = PQOS_API.cap
+
+        # allocation reset, MBA rates to be written again
+        generation = PQOS_API.pqos.alloc_generation
+        rewrite = generation != self.generation
+        self.generation = generation
+
+        targets = self.targets()
+
+        for key in list(self.domains):
+            if key not in targets or targets[key][0] != self.domains[key].cores:
+                self._remove(key)
+
+        for key, (cores, limit) in targets.items():
+            domain = self.domains.get(key)
+            if domain is None:
+                domain = MbaDomain(cores, limit, now)
+                self.domains[key] = domain
+                rewrite = True
+            elif domain.limit != limit:
+                domain.limit = limit
+                domain.target = limit
+                domain.converged = False
+                domain.reg_start = now
+
+            if domain.group is None:
+                domain.group = mba_sc_api.mon_start(cores, ['lmem_bw'])
+                if domain.group is None:
+                    log.error(f"MBA SC, failed to monitor pool {key[0]} cores {cores}")
+
+        if rewrite:
+            for (pool_id, socket), domain in self.domains.items():
+                self._set_rate(pool_id, socket, domain.rate)
+
+
+    def _regulate(self, domain, step):
+        """
+        Computes new MBA rate
+
+        Parameters:
+            domain: regulation state
+            step: MBA rate granularity
+
+        Returns:
+            new MBA rate
+        """
+        upper = domain.target * (1 + self.hysteresis)
+        lower = domain.target * (1 - self.hysteresis)
+        min_rate = step
+
+        if domain.bandwidth > upper and domain.rate > min_rate:
+            return max(domain.rate - step, min_rate)
+
+        if domain.bandwidth < lower and domain.rate < MBA_RATE_MAX and \
+                domain.bandwidth + domain.delta_bw <= upper:
+            return min(domain.rate + step, MBA_RATE_MAX)
+
+        return domain.rate
+
+
+    @staticmethod
+    def _sample(domain, now):
+        """
+        Processes new sample of a pool on a socket
+
+        Returns:
+            True if bandwidth was measured
+            False otherwise
+        """
+        elapsed = None
+        if domain.last_time is not None:
+            elapsed = now - domain.last_time
+        domain.last_time = now
+
+        # first sample or clock did not advance
+        if not elapsed or elapsed <= 0:
+            return False
+
+        bandwidth = domain.group.values.mbm_local_delta / MB / elapsed
+        if domain.delta_comp:
+            domain.delta_bw = abs(bandwidth - domain.bandwidth)
+            domain.delta_comp = False
+        domain.bandwidth = bandwidth
+
+        return True
+
+
+    def _arbitrate(self):
+        """
+        Sets targets of arbitrated pools to their shares of socket budget,
+        demand of a pool is estimated from its bandwidth at current MBA rate
+        """
+        self.arbiter.clear()
+
+        sockets = {}
+        for (pool_id, socket), domain in self.domains.items():
+            if not self.arbiter.is_arbitrated(pool_id):
+                continue
+
+            if domain.bandwidth is None:
+                # not measured yet, assume it would use whole budget
+                demand = self.arbiter.budget
+            else:
+                demand = domain.bandwidth * MBA_RATE_MAX / domain.rate
+            sockets.setdefault(socket, {})[pool_id] = demand
+
+        for socket, demands in sockets.items():
+            alloc = self.arbiter.allocate(socket, demands)
+            for pool_id, share in alloc.items():
+                domain = self.domains[(pool_id, socket)]
+                domain.target = share if domain.limit is None else min(share, domain.limit)
+
+
+    def _control(self, key, domain, step, now):
+        """
+        Steps MBA rate of a pool on a socket towards its target
+        """
+        rate = self._regulate(domain, step)
+        if rate != domain.rate:
+            pool_id, socket = key
+            if self._set_rate(pool_id, socket, rate) != 0:
+                return
+            domain.rate = rate
+            domain.steps += 1
+            domain.delta_comp = True
+            if domain.converged or domain.reg_start is None:
+                domain.reg_start = now
+            domain.converged = False
+        elif not domain.converged:
+            domain.converged = True
+            if domain.reg_start is not None:
+                domain.reg_time = now - domain.reg_start
+                domain.reg_start = None
+            log.debug(f"MBA SC, pool {key[0]} socket {key[1]}: {round(domain.bandwidth)} MBps " \
+                      f"at {domain.rate}%, target {domain.target} MBps, " \
+                      f"regulation took {domain.reg_time} s")
+
+
+    def step(self, now):
+        """
+        Runs single control step,
+        polls monitoring groups and updates MBA rates
+
+        Parameters:
+            now: current time in seconds
+
+        Returns:
+            0 on success
+            -1 otherwise
+        """
+        self.sync(now)
+
+        active = [(key, domain) for key, domain in self.domains.items() \
+                  if domain.group is not None]
+        if not active:
+            self.arbiter.clear()
+            STATS_STORE.mba_stats_set(self.stats(), self.arbiter_stats())
+            return 0
+
+        step = mba_sc_api.get_mba_throttle_step()
+        if not step:
+            return -1
+
+        if mba_sc_api.mon_poll([domain.group for _, domain in active]) != 0:
+            return -1
+
+        sampled = [(key, domain) for key, domain in active if self._sample(domain, now)]
+
+        if self.arbiter.budget is not None:
+            self._arbitrate()
+
+        for key, domain in sampled:
+            if domain.target:
+                self._control(key, domain, step, now)
+
+        STATS_STORE.mba_stats_set(self.stats(), self.arbiter_stats())
+
+        return 0
+
+
+    def stats(self):
+        """
+        Returns convergence metrics of regulated pools
+
+        Returns:
+            dict of pool id to dict of socket to metrics
+        """
+        result = {}
+        for (pool_id, socket), domain in self.domains.items():
+            result.setdefault(pool_id, {})[socket] = domain.info()
+
+        return result
+
+
+    def arbiter_stats(self):
+        """
+        Returns allocations chosen by MBA arbiter
+
+        Returns:
+            dict of socket to budget and per pool allocation info
+        """
+        bandwidth = {key: domain.bandwidth for key, domain in self.domains.items()}
+        return self.arbiter.stats(bandwidth)
+
+
+    def stop(self):
+        """
+        Stops regulation of all pools
+        """
+        if PQOS_API.cap is self.cap:
+            for key in list(self.domains):
+                self._remove(key)
+        self.domains = {}
+
+
+MBA_SC = MbaController()
@@ -0,0 +1,137 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+MBA software controller plumbing module.
+Monitoring and MBA capabilities of libpqos used by MBA software controller.
+"""
+
+from pqos.monitoring import PqosMon
+from pqos.native_struct import CPqosMonitor
+
+from appqos import log
+from appqos.pqos_api import PQOS_API
+
+
+def mon_start(cores, events):
+    """
+    Starts monitoring of a group of cores
+
+    Parameters:
+        cores: list of cores to monitor
+        events: list of events to monitor
+
+    Returns:
+        monitoring group on success
+        None otherwise
+    """
+    try:
+        return PqosMon().start_cores(cores, events)
+    except Exception as ex:
+        log.error(f"MBA SC, {ex}")
+        return None
+
+
+def mon_poll(groups):
+    """
+    Polls monitoring groups
+
+    Parameters:
+        groups: list of monitoring groups
+
+    Returns:
+        0 on success
+        -1 otherwise
+    """
+    try:
+        PqosMon().poll(groups)
+    except Exception as ex:
+        log.error(f"MBA SC, {ex}")
+        return -1
+
+    return 0
+
+
+def mon_stop(group):
+    """
+    Stops monitoring of a group
+
+    Parameters:
+        group: monitoring group
+
+    Returns:
+        0 on success
+        -1 otherwise
+    """
+    try:
+        group.stop()
+    except Exception as ex:
+        log.error(f"MBA SC, {ex}")
+        return -1
+
+    return 0
+
+
+def is_mba_sc_supported():
+    """
+    Checks if MBA rate can be controlled in software to meet MBps targets,
+    i.e. MBA is linear and local memory bandwidth can be monitored
+
+    Returns:
+        True if supported
+        False otherwise
+    """
+    try:
+        mba_caps = PQOS_API.cap.get_type("mba")
+        mon_caps = PQOS_API.cap.get_type("mon")
+    except Exception as ex:
+        log.debug(f"MBA SC, {ex}")
+        return False
+
+    events = [event.type for event in mon_caps.events]
+
+    return bool(mba_caps.is_linear) and CPqosMonitor.PQOS_MON_EVENT_LMEM_BW in events
+
+
+def get_mba_throttle_step():
+    """
+    Gets MBA rate granularity
+
+    Returns:
+        MBA throttle step
+        or None on error
+    """
+    try:
+        return PQOS_API.cap.get_type("mba").throttle_step
+    except Exception as ex:
+        log.error(f"MBA SC, {ex}")
+        return None
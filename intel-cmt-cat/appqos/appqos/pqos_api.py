@@ -46,12 +46,31 @@ from pqos.l2ca import PqosCatL2
 from pqos.mba import PqosMba
 from pqos.allocation import PqosAlloc
 from pqos.cpuinfo import PqosCpuInfo
+from pqos.fanout import apply_domains
+from pqos.shadow import AllocationShadow
 
 from appqos import common
 from appqos import log
 from appqos.manager import MANAGER
 
 
+def _domain_value(value, domain):
+    """
+    Gets value of an allocation on a domain
+
+    Parameters:
+        value: value common to all domains or dict of domain to value
+        domain: socket or L2 ID
+
+    Returns:
+        value on a domain
+    """
+    if isinstance(value, dict):
+        return value[domain]
+
+    return value
+
+
 class PqosApi:
 # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """
@@ -101,8 +120,13 @@ class PqosApi:
         self.l2ca = None
         self.mba = None
         self.alloc = None
+        self.shadow = None
         self.cpuinfo = None
 
+        # maximum number of worker threads used to apply a CoS to sockets
+        # or L2 IDs, 1 applies domains one by one ("rdt_domain_workers")
+        self.domain_workers = 1
+
         # dict to share interface type and MBA BW status
         # between REST API process and "backend"
         self.shared_dict = MANAGER.dict()
@@ -142,6 +166,7 @@ class PqosApi:
             self.l2ca = PqosCatL2()
             self.mba = PqosMba()
             self.alloc = PqosAlloc()
+            self.shadow = AllocationShadow()
             self.cpuinfo = PqosCpuInfo()
         except Exception as ex:
             log.error(str(ex))
@@ -295,8 +320,8 @@ class PqosApi:
             return 0
 
         try:
-            for core in cores:
-                self.alloc.assoc_set(core, cos)
+            # only cores not yet associated with cos are written
+            self.shadow.assoc_set_many({core: cos for core in cores})
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -308,6 +333,8 @@ class PqosApi:
         """
         Configures L3 CAT for CoS
 
+        Masks are either common to all sockets or dicts of socket to mask.
+
         Parameters:
             sockets: sockets list on which to configure L3 CAT
             cos_id: Class of Service
@@ -319,10 +346,14 @@ class PqosApi:
             0 on success
             -1 otherwise
         """
+        def l3ca_cos(socket):
+            return self.l3ca.COS(cos_id, mask=_domain_value(mask, socket),
+                                 code_mask=_domain_value(code_mask, socket),
+                                 data_mask=_domain_value(data_mask, socket))
+
         try:
-            cos = self.l3ca.COS(cos_id, mask=mask, code_mask=code_mask, data_mask=data_mask)
-            for socket in sockets:
-                self.l3ca.set(socket, [cos])
+            apply_domains(lambda socket: self.shadow.set_l3ca(socket, [l3ca_cos(socket)]),
+                          sockets, self.domain_workers)
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -333,6 +364,8 @@ class PqosApi:
         """
         Configures L2 CAT for CoS
 
+        Masks are either common to all L2 IDs or dicts of L2 ID to mask.
+
         Parameters:
             l2ids: L2 cache identifiers list on which to configure L2 CAT
             cos_id: Class of Service
@@ -344,10 +377,14 @@ class PqosApi:
             0 on success
             -1 otherwise
         """
+        def l2ca_cos(l2id):
+            return self.l2ca.COS(cos_id, mask=_domain_value(mask, l2id),
+                                 code_mask=_domain_value(code_mask, l2id),
+                                 data_mask=_domain_value(data_mask, l2id))
+
         try:
-            cos = self.l2ca.COS(cos_id, mask=mask, code_mask=code_mask, data_mask=data_mask)
-            for l2id in l2ids:
-                self.l2ca.set(l2id, [cos])
+            apply_domains(lambda l2id: self.shadow.set_l2ca(l2id, [l2ca_cos(l2id)]), l2ids,
+                          self.domain_workers)
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -361,16 +398,18 @@ class PqosApi:
         Parameters:
             sockets: sockets list on which to configure L3 CAT
             cos_id: Class of Service
-            mb_max: MBA rate to set
+            mb_max: MBA rate to set, common to all sockets or dict of socket to rate
 
         Returns:
             0 on success
             -1 otherwise
         """
+        def mba_cos(socket):
+            return self.mba.COS(cos_id, _domain_value(mb_max, socket), ctrl)
+
         try:
-            cos = self.mba.COS(cos_id, mb_max, ctrl)
-            for socket in sockets:
-                self.mba.set(socket, [cos])
+            apply_domains(lambda socket: self.shadow.set_mba(socket, [mba_cos(socket)]),
+                          sockets, self.domain_workers)
         except Exception as ex:
             log.error(str(ex))
             return -1
@@ -504,6 +543,42 @@ class PqosApi:
             return None
 
 
+    def get_core_sockets(self, cores):
+        """
+        Gets socket of each core
+
+        Parameters:
+            cores: list of cores
+
+        Returns:
+            dict of core to socket,
+            None otherwise
+        """
+        try:
+            return {core: self.cpuinfo.get_socketid(core) for core in cores}
+        except Exception as ex:
+            log.error(str(ex))
+            return None
+
+
+    def get_core_l2ids(self, cores):
+        """
+        Gets L2 ID of each core
+
+        Parameters:
+            cores: list of cores
+
+        Returns:
+            dict of core to L2 ID,
+            None otherwise
+        """
+        try:
+            return {core: self.cpuinfo.get_core_info(core).l2_id for core in cores}
+        except Exception as ex:
+            log.error(str(ex))
+            return None
+
+
     def get_cores(self):
         """
         Gets list of cores
@@ -606,6 +681,24 @@ class PqosApi:
 
         return min(cos_nums) - 1
 
+    def get_min_l2_cat_cbm(self):
+        """
+        Gets smallest L2 CAT CBM that can be set, the lowest ways
+
+        Returns:
+            Min L2 CAT CBM
+            None otherwise
+        """
+
+        if not self.is_l2_cat_supported():
+            return None
+
+        try:
+            return 2**self.l2ca.get_min_cbm_bits() - 1
+        except Exception as ex:
+            log.error(str(ex))
+            return None
+
     def get_max_l2_cat_cbm(self):
         """
         Gets Max L2 CAT CBM
@@ -625,6 +718,24 @@ class PqosApi:
             log.error(str(ex))
             return None
 
+    def get_min_l3_cat_cbm(self):
+        """
+        Gets smallest L3 CAT CBM that can be set, the lowest ways
+
+        Returns:
+            Min L3 CAT CBM
+            None otherwise
+        """
+
+        if not self.is_l3_cat_supported():
+            return None
+
+        try:
+            return 2**self.l3ca.get_min_cbm_bits() - 1
+        except Exception as ex:
+            log.error(str(ex))
+            return None
+
     def get_max_l3_cat_cbm(self):
         """
         Gets Max L3 CAT CBM
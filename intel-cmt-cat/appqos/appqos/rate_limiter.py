@@ -0,0 +1,109 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Rate limiter module.
+Token bucket limiting rate of configuration changes
+"""
+
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket, allows bursts of up to "burst" operations
+    and "rate" operations per second on average
+    """
+
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        """
+        Constructor
+
+        Parameters:
+            rate: tokens added per second
+            burst: bucket capacity
+            clock: time source
+        """
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.last_ts = None
+
+
+    def _refill(self, now):
+        """
+        Add tokens accumulated since last refill
+
+        Parameters:
+            now: current time
+        """
+        if self.last_ts is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_ts) * self.rate)
+        self.last_ts = now
+
+
+    def delay(self, now=None):
+        """
+        Get time until a token is available
+
+        Parameters:
+            now: current time, clock used if None
+
+        Returns:
+            delay in seconds, 0 if token is available
+        """
+        now = self.clock() if now is None else now
+        self._refill(now)
+
+        if self.tokens >= 1:
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+
+    def consume(self, now=None):
+        """
+        Take a token from the bucket
+
+        Parameters:
+            now: current time, clock used if None
+
+        Returns:
+            True if token was taken, False if bucket is empty
+        """
+        if self.delay(now) > 0:
+            return False
+
+        self.tokens -= 1
+        return True
@@ -0,0 +1,254 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+RDT configuration module.
+Configures RDT interface, Pools and Apps, reconfiguring only Pools and
+Apps affected by a configuration change.
+"""
+
+from copy import deepcopy
+
+from appqos import caps
+from appqos import log
+from appqos.cache_ops import Apps, Pool
+from appqos.config_diff import ConfigDiff
+from appqos.config_store import ConfigStore
+from appqos.cos_table import COS_TABLE
+from appqos.pqos_api import PQOS_API
+
+
+def configure_rdt(cfg):
+    """
+    Configure RDT
+
+    Parameters
+        cfg: configuration
+
+    Returns:
+        0 on success
+    """
+    result = 0
+    recreate_default = False
+
+    cfg_rdt_iface = cfg.get_rdt_iface()
+
+    def rdt_interface():
+        """
+        Change RDT interface if needed
+
+        Returns:
+            False interface not changed
+        """
+        if cfg_rdt_iface != PQOS_API.current_iface():
+            if PQOS_API.init(cfg_rdt_iface):
+                raise RuntimeError("Failed to initialize RDT interface!")
+
+            log.info(f"RDT initialized with {cfg_rdt_iface.upper()} interface.")
+            return True
+
+        return False
+
+    def rdt_reset():
+        """
+        Change RDT features enabled status
+
+        Returns:
+            False nothing changed
+        """
+
+        def get_mba_cfg():
+            """
+            Obtain MBA configuration
+            """
+            if caps.mba_supported(cfg_rdt_iface):
+                cfg_mba_ctrl_enabled = cfg.get_mba_ctrl_enabled()
+                # Change MBA BW/CTRL state if needed
+                if cfg_mba_ctrl_enabled == PQOS_API.is_mba_bw_enabled():
+                    return "any"
+
+                if cfg_mba_ctrl_enabled:
+                    return "ctrl"
+                return "default"
+
+            return "any"
+
+        def get_l2cdp_cfg():
+            """
+            Obtain L2 CDP configuration
+            """
+            if caps.cat_l2_supported(cfg_rdt_iface) and caps.cdp_l2_supported(cfg_rdt_iface):
+                cfg_l2cdp_enabled = cfg.get_l2cdp_enabled()
+                # Change L2CDP state if needed
+                if cfg_l2cdp_enabled == PQOS_API.is_l2_cdp_enabled():
+                    return "any"
+
+                if cfg_l2cdp_enabled:
+                    return "on"
+                return "off"
+
+            return "any"
+
+        def get_l3cdp_cfg():
+            """
+            Obtain L3 CDP configuration
+            """
+            if caps.cat_l3_supported(cfg_rdt_iface) and caps.cdp_l3_supported(cfg_rdt_iface):
+                cfg_l3cdp_enabled = cfg.get_l3cdp_enabled()
+                # Change L3CDP state if needed
+                if cfg_l3cdp_enabled == PQOS_API.is_l3_cdp_enabled():
+                    return "any"
+
+                if cfg_l3cdp_enabled:
+                    return "on"
+                return "off"
+
+            return "any"
+
+        l3cdp_cfg = get_l3cdp_cfg()
+        l2cdp_cfg = get_l2cdp_cfg()
+        mba_cfg = get_mba_cfg()
+
+        if l3cdp_cfg != "any" or l2cdp_cfg != "any" or mba_cfg != "any":
+            if PQOS_API.reset(l3_cdp_cfg = l3cdp_cfg, l2_cdp_cfg = l2cdp_cfg, \
+                                     mba_cfg = mba_cfg):
+                if l3cdp_cfg != "any":
+                    raise RuntimeError("Failed to change L3 CDP state!")
+                if l2cdp_cfg != "any":
+                    raise RuntimeError("Failed to change L2 CDP state!")
+                if mba_cfg != "any":
+                    raise RuntimeError("Failed to change MBA BW state!")
+
+            log.info(f"RDT MBA BW {'en' if PQOS_API.is_mba_bw_enabled() else 'dis'}abled.")
+            log.info(f"RDT L3 CDP {'en' if PQOS_API.is_l3_cdp_enabled() else 'dis'}abled.")
+            log.info(f"RDT L2 CDP {'en' if PQOS_API.is_l2_cdp_enabled() else 'dis'}abled.")
+
+    try:
+        if rdt_interface():
+            recreate_default = True
+        if rdt_reset():
+            recreate_default = True
+
+    except Exception as ex:
+        log.error(str(ex))
+        return -1
+
+    if recreate_default:
+        # On interface or MBA BW state change it is needed to recreate Default Pool #0
+        ConfigStore().recreate_default_pool()
+        Pool.config = None
+
+    PQOS_API.domain_workers = cfg.get_global_attr('rdt_domain_workers', 1)
+
+    result = configure_pools(cfg, ConfigDiff(Pool.config, cfg))
+
+    # on failure, everything is configured next time
+    Pool.config = deepcopy(cfg) if result == 0 else None
+
+    return result
+
+
+def configure_pools(cfg, diff):
+    # pylint: disable=too-many-branches
+    """
+    Configure Pools and Apps affected by configuration change
+
+    Parameters
+        cfg: configuration
+        diff: change between applied configuration and cfg
+
+    Returns:
+        0 on success
+    """
+    if not diff.full and diff.is_empty():
+        log.debug("No RDT configuration changes...")
+        return 0
+
+    # detect removed pools
+    old_pools = Pool.pools.copy()
+
+    pool_ids = cfg.get_pool_attr('id', None)
+
+    if old_pools:
+        for pool_id in old_pools:
+            if not pool_ids or pool_id not in pool_ids:
+                log.debug(f"Pool {pool_id} removed...")
+                Pool(pool_id).cores_set([])
+
+                # remove pool
+                Pool.pools.pop(pool_id)
+
+    if not pool_ids:
+        log.error("No Pools to configure...")
+        return -1
+
+    # map pools onto classes of service
+    pool_cos = COS_TABLE.update(cfg)
+    if pool_cos is None:
+        log.error("Not enough COS to configure Pools...")
+        return -1
+
+    # pools to be configured and classes of service with changed pools
+    configure = set(diff.pools_added + diff.pools_changed)
+    changed_cos = {pool.get('cos', pool_id) for pool_id, pool in old_pools.items() \
+                   if pool_id not in pool_ids}
+
+    for pool_id in pool_ids:
+        pool = Pool(pool_id)
+        if pool_id in old_pools and pool.cos_get() != pool_cos[pool_id]:
+            configure.add(pool_id)
+            changed_cos.add(pool.cos_get())
+        if pool_id in configure:
+            changed_cos.add(pool_cos[pool_id])
+        pool.cos_set(pool_cos[pool_id])
+
+    # Configure Pools, Intel RDT (CAT, MBA)
+    for pool_id in Pool.pools:
+        if diff.full or pool_id in configure:
+            result = Pool(pool_id).configure(cfg)
+            if result != 0:
+                return result
+        elif pool_id in diff.pools_pids:
+            Pool(pool_id).pids_configure(cfg)
+
+    # reapply COS of unchanged pools sharing it with changed ones
+    if not diff.full:
+        for cos in changed_cos:
+            pool_id = next((pool_id for pool_id in Pool.pools \
+                            if pool_cos[pool_id] == cos and pool_id not in configure), None)
+            if pool_id is not None and Pool.apply(pool_id) != 0:
+                return -1
+
+    # Configure Apps, core affinity
+    result = Apps().configure(cfg, None if diff.full else diff.apps_changed)
+
+    return result
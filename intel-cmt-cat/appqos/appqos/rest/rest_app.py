@@ -67,13 +67,12 @@ class App(Resource):
             response, status code
         """
 
-        data = ConfigStore.get_config()
+        data = ConfigStore.get_config_snapshot()
         if 'apps' not in data:
             raise NotFound("No apps in config file")
 
         try:
-            app = data.get_app(int(app_id))
-            app['pool_id'] = data.app_to_pool(int(app_id))
+            app = dict(data.get_app(int(app_id)), pool_id=data.app_to_pool(int(app_id)))
         except:
             # pylint: disable=raise-missing-from
             raise NotFound(f"APP {app_id} not found in config")
@@ -103,20 +102,11 @@ class App(Resource):
             if app['id'] != int(app_id):
                 continue
 
-            # remove app id from pool
-            for pool in data['pools']:
-                if 'apps' not in pool:
-                    continue
+            # remove app and app id from pool
+            data.remove_app(app['id'])
+            generation = ConfigStore.set_config(data)
 
-                if app['id'] in pool['apps']:
-                    pool['apps'].remove(app['id'])
-                    break
-
-            # remove app
-            data['apps'].remove(app)
-            ConfigStore.set_config(data)
-
-            res = {'message': f"APP {app_id} deleted" }
+            res = {'message': f"APP {app_id} deleted", 'generation': generation}
             return res, 200
 
         raise NotFound(f"APP {app_id} not found in config")
@@ -159,20 +149,8 @@ class App(Resource):
             if 'pool_id' in json_data:
                 pool_id = json_data['pool_id']
 
-                # remove app id from pool
-                for pool in data['pools']:
-                    if 'apps' in pool:
-                        if app['id'] in pool['apps']:
-                            pool['apps'].remove(app['id'])
-                            break
-
-                # add app id to new pool
-                for pool in data['pools']:
-                    if pool['id'] == int(pool_id):
-                        if not 'apps' in pool:
-                            pool['apps'] = []
-                        pool['apps'].append(app['id'])
-                        break
+                # remove app id from pool, add app id to new pool
+                data.move_app(app['id'], int(pool_id))
 
             # set new cores
             if 'cores' in json_data:
@@ -184,7 +162,7 @@ class App(Resource):
 
             # set new PIDs
             if 'pids' in json_data:
-                app['pids'] = json_data['pids']
+                data.set_app_pids(app['id'], json_data['pids'])
 
             try:
                 ConfigStore().validate(data)
@@ -193,11 +171,11 @@ class App(Resource):
             except Exception as ex:
                 raise BadRequest(f"APP {app_id} not updated, {ex}") from ex
 
-            ConfigStore.set_config(data)
+            generation = ConfigStore.set_config(data)
             if 'pool_id' in json_data:
                 STATS_STORE.general_stats_inc_apps_moves()
 
-            res = {'message': f"APP {app_id} updated"}
+            res = {'message': f"APP {app_id} updated", 'generation': generation}
             return res, 200
 
         raise NotFound(f"APP {app_id} not found in config")
@@ -219,16 +197,13 @@ class Apps(Resource):
         Returns:
             response, status code
         """
-        data = ConfigStore.get_config()
+        data = ConfigStore.get_config_snapshot()
         if 'apps' not in data or not data['apps']:
             return ([]), 200
 
-        apps = data['apps']
+        apps = [dict(app, pool_id=data.app_to_pool(app['id'])) for app in data['apps']]
 
-        for app in apps:
-            app['pool_id'] = data.app_to_pool(app['id'])
-
-        return (data['apps']), 200
+        return apps, 200
 
 
     @staticmethod
@@ -293,12 +268,8 @@ class Apps(Resource):
             raise BadRequest(f"New APP not added, {ex}") from ex
 
         # update pool configuration to include new app
-        if not 'apps' in pool:
-            pool['apps'] = []
-        pool['apps'].append(json_data['id'])
-
         json_data.pop('pool_id')
-        data['apps'].append(json_data)
+        data.add_app(json_data, pool['id'])
 
         try:
             ConfigStore().validate(data)
@@ -307,10 +278,11 @@ class Apps(Resource):
         except Exception as ex:
             raise BadRequest(f"New APP not added, {ex}") from ex
 
-        ConfigStore.set_config(data)
+        generation = ConfigStore.set_config(data)
 
         res = {
             'id': json_data['id'],
-            'message': f"New APP added to pool {pool['id']}"
+            'message': f"New APP added to pool {pool['id']}",
+            'generation': generation
         }
         return res, 201
@@ -44,7 +44,7 @@ from appqos import power
 from appqos import sstbf
 from appqos.config_store import ConfigStore
 from appqos.stats import StatsStore, STATS_STORE
-from appqos.rest.rest_exceptions import BadRequest, InternalError
+from appqos.rest.rest_exceptions import BadRequest, InternalError, NotFound
 
 class Stats(Resource):
     """
@@ -69,6 +69,43 @@ class Stats(Resource):
         return res, 200
 
 
+class StatsMba(Resource):
+    """
+    Handles /stats/mba HTTP requests
+    """
+
+
+    @staticmethod
+    def get():
+        """
+        Handles HTTP GET /stats/mba request.
+        Retrieve MBA software controller stats,
+        convergence metrics of regulated pools and MBA arbiter allocations
+
+        Returns:
+            response, status code
+        """
+        return STATS_STORE.mba_stats_get(), 200
+
+
+class StatsCos(Resource):
+    """
+    Handles /stats/cos HTTP requests
+    """
+
+
+    @staticmethod
+    def get():
+        """
+        Handles HTTP GET /stats/cos request.
+        Retrieve pool to COS table, pools with the same allocation share COS
+
+        Returns:
+            response, status code
+        """
+        return {'pools': STATS_STORE.cos_stats_get()}, 200
+
+
 class Caps(Resource):
     """
     Handles /caps HTTP requests
@@ -161,3 +198,30 @@ class Reset(Resource):
 
         res = {'message': "Reset performed. Configuration reloaded."}
         return res, 200
+
+
+class ConfigGeneration(Resource):
+    """
+    Handles /config/generations/<generation> HTTP requests
+    """
+
+
+    @staticmethod
+    def get(generation):
+        """
+        Handles HTTP GET /config/generations/<generation> request.
+        Retrieve status of configuration generation returned by configuration change
+        Raises NotFound
+
+        Parameters:
+            generation: configuration generation
+
+        Returns:
+            response, status code
+        """
+        status = ConfigStore.get_config_status(generation)
+        if status is None:
+            raise NotFound(f"Configuration generation {generation} not found")
+
+        res = {'generation': generation, 'status': status}
+        return res, 200
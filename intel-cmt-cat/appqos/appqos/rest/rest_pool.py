@@ -41,12 +41,11 @@ from flask_restful import Resource, request
 import jsonschema
 
 from appqos import caps
-from appqos import common
 from appqos import log
 from appqos import sstbf
 from appqos.config_store import ConfigStore
 from appqos.rest.rest_exceptions import NotFound, BadRequest, InternalError
-from appqos.pqos_api import PQOS_API
+from appqos.stats import STATS_STORE
 
 class Pool(Resource):
     """
@@ -77,6 +76,11 @@ class Pool(Resource):
         except:
             # pylint: disable=raise-missing-from
             raise NotFound(f"POOL {pool_id} not found in config")
+
+        pool_cos = STATS_STORE.cos_stats_get()
+        if pool['id'] in pool_cos:
+            pool['cos'] = pool_cos[pool['id']]
+
         return pool, 200
 
 
@@ -108,11 +112,11 @@ class Pool(Resource):
             if 'apps' in pool and pool['apps']:
                 raise BadRequest(f"POOL {pool_id} is not empty")
 
-            # remove app
-            data['pools'].remove(pool)
-            ConfigStore.set_config(data)
+            # remove pool
+            data.remove_pool(pool['id'])
+            generation = ConfigStore.set_config(data)
 
-            res = {'message': f"POOL {pool_id} deleted"}
+            res = {'message': f"POOL {pool_id} deleted", 'generation': generation}
             return res, 200
 
         raise NotFound(f"POOL {pool_id} not found in config")
@@ -132,28 +136,23 @@ class Pool(Resource):
         Returns:
             response, status code
         """
-        def check_alloc_tech(pool_id, json_data):
+        def check_alloc_tech(json_data):
             iface = ConfigStore.get_config().get_rdt_iface()
 
             if any(k in json_data for k in ('l3cbm', 'l3cbm_data', 'l3cbm_code')):
                 if not caps.cat_l3_supported(iface):
                     raise BadRequest("System does not support CAT!")
-                if pool_id > PQOS_API.get_max_cos_id([common.CAT_L3_CAP]):
-                    raise BadRequest(f"Pool {pool_id} does not support CAT")
 
             if any(k in json_data for k in ('l2cbm', 'l2cbm_data', 'l2cbm_code')):
                 if not caps.cat_l2_supported(iface):
                     raise BadRequest("System does not support CAT!")
-                if pool_id > PQOS_API.get_max_cos_id([common.CAT_L2_CAP]):
-                    raise BadRequest(f"Pool {pool_id} does not support L2 CAT")
 
             if 'mba' in json_data or 'mba_bw' in json_data:
                 if not caps.mba_supported(iface):
                     raise BadRequest("System does not support MBA!")
-                if pool_id > PQOS_API.get_max_cos_id([common.MBA_CAP]):
-                    raise BadRequest(f"Pool {pool_id} does not support MBA")
 
-            if 'mba_bw' in json_data and not caps.mba_bw_enabled():
+            if 'mba_bw' in json_data and not caps.mba_bw_enabled() \
+                    and not caps.mba_sc_supported(iface):
                 raise BadRequest("MBA CTRL is not "\
                                  f"{'enabled' if caps.mba_bw_supported() else 'supported'}!")
 
@@ -186,7 +185,7 @@ class Pool(Resource):
                     json_data['l3cbm'] = json_data['cbm']
                 json_data.pop('cbm')
 
-            check_alloc_tech(int(pool_id), json_data)
+            check_alloc_tech(json_data)
 
             # set new cbm
             for key in ['l2cbm', 'l2cbm_code', 'l2cbm_data', 'l3cbm', 'l3cbm_code', 'l3cbm_data']:
@@ -199,10 +198,18 @@ class Pool(Resource):
 
                 pool[key] = cbm
 
-            for feature in ['mba', 'mba_bw', 'cores']:
+            for feature in ['mba', 'mba_bw', 'mba_weight', 'mba_guarantee']:
                 if feature in json_data:
                     pool[feature] = json_data[feature]
 
+            if 'cores' in json_data:
+                data.set_pool_cores(pool['id'], json_data['cores'])
+
+            # new per domain allocation replaces the old one
+            if 'domains' in json_data:
+                ConfigStore.domains_cbm_to_int(json_data['domains'])
+                pool['domains'] = json_data['domains']
+
             if 'apps' in pool and pool['apps']:
                 for app_id in pool['apps']:
                     for app in data['apps']:
@@ -225,9 +232,9 @@ class Pool(Resource):
             except Exception as ex:
                 raise BadRequest(f"POOL {pool_id} not updated, {ex}") from ex
 
-            ConfigStore.set_config(data)
+            generation = ConfigStore.set_config(data)
 
-            res = {'message': f"POOL {pool_id} updated"}
+            res = {'message': f"POOL {pool_id} updated", 'generation': generation}
             return res, 200
 
         raise NotFound(f"POOL {pool_id} not found in config")
@@ -249,10 +256,15 @@ class Pools(Resource):
         Returns:
             response, status code
         """
-        data = ConfigStore.get_config()
+        data = deepcopy(ConfigStore.get_config())
         if 'pools' not in data:
             raise NotFound("No pools in config file")
 
+        pool_cos = STATS_STORE.cos_stats_get()
+        for pool in data['pools']:
+            if pool['id'] in pool_cos:
+                pool['cos'] = pool_cos[pool['id']]
+
         return data['pools'], 200
 
 
@@ -301,23 +313,27 @@ class Pools(Resource):
 
             post_data[key] = cbm
 
+        if 'domains' in post_data:
+            ConfigStore.domains_cbm_to_int(post_data['domains'])
+
         # ignore 'power_profile' if SST-BF is enabled
         if sstbf.is_sstbf_configured():
             post_data.pop('power_profile', None)
 
         cfg = ConfigStore.get_config()
         data = deepcopy(cfg)
-        data['pools'].append(post_data)
+        data.add_pool(post_data)
 
         try:
             ConfigStore().validate(data, admission_control_check)
         except Exception as ex:
             raise BadRequest("New POOL not added") from ex
 
-        ConfigStore.set_config(data)
+        generation = ConfigStore.set_config(data)
 
         res = {
             'id': post_data['id'],
-            'message': f"New POOL {post_data['id']} added"
+            'message': f"New POOL {post_data['id']} added",
+            'generation': generation
         }
         return res, 201
@@ -131,9 +131,12 @@ class Power(Resource):
 
             # remove profile
             data['power_profiles'].remove(profile)
-            ConfigStore.set_config(data)
+            generation = ConfigStore.set_config(data)
 
-            res = {'message': "POWER PROFILE " + str(profile_id) + " deleted"}
+            res = {
+                'message': "POWER PROFILE " + str(profile_id) + " deleted",
+                'generation': generation
+            }
             return res, 200
 
         raise NotFound("POWER PROFILE " + str(profile_id) + " not found in config")
@@ -181,9 +184,12 @@ class Power(Resource):
             except Exception as ex:
                 raise BadRequest(f"POWER PROFILE {profile_id} not updated - {str(ex)}") from ex
 
-            ConfigStore.set_config(data)
+            generation = ConfigStore.set_config(data)
 
-            res = {'message': "POWER PROFILE " + str(profile_id) + " updated"}
+            res = {
+                'message': "POWER PROFILE " + str(profile_id) + " updated",
+                'generation': generation
+            }
             return res, 200
 
         raise NotFound(f"POWER PROFILE {profile_id} not found in config")
@@ -245,11 +251,12 @@ class Powers(Resource):
         except Exception as ex:
             raise BadRequest("New POWER PROFILE not added") from ex
 
-        ConfigStore().set_config(data)
+        generation = ConfigStore().set_config(data)
 
         res = {
             'id': json_data['id'],
-            'message': f"New POWER PROFILE {json_data['id']} added"
+            'message': f"New POWER PROFILE {json_data['id']} added",
+            'generation': generation
         }
 
         return res, 201
@@ -151,14 +151,16 @@ class CapsMbaCtrl(Resource):
         if cfg.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        res = {'message': "MBA CTRL status changed."}
+
         if cfg.get_mba_ctrl_enabled() != json_data['enabled']:
             data = deepcopy(cfg)
 
             CapsMbaCtrl.set_mba_ctrl_enabled(data, json_data['enabled'])
 
-            ConfigStore.set_config(data)
+            res['generation'] = ConfigStore.set_config(data)
 
-        return {'message': "MBA CTRL status changed."}, 200
+        return res, 200
 
     @staticmethod
     def set_mba_ctrl_enabled(data, enabled):
@@ -230,6 +232,8 @@ class CapsRdtIface(Resource):
         if cfg.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        res = {'message': "RDT Interface modified"}
+
         if cfg.get_rdt_iface() != json_data['interface']:
             data = deepcopy(cfg)
 
@@ -241,9 +245,8 @@ class CapsRdtIface(Resource):
             CapsL3ca.set_cdp_enabled(data, False)
             CapsL2ca.set_cdp_enabled(data, False)
 
-            ConfigStore.set_config(data)
+            res['generation'] = ConfigStore.set_config(data)
 
-        res = {'message': "RDT Interface modified"}
         return res, 200
 
 
@@ -311,14 +314,16 @@ class CapsL3ca(Resource):
         if cfg.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        res = {'message': "L3 CDP status changed."}
+
         if cfg.get_l3cdp_enabled() != json_data['cdp_enabled']:
             data = deepcopy(cfg)
 
             CapsL3ca.set_cdp_enabled(data, json_data['cdp_enabled'])
 
-            ConfigStore().set_config(data)
+            res['generation'] = ConfigStore().set_config(data)
 
-        return {'message': "L3 CDP status changed."}, 200
+        return res, 200
 
 
     @staticmethod
@@ -403,14 +408,16 @@ class CapsL2ca(Resource):
         if cfg.is_any_pool_defined():
             return {'message': "Please remove all Pools first!"}, 409
 
+        res = {'message': "L2 CDP status changed."}
+
         if cfg.get_l2cdp_enabled() != json_data['cdp_enabled']:
             data = deepcopy(cfg)
 
             CapsL2ca.set_cdp_enabled(data, json_data['cdp_enabled'])
 
-            ConfigStore().set_config(data)
+            res['generation'] = ConfigStore().set_config(data)
 
-        return {'message': "L2 CDP status changed."}, 200
+        return res, 200
 
 
     @staticmethod
@@ -51,7 +51,7 @@ from appqos.rest.rest_power import Power, Powers
 from appqos.rest.rest_app import App, Apps
 from appqos.rest.rest_caps_cpu import CapsCpus
 from appqos.rest.rest_pool import Pool, Pools
-from appqos.rest.rest_misc import Stats, Caps, Sstbf, Reset
+from appqos.rest.rest_misc import Stats, StatsMba, StatsCos, Caps, Sstbf, Reset, ConfigGeneration
 from appqos.rest.rest_rdt import CapsRdtIface, CapsMba, CapsMbaCtrl, CapsL3ca, CapsL2ca
 from appqos.stats import STATS_STORE
 
@@ -107,6 +107,8 @@ class Server:
 
         # Stats and Capabilities API
         self.api.add_resource(Stats, '/stats')
+        self.api.add_resource(StatsMba, '/stats/mba')
+        self.api.add_resource(StatsCos, '/stats/cos')
         self.api.add_resource(Caps, '/caps')
         self.api.add_resource(CapsCpus, '/caps/cpu')
 
@@ -130,6 +132,9 @@ class Server:
         # Reset API
         self.api.add_resource(Reset, '/reset')
 
+        # Configuration generations API
+        self.api.add_resource(ConfigGeneration, '/config/generations/<int:generation>')
+
         self.app.register_error_handler(HTTPException, Server.error_handler)
 
 
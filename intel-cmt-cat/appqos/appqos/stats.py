@@ -61,6 +61,13 @@ class StatsStore:
                 self.General.NUM_INV_ACCESS]:
             self.general_stats[cntr] = 0
 
+        self.mba_stats = MANAGER.dict()
+        self.mba_stats['pools'] = {}
+        self.mba_stats['arbiter'] = {}
+
+        self.cos_stats = MANAGER.dict()
+        self.cos_stats['pools'] = {}
+
 
     def general_stats_inc(self, gen_stats_id):
         """
@@ -111,4 +118,47 @@ class StatsStore:
         """
         self.general_stats_inc(StatsStore.General.NUM_INV_ACCESS)
 
+
+    def mba_stats_set(self, pools, arbiter):
+        """
+        Stores MBA software controller stats
+
+        Parameters:
+            pools: convergence metrics of regulated pools
+            arbiter: allocations chosen by MBA arbiter
+        """
+        self.mba_stats['pools'] = pools
+        self.mba_stats['arbiter'] = arbiter
+
+
+    def mba_stats_get(self):
+        """
+        Getter for MBA software controller stats
+
+        Returns:
+            MBA software controller stats
+        """
+        return dict(self.mba_stats)
+
+
+
+    def cos_stats_set(self, pool_cos):
+        """
+        Stores pool to COS table
+
+        Parameters:
+            pool_cos: dict of pool id to COS id
+        """
+        self.cos_stats['pools'] = pool_cos
+
+
+    def cos_stats_get(self):
+        """
+        Getter for pool to COS table
+
+        Returns:
+            dict of pool id to COS id
+        """
+        return self.cos_stats['pools']
+
 STATS_STORE = StatsStore()
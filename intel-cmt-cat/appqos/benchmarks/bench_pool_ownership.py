@@ -0,0 +1,162 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Benchmark of core and PID ownership changes in cache_ops.Pool at scale:
+PIDs of apps moved between pools and cores moved between pools, compared
+with the list based ownership computation used before (nested list
+comprehensions over all other pools).
+
+RDT association and affinity calls are mocked out, so only ownership
+bookkeeping is measured.
+
+Usage: python3 benchmarks/bench_pool_ownership.py [-p PIDS] [-c CORES] [-n POOLS]
+"""
+
+import argparse
+import time
+from unittest import mock
+
+from appqos.cache_ops import Pool
+
+
+def legacy_pids_set(pools, pool, pids):
+    "PIDs ownership update as done with lists, returns removed PIDs."
+
+    old_pids = pools[pool]['pids']
+    removed_pids = [pid for pid in old_pids if pid not in pids]
+    for pool_id in pools:
+        if pool_id == pool:
+            continue
+        removed_pids = [pid for pid in removed_pids if pid not in pools[pool_id]['pids']]
+
+    if old_pids:
+        for pool_id in pools:
+            if pool_id == pool:
+                continue
+            pools[pool_id]['pids'] = [pid for pid in pools[pool_id]['pids'] if pid not in pids]
+
+    pools[pool]['pids'] = pids
+    return removed_pids
+
+
+def legacy_cores_set(pools, pool, cores):
+    "Cores ownership update as done with lists, returns released cores."
+
+    old_cores = pools[pool]['cores']
+    removed_cores = [core for core in old_cores if core not in cores]
+    pools[pool]['cores'] = cores
+
+    for pool_id in pools:
+        if pool_id == pool:
+            continue
+        pools[pool_id]['cores'] = [core for core in pools[pool_id]['cores'] if core not in cores]
+        removed_cores = [core for core in removed_cores if core not in pools[pool_id]['cores']]
+
+    return removed_cores
+
+
+def layout(num_pids, num_cores, num_pools):
+    "Returns initial and moved cores and PIDs of each pool."
+
+    cores = {pool: list(range(pool, num_cores, num_pools)) for pool in range(num_pools)}
+    pids = {pool: list(range(pool, num_pids, num_pools)) for pool in range(num_pools)}
+
+    # every pool takes over half of the PIDs and one core of the next pool
+    moved_pids = {}
+    moved_cores = {}
+    for pool in range(num_pools):
+        other = (pool + 1) % num_pools
+        moved_pids[pool] = pids[pool] + pids[other][:len(pids[other]) // 2]
+        moved_cores[pool] = cores[pool] + cores[other][:1]
+
+    return cores, pids, moved_cores, moved_pids
+
+
+def run_legacy(cores, pids, moved_cores, moved_pids):
+    "Moves cores and PIDs with list based ownership, returns time."
+
+    pools = {pool: {'cores': list(cores[pool]), 'pids': list(pids[pool])} for pool in cores}
+
+    start = time.perf_counter()
+    for pool in pools:
+        legacy_pids_set(pools, pool, moved_pids[pool])
+    for pool in pools:
+        legacy_cores_set(pools, pool, moved_cores[pool])
+
+    return time.perf_counter() - start
+
+
+def run_ownership(cores, pids, moved_cores, moved_pids):
+    "Moves cores and PIDs with Pool ownership tables, returns time."
+
+    with mock.patch('appqos.pqos_api.PQOS_API.alloc_assoc_set', return_value=0), \
+         mock.patch('appqos.pqos_api.PQOS_API.release', return_value=0), \
+         mock.patch('appqos.caps.sstcp_enabled', return_value=False), \
+         mock.patch('appqos.cache_ops.set_affinity'):
+
+        Pool.reset()
+        for pool in cores:
+            Pool(pool).cores_set(list(cores[pool]))
+            Pool(pool).pids_set(list(pids[pool]), [])
+
+        start = time.perf_counter()
+        for pool in cores:
+            Pool(pool).pids_set(moved_pids[pool], [])
+        for pool in cores:
+            Pool(pool).cores_set(moved_cores[pool])
+        elapsed = time.perf_counter() - start
+
+        Pool.reset()
+
+    return elapsed
+
+
+def main():
+    "Main entry point."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-p', '--pids', type=int, default=10000, help='number of PIDs')
+    parser.add_argument('-c', '--cores', type=int, default=256, help='number of cores')
+    parser.add_argument('-n', '--pools', type=int, default=64, help='number of pools')
+    args = parser.parse_args()
+
+    cores, pids, moved_cores, moved_pids = layout(args.pids, args.cores, args.pools)
+
+    print(f"{args.pids} PIDs, {args.cores} cores, {args.pools} pools")
+    for name, func in [("lists", run_legacy), ("ownership tables", run_ownership)]:
+        elapsed = func(cores, pids, moved_cores, moved_pids)
+        print(f"  {name:<18} {elapsed * 1000:10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -41,42 +41,6 @@ from appqos import common
 from appqos.cache_ops import *
 from appqos.config import Config
 
-@mock.patch("appqos.caps.caps_get", mock.MagicMock(return_value=[]))
-def test_configure_rdt():
-    Pool.pools[1] = {}
-    Pool.pools[1]['cores'] = [1, 101]
-    Pool.pools[1]['cbm'] = 0x100
-    Pool.pools[1]['mba'] = 11
-
-    Pool.pools[2] = {}
-    Pool.pools[2]['cores'] = [2, 202]
-    Pool.pools[2]['cbm'] = 0x200
-    Pool.pools[2]['mba'] = 22
-
-    with mock.patch('appqos.config.Config.get_pool_attr', return_value=[1]) as mock_get_pool_attr,\
-         mock.patch('appqos.cache_ops.Pool.cores_set') as mock_cores_set,\
-         mock.patch('appqos.cache_ops.Pool.configure', return_value=0) as mock_pool_configure,\
-         mock.patch('appqos.cache_ops.Apps.configure', return_value=0) as mock_apps_configure,\
-         mock.patch('appqos.pqos_api.PQOS_API.init', return_value=0),\
-         mock.patch('appqos.pqos_api.PQOS_API.enable_mba_bw', return_value=0),\
-         mock.patch('appqos.config_store.ConfigStore.recreate_default_pool', return_value=0):
-
-        cfg = Config({})
-
-        assert not configure_rdt(cfg)
-
-        mock_cores_set.assert_called_once_with([])
-        mock_pool_configure.assert_called_once()
-        mock_apps_configure.assert_called_once()
-
-        mock_pool_configure.return_value = -1
-        assert configure_rdt(cfg) == -1
-
-        mock_pool_configure.return_value = 0
-        mock_get_pool_attr.return_value = []
-        assert configure_rdt(cfg) == -1
-
-
 class TestPools(object):
 
     ## @cond
@@ -89,6 +53,7 @@ class TestPools(object):
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.cat_l2_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=False))
     def test_configure(self):
         def get_attr(cls, attr, pool_id):
             config = {
@@ -168,6 +133,32 @@ class TestPools(object):
              mock_apply.assert_called_once_with(1)
 
 
+    @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.cat_l2_supported", mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_bw_enabled", mock.MagicMock(return_value=False))
+    def test_configure_mba_sc(self):
+        def get_attr(cls, attr, pool_id):
+            config = {
+                'cores': [1, 2],
+                'mba_bw': 100
+            }
+            return config.get(attr)
+
+        with mock.patch('appqos.config.Config.get_pool_attr', new=get_attr),\
+             mock.patch('appqos.cache_ops.Pool.mba_set') as mock_mba_set,\
+             mock.patch('appqos.cache_ops.Pool.mba_bw_set') as mock_mba_bw_set,\
+             mock.patch('appqos.cache_ops.Pool.cores_set'),\
+             mock.patch('appqos.cache_ops.Pool.apply') as mock_apply:
+
+            Pool(1).configure(Config({}))
+
+            mock_mba_bw_set.assert_called_once_with(100)
+            mock_mba_set.assert_called_once_with(None)
+            mock_apply.assert_called_once_with(1)
+
+
     def test_l3cbm_get(self):
         Pool.pools[3] = {}
         Pool.pools[3]['l3cbm'] = 0xf
@@ -373,6 +364,50 @@ class TestPools(object):
         mock_release.assert_called_once_with([2])
 
 
+    @mock.patch('appqos.pqos_api.PQOS_API.alloc_assoc_set', mock.MagicMock(return_value=0))
+    @mock.patch('appqos.pqos_api.PQOS_API.release')
+    @mock.patch('appqos.caps.caps_get', mock.MagicMock(return_value=[]))
+    def test_cores_set_moved(self, mock_release):
+        Pool(1).cores_set([1, 2, 3])
+        Pool(2).cores_set([4, 5])
+        assert Pool.core_bitmap(1) == 0b1110
+
+        # cores taken from other pool are not released
+        Pool(2).cores_set([3, 4])
+        assert Pool.pools[1]['cores'] == [1, 2]
+        assert Pool.core_bitmap(1) == 0b110
+        mock_release.assert_called_once_with([5])
+
+        # cores list replaced directly
+        Pool.pools[1]['cores'] = [7]
+        assert Pool.core_bitmap(1) == 1 << 7
+
+        Pool.reset()
+
+
+    def test_pids_set_moved(self):
+        with mock.patch('appqos.cache_ops.set_affinity') as set_aff_mock:
+            Pool(1).pids_set([1, 2, 3], [0])
+            Pool(2).pids_set([4], [0])
+            set_aff_mock.assert_not_called()
+            assert Pool.pid_pool(2) == 1
+
+            # PIDs moved from other pool, not set to default cores
+            Pool(2).pids_set([2, 3], [0])
+            assert Pool.pools[1]['pids'] == [1]
+            assert Pool.pid_pool(2) == 2
+            assert Pool.pid_pool(4) is None
+            set_aff_mock.assert_called_once_with([4], [0])
+            set_aff_mock.reset_mock()
+
+            # PIDs already moved to other pool, not set to default cores
+            Pool(1).pids_set([], [0])
+            set_aff_mock.assert_called_once_with([1], [0])
+
+        Pool.reset()
+        assert Pool.pid_pool(2) is None
+
+
     @mock.patch('appqos.pqos_api.PQOS_API.l3ca_set')
     @mock.patch('appqos.pqos_api.PQOS_API.alloc_assoc_set')
     def test_apply_not_configured(self, mock_l3ca_set, mock_alloc_assoc_set):
@@ -384,6 +419,92 @@ class TestPools(object):
         mock_alloc_assoc_set.assert_not_called()
 
 
+    @mock.patch('appqos.pqos_api.PQOS_API.is_l2_cdp_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('appqos.pqos_api.PQOS_API.is_l3_cdp_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('appqos.pqos_api.PQOS_API.alloc_assoc_set', mock.MagicMock(return_value=0))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_sockets', mock.MagicMock(return_value=[0, 1]))
+    @pytest.mark.parametrize("mba_bw_enabled", [True, False])
+    def test_apply_mba_bw(self, mba_bw_enabled):
+        Pool.pools[1] = {}
+        Pool.pools[1]['cores'] = [2, 3]
+        Pool.pools[1]['mba_bw'] = 5000
+
+        with mock.patch('appqos.caps.mba_bw_enabled', return_value=mba_bw_enabled),\
+             mock.patch('appqos.pqos_api.PQOS_API.mba_set', return_value=0) as mock_mba_set:
+            assert Pool.apply(1) == 0
+
+            # without MBA CTRL MBA rate is left to MBA software controller
+            if mba_bw_enabled:
+                mock_mba_set.assert_called_once_with([0, 1], 1, 5000, True)
+            else:
+                mock_mba_set.assert_not_called()
+
+
+    @mock.patch('appqos.pqos_api.PQOS_API.is_l2_cdp_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('appqos.pqos_api.PQOS_API.is_l3_cdp_enabled', mock.MagicMock(return_value=False))
+    @mock.patch('appqos.pqos_api.PQOS_API.alloc_assoc_set', mock.MagicMock(return_value=0))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_sockets', mock.MagicMock(return_value=[0, 1]))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_l2ids', mock.MagicMock(return_value=[0, 1, 2]))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_core_sockets',
+                mock.MagicMock(side_effect=lambda cores: {core: core // 4 for core in cores}))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_core_l2ids',
+                mock.MagicMock(side_effect=lambda cores: {core: core // 2 for core in cores}))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_min_l3_cat_cbm', mock.MagicMock(return_value=0x1))
+    @mock.patch('appqos.pqos_api.PQOS_API.get_min_l2_cat_cbm', mock.MagicMock(return_value=0x1))
+    @mock.patch('appqos.caps.mba_bw_enabled', mock.MagicMock(return_value=False))
+    def test_apply_domains(self):
+        for pool_id in [0, 1]:
+            Pool.pools[pool_id] = {}
+            Pool.pools[pool_id]['cores'] = [2, 3]
+            Pool.pools[pool_id]['l3cbm'] = 0xf0
+            Pool.pools[pool_id]['l2cbm'] = 0xc
+            Pool.pools[pool_id]['mba'] = 50
+
+        with mock.patch('appqos.pqos_api.PQOS_API.l3ca_set', return_value=0) as mock_l3ca_set,\
+             mock.patch('appqos.pqos_api.PQOS_API.l2ca_set', return_value=0) as mock_l2ca_set,\
+             mock.patch('appqos.pqos_api.PQOS_API.mba_set', return_value=0) as mock_mba_set:
+            # masks collapsed on domains without pool's cores
+            assert Pool.apply(1) == 0
+            mock_l3ca_set.assert_called_once_with([0, 1], 1, mask={0: 0xf0, 1: 0x1})
+            mock_l2ca_set.assert_called_once_with([0, 1, 2], 1, mask={0: 0x1, 1: 0xc, 2: 0x1})
+            mock_mba_set.assert_called_once_with([0, 1], 1, 50, False)
+
+            # Default pool's COS is used by unassigned cores too
+            mock_l3ca_set.reset_mock()
+            mock_l2ca_set.reset_mock()
+            assert Pool.apply(0) == 0
+            mock_l3ca_set.assert_called_once_with([0, 1], 0, mask=0xf0)
+            mock_l2ca_set.assert_called_once_with([0, 1, 2], 0, mask=0xc)
+
+            # per domain values
+            Pool(1).domains_set({'sockets': [{'id': 1, 'l3cbm': 0xf, 'mba': 100},
+                                             {'id': 0, 'mba': 20}],
+                                 'l2ids': [{'id': 1, 'l2cbm': 0x3}]})
+            mock_l3ca_set.reset_mock()
+            mock_l2ca_set.reset_mock()
+            mock_mba_set.reset_mock()
+            assert Pool.apply(1) == 0
+            mock_l3ca_set.assert_called_once_with([0, 1], 1, mask={0: 0xf0, 1: 0xf})
+            mock_l2ca_set.assert_called_once_with([0, 1, 2], 1, mask={0: 0x1, 1: 0x3, 2: 0x1})
+            mock_mba_set.assert_called_once_with([0, 1], 1, {0: 20, 1: 100}, False)
+
+            # pools sharing COS, masks collapsed where none of their cores live
+            Pool.pools[2] = {'cores': [4], 'l3cbm': 0xf0, 'cos': 5}
+            Pool(1).cos_set(5)
+            Pool(1).domains_set(None)
+            mock_l3ca_set.reset_mock()
+            mock_l2ca_set.reset_mock()
+            assert Pool.apply(1) == 0
+            mock_l3ca_set.assert_called_once_with([0, 1], 5, mask=0xf0)
+            mock_l2ca_set.assert_called_once_with([0, 1, 2], 5, mask={0: 0x1, 1: 0xc, 2: 0xc})
+
+            # topology unknown, same mask everywhere
+            mock_l3ca_set.reset_mock()
+            with mock.patch('appqos.pqos_api.PQOS_API.get_core_sockets', return_value=None):
+                assert Pool.apply(1) == 0
+            mock_l3ca_set.assert_called_once_with([0, 1], 5, mask=0xf0)
+
+
     @mock.patch('appqos.pqos_api.PQOS_API.is_l2_cdp_enabled')
     @mock.patch('appqos.pqos_api.PQOS_API.is_l3_cdp_enabled')
     @mock.patch('appqos.pqos_api.PQOS_API.mba_set')
@@ -570,3 +691,12 @@ class TestApps(object):
                 set_aff_mock.assert_any_call([2, 22], [2])
                 set_aff_mock.assert_any_call([10], [1, 2, 3, 4])
 
+        with mock.patch('appqos.config.Config.app_to_pool', return_value=1),\
+             mock.patch('appqos.config.Config.get_pool_attr', new=get_pool_attr),\
+             mock.patch('appqos.cache_ops.set_affinity') as set_aff_mock:
+
+                cfg = Config(CONFIG)
+                Apps.configure(cfg, [2])
+
+                set_aff_mock.assert_called_once_with([2, 22], [2])
+
@@ -139,6 +139,88 @@ def test_config_pid_to_pool(pid, pool_id):
     assert config.pid_to_pool(pid) == pool_id
 
 
+@pytest.mark.parametrize("core, pool_id", [
+    (1, 1),
+    (3, 2),
+    (4, 3),
+    (5, None)
+])
+def test_config_core_to_pool(core, pool_id):
+    config = Config(CONFIG)
+
+    assert config.core_to_pool(core) == pool_id
+
+
+def test_config_index_direct_modification():
+    config = Config(deepcopy(CONFIG))
+
+    assert config.app_to_pool(1) == 1
+    assert config.pid_to_app(4) == 3
+
+    # modify config bypassing mutation helpers
+    config['pools'][0]['apps'].remove(1)
+    config['pools'][1]['apps'].append(1)
+    config['apps'][2]['pids'] = [5]
+    config['pools'].pop()
+    config['pools'].append({"id": 4, "cores": [4]})
+
+    config.reindex()
+
+    assert config.app_to_pool(1) == 2
+    assert config.pid_to_app(4) is None
+    assert config.pid_to_app(5) == 3
+    assert config.get_pool_attr('cores', 3) is None
+    assert config.core_to_pool(4) == 4
+
+    # lists replaced
+    config['apps'] = []
+    assert config.pid_to_app(5) is None
+    config['pools'] = [{"id": 5, "cores": [4], "apps": [1]}]
+    assert config.core_to_pool(4) == 5
+    assert config.app_to_pool(1) == 5
+
+
+def test_config_index_helpers():
+    config = Config(deepcopy(CONFIG))
+
+    config.add_app({"id": 4, "cores": [4], "pids": [10]}, 3)
+    assert config.get_app(4)['pids'] == [10]
+    assert config.app_to_pool(4) == 3
+    assert config.pid_to_pool(10) == 3
+
+    config.move_app(4, 1)
+    assert config.app_to_pool(4) == 1
+    assert config.get_pool_attr('apps', 1) == [1, 4]
+    assert config.get_pool_attr('apps', 3) is None or 4 not in config.get_pool_attr('apps', 3)
+
+    config.set_app_pids(4, [11])
+    assert config.pid_to_app(10) is None
+    assert config.pid_to_app(11) == 4
+
+    config.remove_app(4)
+    assert config.app_to_pool(4) is None
+    assert config.pid_to_app(11) is None
+    assert 4 not in config.get_pool_attr('apps', 1)
+    with pytest.raises(KeyError):
+        config.get_app(4)
+
+    config.add_pool({"id": 5, "cores": [5]})
+    assert config.core_to_pool(5) == 5
+
+    config.set_pool_cores(5, [6])
+    assert config.core_to_pool(5) is None
+    assert config.core_to_pool(6) == 5
+
+    config.remove_pool(5)
+    assert config.core_to_pool(6) is None
+    with pytest.raises(KeyError):
+        config.get_pool(5)
+
+    # app moved to not existing pool is unassigned
+    config.move_app(1, 99)
+    assert config.app_to_pool(1) is None
+
+
 @mock.patch('appqos.pqos_api.PQOS_API.get_cores')
 @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=False))
 @mock.patch("appqos.caps.cat_l2_supported", mock.MagicMock(return_value=False))
@@ -167,10 +249,7 @@ def test_config_default_pool(mock_get_cores):
     assert not all_cores
 
     # remove default pool from config
-    for pool in config['pools']:
-        if pool['id'] == 0:
-            config['pools'].remove(pool)
-            break
+    config.remove_pool(0)
 
     # no default pool in config
     assert not config.is_default_pool_defined()
@@ -435,10 +514,7 @@ def test_config_is_default_pool_defined():
     assert config.is_default_pool_defined() == True
 
     # remove default pool from config
-    for pool in config['pools'][:]:
-        if pool['id'] == 0:
-            config['pools'].remove(pool)
-            break
+    config.remove_pool(0)
 
     # FUT, no default pool in config
     assert not config.is_default_pool_defined()
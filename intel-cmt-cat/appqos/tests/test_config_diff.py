@@ -0,0 +1,152 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.config_diff module
+"""
+
+from copy import deepcopy
+
+from appqos.config import Config
+from appqos.config_diff import ConfigDiff
+
+
+CONFIG = {
+    "rdt_iface": {"interface": "msr"},
+    "pools": [
+        {"id": 0, "name": "Default", "l3cbm": 0xff, "cores": [0]},
+        {"id": 1, "name": "Pool 1", "l3cbm": 0xf, "cores": [1], "apps": [1]},
+        {"id": 2, "name": "Pool 2", "l3cbm": 0xf0, "cores": [2, 3], "apps": [2]}
+    ],
+    "apps": [
+        {"id": 1, "name": "App 1", "cores": [1], "pids": [11]},
+        {"id": 2, "name": "App 2", "cores": [2], "pids": [22]}
+    ]
+}
+
+
+def modify(func):
+    data = Config(deepcopy(CONFIG))
+    func(data)
+    return data
+
+
+def test_initial():
+    diff = ConfigDiff(None, Config(CONFIG))
+
+    assert diff.full
+    assert diff.pools_added == [0, 1, 2]
+    assert not diff.is_empty()
+
+
+def test_unchanged():
+    diff = ConfigDiff(Config(CONFIG), Config(deepcopy(CONFIG)))
+
+    assert not diff.full
+    assert diff.is_empty()
+
+
+def test_global_change():
+    def change(data):
+        data['rdt_iface'] = {"interface": "os"}
+
+    assert ConfigDiff(Config(CONFIG), modify(change)).full
+
+
+def test_name_change():
+    def change(data):
+        data['pools'][1]['name'] = "Renamed"
+        data['apps'][1]['name'] = "Renamed"
+
+    diff = ConfigDiff(Config(CONFIG), modify(change))
+
+    assert not diff.pools_changed
+    # app definition differs, affinity is set again
+    assert diff.apps_changed == [2]
+
+
+def test_pool_changed():
+    def change(data):
+        data['pools'][1]['l3cbm'] = 0x3
+
+    diff = ConfigDiff(Config(CONFIG), modify(change))
+
+    assert not diff.full
+    assert diff.pools_changed == [1]
+    assert not diff.pools_pids
+    # pool's cores not changed
+    assert not diff.apps_changed
+
+
+def test_pool_cores_changed():
+    def change(data):
+        data['pools'][2]['cores'] = [2, 3, 4]
+
+    diff = ConfigDiff(Config(CONFIG), modify(change))
+
+    assert diff.pools_changed == [2]
+    assert diff.apps_changed == [2]
+
+
+def test_pools_added_removed():
+    def change(data):
+        data['pools'].pop(2)
+        data['apps'].pop(1)
+        data['pools'].append({"id": 3, "l3cbm": 0xf, "cores": [5]})
+
+    diff = ConfigDiff(Config(CONFIG), modify(change))
+
+    assert diff.pools_removed == [2]
+    assert diff.pools_added == [3]
+    assert not diff.pools_changed
+
+
+def test_pids_changed():
+    def change(data):
+        data['apps'][0]['pids'] = [11, 12]
+
+    diff = ConfigDiff(Config(CONFIG), modify(change))
+
+    assert not diff.pools_changed
+    assert diff.pools_pids == [1]
+    assert diff.apps_changed == [1]
+
+
+def test_app_moved():
+    def change(data):
+        data['pools'][1]['apps'] = []
+        data['pools'][2]['apps'] = [1, 2]
+
+    diff = ConfigDiff(Config(CONFIG), modify(change))
+
+    assert diff.pools_pids == [1, 2]
+    assert diff.apps_changed == [1]
@@ -0,0 +1,135 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.config_snapshot module
+"""
+
+import multiprocessing
+
+import mock
+
+from appqos.config_snapshot import ConfigSnapshot
+
+
+CONFIG = {"pools": [{"id": 0, "cores": [0, 1]}], "apps": [{"id": 1, "pids": [1]}]}
+
+
+def test_empty():
+    snapshot = ConfigSnapshot()
+
+    assert snapshot.get() == ({}, 0)
+    assert snapshot.get_snapshot() == ({}, 0)
+    assert snapshot.generation() == 0
+
+    # shared memory is created on first publish
+    assert snapshot.header is None
+
+    snapshot.close()
+
+
+def test_publish():
+    snapshot = ConfigSnapshot()
+
+    assert snapshot.publish(CONFIG, 1) == 1
+    assert snapshot.get() == (CONFIG, 1)
+    assert snapshot.generation() == 1
+
+    # generation is kept
+    assert snapshot.publish({"pools": []}) == 1
+    assert snapshot.get() == ({"pools": []}, 1)
+
+    snapshot.close()
+
+
+def test_get_copy():
+    snapshot = ConfigSnapshot()
+    snapshot.publish(CONFIG, 1)
+
+    data, _ = snapshot.get()
+    data['pools'].pop()
+    assert snapshot.get() == (CONFIG, 1)
+
+    snapshot.close()
+
+
+def test_get_snapshot_cached():
+    snapshot = ConfigSnapshot()
+    snapshot.publish(CONFIG, 1)
+
+    data, generation = snapshot.get_snapshot()
+    assert data == CONFIG
+    assert generation == 1
+    assert snapshot.get_snapshot()[0] is data
+
+    snapshot.publish(CONFIG, 2)
+    new_data, generation = snapshot.get_snapshot()
+    assert new_data is not data
+    assert new_data == CONFIG
+    assert generation == 2
+
+    snapshot.close()
+
+
+def publish(snapshot, config, generation):
+    snapshot.publish(config, generation)
+
+
+def test_publish_other_process():
+    snapshot = ConfigSnapshot()
+    snapshot.publish(CONFIG, 1)
+    assert snapshot.get_snapshot() == (CONFIG, 1)
+
+    ctx = multiprocessing.get_context('fork')
+    process = ctx.Process(target=publish, args=(snapshot, {"pools": []}, 2))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    assert snapshot.get_snapshot() == ({"pools": []}, 2)
+
+    snapshot.close()
+
+
+
+def test_reader_untracked():
+    snapshot = ConfigSnapshot()
+    snapshot.publish(CONFIG, 1)
+
+    with mock.patch('multiprocessing.resource_tracker.register') as register,\
+         mock.patch('multiprocessing.resource_tracker.unregister') as unregister:
+        assert snapshot.get() == (CONFIG, 1)
+
+    # attached segment is not left registered, not to be removed on reader's exit
+    assert register.call_count == unregister.call_count
+
+    snapshot.close()
@@ -110,6 +110,26 @@ def test_config_recreate_default_pool(def_pool_def):
         mock_add_def_pool.assert_called_once()
 
 
+def test_config_recreate_default_pool_locked():
+    lock = mock.MagicMock()
+
+    def publish(data, generation=None):
+        lock.__enter__.assert_called_once()
+        lock.__exit__.assert_not_called()
+        return generation
+
+    with mock.patch('appqos.config.Config.is_default_pool_defined', return_value=False),\
+         mock.patch('appqos.config.Config.add_default_pool'),\
+         mock.patch('appqos.config_store.ConfigStore.lock', new=lock),\
+         mock.patch('appqos.config_store.ConfigStore.snapshot.publish',
+                    side_effect=publish) as mock_publish:
+
+        ConfigStore.recreate_default_pool()
+
+        mock_publish.assert_called_once()
+        lock.__exit__.assert_called_once()
+
+
 @mock.patch('appqos.config_store.ConfigStore.get_config')
 def test_config_get_new_pool_id(mock_get_config):
 
@@ -138,6 +158,11 @@ def test_config_get_new_pool_id(mock_get_config):
         assert 30 == config_store.get_new_pool_id({"l2cbm":"0xff"})
         assert 30 == config_store.get_new_pool_id({"l2cbm":"0xff", "cbm":"0xf0"})
 
+        # pool IDs are not limited by number of COS
+        mock_get_config.return_value = Config({"pools": [{"id": 0}, {"id": 1}, {"id": 2}]})
+        with mock.patch('appqos.pqos_api.PQOS_API.get_max_cos_id', return_value=2):
+            assert 3 == config_store.get_new_pool_id({"mba":10})
+
 
 def test_config_reset():
     from copy import deepcopy
@@ -190,6 +215,53 @@ def test_config_reset():
         assert config_store.get_config().get_pool_attr('mba', 0) is None
 
 
+def test_config_generations():
+    config_store = ConfigStore()
+
+    # consume pending changes
+    config_store.wait_config_changed(0)
+    _, processed = config_store.get_config_generation()
+    config_store.config_processed(processed, True)
+    assert config_store.wait_config_changed(0) is None
+
+    cfg = Config(deepcopy(CONFIG))
+    generation = config_store.set_config(cfg)
+    assert generation == processed + 1
+    assert config_store.get_config_status(generation) == "pending"
+
+    # changes are collapsed into the latest one
+    assert config_store.set_config(cfg) == generation + 1
+    assert config_store.set_config(cfg) == generation + 2
+    assert config_store.wait_config_changed(0) == generation + 2
+    assert config_store.wait_config_changed(0) is None
+
+    _, latest = config_store.get_config_generation()
+    assert latest == generation + 2
+    config_store.config_processed(latest, False)
+    for gen in range(generation, latest + 1):
+        assert config_store.get_config_status(gen) == "failed"
+
+    # changes already processed are ignored
+    config_store.changed_queue.put(latest)
+    assert config_store.wait_config_changed(0) is None
+
+    generation = config_store.set_config(cfg)
+    config_store.config_processed(generation, True)
+    assert config_store.get_config_status(generation) == "applied"
+    assert config_store.get_config_status(generation + 1) is None
+    assert config_store.wait_config_changed(0) is None
+
+    # wake up only
+    config_store.wakeup()
+    assert config_store.wait_config_changed(0) is None
+
+    # status of old generations is not kept
+    generation += ConfigStore.GENERATIONS_HISTORY
+    config_store.config_processed(generation, True)
+    assert config_store.get_config_status(generation - ConfigStore.GENERATIONS_HISTORY) is None
+    assert config_store.get_config_status(generation) == "applied"
+
+
 class TestConfigValidate:
 
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
@@ -444,6 +516,7 @@ class TestConfigValidate:
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_bw_supported", mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=False))
     def test_pool_mba_bw_not_supported(self):
         data = Config({
             "pools": [
@@ -484,6 +557,7 @@ class TestConfigValidate:
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_bw_supported", mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=False))
     def test_pool_mba_bw_not_supported_cat(self):
         data = Config({
             "pools": [
@@ -501,6 +575,29 @@ class TestConfigValidate:
             ConfigStore().validate(data)
 
 
+    @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_bw_supported", mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=True))
+    def test_pool_mba_bw_mba_sc(self):
+        data = Config({
+            "rdt_iface": {"interface": "msr"},
+            "mba_ctrl": {"enabled": False},
+            "pools": [
+                {
+                    "cbm": 0xf,
+                    "mba_bw": 5000,
+                    "cores": [1, 3],
+                    "id": 1,
+                    "name": "pool 1"
+                }
+            ]
+        })
+
+        ConfigStore().validate(data)
+
+
     @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
@@ -531,6 +628,113 @@ class TestConfigValidate:
             ConfigStore().validate(data)
 
 
+    @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=True))
+    def test_mba_budget(self):
+        data = Config({
+            "rdt_iface": {"interface": "msr"},
+            "mba_budget": {"bw": 10000},
+            "pools": [
+                {
+                    "cbm": 0xf,
+                    "mba_guarantee": 6000,
+                    "cores": [1, 3],
+                    "id": 1,
+                    "name": "pool 1"
+                },
+                {
+                    "cbm": 0xf,
+                    "mba_weight": 2,
+                    "cores": [2],
+                    "id": 2,
+                    "name": "pool 2"
+                }
+            ]
+        })
+
+        ConfigStore().validate(data)
+
+        data['pools'][1]['mba_guarantee'] = 5000
+        with pytest.raises(ValueError, match="exceed MBA budget"):
+            ConfigStore().validate(data)
+
+        data['pools'][1].pop('mba_guarantee')
+        with mock.patch("appqos.caps.mba_sc_supported", return_value=False):
+            with pytest.raises(ValueError, match="MBA budget requires MBA software controller"):
+                ConfigStore().validate(data)
+
+
+    @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.pqos_api.PQOS_API.get_sockets", mock.MagicMock(return_value=[0, 1]))
+    @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.is_l3_non_contiguous_cbm_supported",
+                mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
+    def test_pool_domains(self):
+        data = Config({
+            "rdt_iface": {"interface": "msr"},
+            "pools": [
+                {
+                    "l3cbm": 0xf,
+                    "mba": 50,
+                    "domains": {"sockets": [{"id": 1, "l3cbm": 0xf0, "mba": 100}]},
+                    "cores": [1, 3],
+                    "id": 1,
+                    "name": "pool 1"
+                }
+            ]
+        })
+
+        ConfigStore().validate(data)
+
+        data['pools'][0]['domains']['sockets'].append({"id": 2})
+        with pytest.raises(ValueError, match="Invalid sockets id 2"):
+            ConfigStore().validate(data)
+
+        data['pools'][0]['domains']['sockets'][1]['id'] = 1
+        with pytest.raises(ValueError, match="multiple sockets with same id 1"):
+            ConfigStore().validate(data)
+
+        data['pools'][0]['domains']['sockets'].pop()
+        data['pools'][0]['domains']['sockets'][0]['l3cbm'] = 0x101
+        with pytest.raises(ValueError, match="not contiguous"):
+            ConfigStore().validate(data)
+
+        data['pools'][0]['domains']['sockets'][0]['l3cbm'] = 0xf0
+        data['pools'][0].pop('l3cbm')
+        with pytest.raises(ValueError, match="requires Pool's L3 CBM"):
+            ConfigStore().validate(data)
+
+        data['pools'][0]['domains']['sockets'][0].pop('l3cbm')
+        data['pools'][0].pop('mba')
+        data['pools'][0]['l3cbm'] = 0xf
+        with pytest.raises(ValueError, match="requires Pool's MBA"):
+            ConfigStore().validate(data)
+
+
+    @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", mock.MagicMock(return_value=2))
+    @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    def test_pool_cos(self):
+        data = Config({
+            "rdt_iface": {"interface": "msr"},
+            "pools": [
+                {"l3cbm": 0xf, "cores": [1], "id": 1, "name": "pool 1"},
+                {"l3cbm": 0xf0, "cores": [2], "id": 2, "name": "pool 2"},
+                {"l3cbm": 0xf, "cores": [3], "id": 3, "name": "pool 3"}
+            ]
+        })
+
+        # pools 1 and 3 share COS
+        ConfigStore().validate(data)
+
+        data['pools'][2]['l3cbm'] = 0xf00
+        with pytest.raises(ValueError, match="Not enough COS"):
+            ConfigStore().validate(data)
+
+
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
     def test_app_invalid_core(self):
         def check_core(core):
@@ -786,6 +990,24 @@ class TestConfigValidate:
             ConfigStore().validate(data)
 
 
+    def test_rdt_domain_workers(self):
+        data = Config({
+            "pools": [],
+            "apps": [],
+            "rdt_domain_workers": 4
+        })
+
+        ConfigStore().validate(data)
+
+        data['rdt_domain_workers'] = 0
+        with pytest.raises(jsonschema.exceptions.ValidationError, match="less than or equal to the minimum of 0"):
+            ConfigStore().validate(data)
+
+        data['rdt_domain_workers'] = 65
+        with pytest.raises(jsonschema.exceptions.ValidationError, match="65 is greater than the maximum of 64"):
+            ConfigStore().validate(data)
+
+
     def test_power_profile_verify_invalid(self):
         data = Config({
             "pools": [],
@@ -0,0 +1,148 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.cos_table module
+"""
+
+import mock
+
+from appqos.config import Config
+from appqos.cos_table import CosTable, allocation_key, map_pools
+
+
+def get_max_cos_id(alloc_type):
+    if 'mba' in alloc_type:
+        return 3
+    return 7
+
+
+def config(pools, mba_budget=None):
+    data = {"pools": [dict(pool, cores=[pool['id']]) for pool in pools]}
+    if mba_budget is not None:
+        data['mba_budget'] = {"bw": mba_budget}
+    return Config(data)
+
+
+def test_allocation_key():
+    assert allocation_key({"id": 1, "l3cbm": 0xf}) == \
+        allocation_key({"id": 2, "l3cbm": 0xf, "name": "other", "cores": [3]})
+    assert allocation_key({"id": 1, "l3cbm": 0xf}) != \
+        allocation_key({"id": 2, "l3cbm": 0xf, "mba": 50})
+
+    # pools regulated by MBA software controller do not share COS
+    assert allocation_key({"id": 1, "mba_bw": 100}) != \
+        allocation_key({"id": 2, "mba_bw": 100})
+    assert allocation_key({"id": 1, "l3cbm": 0xf}, 1000) != \
+        allocation_key({"id": 2, "l3cbm": 0xf}, 1000)
+
+
+@mock.patch('appqos.pqos_api.PQOS_API.get_max_cos_id', new=get_max_cos_id)
+class TestMapPools:
+
+    def test_share(self):
+        cfg = config([{"id": 0, "l3cbm": 0xff}, {"id": 1, "l3cbm": 0xf},
+                      {"id": 2, "l3cbm": 0xf0}, {"id": 3, "l3cbm": 0xf},
+                      {"id": 4, "l3cbm": 0xf, "mba": 50}])
+
+        assert map_pools(cfg) == {0: 0, 1: 7, 2: 6, 3: 7, 4: 3}
+
+
+    def test_more_pools_than_cos(self):
+        pools = [{"id": pool_id, "l3cbm": 0x1 << (pool_id % 7)} for pool_id in range(1, 43)]
+
+        pool_cos = map_pools(config(pools))
+        assert len(set(pool_cos.values())) == 7
+        assert pool_cos[1] == pool_cos[8] == pool_cos[15]
+
+        pools.append({"id": 43, "l3cbm": 0x80})
+        assert map_pools(config(pools)) is None
+
+
+    def test_incremental(self):
+        pool_cos = {0: 0, 1: 7, 2: 6, 3: 7, 4: 3}
+        cos_keys = {7: allocation_key({"id": 3, "l3cbm": 0xf})}
+
+        # pool 1 changed, pool 3 keeps COS
+        cfg = config([{"id": 0, "l3cbm": 0xff}, {"id": 1, "l3cbm": 0xf0},
+                      {"id": 2, "l3cbm": 0xf0}, {"id": 3, "l3cbm": 0xf},
+                      {"id": 4, "l3cbm": 0xf, "mba": 50}, {"id": 5, "l3cbm": 0x3}])
+        assert map_pools(cfg, pool_cos, cos_keys) == {0: 0, 1: 6, 2: 6, 3: 7, 4: 3, 5: 5}
+
+
+    def test_largest_group_keeps_cos(self):
+        # all pools changed allocation
+        pool_cos = {1: 7, 2: 7, 3: 7}
+
+        cfg = config([{"id": 1, "l3cbm": 0xf0}, {"id": 2, "l3cbm": 0xf},
+                      {"id": 3, "l3cbm": 0xf}])
+        assert map_pools(cfg, pool_cos) == {1: 6, 2: 7, 3: 7}
+
+
+    def test_restricted_first(self):
+        # MBA pools can use COS 1-3 only
+        cfg = config([{"id": pool_id, "l3cbm": 0x1 << pool_id} for pool_id in range(1, 5)] +
+                     [{"id": pool_id, "mba": 10 * pool_id} for pool_id in range(5, 8)])
+
+        pool_cos = map_pools(cfg)
+        assert sorted(pool_cos[pool_id] for pool_id in range(5, 8)) == [1, 2, 3]
+        assert sorted(pool_cos[pool_id] for pool_id in range(1, 5)) == [4, 5, 6, 7]
+
+
+@mock.patch('appqos.pqos_api.PQOS_API.get_max_cos_id', new=get_max_cos_id)
+def test_cos_table_update():
+    table = CosTable()
+    pools = [{"id": pool_id, "l3cbm": 0x1 << pool_id} for pool_id in range(1, 5)]
+
+    with mock.patch('appqos.stats.STATS_STORE.cos_stats_set') as mock_stats:
+        assert table.update(config(pools)) == {1: 7, 2: 6, 3: 5, 4: 4}
+        mock_stats.assert_called_once_with(table.pool_cos)
+    assert table.get_cos(3) == 5
+    assert table.get_cos(9) == 9
+
+    # pool 4 can not keep COS 4 when using MBA
+    pools[3]['mba'] = 50
+    with mock.patch('appqos.stats.STATS_STORE.cos_stats_set'):
+        assert table.update(config(pools)) == {1: 7, 2: 6, 3: 5, 4: 3}
+
+    # not enough free COS for MBA pools, all pools remapped
+    table.pool_cos = {1: 1, 2: 2, 3: 3}
+    pools = pools[:3] + [{"id": pool_id, "mba": 10 * pool_id} for pool_id in range(4, 7)]
+    with mock.patch('appqos.stats.STATS_STORE.cos_stats_set'):
+        pool_cos = table.update(config(pools))
+    assert sorted(pool_cos[pool_id] for pool_id in range(4, 7)) == [1, 2, 3]
+
+    pools += [{"id": pool_id, "l3cbm": 0x1 << pool_id} for pool_id in range(7, 11)]
+
+    with mock.patch('appqos.stats.STATS_STORE.cos_stats_set'):
+        assert table.update(config(pools)) is None
+    assert table.pool_cos == pool_cos
@@ -0,0 +1,139 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.mba_arbiter module
+"""
+
+import pytest
+
+from appqos.cache_ops import Pool
+from appqos.config import Config
+from appqos.mba_arbiter import MbaArbiter, weighted_max_min
+
+
+def test_weighted_max_min_equal():
+    alloc = weighted_max_min(9000, {1: 5000, 2: 5000, 3: 5000}, {1: 1, 2: 1, 3: 1}, {})
+
+    assert alloc == {1: pytest.approx(3000), 2: pytest.approx(3000), 3: pytest.approx(3000)}
+
+
+def test_weighted_max_min_weights():
+    alloc = weighted_max_min(8000, {1: 10000, 2: 10000}, {1: 1, 2: 3}, {})
+
+    assert alloc == {1: pytest.approx(2000), 2: pytest.approx(6000)}
+
+
+def test_weighted_max_min_demand():
+    # pool 1 needs less than its share, the rest goes to others by weight
+    alloc = weighted_max_min(9000, {1: 1000, 2: 10000, 3: 10000}, {1: 1, 2: 1, 3: 2}, {})
+
+    assert alloc == {1: pytest.approx(1000), 2: pytest.approx(8000 / 3),
+                     3: pytest.approx(16000 / 3)}
+
+
+def test_weighted_max_min_headroom():
+    # budget not saturated, leftover divided by weights
+    alloc = weighted_max_min(10000, {1: 1000, 2: 3000}, {1: 1, 2: 1}, {})
+
+    assert alloc == {1: pytest.approx(4000), 2: pytest.approx(6000)}
+
+
+def test_weighted_max_min_guarantee():
+    alloc = weighted_max_min(10000, {1: 10000, 2: 10000, 3: 10000},
+                             {1: 1, 2: 1, 3: 1}, {1: 6000})
+
+    # guarantee first, the rest divided equally
+    assert alloc == {1: pytest.approx(6000 + 4000 / 3), 2: pytest.approx(4000 / 3),
+                     3: pytest.approx(4000 / 3)}
+
+
+def test_weighted_max_min_guarantees_exceed():
+    alloc = weighted_max_min(6000, {1: 10000, 2: 10000}, {1: 1, 2: 1}, {1: 6000, 2: 3000})
+
+    assert alloc == {1: pytest.approx(4000), 2: pytest.approx(2000)}
+
+
+class TestMbaArbiter(object):
+
+    ## @cond
+    @pytest.fixture(autouse=True)
+    def init(self):
+        Pool.pools = {}
+        yield
+        Pool.pools = {}
+    ## @endcond
+
+
+    def test_configure(self):
+        arbiter = MbaArbiter()
+
+        arbiter.configure(Config({"mba_budget": {"bw": 20000}}))
+        assert arbiter.budget == 20000
+
+        arbiter.allocations = {0: {}}
+        arbiter.configure(Config({}))
+        assert arbiter.budget is None
+        assert arbiter.allocations == {}
+
+
+    def test_is_arbitrated(self):
+        Pool.pools[1] = {'cores': [1], 'mba': 50}
+        Pool.pools[2] = {'cores': [2], 'mba_bw': 5000}
+        Pool.pools[3] = {'cores': [3]}
+        arbiter = MbaArbiter()
+
+        assert not arbiter.is_arbitrated(3)
+
+        arbiter.budget = 10000
+        assert not arbiter.is_arbitrated(1)
+        assert arbiter.is_arbitrated(2)
+        assert arbiter.is_arbitrated(3)
+        assert not arbiter.is_arbitrated(4)
+
+
+    def test_allocate(self):
+        Pool.pools[1] = {'cores': [1], 'mba_weight': 2, 'mba_guarantee': 1000}
+        Pool.pools[2] = {'cores': [2]}
+        arbiter = MbaArbiter()
+        arbiter.budget = 9000
+
+        alloc = arbiter.allocate(1, {1: 20000, 2: 20000})
+        assert alloc == {1: pytest.approx(1000 + 16000 / 3), 2: pytest.approx(8000 / 3)}
+
+        stats = arbiter.stats({(1, 1): 500.0})
+        assert stats[1]['budget'] == 9000
+        assert stats[1]['pools'][1]['weight'] == 2
+        assert stats[1]['pools'][1]['guarantee'] == 1000
+        assert stats[1]['pools'][1]['guarantee_ratio'] == pytest.approx(0.5)
+        assert stats[1]['pools'][2]['bandwidth'] is None
+        assert stats[1]['pools'][2]['guarantee_ratio'] is None
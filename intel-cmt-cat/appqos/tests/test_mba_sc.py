@@ -0,0 +1,285 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.mba_sc module
+"""
+
+import pytest
+import mock
+
+from appqos.cache_ops import Pool
+from appqos.mba_arbiter import MbaArbiter
+from appqos.mba_sc import MbaController, MB
+
+
+class Platform:
+    """
+    Memory bandwidth model, bandwidth of a pool scales with MBA rate
+    """
+
+    def __init__(self, demand, sockets=None):
+        self.demand = demand            # pool id to MBps at 100%
+        self.sockets = sockets or {}    # core to socket
+        self.rates = {}                 # (pool id, socket) to MBA rate
+        self.groups = []
+        self.elapsed = 1.0
+
+    def mba_set(self, sockets, cos_id, rate):
+        for socket in sockets:
+            self.rates[(cos_id, socket)] = rate
+        return 0
+
+    def mon_start(self, cores, events):
+        assert events == ['lmem_bw']
+        group = mock.MagicMock()
+        group.cores = cores
+        self.groups.append(group)
+        return group
+
+    def mon_poll(self, groups):
+        for group in groups:
+            socket = self.sockets.get(group.cores[0], 0)
+            pool_id = [key for key in self.demand if group.cores[0] in Pool.pools[key]['cores']][0]
+            rate = self.rates.get((pool_id, socket), 100)
+            bandwidth = self.demand[pool_id] * rate / 100
+            group.values.mbm_local_delta = int(bandwidth * MB * self.elapsed)
+        return 0
+
+    def get_core_sockets(self, cores):
+        return {core: self.sockets.get(core, 0) for core in cores}
+
+
+class TestMbaController(object):
+
+    ## @cond
+    @pytest.fixture(autouse=True)
+    def init(self):
+        Pool.pools = {}
+        self.platform = Platform({1: 10000})
+        patches = [
+            mock.patch('appqos.caps.mba_bw_enabled', return_value=False),
+            mock.patch('appqos.pqos_api.PQOS_API.mba_set', new=self.platform.mba_set),
+            mock.patch('appqos.mba_sc_api.mon_start', new=self.platform.mon_start),
+            mock.patch('appqos.mba_sc_api.mon_poll', new=self.platform.mon_poll),
+            mock.patch('appqos.mba_sc_api.mon_stop', return_value=0),
+            mock.patch('appqos.pqos_api.PQOS_API.get_core_sockets',
+                       new=self.platform.get_core_sockets),
+            mock.patch('appqos.mba_sc_api.get_mba_throttle_step', return_value=10),
+            mock.patch('appqos.pqos_api.PQOS_API.get_mba_num_cos', return_value=8),
+            mock.patch('appqos.pqos_api.PQOS_API.cap', new=mock.MagicMock()),
+            mock.patch('appqos.pqos_api.PQOS_API.pqos', new=mock.MagicMock(alloc_generation=1))
+        ]
+        for patch in patches:
+            patch.start()
+        yield
+        for patch in patches:
+            patch.stop()
+        Pool.pools = {}
+    ## @endcond
+
+
+    def run(self, controller, steps):
+        for i in range(steps):
+            assert controller.step(float(i)) == 0
+
+
+    def test_converge(self):
+        Pool.pools[1] = {'cores': [1, 2], 'mba_bw': 5000}
+        controller = MbaController(hysteresis=0.05)
+
+        self.run(controller, 10)
+
+        assert self.platform.rates[(1, 0)] == 50
+        stats = controller.stats()[1][0]
+        assert stats['converged']
+        assert stats['steps'] == 5
+        assert stats['bandwidth'] == pytest.approx(5000)
+        assert stats['error'] == pytest.approx(0)
+        # started at 0 s, 5 steps, converged on next sample
+        assert stats['regulation_time'] == 6
+
+
+    def test_hysteresis(self):
+        # 60% gives 5400 MBps which is within 10% band around 5000
+        self.platform.demand[1] = 9000
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 5000}
+        controller = MbaController(hysteresis=0.1)
+
+        self.run(controller, 20)
+
+        assert self.platform.rates[(1, 0)] == 60
+        assert controller.stats()[1][0]['steps'] == 4
+
+
+    def test_step_up(self):
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 2000}
+        controller = MbaController()
+
+        self.run(controller, 20)
+        assert self.platform.rates[(1, 0)] == 20
+
+        # target raised, rate is stepped up without crossing the band
+        Pool.pools[1]['mba_bw'] = 7200
+        for i in range(20, 40):
+            controller.step(float(i))
+
+        assert self.platform.rates[(1, 0)] == 70
+        stats = controller.stats()[1][0]
+        assert stats['converged']
+        assert stats['steps'] == 13
+
+
+    def test_below_target(self):
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 20000}
+        controller = MbaController()
+
+        self.run(controller, 5)
+
+        assert self.platform.rates[(1, 0)] == 100
+        stats = controller.stats()[1][0]
+        assert stats['converged']
+        assert stats['steps'] == 0
+
+
+    def test_sockets(self):
+        self.platform.sockets = {1: 0, 2: 1, 3: 1}
+        Pool.pools[1] = {'cores': [1, 2, 3], 'mba_bw': 5000}
+        controller = MbaController()
+
+        self.run(controller, 10)
+
+        assert sorted(controller.domains) == [(1, 0), (1, 1)]
+        assert controller.domains[(1, 1)].cores == [2, 3]
+        assert len(self.platform.groups) == 2
+        assert self.platform.rates[(1, 0)] == 50
+        assert self.platform.rates[(1, 1)] == 50
+
+
+    def test_remove(self):
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 5000}
+        controller = MbaController()
+        self.run(controller, 10)
+
+        with mock.patch('appqos.mba_sc_api.mon_stop', return_value=0) as mock_stop:
+            # MBA BW replaced with MBA rate
+            Pool.pools[1] = {'cores': [1], 'mba': 30}
+            controller.step(10.0)
+
+            mock_stop.assert_called_once_with(self.platform.groups[0])
+            assert not controller.domains
+            assert self.platform.rates[(1, 0)] == 30
+
+
+    def test_cores_changed(self):
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 5000}
+        controller = MbaController()
+        self.run(controller, 10)
+
+        Pool.pools[1]['cores'] = [1, 2]
+        controller.step(10.0)
+
+        assert len(self.platform.groups) == 2
+        assert controller.domains[(1, 0)].cores == [1, 2]
+
+
+    def test_mba_ctrl_enabled(self):
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 5000}
+        controller = MbaController()
+
+        with mock.patch('appqos.caps.mba_bw_enabled', return_value=True):
+            self.run(controller, 5)
+
+        assert not controller.domains
+        assert not self.platform.groups
+        assert not self.platform.rates
+
+
+    def test_reinit(self):
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 5000}
+        controller = MbaController()
+        self.run(controller, 10)
+
+        # libpqos re-initialized, monitoring groups and MBA rates are gone
+        with mock.patch('appqos.pqos_api.PQOS_API.cap', new=mock.MagicMock()),\
+             mock.patch('appqos.mba_sc_api.mon_stop') as mock_stop:
+            controller.step(10.0)
+
+            mock_stop.assert_not_called()
+            assert len(self.platform.groups) == 2
+            assert self.platform.rates[(1, 0)] == 100
+
+
+    def test_arbiter(self):
+        self.platform.demand = {1: 12000, 2: 12000, 3: 1500}
+        Pool.pools[1] = {'cores': [1], 'mba_weight': 1}
+        Pool.pools[2] = {'cores': [2], 'mba_weight': 3}
+        Pool.pools[3] = {'cores': [3], 'mba_guarantee': 2000}
+        Pool.pools[4] = {'cores': [4], 'mba': 50}
+        arbiter = MbaArbiter()
+        arbiter.budget = 10000
+        controller = MbaController(arbiter=arbiter)
+
+        self.run(controller, 20)
+
+        # pool with MBA rate % is not arbitrated
+        assert sorted(controller.domains) == [(1, 0), (2, 0), (3, 0)]
+
+        # 1500 MBps to pool 3 (its demand), the rest divided 1:3
+        stats = controller.arbiter_stats()[0]
+        assert stats['budget'] == 10000
+        assert stats['pools'][1]['allocation'] == pytest.approx(2125)
+        assert stats['pools'][2]['allocation'] == pytest.approx(6375)
+        assert stats['pools'][3]['allocation'] == pytest.approx(1500)
+        assert stats['pools'][3]['guarantee_ratio'] == pytest.approx(1)
+        assert stats['pools'][1]['guarantee_ratio'] is None
+
+        assert self.platform.rates[(1, 0)] == 10
+        assert self.platform.rates[(2, 0)] == 50
+        assert self.platform.rates.get((3, 0), 100) == 100
+
+
+    def test_arbiter_limit(self):
+        # pool's mba_bw caps its share
+        Pool.pools[1] = {'cores': [1], 'mba_bw': 3000}
+        Pool.pools[2] = {'cores': [2]}
+        self.platform.demand = {1: 10000, 2: 10000}
+        arbiter = MbaArbiter()
+        arbiter.budget = 10000
+        controller = MbaController(arbiter=arbiter)
+
+        self.run(controller, 20)
+
+        assert controller.domains[(1, 0)].target == 3000
+        assert controller.domains[(2, 0)].target == pytest.approx(5000)
+        assert self.platform.rates[(1, 0)] == 30
+        assert self.platform.rates[(2, 0)] == 50
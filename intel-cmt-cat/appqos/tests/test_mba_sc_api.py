@@ -0,0 +1,93 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.mba_sc_api module
+"""
+
+import pytest
+import mock
+from pqos.native_struct import CPqosMonitor
+
+from appqos import mba_sc_api
+
+
+@pytest.mark.parametrize("is_linear, events, supported", [
+    (True, [CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP, CPqosMonitor.PQOS_MON_EVENT_LMEM_BW], True),
+    (False, [CPqosMonitor.PQOS_MON_EVENT_LMEM_BW], False),
+    (True, [CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP], False)
+])
+def test_is_mba_sc_supported(is_linear, events, supported):
+    mba_caps = mock.MagicMock(is_linear=is_linear)
+    mon_caps = mock.MagicMock(events=[mock.MagicMock(type=event) for event in events])
+    cap = mock.MagicMock()
+    cap.get_type.side_effect = lambda type_str: mba_caps if type_str == "mba" else mon_caps
+
+    with mock.patch('appqos.pqos_api.PQOS_API.cap', new=cap):
+        assert mba_sc_api.is_mba_sc_supported() == supported
+
+        cap.get_type.side_effect = Exception('Test')
+        assert not mba_sc_api.is_mba_sc_supported()
+
+
+def test_get_mba_throttle_step():
+    cap = mock.MagicMock()
+    cap.get_type.return_value = mock.MagicMock(throttle_step=10)
+
+    with mock.patch('appqos.pqos_api.PQOS_API.cap', new=cap):
+        assert mba_sc_api.get_mba_throttle_step() == 10
+
+        cap.get_type.side_effect = Exception('Test')
+        assert mba_sc_api.get_mba_throttle_step() is None
+
+
+@mock.patch('appqos.mba_sc_api.PqosMon')
+def test_mon(mock_mon):
+    group = mock.MagicMock()
+    mock_mon.return_value.start_cores.return_value = group
+
+    assert mba_sc_api.mon_start([1, 2], ['lmem_bw']) is group
+    mock_mon.return_value.start_cores.assert_called_once_with([1, 2], ['lmem_bw'])
+
+    assert mba_sc_api.mon_poll([group]) == 0
+    mock_mon.return_value.poll.assert_called_once_with([group])
+
+    assert mba_sc_api.mon_stop(group) == 0
+    group.stop.assert_called_once_with()
+
+    mock_mon.return_value.start_cores.side_effect = Exception('Test')
+    mock_mon.return_value.poll.side_effect = Exception('Test')
+    group.stop.side_effect = Exception('Test')
+
+    assert mba_sc_api.mon_start([1, 2], ['lmem_bw']) is None
+    assert mba_sc_api.mon_poll([group]) == -1
+    assert mba_sc_api.mon_stop(group) == -1
@@ -60,13 +60,13 @@ class TestPqosApi(object):
         self.Pqos_api.alloc.reset = mock.MagicMock()
         self.Pqos_api.alloc.assoc_set = mock.MagicMock()
 
+        self.Pqos_api.shadow = mock.MagicMock()
+
         self.Pqos_api.l3ca = mock.MagicMock()
         self.Pqos_api.l3ca.COS = mock.MagicMock()
-        self.Pqos_api.l3ca.set = mock.MagicMock()
 
         self.Pqos_api.mba = mock.MagicMock()
         self.Pqos_api.mba.COS = mock.MagicMock()
-        self.Pqos_api.mba.set = mock.MagicMock()
 
         self.Pqos_api.cpuinfo = mock.MagicMock()
         self.Pqos_api.cpuinfo.get_sockets = mock.MagicMock()
@@ -186,14 +186,14 @@ class TestPqosApi(object):
         self.Pqos_api.mba.COS.return_value = 0xDEADBEEF
         assert 0 == self.Pqos_api.mba_set([0], 1, 44)
         self.Pqos_api.mba.COS.assert_called_once_with(1, 44, False)
-        self.Pqos_api.mba.set.assert_called_once_with(0, [0xDEADBEEF])
+        self.Pqos_api.shadow.set_mba.assert_called_once_with(0, [0xDEADBEEF])
 
-        self.Pqos_api.mba.set.mock_reset()
+        self.Pqos_api.shadow.set_mba.mock_reset()
         self.Pqos_api.mba.COS.mock_reset()
         self.Pqos_api.mba.COS.return_value = 0xDEADBEEF
         assert 0 == self.Pqos_api.mba_set([0,1], 2, 44)
-        self.Pqos_api.mba.set.assert_any_call(0, [0xDEADBEEF])
-        self.Pqos_api.mba.set.assert_any_call(1, [0xDEADBEEF])
+        self.Pqos_api.shadow.set_mba.assert_any_call(0, [0xDEADBEEF])
+        self.Pqos_api.shadow.set_mba.assert_any_call(1, [0xDEADBEEF])
 
         # socket param not a list
         assert -1 == self.Pqos_api.mba_set(0, 1, 44)
@@ -203,7 +203,7 @@ class TestPqosApi(object):
         self.Pqos_api.mba.COS.mock_reset()
         self.Pqos_api.mba.COS.return_value = 0xDEADBEEF
 
-        self.Pqos_api.mba.set.side_effect = Exception('Test')
+        self.Pqos_api.shadow.set_mba.side_effect = Exception('Test')
         assert -1 == self.Pqos_api.mba_set([0], 1, 44)
 
 
@@ -211,12 +211,12 @@ class TestPqosApi(object):
         self.Pqos_api.l3ca.COS.return_value = 0xDEADBEEF
         assert 0 == self.Pqos_api.l3ca_set([0], 1, mask=0xff)
         self.Pqos_api.l3ca.COS.assert_called_once_with(1, mask=0xff, code_mask=None, data_mask=None)
-        self.Pqos_api.l3ca.set.assert_called_once_with(0, [0xDEADBEEF])
+        self.Pqos_api.shadow.set_l3ca.assert_called_once_with(0, [0xDEADBEEF])
 
-        self.Pqos_api.l3ca.set.mock_reset()
+        self.Pqos_api.shadow.set_l3ca.mock_reset()
         assert 0 == self.Pqos_api.l3ca_set([0,1], 1, mask=0xff)
-        self.Pqos_api.l3ca.set.assert_any_call(0, [0xDEADBEEF])
-        self.Pqos_api.l3ca.set.assert_any_call(1, [0xDEADBEEF])
+        self.Pqos_api.shadow.set_l3ca.assert_any_call(0, [0xDEADBEEF])
+        self.Pqos_api.shadow.set_l3ca.assert_any_call(1, [0xDEADBEEF])
 
         # socket param not a list
         assert -1 == self.Pqos_api.l3ca_set(0, 1, 0xff)
@@ -225,10 +225,45 @@ class TestPqosApi(object):
         assert -1 == self.Pqos_api.l3ca_set([0], 1, mask=0xff)
         self.Pqos_api.l3ca.COS.mock_reset(side_effect = True)
 
-        self.Pqos_api.l3ca.set.side_effect = Exception('Test')
+        self.Pqos_api.shadow.set_l3ca.side_effect = Exception('Test')
         assert -1 == self.Pqos_api.l3ca_set([0], 1, mask=0xff)
 
 
+    def test_l3ca_set_per_socket(self):
+        self.Pqos_api.l3ca.COS.side_effect = lambda cos_id, **masks: masks['mask']
+        assert 0 == self.Pqos_api.l3ca_set([0, 1], 1, mask={0: 0xff, 1: 0x1})
+        self.Pqos_api.shadow.set_l3ca.assert_any_call(0, [0xff])
+        self.Pqos_api.shadow.set_l3ca.assert_any_call(1, [0x1])
+
+
+    def test_mba_set_per_socket(self):
+        self.Pqos_api.mba.COS.side_effect = lambda cos_id, mb_max, ctrl: mb_max
+        assert 0 == self.Pqos_api.mba_set([0, 1], 2, {0: 50, 1: 100})
+        self.Pqos_api.shadow.set_mba.assert_any_call(0, [50])
+        self.Pqos_api.shadow.set_mba.assert_any_call(1, [100])
+
+
+    def test_l2ca_set_domain_workers(self):
+        self.Pqos_api.domain_workers = 4
+        self.Pqos_api.l2ca = mock.MagicMock()
+        self.Pqos_api.l2ca.COS.return_value = 0xDEADBEEF
+
+        assert 0 == self.Pqos_api.l2ca_set([0, 1, 2, 3, 4, 5], 1, mask=0xf)
+        assert self.Pqos_api.shadow.set_l2ca.call_count == 6
+        for l2id in range(6):
+            self.Pqos_api.shadow.set_l2ca.assert_any_call(l2id, [0xDEADBEEF])
+
+        # all L2 IDs are attempted, errors are aggregated
+        self.Pqos_api.shadow.set_l2ca.reset_mock()
+        self.Pqos_api.shadow.set_l2ca.side_effect = \
+            lambda l2id, _coses: 1 / (l2id % 3)
+        with mock.patch('appqos.log.error') as log_error:
+            assert -1 == self.Pqos_api.l2ca_set([0, 1, 2, 3], 1, mask=0xf)
+        assert self.Pqos_api.shadow.set_l2ca.call_count == 4
+        log_error.assert_called_once()
+        self.Pqos_api.domain_workers = 1
+
+
     @mock.patch("os.system", mock.MagicMock(return_value=0))
     @pytest.mark.parametrize("iface", ["msr", "os"])
     def test_init(self, iface):
@@ -238,6 +273,7 @@ class TestPqosApi(object):
              mock.patch('pqos.l3ca.PqosCatL3.__init__', return_value = None) as pqos_cat_l3_init_mock,\
              mock.patch('pqos.mba.PqosMba.__init__', return_value = None) as pqos_mba_init_mock,\
              mock.patch('pqos.allocation.PqosAlloc.__init__', return_value = None) as pqos_alloc_init_mock,\
+             mock.patch('pqos.shadow.AllocationShadow.__init__', return_value = None) as shadow_init_mock,\
              mock.patch('pqos.cpuinfo.PqosCpuInfo.__init__', return_value = None) as pqos_cpu_info_init_mock:
 
             assert 0 == self.Pqos_api.init(iface)
@@ -247,6 +283,7 @@ class TestPqosApi(object):
             pqos_cat_l3_init_mock.assert_called_once()
             pqos_mba_init_mock.assert_called_once()
             pqos_alloc_init_mock.assert_called_once()
+            shadow_init_mock.assert_called_once()
             pqos_cpu_info_init_mock.assert_called_once()
 
             pqos_cpu_info_init_mock.side_effect = Exception('Test')
@@ -276,18 +313,16 @@ class TestPqosApi(object):
 
     def test_alloc_assoc_set(self):
         assert 0 == self.Pqos_api.alloc_assoc_set([], 0)
-        self.Pqos_api.alloc.assoc_set.assert_not_called
+        self.Pqos_api.shadow.assoc_set_many.assert_not_called()
 
         assert 0 == self.Pqos_api.alloc_assoc_set([1], 2)
-        self.Pqos_api.alloc.assoc_set.assert_called_once_with(1, 2)
+        self.Pqos_api.shadow.assoc_set_many.assert_called_once_with({1: 2})
 
-        self.Pqos_api.alloc.assoc_set.reset_mock()
+        self.Pqos_api.shadow.assoc_set_many.reset_mock()
         assert 0 == self.Pqos_api.alloc_assoc_set([2,3,4], 3)
-        self.Pqos_api.alloc.assoc_set.assert_any_call(2, 3)
-        self.Pqos_api.alloc.assoc_set.assert_any_call(3, 3)
-        self.Pqos_api.alloc.assoc_set.assert_any_call(4, 3)
+        self.Pqos_api.shadow.assoc_set_many.assert_called_once_with({2: 3, 3: 3, 4: 3})
 
-        self.Pqos_api.alloc.assoc_set.side_effect = Exception('Test')
+        self.Pqos_api.shadow.assoc_set_many.side_effect = Exception('Test')
         assert -1 == self.Pqos_api.alloc_assoc_set([0,1], 5)
 
 
@@ -0,0 +1,139 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for appqos.rdt_config module
+"""
+
+import mock
+
+from copy import deepcopy
+
+from appqos.cache_ops import Pool
+from appqos.config import Config
+from appqos.pqos_api import PQOS_API
+from appqos.rdt_config import configure_rdt
+
+@mock.patch("appqos.caps.caps_get", mock.MagicMock(return_value=[]))
+def test_configure_rdt():
+    Pool.pools[1] = {}
+    Pool.pools[1]['cores'] = [1, 101]
+    Pool.pools[1]['cbm'] = 0x100
+    Pool.pools[1]['mba'] = 11
+
+    Pool.pools[2] = {}
+    Pool.pools[2]['cores'] = [2, 202]
+    Pool.pools[2]['cbm'] = 0x200
+    Pool.pools[2]['mba'] = 22
+
+    with mock.patch('appqos.config.Config.get_pool_attr', return_value=[1]) as mock_get_pool_attr,\
+         mock.patch('appqos.cache_ops.Pool.cores_set') as mock_cores_set,\
+         mock.patch('appqos.cache_ops.Pool.configure', return_value=0) as mock_pool_configure,\
+         mock.patch('appqos.cache_ops.Apps.configure', return_value=0) as mock_apps_configure,\
+         mock.patch('appqos.pqos_api.PQOS_API.init', return_value=0),\
+         mock.patch('appqos.pqos_api.PQOS_API.enable_mba_bw', return_value=0),\
+         mock.patch('appqos.config_store.ConfigStore.recreate_default_pool', return_value=0),\
+         mock.patch('appqos.cos_table.COS_TABLE.update', return_value={1: 1}):
+
+        cfg = Config({})
+
+        assert not configure_rdt(cfg)
+
+        mock_cores_set.assert_called_once_with([])
+        mock_pool_configure.assert_called_once()
+        mock_apps_configure.assert_called_once()
+
+        # configuration unchanged, force full reconfiguration
+        Pool.config = None
+        mock_pool_configure.return_value = -1
+        assert configure_rdt(cfg) == -1
+
+        mock_pool_configure.return_value = 0
+        mock_get_pool_attr.return_value = []
+        assert configure_rdt(cfg) == -1
+
+
+@mock.patch("appqos.caps.caps_get", mock.MagicMock(return_value=[]))
+def test_configure_rdt_incremental():
+    config = {
+        "rdt_iface": {"interface": "msr"},
+        "pools": [
+            {"id": 0, "l3cbm": 0xff, "cores": [0]},
+            {"id": 1, "name": "Pool 1", "l3cbm": 0xf, "cores": [1], "apps": [1]},
+            {"id": 2, "l3cbm": 0xf0, "cores": [2]}
+        ],
+        "apps": [{"id": 1, "cores": [1], "pids": [11]}]
+    }
+    pool_cos = {0: 0, 1: 7, 2: 6}
+
+    Pool.reset()
+
+    with mock.patch('appqos.cache_ops.Pool.configure', return_value=0) as mock_pool_configure,\
+         mock.patch('appqos.cache_ops.Pool.pids_configure') as mock_pids_configure,\
+         mock.patch('appqos.cache_ops.Apps.configure', return_value=0) as mock_apps_configure,\
+         mock.patch('appqos.pqos_api.PQOS_API.current_iface', return_value="msr"),\
+         mock.patch('appqos.cos_table.COS_TABLE.update', return_value=pool_cos):
+
+        assert configure_rdt(Config(deepcopy(config))) == 0
+        assert mock_pool_configure.call_count == 3
+        mock_apps_configure.assert_called_once_with(mock.ANY, None)
+
+        assert PQOS_API.domain_workers == 1
+
+        # nothing to do
+        mock_pool_configure.reset_mock()
+        mock_apps_configure.reset_mock()
+        config['pools'][1]['name'] = "Renamed"
+        config['rdt_domain_workers'] = 4
+        assert configure_rdt(Config(deepcopy(config))) == 0
+        mock_pool_configure.assert_not_called()
+        mock_apps_configure.assert_not_called()
+        assert PQOS_API.domain_workers == 4
+        config.pop('rdt_domain_workers')
+
+        # only changed pool is configured
+        config['pools'][2]['l3cbm'] = 0x30
+        assert configure_rdt(Config(deepcopy(config))) == 0
+        mock_pool_configure.assert_called_once()
+        mock_pids_configure.assert_not_called()
+        mock_apps_configure.assert_called_once_with(mock.ANY, [])
+
+        # only PIDs of pool are configured
+        mock_pool_configure.reset_mock()
+        mock_apps_configure.reset_mock()
+        config['apps'][0]['pids'] = [11, 12]
+        assert configure_rdt(Config(deepcopy(config))) == 0
+        mock_pool_configure.assert_not_called()
+        mock_pids_configure.assert_called_once()
+        mock_apps_configure.assert_called_once_with(mock.ANY, [1])
+
+    Pool.reset()
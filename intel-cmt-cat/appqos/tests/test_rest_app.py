@@ -43,11 +43,11 @@ import appqos.common
 import appqos.caps
 import appqos.pid_ops
 
-from rest_common import get_config, load_json_schema, REST, CONFIG_EMPTY
+from rest_common import get_config, load_json_schema, get_max_cos_id, REST, CONFIG_EMPTY
 
 
 class TestAppsGet:
-    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    @mock.patch("appqos.config_store.ConfigStore.get_config_snapshot", new=get_config)
     def test_get(self):
         response = REST.get("/apps")
         data = json.loads(response.data.decode('utf-8'))
@@ -63,7 +63,7 @@ class TestAppsGet:
         assert len(data) == 3
 
 
-    @mock.patch("appqos.config_store.ConfigStore.get_config", mock.MagicMock(return_value=CONFIG_EMPTY))
+    @mock.patch("appqos.config_store.ConfigStore.get_config_snapshot", mock.MagicMock(return_value=CONFIG_EMPTY))
     def test_get_empty(self):
         response = REST.get("/apps")
         data = json.loads(response.data.decode('utf-8'))
@@ -74,6 +74,7 @@ class TestAppsGet:
 
 
 class TestAppPost:
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
     @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
     @mock.patch("appqos.pid_ops.is_pid_valid", mock.MagicMock(return_value=True))
@@ -86,7 +87,7 @@ class TestAppPost:
             {"pool_id": 2, "name":"hello", "pids": [12]}                                    # no cores
         ])
     def test_post(self, app_config):
-        with mock.patch('appqos.config_store.ConfigStore.set_config') as func_mock,\
+        with mock.patch('appqos.config_store.ConfigStore.set_config', return_value=2) as func_mock,\
              mock.patch('appqos.pid_ops.is_pid_valid', return_value=True):
             response = REST.post("/apps", app_config)
             func_mock.assert_called_once()
@@ -98,6 +99,7 @@ class TestAppPost:
 
         assert response.status_code == 201
         assert 'id' in data
+        assert data['generation'] == 2
 
 
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
@@ -157,7 +159,7 @@ class TestAppPost:
 
 
 class TestAppGet:
-    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    @mock.patch("appqos.config_store.ConfigStore.get_config_snapshot", new=get_config)
     def test_get(self):
         response = REST.get("/apps/2")
         data = json.loads(response.data.decode('utf-8'))
@@ -172,7 +174,7 @@ class TestAppGet:
         # structure, types and required fields are validated using schema
         assert data['id'] == 2
 
-    @mock.patch("appqos.config_store.ConfigStore.get_config", mock.MagicMock(return_value=CONFIG_EMPTY))
+    @mock.patch("appqos.config_store.ConfigStore.get_config_snapshot", mock.MagicMock(return_value=CONFIG_EMPTY))
     def test_get_empty(self):
         response = REST.get("/apps/2")
         data = json.loads(response.data.decode('utf-8'))
@@ -220,6 +222,7 @@ class TestAppDelete:
 
 
 class TestAppPut:
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
     @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
     @mock.patch("appqos.pid_ops.is_pid_valid", mock.MagicMock(return_value=True))
@@ -242,6 +245,7 @@ class TestAppPut:
         assert response.status_code == 200
 
 
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
     @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
     @mock.patch("appqos.pid_ops.is_pid_valid", mock.MagicMock(return_value=True))
@@ -0,0 +1,84 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2019-2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for rest module CONFIG GENERATIONS
+"""
+
+import json
+from jsonschema import validate
+import mock
+import pytest
+
+from rest_common import get_config, load_json_schema, REST
+
+
+class TestConfigGeneration:
+    @pytest.mark.parametrize("status", ["pending", "applied", "failed"])
+    def test_get(self, status):
+        with mock.patch('appqos.config_store.ConfigStore.get_config_status',
+                        return_value=status) as func_mock:
+            response = REST.get("/config/generations/3")
+            func_mock.assert_called_once_with(3)
+        data = json.loads(response.data.decode('utf-8'))
+
+        # validate response schema
+        schema, resolver = load_json_schema('get_config_generation_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert response.status_code == 200
+        assert data == {'generation': 3, 'status': status}
+
+
+    def test_get_not_found(self):
+        with mock.patch('appqos.config_store.ConfigStore.get_config_status', return_value=None):
+            response = REST.get("/config/generations/100")
+
+        assert response.status_code == 404
+
+
+    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    def test_change_status(self):
+        with mock.patch('appqos.config_store.ConfigStore.set_config', return_value=7):
+            response = REST.delete("/apps/2")
+        generation = json.loads(response.data.decode('utf-8'))['generation']
+
+        assert response.status_code == 200
+        assert generation == 7
+
+        with mock.patch('appqos.config_store.ConfigStore.get_config_status',
+                        return_value="applied") as func_mock:
+            response = REST.get(f"/config/generations/{generation}")
+            func_mock.assert_called_once_with(7)
+
+        assert response.status_code == 200
+        assert json.loads(response.data.decode('utf-8'))['status'] == "applied"
@@ -106,6 +106,20 @@ class TestPoolGet:
                 get_pool_3()
 
 
+    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    @mock.patch("appqos.stats.STATS_STORE.cos_stats_get", mock.MagicMock(return_value={3: 7}))
+    def test_get_cos(self):
+        response = REST.get("/pools/3")
+        data = json.loads(response.data.decode('utf-8'))
+
+        # validate get 1 pool response schema
+        schema, resolver = load_json_schema('get_pool_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert response.status_code == 200
+        assert data['cos'] == 7
+
+
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config_empty)
     def test_get_empty(self):
         response = REST.get("/pools/5")
@@ -238,6 +252,27 @@ class TestPoolPut:
 
         assert response.status_code == 200
 
+    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
+    @mock.patch("appqos.pqos_api.PQOS_API.get_sockets", mock.MagicMock(return_value=[0, 1]))
+    @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.cat_l2_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
+    @mock.patch("appqos.power.validate_power_profiles", mock.MagicMock(return_value=True))
+    def test_put_domains(self):
+        def set_config(data):
+            for pool in data['pools']:
+                if pool['id'] == 1:
+                    assert pool['domains'] == {'sockets': [{'id': 1, 'l3cbm': 0x3}]}
+
+        with mock.patch('appqos.config_store.ConfigStore.set_config', side_effect=set_config) as func_mock,\
+             mock.patch('appqos.pid_ops.is_pid_valid', return_value=True):
+            response = REST.put("/pools/1", {"domains": {"sockets": [{"id": 1, "l3cbm": "0x3"}]}})
+            func_mock.assert_called_once()
+
+        assert response.status_code == 200
+
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
     @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
     @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
@@ -342,6 +377,7 @@ class TestPoolPut:
     @mock.patch("appqos.caps.cat_l3_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_supported", mock.MagicMock(return_value=True))
     @mock.patch("appqos.caps.mba_bw_enabled", mock.MagicMock(return_value=False))
+    @mock.patch("appqos.caps.mba_sc_supported", mock.MagicMock(return_value=False))
     @mock.patch("appqos.power.validate_power_profiles", mock.MagicMock(return_value=True))
     @pytest.mark.parametrize("mba_bw_supported", [
         True,
@@ -444,6 +480,7 @@ class TestPoolPut:
         assert "not found in config" in data["message"]
 
 
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
     @mock.patch("appqos.config_store.ConfigStore.get_new_pool_id", mock.MagicMock(return_value=5))
     @mock.patch("appqos.pqos_api.PQOS_API.check_core", mock.MagicMock(return_value=True))
@@ -460,7 +497,7 @@ class TestPoolPut:
         {"name":"hello_mba_cbm", "cores":[14, 18], "mba": 50, "cbm": "0xf0"} # cbm & mba
     ])
     def test_post(self, pool_config):
-        with mock.patch('appqos.config_store.ConfigStore.set_config') as func_mock,\
+        with mock.patch('appqos.config_store.ConfigStore.set_config', return_value=2) as func_mock,\
              mock.patch('appqos.pid_ops.is_pid_valid', return_value=True):
             response = REST.post("/pools", pool_config)
             func_mock.assert_called_once()
@@ -472,8 +509,10 @@ class TestPoolPut:
 
         assert response.status_code == 201
         assert data['id'] == 5
+        assert data['generation'] == 2
 
 
+    @mock.patch("appqos.pqos_api.PQOS_API.get_max_cos_id", new=get_max_cos_id)
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config_mba_bw)
     @mock.patch("appqos.config_store.ConfigStore.get_new_pool_id", mock.MagicMock(return_value=5))
     @mock.patch("appqos.config.Config.get_mba_ctrl_enabled", mock.MagicMock(return_value=True))
@@ -489,7 +528,7 @@ class TestPoolPut:
         {"name":"hello_mba_cbm", "cores":[14, 18], "mba_bw": 5000, "l3cbm": "0xf0"} # cbm & mba_bw
     ])
     def test_post_mba_bw(self, pool_config):
-        with mock.patch('appqos.config_store.ConfigStore.set_config') as func_mock,\
+        with mock.patch('appqos.config_store.ConfigStore.set_config', return_value=2) as func_mock,\
              mock.patch('appqos.pid_ops.is_pid_valid', return_value=True):
             response = REST.post("/pools", pool_config)
             func_mock.assert_called_once()
@@ -501,6 +540,7 @@ class TestPoolPut:
 
         assert response.status_code == 201
         assert data['id'] == 5
+        assert data['generation'] == 2
 
 
     @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
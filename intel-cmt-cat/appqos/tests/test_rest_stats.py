@@ -64,3 +64,46 @@ class TestStats:
         assert response.status_code == 200
         assert data["num_apps_moves"] == 1
         assert data["num_err"] == 2
+
+
+    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    def test_get_mba(self):
+        stats = {
+            'pools': {
+                1: {0: {'target': 5000, 'bandwidth': 4900.5, 'rate': 50, 'error': -0.0199,
+                        'steps': 5, 'converged': True, 'regulation_time': 6.0}}
+            },
+            'arbiter': {
+                0: {'budget': 10000, 'pools': {
+                    1: {'demand': 9801.0, 'weight': 1, 'guarantee': 5000,
+                        'allocation': 5000.0, 'bandwidth': 4900.5, 'guarantee_ratio': 0.9801}
+                }}
+            }
+        }
+
+        with mock.patch("appqos.stats.STATS_STORE.mba_stats_get", return_value=stats):
+            response = REST.get("/stats/mba")
+        data = json.loads(response.data.decode('utf-8'))
+
+        # validate response schema
+        schema, resolver = load_json_schema('get_stats_mba_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert response.status_code == 200
+        assert data['pools']['1']['0']['rate'] == 50
+        assert data['arbiter']['0']['pools']['1']['allocation'] == 5000
+
+
+    @mock.patch("appqos.config_store.ConfigStore.get_config", new=get_config)
+    def test_get_cos(self):
+        with mock.patch("appqos.stats.STATS_STORE.cos_stats_get",
+                        return_value={0: 0, 1: 7, 2: 7}):
+            response = REST.get("/stats/cos")
+        data = json.loads(response.data.decode('utf-8'))
+
+        # validate response schema
+        schema, resolver = load_json_schema('get_stats_cos_response.json')
+        validate(data, schema, resolver=resolver)
+
+        assert response.status_code == 200
+        assert data['pools'] == {'0': 0, '1': 7, '2': 7}
@@ -0,0 +1,95 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Microbenchmark of PQoS library calls: prototyping a shared function object
+on every call (as the bindings used to do) versus calling through the table
+of prototyped functions built once by Pqos().
+
+The library is not initialized, so the benchmarked functions return an error
+immediately and the measurement is dominated by the Python/ctypes overhead.
+
+Usage: python3 benchmarks/bench_bound_functions.py [-n NUMBER]
+"""
+
+import argparse
+import ctypes
+import timeit
+
+from pqos import Pqos
+from pqos.native_struct import PqosChannelT, RmidT
+
+
+def per_call_prototype(lib, rmid_ref):
+    "Prototypes the function before each call."
+
+    func = lib.pqos_mon_assoc_get_channel
+    func.restype = ctypes.c_int
+    func.argtypes = [PqosChannelT, ctypes.POINTER(RmidT)]
+    return func(3, rmid_ref)
+
+
+def bound_table(table, rmid_ref):
+    "Calls through the table of prototyped functions."
+
+    return table.pqos_mon_assoc_get_channel(3, rmid_ref)
+
+
+def main():
+    "Runs the benchmark."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--number', type=int, default=200000,
+                        help='number of calls')
+    args = parser.parse_args()
+
+    pqos = Pqos()
+    rmid = RmidT(0)
+    rmid_ref = ctypes.byref(rmid)
+
+    results = [
+        ('per-call prototype',
+         timeit.timeit(lambda: per_call_prototype(pqos.cdll, rmid_ref),
+                       number=args.number)),
+        ('bound table',
+         timeit.timeit(lambda: bound_table(pqos.lib, rmid_ref),
+                       number=args.number))
+    ]
+
+    baseline = results[0][1]
+    for name, total in results:
+        print(f'{name:20} {total / args.number * 1e9:8.0f} ns/call '
+              f'({baseline / total:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Benchmark of CbmSolver: time to solve random pool requirements (sizes,
+exclusive pools, isolation groups, CDP pools) for caches of 11 and 20 ways,
+and time to reject exclusive pools of 2 ways exceeding the cache by one way.
+
+Usage: python3 benchmarks/bench_cbm.py [-p POOLS] [-n RUNS]
+"""
+
+import argparse
+import random
+import time
+
+from pqos.cbm import CbmSolver
+
+
+def random_solver(num_ways, num_pools, rng):
+    "Creates a solver with random pool requirements."
+
+    solver = CbmSolver(num_ways)
+    for pool in range(num_pools):
+        min_ways = rng.randint(1, max(1, num_ways // num_pools))
+        kwargs = {
+            'min_ways': min_ways,
+            'max_ways': rng.choice([None, min_ways, 2 * min_ways]),
+            'exclusive': rng.random() < 0.2,
+            'group': rng.choice([None, None, 'a', 'b'])
+        }
+        if rng.random() < 0.2:
+            kwargs['code'] = {'min_ways': 1}
+        solver.add(pool, **kwargs)
+
+    return solver
+
+
+def main():
+    "Runs the benchmark."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-p', '--pools', type=int, nargs='+',
+                        default=[4, 8, 15], help='numbers of pools')
+    parser.add_argument('-n', '--runs', type=int, default=50,
+                        help='number of random requirement sets')
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    for num_ways in [11, 20]:
+        for num_pools in args.pools:
+            times = []
+            infeasible = 0
+            for _ in range(args.runs):
+                solver = random_solver(num_ways, num_pools, rng)
+                start = time.perf_counter()
+                try:
+                    solver.solve()
+                except ValueError:
+                    infeasible += 1
+                times.append(time.perf_counter() - start)
+
+            print(f'ways {num_ways:2}  pools {num_pools:2}  '
+                  f'mean {sum(times) / len(times) * 1e3:7.2f} ms  '
+                  f'max {max(times) * 1e3:7.2f} ms  '
+                  f'({infeasible} infeasible)')
+
+    for num_pools in args.pools:
+        solver = CbmSolver(2 * num_pools - 1)
+        for pool in range(num_pools):
+            solver.add(pool, min_ways=2, exclusive=True)
+
+        start = time.perf_counter()
+        try:
+            solver.solve()
+        except ValueError:
+            pass
+        print(f'ways {2 * num_pools - 1:2}  pools {num_pools:2}  '
+              f'exclusive, rejected in '
+              f'{(time.perf_counter() - start) * 1e3:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
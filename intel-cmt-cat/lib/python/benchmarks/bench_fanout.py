@@ -0,0 +1,104 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Benchmark of per-domain apply: latency of setting one L2 class of service
+on every L2 ID against the number of L2 IDs, serially and fanned out across
+worker threads (pqos.fanout.apply_domains), on the simulated PQoS library
+with MSR and resctrl call latencies.
+
+The simulated library, like libpqos, serializes calls under one API lock.
+
+Usage: python3 benchmarks/bench_fanout.py [-w WORKERS] [-r REPEAT]
+"""
+
+import argparse
+import os
+import time
+
+from pqos import Pqos
+from pqos.cpuinfo import PqosCpuInfo
+from pqos.fanout import apply_domains
+from pqos.l2ca import PqosCatL2
+from pqos.sim import SimulatedPlatform, SimulatedPqos
+
+
+def run(interface, profile, num_l2ids, workers, repeat, log_file):
+    "Runs the benchmark, returns mean apply time in seconds."
+    # pylint: disable=too-many-arguments
+
+    platform = SimulatedPlatform(num_sockets=1,
+                                 cores_per_socket=2 * num_l2ids)
+    sim = SimulatedPqos(platform, latency=profile).install()
+    Pqos().init(interface, log_file=log_file)
+
+    try:
+        l2ids = PqosCpuInfo().get_l2ids()
+        l2ca = PqosCatL2()
+        elapsed = 0
+
+        for i in range(repeat):
+            cos = PqosCatL2.COS(1, 0x3 << (i % 8))
+            start = time.perf_counter()
+            apply_domains(lambda l2id, cos=cos: l2ca.set(l2id, [cos]),
+                          l2ids, workers)
+            elapsed += time.perf_counter() - start
+    finally:
+        Pqos().fini()
+        sim.uninstall()
+
+    return elapsed / repeat
+
+
+def main():
+    "Runs the benchmark."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-w', '--workers', type=int, nargs='+',
+                        default=[1, 4, 16], help='numbers of workers')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='number of applies per measurement')
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w', encoding='utf-8') as log_file:
+        for interface, profile in [('MSR', 'msr'), ('OS', 'resctrl')]:
+            for num_l2ids in [4, 16, 64]:
+                times = [run(interface, profile, num_l2ids, workers,
+                             args.repeat, log_file)
+                         for workers in args.workers]
+                print(f'{interface:4} L2 IDs {num_l2ids:3}  ' +
+                      '  '.join(f'workers={workers:<3} {t * 1e3:7.2f} ms'
+                                for workers, t in zip(args.workers, times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Benchmark of moving many tasks (e.g. threads of a JVM) to classes of
+service: one task per call through PqosAlloc.assoc_set_pid() on the
+simulated PQoS library with resctrl call latencies, one task per
+open()/write()/close() of the tasks file (what the library does for each
+call), and ResctrlTasks writing each tasks file with as few write() calls
+as possible.
+
+File based paths write to a directory tree laid out like resctrl on
+a regular filesystem, so kernel cost of moving tasks is not included.
+
+Usage: python3 benchmarks/bench_resctrl_tasks.py [-t TASKS] [-c COS]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from pqos import Pqos
+from pqos.allocation import PqosAlloc
+from pqos.resctrl import ResctrlTasks
+from pqos.sim import SimulatedPqos
+
+
+def run_library(assoc, log_file):
+    "Associates tasks one by one through the library, returns time."
+
+    sim = SimulatedPqos(latency='resctrl').install()
+    Pqos().init('OS', log_file=log_file)
+
+    try:
+        alloc = PqosAlloc()
+
+        start = time.perf_counter()
+        for task, class_id in assoc.items():
+            alloc.assoc_set_pid(task, class_id)
+        elapsed = time.perf_counter() - start
+    finally:
+        Pqos().fini()
+        sim.uninstall()
+
+    return elapsed, len(assoc)
+
+
+def run_per_task(tasks, assoc):
+    "Associates tasks with a tasks file open per task, returns time."
+
+    start = time.perf_counter()
+    for task, class_id in assoc.items():
+        fd = os.open(tasks.tasks_file(class_id), os.O_WRONLY)
+        try:
+            os.write(fd, f'{task}\n'.encode())
+        finally:
+            os.close(fd)
+
+    return time.perf_counter() - start, len(assoc)
+
+
+def run_bulk(tasks, assoc):
+    "Associates tasks with ResctrlTasks, returns time."
+
+    tasks.writes = 0
+    start = time.perf_counter()
+    tasks.assoc_set(assoc)
+
+    return time.perf_counter() - start, tasks.writes
+
+
+def main():
+    "Runs the benchmark."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-t', '--tasks', type=int, default=5000,
+                        help='number of tasks to move')
+    parser.add_argument('-c', '--cos', type=int, default=4,
+                        help='number of classes of service')
+    args = parser.parse_args()
+
+    # thread IDs of a large process are usually consecutive
+    assoc = {100000 + task: 1 + task % (args.cos - 1) if args.cos > 1 else 0
+             for task in range(args.tasks)}
+
+    with tempfile.TemporaryDirectory() as path:
+        tasks = ResctrlTasks(path)
+        for class_id in range(args.cos):
+            tasks_file = tasks.tasks_file(class_id)
+            os.makedirs(os.path.dirname(tasks_file), exist_ok=True)
+            with open(tasks_file, 'w', encoding='utf-8'):
+                pass
+
+        with open(os.devnull, 'w', encoding='utf-8') as log_file:
+            results = [
+                ('library', run_library(assoc, log_file)),
+                ('per-task', run_per_task(tasks, assoc)),
+                ('bulk', run_bulk(tasks, assoc))
+            ]
+
+    for name, (elapsed, writes) in results:
+        print(f'{name:8} {elapsed * 1e3:9.2f} ms  '
+              f'{elapsed * 1e6 / args.tasks:7.2f} us/task  ({writes} writes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Benchmark of AllocationShadow: a control loop re-asserting the same
+allocation configuration (L3 CAT and MBA classes on every socket,
+association of every core) with resctrl call latencies, written directly
+and through the shadow.
+
+Usage: python3 benchmarks/bench_shadow.py [-s SOCKETS] [-c CORES] [-i ITER]
+"""
+
+import argparse
+import os
+import time
+
+from pqos import Pqos
+from pqos.allocation import PqosAlloc
+from pqos.cpuinfo import PqosCpuInfo
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.shadow import AllocationShadow
+from pqos.sim import SimulatedPlatform, SimulatedPqos
+
+
+class DirectWriter(object):
+    "Writes configuration directly through the bindings."
+
+    def __init__(self):
+        self.l3ca = PqosCatL3()
+        self.mba = PqosMba()
+        self.alloc = PqosAlloc()
+
+    def set_l3ca(self, socket, coses):
+        "Sets L3 classes of service."
+        self.l3ca.set(socket, coses)
+
+    def set_mba(self, socket, coses):
+        "Sets MBA classes of service."
+        self.mba.set(socket, coses)
+
+    def assoc_set(self, core, class_id):
+        "Associates a core with a class of service."
+        self.alloc.assoc_set(core, class_id)
+
+
+def reconfigure(writer, sockets, num_cores, num_cos):
+    "Configures all classes of service and associates all cores."
+
+    for socket in sockets:
+        writer.set_l3ca(socket, [PqosCatL3.COS(cos, 1 << cos)
+                                 for cos in range(num_cos)])
+        writer.set_mba(socket, [PqosMba.COS(cos, 100 - 10 * cos)
+                                for cos in range(num_cos)])
+
+    for core in range(num_cores):
+        writer.assoc_set(core, core % num_cos)
+
+
+def run(platform, iterations, shadow, log_file):
+    "Runs the control loop, returns time in seconds and number of calls."
+
+    sim = SimulatedPqos(platform, latency='resctrl').install()
+    Pqos().init('OS', log_file=log_file)
+
+    try:
+        cpu = PqosCpuInfo()
+        sockets = cpu.get_sockets()
+        num_cores = len(cpu.get_cores_info())
+        writer = AllocationShadow() if shadow else DirectWriter()
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            reconfigure(writer, sockets, num_cores, 8)
+        elapsed = time.perf_counter() - start
+    finally:
+        Pqos().fini()
+        sim.uninstall()
+
+    return elapsed, sum(sim.calls.values())
+
+
+def main():
+    "Runs the benchmark."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--sockets', type=int, default=2,
+                        help='number of sockets')
+    parser.add_argument('-c', '--cores', type=int, default=32,
+                        help='number of cores per socket')
+    parser.add_argument('-i', '--iterations', type=int, default=10,
+                        help='number of control loop iterations')
+    args = parser.parse_args()
+
+    platform = SimulatedPlatform(num_sockets=args.sockets,
+                                 cores_per_socket=args.cores)
+
+    with open(os.devnull, 'w', encoding='utf-8') as log_file:
+        for shadow in [False, True]:
+            elapsed, calls = run(platform, args.iterations, shadow, log_file)
+            print(f'{"shadow" if shadow else "direct":6} '
+                  f'{elapsed * 1e3 / args.iterations:8.2f} ms/iteration  '
+                  f'({calls} calls)')
+
+
+if __name__ == '__main__':
+    main()
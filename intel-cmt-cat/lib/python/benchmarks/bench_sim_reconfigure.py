@@ -0,0 +1,124 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+End-to-end benchmark of the bindings against the simulated PQoS library:
+a full reconfiguration (L3 CAT and MBA classes on every socket, association
+of every core) and a monitoring poll of every core, with call latencies of
+MSR and resctrl interface.
+
+Usage: python3 benchmarks/bench_sim_reconfigure.py [-s SOCKETS] [-c CORES]
+"""
+
+import argparse
+import os
+import time
+
+from pqos import Pqos
+from pqos.allocation import PqosAlloc
+from pqos.cpuinfo import PqosCpuInfo
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.monitoring import PqosMon
+from pqos.sim import SimulatedPlatform, SimulatedPqos
+
+
+def reconfigure(cpu, num_cos):
+    "Configures all classes of service and associates all cores."
+
+    l3ca = PqosCatL3()
+    mba = PqosMba()
+    alloc = PqosAlloc()
+
+    for socket in cpu.get_sockets():
+        l3ca.set(socket, [PqosCatL3.COS(cos, 1 << cos) for cos in range(num_cos)])
+        mba.set(socket, [PqosMba.COS(cos, 100 - 10 * cos)
+                         for cos in range(num_cos)])
+
+    for core in range(len(cpu.get_cores_info())):
+        alloc.assoc_set(core, core % num_cos)
+
+
+def run(interface, profile, platform, log_file):
+    "Runs the benchmark with a latency profile, returns times in seconds."
+
+    sim = SimulatedPqos(platform, latency=profile).install()
+    Pqos().init(interface, log_file=log_file)
+
+    try:
+        cpu = PqosCpuInfo()
+        mon = PqosMon()
+
+        start = time.perf_counter()
+        reconfigure(cpu, 8)
+        reconfigure_time = time.perf_counter() - start
+
+        groups = [mon.start_cores([core.core], ['l3_occup', 'lmem_bw'])
+                  for core in cpu.get_cores_info()]
+        start = time.perf_counter()
+        mon.poll(groups)
+        poll_time = time.perf_counter() - start
+
+        for group in groups:
+            group.stop()
+    finally:
+        Pqos().fini()
+        sim.uninstall()
+
+    return reconfigure_time, poll_time, sum(sim.calls.values())
+
+
+def main():
+    "Runs the benchmark."
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--sockets', type=int, default=2,
+                        help='number of sockets')
+    parser.add_argument('-c', '--cores', type=int, default=32,
+                        help='number of cores per socket')
+    args = parser.parse_args()
+
+    platform = SimulatedPlatform(num_sockets=args.sockets,
+                                 cores_per_socket=args.cores)
+
+    with open(os.devnull, 'w', encoding='utf-8') as log_file:
+        for interface, profile in [('MSR', None), ('MSR', 'msr'),
+                                   ('OS', 'resctrl')]:
+            reconfigure_time, poll_time, calls = run(interface, profile,
+                                                     platform, log_file)
+            print(f'{interface:4} latency={str(profile):8} '
+                  f'reconfigure {reconfigure_time * 1e3:8.2f} ms  '
+                  f'poll {poll_time * 1e3:8.2f} ms  ({calls} calls)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines AsyncPqos, an asyncio interface to monitoring and
+allocation functions of the PQoS library.
+
+The PQoS library is not re-entrant, so all library calls are executed on one
+dedicated executor thread. Requests of the same kind submitted in the same
+event loop iteration are coalesced into a single executor job and, where the
+library allows it, into a single library call:
+
+    - poll() requests are merged into one pqos_mon_poll() call,
+    - l3ca_set(), l2ca_set() and mba_set() requests for the same resource ID
+      are merged into one set call, later requests override earlier ones for
+      the same class of service,
+    - assoc_set() and assoc_set_pid() requests are deduplicated (the last
+      request for a core/PID wins) and executed in one executor job.
+"""
+
+from __future__ import absolute_import, division, print_function
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import time
+
+from pqos.allocation import PqosAlloc
+from pqos.error import PqosError
+from pqos.l2ca import PqosCatL2
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.monitoring import PqosMon
+
+
+def _merge_coses(requests):
+    """
+    Merges class of service lists, later requests override earlier ones.
+
+    Parameters:
+        requests: a list of requests, each is a tuple with a list of COS
+                  objects
+
+    Returns:
+        a list of COS objects
+    """
+
+    merged = {}
+    for coses, in requests:
+        for cos in coses:
+            merged[cos.class_id] = cos
+    return list(merged.values())
+
+
+class AsyncPqos(object):
+    """
+    asyncio interface to the PQoS library.
+
+    An instance must be used from a single event loop. The library has to be
+    initialized with Pqos().init() beforehand.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix='pqos-aio')
+        self._pending = {}
+
+        self.mon = PqosMon()
+        self.alloc = PqosAlloc()
+        self.l3ca = PqosCatL3()
+        self.l2ca = PqosCatL2()
+        self.mba = PqosMba()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Waits for submitted library calls and stops the executor thread.
+        """
+
+        self._executor.shutdown(wait=True)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Calls a function on the executor thread. Used for library calls
+        which are not coalesced.
+
+        Parameters:
+            func: a function to call
+            args: positional arguments
+            kwargs: keyword arguments
+
+        Returns:
+            a value returned by the function
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _submit(self, key, handler, *args):
+        """
+        Submits a request to be coalesced with other requests of the same key
+        submitted in the same event loop iteration.
+
+        Parameters:
+            key: coalescing key
+            handler: a function executed on the executor thread with a list
+                     of all coalesced requests, it returns a list of results,
+                     exception objects are raised in the respective callers
+            args: request
+
+        Returns:
+            request result
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_soon(self._flush, loop, key, handler)
+        batch.append((args, future))
+
+        return await future
+
+    def _flush(self, loop, key, handler):
+        "Executes coalesced requests of a given key."
+
+        batch = self._pending.pop(key)
+        requests = [args for args, _ in batch]
+
+        def done(job):
+            "Dispatches results to the callers."
+
+            if job.cancelled():
+                for _, future in batch:
+                    future.cancel()
+                return
+
+            error = job.exception()
+            results = [error] * len(batch) if error else job.result()
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+        job = loop.run_in_executor(self._executor, handler, requests)
+        job.add_done_callback(done)
+
+    def _poll(self, requests):
+        "Polls union of all requested monitoring groups."
+
+        groups = {}
+        for request_groups, in requests:
+            for group in request_groups:
+                groups.setdefault(id(group), group)
+
+        self.mon.poll(list(groups.values()))
+        return [None] * len(requests)
+
+    @staticmethod
+    def _cat_set(cat, resource_id, requests):
+        "Sets merged cache allocation configuration."
+
+        cat.set(resource_id, _merge_coses(requests))
+        return [None] * len(requests)
+
+    def _mba_set(self, socket, requests):
+        "Sets merged MBA configuration."
+
+        actual = self.mba.set(socket, _merge_coses(requests))
+        actual = {cos.class_id: cos for cos in actual}
+
+        return [[actual[cos.class_id] for cos in coses]
+                for coses, in requests]
+
+    @staticmethod
+    def _assoc_set(func, requests):
+        "Sets deduplicated associations, errors are reported per request."
+
+        merged = {}
+        for item, class_id in requests:
+            merged[item] = class_id
+
+        errors = {}
+        for item, class_id in merged.items():
+            try:
+                func(item, class_id)
+            except PqosError as ex:
+                errors[item] = ex
+
+        return [errors.get(item) for item, _ in requests]
+
+    async def poll(self, groups):
+        """
+        Polls and updates monitoring data for given monitoring objects.
+
+        Parameters:
+            groups: a list of CPqosMonData monitoring objects
+        """
+
+        await self._submit(('poll',), self._poll, groups)
+
+    async def l3ca_set(self, socket, coses):
+        """
+        Sets L3 classes of service on a socket.
+
+        Parameters:
+            socket: a socket number
+            coses: a list of PqosCatL3.COS objects
+        """
+
+        handler = functools.partial(self._cat_set, self.l3ca, socket)
+        await self._submit(('l3ca_set', socket), handler, coses)
+
+    async def l2ca_set(self, l2id, coses):
+        """
+        Sets L2 classes of service on an L2 cluster.
+
+        Parameters:
+            l2id: L2 cache ID
+            coses: a list of PqosCatL2.COS objects
+        """
+
+        handler = functools.partial(self._cat_set, self.l2ca, l2id)
+        await self._submit(('l2ca_set', l2id), handler, coses)
+
+    async def mba_set(self, socket, coses):
+        """
+        Sets MBA classes of service on a socket.
+
+        Parameters:
+            socket: socket ID
+            coses: a list of PqosMba.COS objects
+
+        Returns:
+            a list of PqosMba.COS objects with actual MBA configuration of
+            the requested classes of service
+        """
+
+        handler = functools.partial(self._mba_set, socket)
+        return await self._submit(('mba_set', socket), handler, coses)
+
+    async def assoc_set(self, core, class_id):
+        """
+        Associates a logical core with a given class of service.
+
+        Parameters:
+            core: a logical core number
+            class_id: class of service
+        """
+
+        handler = functools.partial(self._assoc_set, self.alloc.assoc_set)
+        await self._submit(('assoc_set',), handler, core, class_id)
+
+    async def assoc_set_pid(self, pid, class_id):
+        """
+        Associates a process with a given class of service.
+
+        Parameters:
+            pid: process ID
+            class_id: class of service
+        """
+
+        handler = functools.partial(self._assoc_set, self.alloc.assoc_set_pid)
+        await self._submit(('assoc_set_pid',), handler, pid, class_id)
+
+    async def stream(self, session, interval):
+        """
+        Polls a monitoring session at a fixed rate.
+
+        Usage:
+            async for timestamp, values in apqos.stream(session, 1.0):
+                ...
+
+        Parameters:
+            session: MonitoringSession object with started monitoring groups
+            interval: polling interval in seconds
+
+        Returns:
+            asynchronous generator of (timestamp, values) tuples, timestamp
+            is time.monotonic_ns() of the sample and values is a copy of
+            MonitoringSession.values
+        """
+
+        def sample():
+            "Polls the session and copies its values."
+
+            values = session.poll().copy()
+            return time.monotonic_ns(), values
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        while True:
+            yield await self.run(sample)
+
+            deadline += interval
+            now = loop.time()
+            if now > deadline:
+                # skip missed deadlines
+                deadline += (now - deadline) // interval * interval + interval
+
+            await asyncio.sleep(deadline - now)
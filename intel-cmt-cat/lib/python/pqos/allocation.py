@@ -39,9 +39,11 @@ from __future__ import absolute_import, division, print_function
 import ctypes
 
 from pqos.capability import pqos_get_type_enum
-from pqos.common import pqos_handle_error, free_memory
-from pqos.native_struct import PqosChannelT
+from pqos.common import pqos_handle_error, free_memory, PqosBuffer
+from pqos.error import PqosError, PqosErrorPartial
+from pqos.native_struct import CPqosConfig
 from pqos.pqos import Pqos
+from pqos.resctrl import ResctrlCpus
 
 
 def _get_feature_config(feature_cfg):
@@ -153,6 +155,7 @@ class PqosAlloc(object):
         """
 
         ret = self.pqos.lib.pqos_alloc_assoc_set(core, class_id)
+        self.pqos.alloc_changed([('assoc', core)])
         pqos_handle_error('pqos_alloc_assoc_set', ret)
 
     def assoc_get(self, core):
@@ -171,6 +174,80 @@ class PqosAlloc(object):
         pqos_handle_error('pqos_alloc_assoc_get', ret)
         return class_id.value
 
+    def _is_os_interface(self):
+        "Returns True if the library is initialized with the OS interface."
+
+        interface = ctypes.c_int(0)
+        ret = self.pqos.lib.pqos_inter_get(ctypes.byref(interface))
+        pqos_handle_error('pqos_inter_get', ret)
+        return interface.value in (CPqosConfig.PQOS_INTER_OS,
+                                   CPqosConfig.PQOS_INTER_OS_RESCTRL_MON)
+
+    def assoc_set_many(self, assoc, current=None):
+        """
+        Associates logical cores with classes of service. Only associations
+        that change are written, cores are grouped per class of service.
+
+        With the OS interface, cpus_list file of each class of service is
+        written once and associations of cores missing from current are read
+        with one read per class of service. With the MSR interface, cores
+        moved to default class of service #0 are reassigned with a single
+        library call (as release() does), other cores are written and read
+        one by one, as association is a per core register.
+
+        Parameters:
+            assoc: a dictionary mapping logical core numbers to classes
+                   of service
+            current: a dictionary of known associations of cores, cores
+                     missing from it are read (default None)
+
+        Returns:
+            a dictionary of associations that were changed
+
+        Raises:
+            PqosErrorPartial: if a write fails, field 'changed' holds
+                              a dictionary of associations changed before
+        """
+
+        resctrl = ResctrlCpus() if self._is_os_interface() else None
+
+        current = dict(current or {})
+        missing = [core for core in assoc if core not in current]
+        if missing and resctrl is not None:
+            read = resctrl.assoc_get()
+            current.update({core: read.get(core) for core in missing})
+        else:
+            current.update({core: self.assoc_get(core) for core in missing})
+
+        groups = {}
+        for core, class_id in assoc.items():
+            if current[core] != class_id:
+                groups.setdefault(class_id, []).append(core)
+
+        changed = {}
+        for class_id in sorted(groups):
+            cores = groups[class_id]
+            try:
+                if resctrl is not None:
+                    try:
+                        resctrl.assoc_set(class_id, cores)
+                    finally:
+                        self.pqos.alloc_changed(
+                            [('assoc', core) for core in cores])
+                elif class_id == 0:
+                    self.release(cores)
+                else:
+                    for core in cores:
+                        self.assoc_set(core, class_id)
+                        changed[core] = class_id
+            except PqosError as ex:
+                raise PqosErrorPartial(f'Failed to associate cores with COS '
+                                       f'{class_id}: {ex}', changed,
+                                       ex.code) from ex
+            changed.update({core: class_id for core in cores})
+
+        return changed
+
     def assoc_set_pid(self, pid, class_id):
         """
         OS interface to associate a task with a given class of service.
@@ -228,6 +305,7 @@ class PqosAlloc(object):
         core_array = _get_list_of_cores(cores)
         ret = self.pqos.lib.pqos_alloc_assign(mask, core_array, core_array_len,
                                               class_id_ref)
+        self.pqos.alloc_changed([('assoc', core) for core in cores])
         pqos_handle_error('pqos_alloc_assign', ret)
         return class_id.value
 
@@ -242,6 +320,7 @@ class PqosAlloc(object):
         core_array_len = len(cores)
         core_array = _get_list_of_cores(cores)
         ret = self.pqos.lib.pqos_alloc_release(core_array, core_array_len)
+        self.pqos.alloc_changed([('assoc', core) for core in cores])
         pqos_handle_error('pqos_alloc_release', ret)
 
     def assign_pid(self, technologies, pids):
@@ -300,20 +379,28 @@ class PqosAlloc(object):
             a list of process IDs
         """
 
+        with self.get_pids_buffer(class_id) as pids:
+            return pids.tolist()
+
+    def get_pids_buffer(self, class_id):
+        """
+        Retrieves process IDs from resctrl task file for
+        a given class of service without copying them.
+
+        Parameters:
+            class_id: class of service
+
+        Returns:
+            PqosBuffer of process IDs, the IDs are not copied from the array
+            allocated by the library
+        """
+
         count = ctypes.c_uint(0)
         count_ref = ctypes.byref(count)
 
-        restype = ctypes.POINTER(ctypes.c_uint)
-        self.pqos.lib.pqos_pid_get_pid_assoc.restype = restype
         p_pids = self.pqos.lib.pqos_pid_get_pid_assoc(class_id, count_ref)
 
-        if p_pids:
-            pids = [p_pids[i] for i in range(count.value)]
-            free_memory(p_pids)
-        else:
-            pids = []
-
-        return pids
+        return PqosBuffer(p_pids, count.value, ctypes.c_uint, free_memory)
 
     def reset(self, l3_cdp_cfg, l2_cdp_cfg, mba_cfg):
         """
@@ -338,6 +425,7 @@ class PqosAlloc(object):
 
         ret = self.pqos.lib.pqos_alloc_reset(l3_cdp_cfg_enum, l2_cdp_cfg_enum,
                                              mba_cfg_enum)
+        self.pqos.alloc_changed()
         pqos_handle_error('pqos_alloc_reset', ret)
 
 
@@ -351,6 +439,7 @@ class PqosAlloc(object):
 
         cfg_ptr = ctypes.pointer(cfg)
         ret = self.pqos.lib.pqos_alloc_reset_config(cfg_ptr)
+        self.pqos.alloc_changed()
         pqos_handle_error('pqos_alloc_reset_config', ret)
 
     def assoc_get_channel(self, channel):
@@ -366,8 +455,6 @@ class PqosAlloc(object):
 
         class_id = ctypes.c_uint(0)
         ref = ctypes.byref(class_id)
-        argtypes = [PqosChannelT, ctypes.POINTER(ctypes.c_uint)]
-        self.pqos.lib.pqos_alloc_assoc_get_channel.argtypes = argtypes
         ret = self.pqos.lib.pqos_alloc_assoc_get_channel(channel, ref)
         pqos_handle_error('pqos_alloc_assoc_get_channel', ret)
         return class_id.value
@@ -387,9 +474,6 @@ class PqosAlloc(object):
 
         class_id = ctypes.c_uint(0)
         ref = ctypes.byref(class_id)
-        argtypes = [ctypes.c_uint16, ctypes.c_uint16, ctypes.c_uint,
-                    ctypes.POINTER(ctypes.c_uint)]
-        self.pqos.lib.pqos_alloc_assoc_get_dev.argtypes = argtypes
         ret = self.pqos.lib.pqos_alloc_assoc_get_dev(segment, bdf,
                                                      virtual_channel, ref)
         pqos_handle_error('pqos_alloc_assoc_get_dev', ret)
@@ -404,8 +488,6 @@ class PqosAlloc(object):
             class_id: a class of service
         """
 
-        argtypes = [PqosChannelT, ctypes.c_uint]
-        self.pqos.lib.pqos_alloc_assoc_set_channel.argtypes = argtypes
         ret = self.pqos.lib.pqos_alloc_assoc_set_channel(channel, class_id)
         pqos_handle_error('pqos_alloc_assoc_set_channel', ret)
 
@@ -424,9 +506,6 @@ class PqosAlloc(object):
         bdf = ctypes.c_uint16(bdf)
         virtual_channel = ctypes.c_uint(virtual_channel)
         class_id = ctypes.c_uint(class_id)
-        argtypes = [ctypes.c_uint16, ctypes.c_uint16, ctypes.c_uint,
-                    ctypes.c_uint]
-        self.pqos.lib.pqos_alloc_assoc_set_dev.argtypes = argtypes
         ret = self.pqos.lib.pqos_alloc_assoc_set_dev(segment, bdf,
                                                      virtual_channel, class_id)
         pqos_handle_error('pqos_alloc_assoc_set_dev', ret)
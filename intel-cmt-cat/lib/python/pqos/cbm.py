@@ -0,0 +1,444 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines CbmSolver, which computes cache way masks (CBMs) for
+a set of pools from their requirements, instead of hand-written masks.
+
+Each pool requests a number of ways (or bytes), may be exclusive (shares
+ways with no other pool) or shareable, may belong to an isolation group
+(shares ways only with pools of the same group) and may request separate
+code and data masks (CDP). The solver places minimum sizes first, with
+a branch-and-bound search over masks represented as integers, minimizing
+the number of ways shared between pools, then grows masks into unused
+ways up to their maximum sizes.
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import heapq
+
+from pqos.capability import PqosCap
+from pqos.l2ca import PqosCatL2
+from pqos.l3ca import PqosCatL3
+
+
+# A mask to be placed: a whole pool mask, or a code or data mask of a pool
+_Item = namedtuple('_Item', ['pool', 'kind', 'min_ways', 'max_ways',
+                             'exclusive', 'group'])
+
+# Maximum number of search nodes, the best placement found so far is used
+# after, or no placement if none has been found
+_MAX_NODES = 2000
+
+
+def _popcount(mask):
+    "Returns the number of set bits."
+
+    return bin(mask).count('1')
+
+
+def _ceil_div(num, div):
+    "Returns num / div rounded up."
+
+    return -(-num // div)
+
+
+def _min_shared(used, ways):
+    """
+    Returns a lower bound of ways shared by placing a number of ways, given
+    the number of masks using each way: each way is placed on the least used
+    way.
+    """
+
+    if ways <= used.count(0):
+        return 0
+
+    counts = list(used)
+    heapq.heapify(counts)
+    shared = 0
+    for _ in range(ways):
+        count = heapq.heappop(counts)
+        shared += count
+        heapq.heappush(counts, count + 1)
+
+    return shared
+
+
+class CbmSolver(object):
+    """
+    Computes cache way masks from pool requirements.
+
+    Masks are computed by solve(), which returns a dictionary mapping pool
+    names to masks, or to (code mask, data mask) tuples for CDP pools.
+    ValueError is raised if requirements cannot be met.
+    """
+
+    def __init__(self, num_ways, min_cbm_bits=1, non_contiguous=False,
+                 way_size=None):
+        """
+        Initializes the solver.
+
+        Parameters:
+            num_ways: number of cache ways
+            min_cbm_bits: minimum number of bits set in a mask (default 1)
+            non_contiguous: True if masks do not have to be contiguous
+                            (default False)
+            way_size: way size in bytes, required for sizes given in bytes
+                      (default None)
+        """
+
+        if num_ways <= 0:
+            raise ValueError('Number of ways must be positive')
+
+        self.num_ways = num_ways
+        self.min_cbm_bits = max(min_cbm_bits, 1)
+        self.non_contiguous = non_contiguous
+        self.way_size = way_size
+        self._pools = {}  # name -> list of _Item
+
+    @classmethod
+    def from_capability(cls, technology='l3ca'):
+        """
+        Creates a solver for L3 or L2 cache of the platform.
+
+        Parameters:
+            technology: 'l3ca' or 'l2ca' (default 'l3ca')
+
+        Returns:
+            CbmSolver object
+        """
+
+        if technology == 'l3ca':
+            min_cbm_bits = PqosCatL3().get_min_cbm_bits()
+        elif technology == 'l2ca':
+            min_cbm_bits = PqosCatL2().get_min_cbm_bits()
+        else:
+            raise ValueError(f'Unknown technology: {technology}')
+
+        cap = PqosCap().get_type(technology)
+        return cls(cap.num_ways, min_cbm_bits, cap.non_contiguous_cbm,
+                   cap.way_size)
+
+    def _ways(self, name, min_ways, max_ways, min_bytes, max_bytes):
+        """
+        Converts size requirements to (minimum, maximum) number of ways.
+        """
+        # pylint: disable=too-many-arguments
+
+        if (min_bytes is not None or max_bytes is not None) \
+                and not self.way_size:
+            raise ValueError(f'Pool {name}: way size unknown, sizes'
+                             ' in bytes not supported')
+
+        if min_bytes is not None:
+            min_ways = max(min_ways or 0, _ceil_div(min_bytes, self.way_size))
+        if max_bytes is not None:
+            max_ways = max_bytes // self.way_size \
+                if max_ways is None else min(max_ways,
+                                             max_bytes // self.way_size)
+
+        min_ways = max(min_ways or 0, self.min_cbm_bits)
+        max_ways = self.num_ways if max_ways is None \
+            else min(max_ways, self.num_ways)
+
+        if min_ways > max_ways:
+            raise ValueError(f'Pool {name}: minimum size of {min_ways} ways'
+                             f' exceeds maximum size of {max_ways} ways')
+
+        return min_ways, max_ways
+
+    def add(self, name, min_ways=None, max_ways=None, min_bytes=None,
+            max_bytes=None, exclusive=False, group=None, code=None):
+        """
+        Adds a pool.
+
+        Parameters:
+            name: pool name
+            min_ways: minimum number of ways (default None, min_cbm_bits)
+            max_ways: maximum number of ways (default None, unbounded)
+            min_bytes: minimum size in bytes, rounded up to ways
+                       (default None)
+            max_bytes: maximum size in bytes, rounded down to ways
+                       (default None)
+            exclusive: True if the pool shares ways with no other pool
+                       (default False)
+            group: isolation group, pools of different groups never share
+                   ways, pools without a group may share ways with each
+                   other (default None)
+            code: size requirements of a code mask of a CDP pool,
+                  a dictionary with min_ways, max_ways, min_bytes and
+                  max_bytes keys, other arguments are used for a data mask
+                  (default None, not a CDP pool)
+        """
+        # pylint: disable=too-many-arguments
+
+        if name in self._pools:
+            raise ValueError(f'Pool {name} already added')
+
+        sizes = self._ways(name, min_ways, max_ways, min_bytes, max_bytes)
+
+        if code is None:
+            items = [_Item(name, None, *sizes, exclusive, group)]
+        else:
+            code_sizes = self._ways(name, code.get('min_ways'),
+                                    code.get('max_ways'),
+                                    code.get('min_bytes'),
+                                    code.get('max_bytes'))
+            items = [_Item(name, 'code', *code_sizes, exclusive, group),
+                     _Item(name, 'data', *sizes, exclusive, group)]
+
+        self._pools[name] = items
+
+    def remove(self, name):
+        """
+        Removes a pool.
+
+        Parameters:
+            name: pool name
+        """
+
+        del self._pools[name]
+
+    @staticmethod
+    def _conflict(item, other):
+        "Returns True if two masks must not share ways."
+
+        if item.pool == other.pool:
+            return False
+
+        return item.exclusive or other.exclusive or item.group != other.group
+
+    def _candidates(self, size, forbidden, used):
+        """
+        Returns candidate masks of a size, which do not intersect forbidden
+        ways, least shared first.
+        """
+
+        candidates = set()
+        for shift in range(self.num_ways - size + 1):
+            mask = ((1 << size) - 1) << shift
+            if not mask & forbidden:
+                candidates.add(mask)
+
+        if self.non_contiguous:
+            # least used allowed ways, lowest first
+            ways = [way for way in range(self.num_ways)
+                    if not forbidden & (1 << way)]
+            ways.sort(key=lambda way: used[way])
+            if len(ways) >= size:
+                candidates.add(sum(1 << way for way in ways[:size]))
+
+        return candidates
+
+    def _place(self, items, sizes, conflicts, limit=None):
+        """
+        Places masks of items, minimizing shared ways.
+
+        Parameters:
+            items: a list of _Item objects
+            sizes: a list of numbers of ways of masks
+            conflicts: a list of indexes of conflicting items for each item
+            limit: maximum number of shared ways, if given, the first
+                   placement within the limit is returned (default None)
+
+        Returns:
+            (number of shared ways, list of masks) or None if no placement
+            exists or none was found within _MAX_NODES search nodes
+        """
+
+        best = [None if limit is None else limit + 1, None]
+        masks = [0] * len(items)
+        used = [0] * self.num_ways
+        nodes = [0]
+
+        # ways of not yet placed masks of pools without CDP
+        remaining = [0] * (len(items) + 1)
+        for index in range(len(items) - 1, -1, -1):
+            remaining[index] = remaining[index + 1] + \
+                (sizes[index] if items[index].kind is None else 0)
+
+        def search(index, cost):
+            "Places items from index on, returns True to stop the search."
+
+            nodes[0] += 1
+            if nodes[0] > _MAX_NODES:
+                return True
+
+            if best[0] is not None and \
+                    cost + _min_shared(used, remaining[index]) >= best[0]:
+                return False
+
+            if index == len(items):
+                best[0], best[1] = cost, list(masks)
+                return cost == 0 or limit is not None
+
+            forbidden = 0
+            for other in conflicts[index]:
+                if other < index:
+                    forbidden |= masks[other]
+
+            options = []
+            for mask in self._candidates(sizes[index], forbidden, used):
+                shared = sum(_popcount(mask & masks[other])
+                             for other in range(index)
+                             if items[other].pool != items[index].pool)
+                options.append((shared, mask))
+
+            for shared, mask in sorted(options):
+                masks[index] = mask
+                for way in range(self.num_ways):
+                    if mask & (1 << way):
+                        used[way] += 1
+
+                stop = search(index + 1, cost + shared)
+
+                for way in range(self.num_ways):
+                    if mask & (1 << way):
+                        used[way] -= 1
+                masks[index] = 0
+
+                if stop:
+                    return True
+
+            return False
+
+        search(0, 0)
+        if best[1] is None:
+            return None
+
+        return best[0], best[1]
+
+    def _grow(self, items, conflicts, placement):
+        """
+        Grows masks, one way at a time, smallest relative to their minimum
+        first, up to maximum sizes and as long as no more ways get shared.
+
+        Returns:
+            a list of masks
+        """
+
+        shared, masks = placement
+        sizes = [item.min_ways for item in items]
+        full = (1 << self.num_ways) - 1
+        grown = True
+
+        while grown:
+            grown = False
+            used = 0
+            for mask in masks:
+                used |= mask
+            if used == full:
+                break
+
+            order = sorted(range(len(items)),
+                           key=lambda i: (sizes[i] / items[i].min_ways, i))
+
+            for index in order:
+                if sizes[index] >= items[index].max_ways:
+                    continue
+
+                sizes[index] += 1
+                placement = self._place(items, sizes, conflicts, shared)
+                if placement is None:
+                    sizes[index] -= 1
+                    continue
+
+                shared, masks = placement
+                grown = True
+                break
+
+        return masks
+
+    def _required_ways(self):
+        """
+        Returns the minimum number of ways needed by all pools: exclusive
+        pools and isolation groups never share ways with each other, masks
+        of a pool or of an isolation group may all share the largest one.
+        """
+
+        required = {}
+        for name, items in self._pools.items():
+            key = ('pool', name) if items[0].exclusive \
+                else ('group', items[0].group)
+            required[key] = max([required.get(key, 0)] +
+                                [item.min_ways for item in items])
+
+        return sum(required.values())
+
+    def solve(self):
+        """
+        Computes masks of all pools.
+
+        Returns:
+            a dictionary mapping pool names to masks, or to
+            (code mask, data mask) tuples for CDP pools
+        """
+
+        items = [item for name in sorted(self._pools, key=str)
+                 for item in self._pools[name]]
+        if not items:
+            return {}
+
+        required = self._required_ways()
+        if required > self.num_ways:
+            raise ValueError(f'Pools cannot be placed in {self.num_ways}'
+                             f' ways, at least {required} ways required')
+
+        # most constrained masks are placed first
+        order = sorted(range(len(items)),
+                       key=lambda i: (not items[i].exclusive,
+                                      -items[i].min_ways, i))
+        items = [items[i] for i in order]
+        conflicts = [[other for other in range(len(items))
+                      if other != index and
+                      self._conflict(items[index], items[other])]
+                     for index in range(len(items))]
+
+        placement = self._place(items, [item.min_ways for item in items],
+                                conflicts)
+        if placement is None:
+            raise ValueError(f'No placement of pools in {self.num_ways}'
+                             f' ways found within {_MAX_NODES} search steps')
+
+        masks = self._grow(items, conflicts, placement)
+
+        result = {}
+        for item, mask in zip(items, masks):
+            if item.kind is None:
+                result[item.pool] = mask
+            else:
+                code, data = result.get(item.pool, (0, 0))
+                result[item.pool] = (mask, data) if item.kind == 'code' \
+                    else (code, mask)
+
+        return result
@@ -37,6 +37,7 @@ Common module which defines functions used in other modules.
 from __future__ import absolute_import, division, print_function
 import ctypes
 import ctypes.util
+import weakref
 
 from pqos.error import ERRORS, PqosError
 
@@ -140,13 +141,141 @@ def convert_to_cos(ctypes_cos, cls):
 
     return cls(class_id, mask, code_mask, data_mask)
 
+_LIBC_FREE = []
+
+
+def _get_libc_free():
+    "Returns libc free() function, libc is loaded only once."
+
+    if not _LIBC_FREE:
+        libc_path = ctypes.util.find_library('c')
+
+        if not libc_path:
+            raise OSError('Cannot find libc')
+
+        libc_free = ctypes.CDLL(libc_path).free
+        libc_free.restype = None
+        libc_free.argtypes = [ctypes.c_void_p]
+        _LIBC_FREE.append(libc_free)
+
+    return _LIBC_FREE[0]
+
+
 def free_memory(ptr):
     "Releases memory allocated by the library."
 
-    libc_path = ctypes.util.find_library('c')
+    _get_libc_free()(ptr)
+
+
+class PqosBuffer(object):
+    """
+    Array allocated by the library.
+
+    Elements are accessed in place through a memoryview (or a NumPy array),
+    without copying. The memory is freed exactly once, when the buffer and
+    all views created from it are released or garbage-collected.
+    """
+
+    def __init__(self, ptr, count, ctype, free=free_memory):
+        """
+        Takes ownership of an array allocated by the library.
+
+        Parameters:
+            ptr: a pointer to the first element of the array or NULL pointer
+            count: number of elements
+            ctype: ctypes type of an element
+            free: a function used to release the memory (default free_memory)
+        """
+
+        self.ctype = ctype
+        self._array = None
+        self._view = None
+        self._empty = memoryview(b'').cast(ctype._type_)
+
+        if not ptr:
+            return
+
+        address = ctypes.cast(ptr, ctypes.c_void_p).value
+        array = (ctype * count).from_address(address)
+        # the memory is released when the last reference to the array
+        # (held by the buffer and its views) is gone
+        weakref.finalize(array, free, address)
+
+        self._array = array
+        self._view = memoryview(array).cast('B').cast(ctype._type_)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, index):
+        return self.view[index]
+
+    def __iter__(self):
+        return iter(self.view)
+
+    def __eq__(self, other):
+        try:
+            return self.tolist() == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return f'PqosBuffer({self.tolist()!r})'
+
+    @property
+    def view(self):
+        "A memoryview of the array, empty if the array is empty or released."
+
+        if self._view is None:
+            return self._empty
+
+        return self._view
+
+    def tolist(self):
+        """
+        Copies the array to a list.
+
+        Returns:
+            a list of integers
+        """
+
+        return self.view.tolist()
+
+    def as_array(self):
+        """
+        Returns a read-only NumPy array sharing memory with the buffer.
+        Requires NumPy.
+
+        Returns:
+            NumPy array
+        """
+
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        if self._array is None:
+            return np.zeros(0, dtype=self.ctype)
+
+        # the NumPy array references the ctypes array, not the view, so the
+        # buffer can be released while the NumPy array is still in use
+        array = np.frombuffer(self._array, dtype=self.ctype)
+        array.flags.writeable = False
+        return array
+
+    def release(self):
+        """
+        Releases the buffer. The memory is freed immediately if there are no
+        NumPy arrays created with as_array() alive, otherwise it is freed
+        together with the last of them.
+        """
 
-    if not libc_path:
-        raise OSError('Cannot find libc')
+        if self._view is not None:
+            self._view.release()
 
-    libc = ctypes.cdll.LoadLibrary(libc_path)
-    libc.free(ptr)
+        self._view = None
+        self._array = None
@@ -38,7 +38,7 @@ like number of cores, L2/L3 cache ID etc.
 from __future__ import absolute_import, division, print_function
 import ctypes
 
-from pqos.common import pqos_handle_error, free_memory
+from pqos.common import pqos_handle_error, free_memory, PqosBuffer
 from pqos.native_struct import CPqosCpuInfo, CPqosCoreInfo
 from pqos.error import PqosError, PqosErrorParam, PqosErrorResource
 from pqos.pqos import Pqos
@@ -48,13 +48,35 @@ class PqosCoreInfo(object):
     "Core information"
     # pylint: disable=too-few-public-methods, too-many-arguments
 
-    def __init__(self, core, socket, l3_id, l2_id, l3cat_id, mba_id):
+    def __init__(self, core, socket, l3_id, l2_id, l3cat_id, mba_id,
+                 numa=None):
         self.core = core
         self.socket = socket
         self.l3_id = l3_id
         self.l2_id = l2_id
         self.l3cat_id = l3cat_id
         self.mba_id = mba_id
+        self.numa = numa
+
+    @classmethod
+    def from_struct(cls, coreinfo_struct):
+        """
+        Creates core information object from pqos_coreinfo structure.
+
+        Parameters:
+            coreinfo_struct: CPqosCoreInfo object
+
+        Returns:
+            core information
+        """
+
+        return cls(core=coreinfo_struct.lcore,
+                   socket=coreinfo_struct.socket,
+                   l3_id=coreinfo_struct.l3_id,
+                   l2_id=coreinfo_struct.l2_id,
+                   l3cat_id=coreinfo_struct.l3cat_id,
+                   mba_id=coreinfo_struct.mba_id,
+                   numa=coreinfo_struct.numa)
 
 
 class PqosCacheInfo(object):
@@ -70,26 +92,6 @@ class PqosCacheInfo(object):
         self.way_size = way_size
 
 
-def _get_array_items(count, p_items):
-    """
-    Converts ctypes array (given a pointer to the first element
-    and number of elements) to a list.
-
-    Parameters:
-        count: number of elements
-        p_items: a pointer to the first element of the array
-
-    Returns:
-        a list of elements
-    """
-
-    if not count:
-        return []
-
-    items = [p_items[i] for i in range(count)]
-    return items
-
-
 class PqosCpuInfo(object):
     "PQoS CPU information"
 
@@ -116,19 +118,15 @@ class PqosCpuInfo(object):
 
         count = ctypes.c_uint(0)
         count_ref = ctypes.byref(count)
-        func.restype = ctypes.POINTER(ctypes.c_uint)
 
         if use_arg:
             p_items = func(self.p_cpu, arg, count_ref)
         else:
             p_items = func(self.p_cpu, count_ref)
 
-        if not p_items:
-            return []
-
-        items = [p_items[i] for i in range(count.value)] if count.value > 0 else []
-        free_memory(p_items)
-        return items
+        with PqosBuffer(p_items, count.value, ctypes.c_uint,
+                        free_memory) as items:
+            return items.tolist()
 
     def _call_func_ref(self, func, arg):
         """
@@ -156,10 +154,7 @@ class PqosCpuInfo(object):
         Returns:
             CPU vendor
         """
-        func = self.pqos.lib.pqos_get_vendor
-        func.restype = ctypes.c_int
-
-        vendor = func(self.p_cpu)
+        vendor = self.pqos.lib.pqos_get_vendor(self.p_cpu)
 
         if vendor == CPqosCpuInfo.PQOS_VENDOR_INTEL:
             return "INTEL"
@@ -227,21 +222,27 @@ class PqosCpuInfo(object):
             core information
         """
 
-        restype = ctypes.POINTER(CPqosCoreInfo)
-        self.pqos.lib.pqos_cpu_get_core_info.restype = restype
         p_coreinfo = self.pqos.lib.pqos_cpu_get_core_info(self.p_cpu, core)
 
         if not p_coreinfo:
             raise PqosError('Core information not found')
 
-        coreinfo_struct = p_coreinfo.contents
-        coreinfo = PqosCoreInfo(core=coreinfo_struct.lcore,
-                                socket=coreinfo_struct.socket,
-                                l3_id=coreinfo_struct.l3_id,
-                                l2_id=coreinfo_struct.l2_id,
-                                l3cat_id=coreinfo_struct.l3cat_id,
-                                mba_id=coreinfo_struct.mba_id)
-        return coreinfo
+        return PqosCoreInfo.from_struct(p_coreinfo.contents)
+
+    def get_cores_info(self):
+        """
+        Retrieves core information for all cores from CPU info structure.
+
+        Returns:
+            a list of core information objects
+        """
+
+        cpu = self.p_cpu.contents
+        p_cores = ctypes.cast(ctypes.addressof(cpu.cores),
+                              ctypes.POINTER(CPqosCoreInfo))
+
+        return [PqosCoreInfo.from_struct(p_cores[i])
+                for i in range(cpu.num_cores)]
 
 
     def get_cache_info(self, level):
@@ -33,8 +33,8 @@
 "Device information module."
 
 import ctypes
-from pqos.common import free_memory
-from pqos.native_struct import CPqosChannel, CPqosDevinfo, PqosChannelT
+from pqos.common import free_memory, PqosBuffer
+from pqos.native_struct import PqosChannelT
 from pqos.pqos import Pqos
 
 
@@ -61,16 +61,9 @@ class PqosDevInfo:
             channel or None on error
         """
 
-        func = self.pqos.lib.pqos_devinfo_get_channel_id
-        func.restype = PqosChannelT
-        func.argtypes = [
-            ctypes.POINTER(CPqosDevinfo),
-            ctypes.c_uint16,
-            ctypes.c_uint16,
-            ctypes.c_uint
-        ]
-
-        result = func(self.p_devinfo, segment, bdf, virtual_channel)
+        result = self.pqos.lib.pqos_devinfo_get_channel_id(self.p_devinfo,
+                                                           segment, bdf,
+                                                           virtual_channel)
 
         if result == 0:
             return None
@@ -89,25 +82,15 @@ class PqosDevInfo:
             a list of control channels or empty list
         """
 
-        func = self.pqos.lib.pqos_devinfo_get_channel_ids
-        func.restype = ctypes.POINTER(PqosChannelT)
-        func.argtypes = [
-            ctypes.POINTER(CPqosDevinfo),
-            ctypes.c_uint16,
-            ctypes.c_uint16,
-            ctypes.POINTER(ctypes.c_uint)
-        ]
-
         num_channels = ctypes.c_uint(0)
         num_channels_ref = ctypes.byref(num_channels)
-        p_items = func(self.p_devinfo, segment, bdf, num_channels_ref)
+        p_items = self.pqos.lib.pqos_devinfo_get_channel_ids(self.p_devinfo,
+                                                             segment, bdf,
+                                                             num_channels_ref)
 
-        if not p_items or num_channels.value <= 0:
-            return []
-
-        items = [p_items[i] for i in range(num_channels.value)]
-        free_memory(p_items)
-        return items
+        with PqosBuffer(p_items, num_channels.value, PqosChannelT,
+                        free_memory) as items:
+            return items.tolist()
 
     def get_channel(self, channel_id):
         """
@@ -120,14 +103,8 @@ class PqosDevInfo:
             channel information or None on error
         """
 
-        func = self.pqos.lib.pqos_devinfo_get_channel
-        func.restype = ctypes.POINTER(CPqosChannel)
-        func.argtypes = [
-            ctypes.POINTER(CPqosDevinfo),
-            PqosChannelT
-        ]
-
-        p_item = func(self.p_devinfo, channel_id)
+        p_item = self.pqos.lib.pqos_devinfo_get_channel(self.p_devinfo,
+                                                        channel_id)
 
         if not p_item:
             return None
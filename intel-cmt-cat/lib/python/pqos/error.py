@@ -79,6 +79,18 @@ class PqosErrorInter(PqosError):
     "Internal error returned from PQoS library"
 
 
+class PqosErrorPartial(PqosError):
+    """
+    Error of an operation which failed after it was applied in part.
+    Field 'changed' holds changes applied before the failure, field 'code'
+    is an error code of the failure.
+    """
+
+    def __init__(self, message, changed, code=None):
+        super().__init__(message, *([code] if code else []))
+        self.changed = changed
+
+
 ERRORS = {
     1: PqosError,
     2: PqosErrorParam,
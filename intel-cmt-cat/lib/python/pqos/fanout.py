@@ -0,0 +1,113 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines apply_domains(), which applies a per-domain write (e.g.
+a class of service set on each socket or L2 ID) to many domains, optionally
+fanned out across a bounded pool of worker threads, and reports failures of
+all domains at once.
+
+Calls to the PQoS library are serialized by the library's API lock, so
+worker threads overlap only work done outside of it. The fan-out pays off
+when per-domain work is dominated by Python or I/O wait outside the library;
+for plain MSR writes serial apply (the default) is as fast.
+"""
+
+from __future__ import absolute_import, division, print_function
+from concurrent.futures import ThreadPoolExecutor
+
+from pqos.error import PqosError
+
+
+def _message(error):
+    "Returns a message of an exception without its error code."
+
+    return error.args[0] if error.args else repr(error)
+
+
+class PqosDomainError(PqosError):
+    """
+    Error of a per-domain apply. Field 'errors' maps each failed domain to
+    the exception raised for it, field 'code' is the code of the first error.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        details = '; '.join(f'{domain}: {_message(error)}'
+                            for domain, error in errors.items())
+        first = next(iter(errors.values()))
+        super().__init__(f'Failed on {len(errors)} domain(s): {details}',
+                         getattr(first, 'code', None))
+
+
+def apply_domains(func, domains, max_workers=1):
+    """
+    Calls func for each domain. All domains are attempted even if some of
+    them fail.
+
+    Parameters:
+        func: a function taking a domain (socket, L2 ID) as its argument
+        domains: a list of domains
+        max_workers: maximum number of worker threads, one worker per domain
+                     at most, 1 applies domains serially in the calling thread
+                     (default 1)
+
+    Returns:
+        a dictionary mapping domains to values returned by func
+    """
+
+    domains = list(domains)
+    results = {}
+    errors = {}
+
+    def call(domain):
+        "Calls func for a domain, stores its result or error."
+
+        try:
+            results[domain] = func(domain)
+        except Exception as ex:  # pylint: disable=broad-except
+            errors[domain] = ex
+
+    workers = min(max_workers, len(domains))
+    if workers <= 1:
+        for domain in domains:
+            call(domain)
+    else:
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='pqos-domain') as executor:
+            list(executor.map(call, domains))
+
+    if errors:
+        raise PqosDomainError({domain: errors[domain] for domain in domains
+                               if domain in errors})
+
+    return {domain: results[domain] for domain in domains}
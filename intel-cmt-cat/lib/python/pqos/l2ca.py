@@ -52,6 +52,17 @@ class PqosCatL2(object):
 
     def __init__(self):
         self.pqos = Pqos()
+        # (alloc_generation, number of classes of service)
+        self._cos_num = None
+
+    def _get_cos_num(self):
+        "Returns number of classes of service, read once per generation."
+
+        generation = self.pqos.alloc_generation
+        if self._cos_num is None or self._cos_num[0] != generation:
+            self._cos_num = (generation, PqosCap().get_l2ca_cos_num())
+
+        return self._cos_num[1]
 
     def set(self, l2id, coses):
         """
@@ -67,6 +78,7 @@ class PqosCatL2(object):
         pqos_l2_ca_arr = (CPqosL2Ca * len(pqos_l2_cas))(*pqos_l2_cas)
         ret = self.pqos.lib.pqos_l2ca_set(l2id, len(pqos_l2_cas),
                                           pqos_l2_ca_arr)
+        self.pqos.alloc_changed([('l2ca', l2id)])
         pqos_handle_error('pqos_l2ca_set', ret)
 
     def get(self, l2id):
@@ -77,8 +89,7 @@ class PqosCatL2(object):
             l2id: L2 cache identifier
         """
 
-        cap = PqosCap()
-        cos_num = cap.get_l2ca_cos_num()
+        cos_num = self._get_cos_num()
 
         l2cas = (CPqosL2Ca * cos_num)()
         num_ca = ctypes.c_uint(0)
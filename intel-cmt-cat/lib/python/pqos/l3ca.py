@@ -51,6 +51,17 @@ class PqosCatL3(object):
 
     def __init__(self):
         self.pqos = Pqos()
+        # (alloc_generation, number of classes of service)
+        self._cos_num = None
+
+    def _get_cos_num(self):
+        "Returns number of classes of service, read once per generation."
+
+        generation = self.pqos.alloc_generation
+        if self._cos_num is None or self._cos_num[0] != generation:
+            self._cos_num = (generation, PqosCap().get_l3ca_cos_num())
+
+        return self._cos_num[1]
 
     def set(self, socket, coses):
         """
@@ -66,6 +77,7 @@ class PqosCatL3(object):
         pqos_l3_ca_arr = (CPqosL3Ca * len(pqos_l3_cas))(*pqos_l3_cas)
         ret = self.pqos.lib.pqos_l3ca_set(socket, len(pqos_l3_cas),
                                           pqos_l3_ca_arr)
+        self.pqos.alloc_changed([('l3ca', socket)])
         pqos_handle_error('pqos_l3ca_set', ret)
 
     def get(self, socket):
@@ -76,8 +88,7 @@ class PqosCatL3(object):
             socket: a socket number
         """
 
-        cap = PqosCap()
-        cos_num = cap.get_l3ca_cos_num()
+        cos_num = self._get_cos_num()
 
         l3cas = (CPqosL3Ca * cos_num)()
         num_ca = ctypes.c_uint(0)
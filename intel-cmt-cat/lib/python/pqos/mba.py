@@ -60,6 +60,17 @@ class PqosMba(object):
 
     def __init__(self):
         self.pqos = Pqos()
+        # (alloc_generation, number of classes of service)
+        self._cos_num = None
+
+    def _get_cos_num(self):
+        "Returns number of classes of service, read once per generation."
+
+        generation = self.pqos.alloc_generation
+        if self._cos_num is None or self._cos_num[0] != generation:
+            self._cos_num = (generation, PqosCap().get_mba_cos_num())
+
+        return self._cos_num[1]
 
     def set(self, socket, requested):
         """
@@ -80,6 +91,7 @@ class PqosMba(object):
         actual_arr = (CPqosMba * num_cos)()
 
         ret = self.pqos.lib.pqos_mba_set(socket, num_cos, cos_arr, actual_arr)
+        self.pqos.alloc_changed([('mba', socket)])
         pqos_handle_error('pqos_mba_set', ret)
 
         actual = [cos.to_cos(self.COS) for cos in actual_arr]
@@ -97,8 +109,7 @@ class PqosMba(object):
             for a given socket
         """
 
-        cap = PqosCap()
-        max_num_cos = cap.get_mba_cos_num()
+        max_num_cos = self._get_cos_num()
 
         num_cos = ctypes.c_uint(0)
         cos_arr = (CPqosMba * max_num_cos)()
@@ -0,0 +1,183 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines DerivedMetrics which computes memory bandwidth, LLC
+occupancy, IPC and cache miss metrics for batches of monitoring samples.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+
+from pqos.cpuinfo import PqosCpuInfo
+
+
+# Derived metrics of a single sample of a single monitoring group
+METRICS_DTYPE = np.dtype([
+    ('mbm_local', np.float64),    # local memory bandwidth in MB/s
+    ('mbm_total', np.float64),    # total memory bandwidth in MB/s
+    ('mbm_remote', np.float64),   # remote memory bandwidth in MB/s
+    ('llc', np.float64),          # LLC occupancy as a fraction of L3 size
+    ('ipc', np.float64),          # instructions per cycle
+    ('llc_miss_ratio', np.float64),  # LLC misses / LLC references
+    ('llc_mpki', np.float64)      # LLC misses per 1000 instructions
+])
+
+BYTES_PER_MB = 1024.0 * 1024.0
+
+
+def _ratio(numerator, denominator):
+    """
+    Divides two arrays element-wise, NaN where the denominator is zero.
+
+    Parameters:
+        numerator: NumPy array
+        denominator: NumPy array
+
+    Returns:
+        NumPy array of float64
+    """
+
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+class DerivedMetrics(object):
+    """
+    Derived metrics calculator.
+
+    Works on batches of samples laid out as returned by MonitoringSampler:
+    timestamps of shape (T,) and event values of shape (T, N), where T is
+    the number of samples and N is the number of monitoring groups.
+    All metrics are computed with array operations, no per-group Python code
+    is executed.
+    """
+
+    def __init__(self, l3_size=None):
+        """
+        Initializes derived metrics calculator.
+
+        Parameters:
+            l3_size: L3 cache size in bytes, if None it is read from
+                     PqosCpuInfo (default None)
+        """
+
+        if l3_size is None:
+            l3_size = PqosCpuInfo().get_cache_info(3).total_size
+
+        self.l3_size = l3_size
+
+    @staticmethod
+    def intervals(timestamps, prev_timestamp=None):
+        """
+        Computes time between consecutive samples.
+
+        Parameters:
+            timestamps: NumPy array (T) of timestamps in nanoseconds
+            prev_timestamp: timestamp of the sample preceding the batch
+                            or None (default None)
+
+        Returns:
+            NumPy array (T) of intervals in seconds, NaN for the first sample
+            if prev_timestamp is not given
+        """
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        intervals = np.full(timestamps.shape, np.nan)
+
+        if timestamps.size:
+            intervals[1:] = np.diff(timestamps)
+            if prev_timestamp is not None:
+                intervals[0] = timestamps[0] - prev_timestamp
+
+        return intervals / 1e9
+
+    def compute(self, timestamps, values, prev_timestamp=None):
+        """
+        Computes derived metrics for a batch of samples.
+
+        Memory bandwidth is computed from deltas divided by the actual time
+        between samples. Remote bandwidth is the difference between total and
+        local bandwidth, so it does not require 'rmem_bw' event.
+
+        Parameters:
+            timestamps: NumPy array (T) of timestamps in nanoseconds
+            values: NumPy structured array (T x N) of event values
+            prev_timestamp: timestamp of the sample preceding the batch
+                            or None (default None)
+
+        Returns:
+            NumPy structured array (T x N) of METRICS_DTYPE
+        """
+
+        metrics = np.empty(values.shape, dtype=METRICS_DTYPE)
+
+        interval = self.intervals(timestamps, prev_timestamp)
+        interval = interval.reshape((-1,) + (1,) * (values.ndim - 1))
+        scale = BYTES_PER_MB * interval
+
+        local = values['mbm_local_delta']
+        total = values['mbm_total_delta']
+        metrics['mbm_local'] = _ratio(local, scale)
+        metrics['mbm_total'] = _ratio(total, scale)
+        remote = np.clip(total.astype(np.int64) - local.astype(np.int64), 0,
+                         None)
+        metrics['mbm_remote'] = _ratio(remote, scale)
+
+        metrics['llc'] = values['llc'] / self.l3_size
+
+        metrics['ipc'] = _ratio(values['ipc_retired_delta'],
+                                values['ipc_unhalted_delta'])
+        metrics['llc_miss_ratio'] = _ratio(values['llc_misses_delta'],
+                                           values['llc_references_delta'])
+        metrics['llc_mpki'] = _ratio(values['llc_misses_delta'] * 1000.0,
+                                     values['ipc_retired_delta'])
+
+        return metrics
+
+    def compute_samples(self, samples, prev_timestamp=None):
+        """
+        Computes derived metrics for a batch of samples read from
+        MonitoringSampler.
+
+        Parameters:
+            samples: Samples object
+            prev_timestamp: timestamp of the sample preceding the batch
+                            or None (default None)
+
+        Returns:
+            NumPy structured array (T x N) of METRICS_DTYPE
+        """
+
+        return self.compute(samples.timestamps, samples.values, prev_timestamp)
@@ -45,6 +45,29 @@ from pqos.native_struct import (
 from pqos.pqos import Pqos
 
 
+# Maps event names to counters in pqos_event_values structure
+EVENT_COUNTER_MAP = {
+    'l3_occup': 'llc',
+    'lmem_bw': 'mbm_local_delta',
+    'tmem_bw': 'mbm_total_delta',
+    'rmem_bw': 'mbm_remote_delta',
+    'perf_ipc': 'ipc',
+    'perf_llc_miss': 'llc_misses_delta',
+    'perf_llc_ref': 'llc_references_delta'
+}
+
+# Maps event names to PQoS library event identifiers
+EVENT_MASK_MAP = {
+    'l3_occup': CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP,
+    'lmem_bw': CPqosMonitor.PQOS_MON_EVENT_LMEM_BW,
+    'tmem_bw': CPqosMonitor.PQOS_MON_EVENT_TMEM_BW,
+    'rmem_bw': CPqosMonitor.PQOS_MON_EVENT_RMEM_BW,
+    'perf_llc_miss': CPqosMonitor.PQOS_PERF_EVENT_LLC_MISS,
+    'perf_llc_ref': CPqosMonitor.PQOS_PERF_EVENT_LLC_REF,
+    'perf_ipc': CPqosMonitor.PQOS_PERF_EVENT_IPC
+}
+
+
 class CPqosMonData(ctypes.Structure):
     """
     pqos_mon_data structure
@@ -121,17 +144,7 @@ class CPqosMonData(ctypes.Structure):
             counter value
         """
 
-        event_counter_map = {
-            'l3_occup': 'llc',
-            'lmem_bw': 'mbm_local_delta',
-            'tmem_bw': 'mbm_total_delta',
-            'rmem_bw': 'mbm_remote_delta',
-            'perf_ipc': 'ipc',
-            'perf_llc_miss': 'llc_misses_delta',
-            'perf_llc_ref': 'llc_references_delta'
-        }
-
-        counter = event_counter_map.get(event)
+        counter = EVENT_COUNTER_MAP.get(event)
         if not counter:
             return None
 
@@ -141,19 +154,9 @@ class CPqosMonData(ctypes.Structure):
 def _get_event_mask(events):
     "Converts a list of events into a binary mask accepted by PQoS library."
 
-    event_map = {
-        'l3_occup': CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP,
-        'lmem_bw': CPqosMonitor.PQOS_MON_EVENT_LMEM_BW,
-        'tmem_bw': CPqosMonitor.PQOS_MON_EVENT_TMEM_BW,
-        'rmem_bw': CPqosMonitor.PQOS_MON_EVENT_RMEM_BW,
-        'perf_llc_miss': CPqosMonitor.PQOS_PERF_EVENT_LLC_MISS,
-        'perf_llc_ref': CPqosMonitor.PQOS_PERF_EVENT_LLC_REF,
-        'perf_ipc': CPqosMonitor.PQOS_PERF_EVENT_IPC
-    }
-
     mask = 0
     for event in events:
-        mask |= event_map.get(event, 0)
+        mask |= EVENT_MASK_MAP.get(event, 0)
 
     return mask
 
@@ -213,14 +216,10 @@ class PqosMon:
             associated RMID
         """
 
-        func_name = 'pqos_mon_assoc_get_channel'
-        func = getattr(self.pqos.lib, func_name)
-        func.restype = ctypes.c_int
-        func.argtypes = [PqosChannelT, ctypes.POINTER(RmidT)]
         rmid = RmidT(0)
         rmid_ref = ctypes.byref(rmid)
-        ret = func(channel_id, rmid_ref)
-        pqos_handle_error(func_name, ret)
+        ret = self.pqos.lib.pqos_mon_assoc_get_channel(channel_id, rmid_ref)
+        pqos_handle_error('pqos_mon_assoc_get_channel', ret)
         return rmid.value
 
     def assoc_get_dev(self, segment, bdf, virtual_channel):
@@ -236,17 +235,11 @@ class PqosMon:
             associated RMID
         """
 
-        func_name = 'pqos_mon_assoc_get_dev'
-        func = getattr(self.pqos.lib, func_name)
-        func.restype = ctypes.c_int
-        func.argtypes = [
-            ctypes.c_uint16, ctypes.c_uint16, ctypes.c_uint,
-            ctypes.POINTER(RmidT)
-        ]
         rmid = RmidT(0)
         rmid_ref = ctypes.byref(rmid)
-        ret = func(segment, bdf, virtual_channel, rmid_ref)
-        pqos_handle_error(func_name, ret)
+        ret = self.pqos.lib.pqos_mon_assoc_get_dev(segment, bdf,
+                                                   virtual_channel, rmid_ref)
+        pqos_handle_error('pqos_mon_assoc_get_dev', ret)
         return rmid.value
 
     def start(self, cores, events, context=None):
@@ -324,23 +317,14 @@ class PqosMon:
             CPqosMonData monitoring data
         """
 
-        func_name = 'pqos_mon_start_channels'
-        func = getattr(self.pqos.lib, func_name)
-        func.restype = ctypes.c_int
-        func.argtypes = [
-            ctypes.c_uint,
-            ctypes.POINTER(PqosChannelT),
-            ctypes.c_int,
-            ctypes.c_void_p,
-            ctypes.POINTER(CPqosMonData)
-        ]
-
         group = ctypes.POINTER(CPqosMonData)()
         num_channels = len(channels)
         channels_arr = (PqosChannelT * num_channels)(*channels)
         event = _get_event_mask(events)
-        ret = func(num_channels, channels_arr, event, context, ctypes.byref(group))
-        pqos_handle_error(func_name, ret)
+        ret = self.pqos.lib.pqos_mon_start_channels(num_channels, channels_arr,
+                                                    event, context,
+                                                    ctypes.byref(group))
+        pqos_handle_error('pqos_mon_start_channels', ret)
         return group.contents
 
     def start_dev(self, segment, bdf, virtual_channel, events, context=None):
@@ -360,21 +344,12 @@ class PqosMon:
             CPqosMonData monitoring data
         """
 
-        func_name = 'pqos_mon_start_dev'
-        func = getattr(self.pqos.lib, func_name)
-        func.argtypes = [
-            ctypes.c_uint16,
-            ctypes.c_uint16,
-            ctypes.c_uint8,
-            ctypes.c_int,
-            ctypes.c_void_p,
-            ctypes.POINTER(CPqosMonData)
-        ]
-
         group = ctypes.POINTER(CPqosMonData)()
         event = _get_event_mask(events)
-        ret = func(segment, bdf, virtual_channel, event, context, ctypes.byref(group))
-        pqos_handle_error(func_name, ret)
+        ret = self.pqos.lib.pqos_mon_start_dev(segment, bdf, virtual_channel,
+                                               event, context,
+                                               ctypes.byref(group))
+        pqos_handle_error('pqos_mon_start_dev', ret)
         return group.contents
 
     def poll(self, groups):
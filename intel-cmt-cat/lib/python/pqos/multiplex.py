@@ -0,0 +1,334 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines MonitoringMultiplexer which time-slices a limited number
+of RMIDs across an unlimited number of monitoring groups.
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import OrderedDict
+import time
+
+from pqos.capability import PqosCap
+from pqos.error import PqosError, PqosErrorResource
+from pqos.monitoring import PqosMon
+
+
+class GroupEstimate(object):
+    """
+    Estimated monitoring values of a multiplexed group.
+
+    Memory bandwidth rates are measured over the time slices the group was
+    monitored and are assumed to hold while it was not. LLC occupancy is
+    the value read at the end of the last time slice; since a freshly
+    assigned RMID only accounts for cache lines filled after the assignment,
+    it tends to be underestimated for short time slices.
+    """
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+
+    def __init__(self, created):
+        self.created = created        # time the group was added
+        self.last_update = None       # end of the last monitored time slice
+        self.num_slices = 0           # number of monitored time slices
+        self.observed_time = 0.0      # total monitored time in seconds
+        self.mbm_local_bytes = 0      # local memory traffic observed
+        self.mbm_total_bytes = 0      # total memory traffic observed
+        self.mbm_remote_bytes = 0     # remote memory traffic observed
+        self.mbm_local_rate = None    # local memory bandwidth in bytes/s
+        self.mbm_total_rate = None    # total memory bandwidth in bytes/s
+        self.mbm_remote_rate = None   # remote memory bandwidth in bytes/s
+        self.llc = None               # LLC occupancy in bytes
+        self.error = None             # last failure to start monitoring
+
+    def coverage(self, now):
+        """
+        Fraction of time since the group was added that it was monitored,
+        a measure of confidence in the estimates.
+
+        Parameters:
+            now: current time (time.monotonic())
+
+        Returns:
+            coverage in range 0.0 - 1.0
+        """
+
+        wall_time = now - self.created
+        if wall_time <= 0:
+            return 0.0
+
+        return min(self.observed_time / wall_time, 1.0)
+
+    def scaled_mbm_total_bytes(self, now):
+        """
+        Total memory traffic since the group was added, scaled up from
+        the observed traffic by the inverse of coverage.
+
+        Parameters:
+            now: current time (time.monotonic())
+
+        Returns:
+            estimated number of bytes or None if group was not monitored yet
+        """
+
+        if not self.observed_time:
+            return None
+
+        return self.mbm_total_bytes * (now - self.created) / self.observed_time
+
+    def update(self, values, start, end):
+        """
+        Updates estimates with values from a monitored time slice.
+
+        Parameters:
+            values: CPqosEventValues object
+            start: beginning of the time slice
+            end: end of the time slice
+        """
+
+        elapsed = end - start
+        if elapsed <= 0:
+            return
+
+        self.num_slices += 1
+        self.observed_time += elapsed
+        self.last_update = end
+
+        self.mbm_local_bytes += values.mbm_local_delta
+        self.mbm_total_bytes += values.mbm_total_delta
+        self.mbm_remote_bytes += values.mbm_remote_delta
+        self.mbm_local_rate = values.mbm_local_delta / elapsed
+        self.mbm_total_rate = values.mbm_total_delta / elapsed
+        self.mbm_remote_rate = values.mbm_remote_delta / elapsed
+        self.llc = values.llc
+
+
+class MonitoringMultiplexer(object):
+    """
+    RMID multiplexing scheduler.
+
+    Logical groups (cores or PIDs) are monitored in rounds. On each tick()
+    the currently monitored batch of groups is polled and stopped, and the
+    next batch (round-robin) is started, so each monitoring group holds
+    an RMID for one tick interval. The number of groups monitored at
+    the same time is limited to the number of available RMIDs and shrinks
+    automatically when the library runs out of them. A group which fails
+    to start for any other reason is skipped for the current round and
+    the error is stored in its estimate.
+    """
+    # configuration, estimates and round-robin state of a single scheduler
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, events, num_slots=None):
+        """
+        Initializes the scheduler.
+
+        Parameters:
+            events: a list of events to monitor, see PqosMon.start_cores()
+            num_slots: number of groups monitored at the same time,
+                       by default the number of RMIDs minus one (RMID 0 is
+                       used by not monitored cores)
+        """
+
+        self.mon = PqosMon()
+        self.events = events
+
+        if num_slots is None:
+            num_slots = PqosCap().get_type('mon').max_rmid - 1
+
+        if num_slots < 1:
+            raise PqosErrorResource('No RMIDs available for monitoring')
+
+        self.num_slots = num_slots
+        self.groups = OrderedDict()  # key -> (type, ids)
+        self.estimates = {}          # key -> GroupEstimate
+        self.num_rounds = 0          # number of completed rounds
+
+        self._next = 0               # round-robin position in groups
+        self._active = []            # [(key, CPqosMonData)]
+        self._slice_start = None
+
+    def add_cores(self, key, cores):
+        """
+        Adds a logical group of cores.
+
+        Parameters:
+            key: group identifier
+            cores: a list of core IDs
+        """
+
+        self.groups[key] = ('cores', list(cores))
+        self.estimates[key] = GroupEstimate(time.monotonic())
+
+    def add_pids(self, key, pids):
+        """
+        Adds a logical group of processes.
+
+        Parameters:
+            key: group identifier
+            pids: a list of process IDs
+        """
+
+        self.groups[key] = ('pids', list(pids))
+        self.estimates[key] = GroupEstimate(time.monotonic())
+
+    def remove(self, key):
+        """
+        Removes a logical group. If the group is monitored at the moment,
+        it is stopped on the next tick.
+
+        Parameters:
+            key: group identifier
+        """
+
+        self.groups.pop(key)
+        self.estimates.pop(key)
+
+    def get_estimate(self, key):
+        """
+        Gets estimates of a logical group.
+
+        Parameters:
+            key: group identifier
+
+        Returns:
+            GroupEstimate object
+        """
+
+        return self.estimates[key]
+
+    def _start(self, key):
+        """
+        Starts monitoring of a logical group.
+
+        Parameters:
+            key: group identifier
+
+        Returns:
+            CPqosMonData monitoring data
+        """
+
+        group_type, ids = self.groups[key]
+
+        if group_type == 'pids':
+            return self.mon.start_pids(ids, self.events)
+
+        return self.mon.start_cores(ids, self.events)
+
+    def _collect(self):
+        "Polls and stops currently monitored groups, updates estimates."
+
+        if not self._active:
+            return
+
+        try:
+            self.mon.poll([group for _, group in self._active])
+            end = time.monotonic()
+
+            for key, group in self._active:
+                if key in self.estimates:
+                    self.estimates[key].update(group.values, self._slice_start,
+                                               end)
+        finally:
+            for _, group in self._active:
+                group.stop()
+
+            self._active = []
+
+    def _select(self):
+        """
+        Selects the next batch of groups in round-robin order.
+
+        Returns:
+            a list of group identifiers
+        """
+
+        keys = list(self.groups)
+        num = min(self.num_slots, len(keys))
+
+        if self._next >= len(keys):
+            self._next = 0
+
+        batch = keys[self._next:self._next + num]
+        batch += keys[:num - len(batch)]
+
+        return batch
+
+    def tick(self):
+        """
+        Collects results of the current time slice and starts the next one.
+        It should be called periodically, the interval between calls is
+        the time slice length.
+        """
+
+        self._collect()
+
+        batch = self._select()
+        if not batch:
+            return
+
+        visited = 0
+        for key in batch:
+            try:
+                self._active.append((key, self._start(key)))
+                self.estimates[key].error = None
+            except PqosErrorResource:
+                # out of RMIDs, monitor fewer groups at the same time
+                self.num_slots = max(len(self._active), 1)
+                break
+            except PqosError as ex:
+                # skip the group, it is retried in the next round
+                self.estimates[key].error = ex
+            visited += 1
+
+        if not visited:
+            raise PqosErrorResource('No RMIDs available for monitoring')
+
+        # advance round-robin position by the number of visited groups
+        self._next += visited
+        if self._next >= len(self.groups):
+            self._next -= len(self.groups)
+            self.num_rounds += 1
+
+        if not self._active:
+            return
+
+        # first poll sets a baseline for memory bandwidth counters
+        self.mon.poll([group for _, group in self._active])
+        self._slice_start = time.monotonic()
+
+    def stop(self):
+        """
+        Collects results of the current time slice and stops monitoring.
+        """
+
+        self._collect()
@@ -0,0 +1,204 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Prototypes of PQoS library functions used by the bindings.
+
+PQOS_FUNCTIONS is the declarative specification of every library function
+called from Python. bind_functions() creates a prototyped function object for
+each entry once and returns them as an immutable table, so wrappers never
+modify restype/argtypes of shared function objects at call time.
+"""
+
+from collections import namedtuple
+from ctypes import POINTER, c_int, c_uint, c_uint8, c_uint16, c_void_p
+
+from pqos.native_struct import (
+    CPqosCap, CPqosCapability, CPqosChannel, CPqosConfig, CPqosCoreInfo,
+    CPqosCpuInfo, CPqosDevinfo, CPqosL2Ca, CPqosL3Ca, CPqosMba,
+    CPqosMonConfig, CPqosSysconfig, PqosChannelT, RmidT
+)
+
+# Enumerations are passed as int
+PqosEnum = c_int
+
+# pid_t arrays are built as arrays of unsigned int by the bindings
+PidArray = POINTER(c_uint)
+
+# struct pqos_mon_data is defined in monitoring module, which depends on this
+# module, so pointers to monitoring groups are declared as void pointers
+MonDataPtr = c_void_p
+MonDataPtrPtr = c_void_p
+
+# struct pqos_alloc_config has two definitions (native_struct and allocation
+# modules), both are accepted
+AllocConfigPtr = c_void_p
+
+# (name, restype, argtypes)
+PQOS_FUNCTIONS = (
+    # Initialization
+    ('pqos_init', c_int, [POINTER(CPqosConfig)]),
+    ('pqos_fini', c_int, []),
+    ('pqos_sysconfig_get', c_int, [POINTER(POINTER(CPqosSysconfig))]),
+    ('pqos_inter_get', c_int, [POINTER(PqosEnum)]),
+
+    # Capabilities
+    ('pqos_cap_get', c_int, [POINTER(POINTER(CPqosCap)),
+                             POINTER(POINTER(CPqosCpuInfo))]),
+    ('pqos_cap_get_type', c_int, [POINTER(CPqosCap), PqosEnum,
+                                  POINTER(POINTER(CPqosCapability))]),
+    ('pqos_l3ca_get_cos_num', c_int, [POINTER(CPqosCap), POINTER(c_uint)]),
+    ('pqos_l2ca_get_cos_num', c_int, [POINTER(CPqosCap), POINTER(c_uint)]),
+    ('pqos_mba_get_cos_num', c_int, [POINTER(CPqosCap), POINTER(c_uint)]),
+    ('pqos_l3ca_cdp_enabled', c_int, [POINTER(CPqosCap), POINTER(c_int),
+                                      POINTER(c_int)]),
+    ('pqos_l3ca_iordt_enabled', c_int, [POINTER(CPqosCap), POINTER(c_int),
+                                        POINTER(c_int)]),
+    ('pqos_l2ca_cdp_enabled', c_int, [POINTER(CPqosCap), POINTER(c_int),
+                                      POINTER(c_int)]),
+    ('pqos_mba_ctrl_enabled', c_int, [POINTER(CPqosCap), POINTER(c_int),
+                                      POINTER(c_int)]),
+
+    # CPU information
+    ('pqos_get_vendor', PqosEnum, [POINTER(CPqosCpuInfo)]),
+    ('pqos_cpu_get_sockets', POINTER(c_uint), [POINTER(CPqosCpuInfo),
+                                               POINTER(c_uint)]),
+    ('pqos_cpu_get_l2ids', POINTER(c_uint), [POINTER(CPqosCpuInfo),
+                                             POINTER(c_uint)]),
+    ('pqos_cpu_get_cores_l3id', POINTER(c_uint), [POINTER(CPqosCpuInfo),
+                                                  c_uint, POINTER(c_uint)]),
+    ('pqos_cpu_get_cores', POINTER(c_uint), [POINTER(CPqosCpuInfo), c_uint,
+                                             POINTER(c_uint)]),
+    ('pqos_cpu_get_core_info', POINTER(CPqosCoreInfo),
+     [POINTER(CPqosCpuInfo), c_uint]),
+    ('pqos_cpu_get_one_core', c_int, [POINTER(CPqosCpuInfo), c_uint,
+                                      POINTER(c_uint)]),
+    ('pqos_cpu_get_one_by_l2id', c_int, [POINTER(CPqosCpuInfo), c_uint,
+                                         POINTER(c_uint)]),
+    ('pqos_cpu_check_core', c_int, [POINTER(CPqosCpuInfo), c_uint]),
+    ('pqos_cpu_get_socketid', c_int, [POINTER(CPqosCpuInfo), c_uint,
+                                      POINTER(c_uint)]),
+    ('pqos_cpu_get_clusterid', c_int, [POINTER(CPqosCpuInfo), c_uint,
+                                       POINTER(c_uint)]),
+
+    # Device information
+    ('pqos_devinfo_get_channel_id', PqosChannelT,
+     [POINTER(CPqosDevinfo), c_uint16, c_uint16, c_uint]),
+    ('pqos_devinfo_get_channel_ids', POINTER(PqosChannelT),
+     [POINTER(CPqosDevinfo), c_uint16, c_uint16, POINTER(c_uint)]),
+    ('pqos_devinfo_get_channel', POINTER(CPqosChannel),
+     [POINTER(CPqosDevinfo), PqosChannelT]),
+
+    # Allocation
+    ('pqos_l3ca_set', c_int, [c_uint, c_uint, POINTER(CPqosL3Ca)]),
+    ('pqos_l3ca_get', c_int, [c_uint, c_uint, POINTER(c_uint),
+                              POINTER(CPqosL3Ca)]),
+    ('pqos_l3ca_get_min_cbm_bits', c_int, [POINTER(c_uint)]),
+    ('pqos_l2ca_set', c_int, [c_uint, c_uint, POINTER(CPqosL2Ca)]),
+    ('pqos_l2ca_get', c_int, [c_uint, c_uint, POINTER(c_uint),
+                              POINTER(CPqosL2Ca)]),
+    ('pqos_l2ca_get_min_cbm_bits', c_int, [POINTER(c_uint)]),
+    ('pqos_mba_set', c_int, [c_uint, c_uint, POINTER(CPqosMba),
+                             POINTER(CPqosMba)]),
+    ('pqos_mba_get', c_int, [c_uint, c_uint, POINTER(c_uint),
+                             POINTER(CPqosMba)]),
+    ('pqos_alloc_assoc_set', c_int, [c_uint, c_uint]),
+    ('pqos_alloc_assoc_get', c_int, [c_uint, POINTER(c_uint)]),
+    ('pqos_alloc_assoc_set_pid', c_int, [c_int, c_uint]),
+    ('pqos_alloc_assoc_get_pid', c_int, [c_int, POINTER(c_uint)]),
+    ('pqos_alloc_assign', c_int, [c_uint, POINTER(c_uint), c_uint,
+                                  POINTER(c_uint)]),
+    ('pqos_alloc_release', c_int, [POINTER(c_uint), c_uint]),
+    ('pqos_alloc_assign_pid', c_int, [c_uint, PidArray, c_uint,
+                                      POINTER(c_uint)]),
+    ('pqos_alloc_release_pid', c_int, [PidArray, c_uint]),
+    ('pqos_pid_get_pid_assoc', POINTER(c_uint), [c_uint, POINTER(c_uint)]),
+    ('pqos_alloc_reset', c_int, [PqosEnum, PqosEnum, PqosEnum]),
+    ('pqos_alloc_reset_config', c_int, [AllocConfigPtr]),
+    ('pqos_alloc_assoc_set_channel', c_int, [PqosChannelT, c_uint]),
+    ('pqos_alloc_assoc_get_channel', c_int, [PqosChannelT, POINTER(c_uint)]),
+    ('pqos_alloc_assoc_set_dev', c_int, [c_uint16, c_uint16, c_uint,
+                                         c_uint]),
+    ('pqos_alloc_assoc_get_dev', c_int, [c_uint16, c_uint16, c_uint,
+                                         POINTER(c_uint)]),
+
+    # Monitoring
+    ('pqos_mon_reset', c_int, []),
+    ('pqos_mon_reset_config', c_int, [POINTER(CPqosMonConfig)]),
+    ('pqos_mon_assoc_get', c_int, [c_uint, POINTER(RmidT)]),
+    ('pqos_mon_assoc_get_channel', c_int, [PqosChannelT, POINTER(RmidT)]),
+    ('pqos_mon_assoc_get_dev', c_int, [c_uint16, c_uint16, c_uint,
+                                       POINTER(RmidT)]),
+    ('pqos_mon_start', c_int, [c_uint, POINTER(c_uint), PqosEnum, c_void_p,
+                               MonDataPtr]),
+    ('pqos_mon_start_cores', c_int, [c_uint, POINTER(c_uint), PqosEnum,
+                                     c_void_p, MonDataPtrPtr]),
+    ('pqos_mon_start_pids', c_int, [c_uint, PidArray, PqosEnum, c_void_p,
+                                    MonDataPtr]),
+    ('pqos_mon_start_pids2', c_int, [c_uint, PidArray, PqosEnum, c_void_p,
+                                     MonDataPtrPtr]),
+    ('pqos_mon_start_channels', c_int, [c_uint, POINTER(PqosChannelT),
+                                        PqosEnum, c_void_p, MonDataPtrPtr]),
+    ('pqos_mon_start_dev', c_int, [c_uint16, c_uint16, c_uint8, PqosEnum,
+                                   c_void_p, MonDataPtrPtr]),
+    ('pqos_mon_poll', c_int, [MonDataPtrPtr, c_uint]),
+    ('pqos_mon_stop', c_int, [MonDataPtr]),
+    ('pqos_mon_add_pids', c_int, [c_uint, PidArray, MonDataPtr]),
+    ('pqos_mon_remove_pids', c_int, [c_uint, PidArray, MonDataPtr]),
+)
+
+# Immutable table of prototyped library functions
+PqosFunctions = namedtuple('PqosFunctions',
+                           [name for name, _, _ in PQOS_FUNCTIONS])
+
+
+def bind_functions(lib):
+    """
+    Creates prototyped function objects for all functions in PQOS_FUNCTIONS.
+
+    Function objects are created with item access, so they are not shared
+    with other users of the same library object.
+
+    Parameters:
+        lib: a ctypes.CDLL object of PQoS library
+
+    Returns:
+        PqosFunctions table
+    """
+
+    funcs = []
+    for name, restype, argtypes in PQOS_FUNCTIONS:
+        func = lib[name]
+        func.restype = restype
+        func.argtypes = argtypes
+        funcs.append(func)
+
+    return PqosFunctions(*funcs)
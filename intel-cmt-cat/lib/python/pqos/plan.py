@@ -0,0 +1,432 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines AllocationPlan, which collects allocation configuration
+(classes of service of all domains and core associations), validates it
+as a whole and applies it in an order that never leaves a core associated
+with a class of service while its allocation is narrowed. A failed apply is
+rolled back to the configuration read before the first write.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from pqos.allocation import PqosAlloc
+from pqos.capability import PqosCap
+from pqos.cpuinfo import PqosCpuInfo
+from pqos.error import PqosError, PqosErrorResource
+from pqos.l2ca import PqosCatL2
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+
+
+# Order in which technologies are written within a step of apply
+_TECHNOLOGIES = ['l3ca', 'l2ca', 'mba']
+
+
+def _write_order(item):
+    "Sort key of ((technology, domain), class IDs) items of a step."
+
+    (technology, domain), _class_ids = item
+    return (_TECHNOLOGIES.index(technology), domain)
+
+
+def _cat_masks(cos):
+    "Returns (code mask, data mask) of a cache allocation COS."
+
+    if cos.cdp:
+        return (cos.code_mask, cos.data_mask)
+
+    return (cos.mask, cos.mask)
+
+
+def _is_contiguous(mask):
+    "Returns True if set bits of a non-zero mask are contiguous."
+
+    mask //= mask & -mask
+    return mask & (mask + 1) == 0
+
+
+def _is_narrowed(technology, old, new):
+    """
+    Returns True if a class of service gets less resources, i.e. cache ways
+    are removed from its masks or its memory bandwidth is lowered.
+    """
+
+    if technology == 'mba':
+        return old.ctrl != new.ctrl or new.mb_max < old.mb_max
+
+    return any(old_mask & ~new_mask for old_mask, new_mask
+               in zip(_cat_masks(old), _cat_masks(new)))
+
+
+def _is_equal(technology, old, new):
+    "Returns True if two class of service definitions are the same."
+
+    if technology == 'mba':
+        return (old.mb_max, bool(old.ctrl)) == (new.mb_max, bool(new.ctrl))
+
+    return old.cdp == new.cdp and _cat_masks(old) == _cat_masks(new)
+
+
+class AllocationPlan(object):
+    """
+    Transactional allocation configuration.
+
+    Classes of service (per socket or L2 ID) and core associations are
+    collected with set_l3ca(), set_l2ca(), set_mba() and assoc_set(), checked
+    by validate() and written by apply(). Only definitions and associations
+    differing from the current configuration are written, in the following
+    order:
+        1. classes of service that only gain resources,
+        2. cores moved to classes of service which are not narrowed,
+        3. narrowed classes of service, each one only after cores leaving it
+           were moved out, followed by cores moved to it.
+    Cores swapped between narrowed classes of service cannot be ordered this
+    way, such classes are written together.
+
+    If a write fails, classes of service and associations written so far are
+    restored from a snapshot read by apply() and the error is raised again.
+    Errors of the rollback itself are collected in rollback_errors.
+    """
+
+    def __init__(self):
+        "Initializes an empty plan."
+
+        self.l3ca = PqosCatL3()
+        self.l2ca = PqosCatL2()
+        self.mba = PqosMba()
+        self.alloc = PqosAlloc()
+        self.rollback_errors = []
+
+        self._coses = {}  # (technology, domain) -> {class_id: COS}
+        self._assoc = {}  # core -> class_id
+
+    def _add(self, technology, domain, coses):
+        "Adds classes of service of a domain to the plan."
+
+        table = self._coses.setdefault((technology, domain), {})
+        for cos in coses:
+            table[cos.class_id] = cos
+
+    def set_l3ca(self, socket, coses):
+        """
+        Adds L3 classes of service of a socket to the plan.
+
+        Parameters:
+            socket: a socket number
+            coses: a list of PqosCatL3.COS objects
+        """
+
+        self._add('l3ca', socket, coses)
+
+    def set_l2ca(self, l2id, coses):
+        """
+        Adds L2 classes of service of an L2 cluster to the plan.
+
+        Parameters:
+            l2id: L2 cache ID
+            coses: a list of PqosCatL2.COS objects
+        """
+
+        self._add('l2ca', l2id, coses)
+
+    def set_mba(self, socket, coses):
+        """
+        Adds MBA classes of service of a socket to the plan.
+
+        Parameters:
+            socket: socket ID
+            coses: a list of PqosMba.COS objects
+        """
+
+        self._add('mba', socket, coses)
+
+    def assoc_set(self, core, class_id):
+        """
+        Adds association of a logical core with a class of service
+        to the plan.
+
+        Parameters:
+            core: a logical core number
+            class_id: class of service
+        """
+
+        self._assoc[core] = class_id
+
+    def assoc_set_many(self, assoc):
+        """
+        Adds associations of logical cores with classes of service
+        to the plan.
+
+        Parameters:
+            assoc: a dictionary mapping logical core numbers to classes
+                   of service
+        """
+
+        self._assoc.update(assoc)
+
+    def _validate_cat(self, technology, cap, coses, errors):
+        "Validates cache allocation classes of service of a domain."
+
+        if technology == 'l3ca':
+            cos_num = cap.get_l3ca_cos_num()
+            min_cbm_bits = self.l3ca.get_min_cbm_bits()
+        else:
+            cos_num = cap.get_l2ca_cos_num()
+            min_cbm_bits = self.l2ca.get_min_cbm_bits()
+
+        cap_ca = cap.get_type(technology)
+        ways_mask = (1 << cap_ca.num_ways) - 1
+
+        for prefix, cos in coses:
+            if cos.class_id >= cos_num:
+                errors.append(f'{prefix}: only {cos_num} classes of service'
+                              ' available')
+
+            if cos.cdp and not cap_ca.cdp_on:
+                errors.append(f'{prefix}: CDP is not enabled')
+
+            for mask in set(_cat_masks(cos)):
+                if not mask or mask & ~ways_mask:
+                    errors.append(f'{prefix}: mask {mask:#x} out of range'
+                                  f' {ways_mask:#x}')
+                    continue
+
+                if not cap_ca.non_contiguous_cbm and not _is_contiguous(mask):
+                    errors.append(f'{prefix}: mask {mask:#x} is not'
+                                  ' contiguous')
+
+                if bin(mask).count('1') < min_cbm_bits:
+                    errors.append(f'{prefix}: mask {mask:#x} has less than'
+                                  f' {min_cbm_bits} bits set')
+
+    @staticmethod
+    def _validate_mba(cap, coses, errors):
+        "Validates MBA classes of service."
+
+        cos_num = cap.get_mba_cos_num()
+        ctrl_on = cap.get_type('mba').ctrl_on
+
+        for prefix, cos in coses:
+            if cos.class_id >= cos_num:
+                errors.append(f'{prefix}: only {cos_num} classes of service'
+                              ' available')
+
+            if cos.ctrl and not ctrl_on:
+                errors.append(f'{prefix}: MBA controller is not enabled')
+            elif not cos.ctrl and not 0 < cos.mb_max <= 100:
+                errors.append(f'{prefix}: MBA rate {cos.mb_max} out of'
+                              ' range 1-100')
+
+    def validate(self):
+        """
+        Validates the plan against platform capabilities: domains, cores,
+        number of classes of service, masks (range, contiguity, minimum
+        number of bits) and MBA rates. ValueError describing all problems
+        found is raised if the plan is invalid.
+        """
+
+        cap = PqosCap()
+        cpu = PqosCpuInfo()
+        domains = {
+            'l3ca': set(cpu.get_sockets()),
+            'l2ca': set(cpu.get_l2ids()),
+            'mba': set(cpu.get_sockets())
+        }
+        names = {'l3ca': 'socket', 'l2ca': 'L2 ID', 'mba': 'socket'}
+        errors = []
+        cos_nums = []
+
+        for technology in _TECHNOLOGIES:
+            coses = []
+            for (tech, domain), table in sorted(self._coses.items()):
+                if tech != technology:
+                    continue
+
+                prefix = f'{technology} {names[technology]} {domain}'
+                if domain not in domains[technology]:
+                    errors.append(f'{prefix}: no such domain')
+                coses.extend((f'{prefix} COS{class_id}', table[class_id])
+                             for class_id in sorted(table))
+
+            try:
+                cos_nums.append(getattr(cap, f'get_{technology}_cos_num')())
+            except PqosErrorResource:
+                if coses:
+                    errors.append(f'{technology}: not supported')
+                continue
+
+            if not coses:
+                continue
+
+            if technology == 'mba':
+                self._validate_mba(cap, coses, errors)
+            else:
+                self._validate_cat(technology, cap, coses, errors)
+
+        cores = {core.core for core in cpu.get_cores_info()}
+        max_cos = max(cos_nums, default=0)
+        for core, class_id in sorted(self._assoc.items()):
+            if core not in cores:
+                errors.append(f'core {core}: no such core')
+            if class_id >= max_cos:
+                errors.append(f'core {core}: only {max_cos} classes of'
+                              ' service available')
+
+        if errors:
+            raise ValueError('Invalid allocation plan: ' + '; '.join(errors))
+
+    def _read(self, technology, domain):
+        "Reads classes of service of a domain."
+
+        return {cos.class_id: cos
+                for cos in getattr(self, technology).get(domain)}
+
+    def _write(self, technology, domain, coses):
+        "Writes classes of service of a domain."
+
+        getattr(self, technology).set(domain, coses)
+
+    def _schedule(self, snapshot, current):
+        """
+        Computes the ordered list of steps of apply.
+
+        Parameters:
+            snapshot: {(technology, domain): {class_id: COS}} read from
+                      the library
+            current: {core: class_id} read from the library
+
+        Returns:
+            a list of steps, ('cos', {(technology, domain): [class_id]}) or
+            ('assoc', {core: class_id})
+        """
+        # pylint: disable=too-many-locals
+
+        changed = {}      # (technology, domain) -> [class_id]
+        narrowed = set()  # class IDs narrowed in any domain
+        for key, table in self._coses.items():
+            technology = key[0]
+            for class_id, cos in table.items():
+                old = snapshot[key].get(class_id)
+                if old is not None and _is_equal(technology, old, cos):
+                    continue
+                changed.setdefault(key, []).append(class_id)
+                if old is not None and _is_narrowed(technology, old, cos):
+                    narrowed.add(class_id)
+
+        moves = {core: class_id for core, class_id in self._assoc.items()
+                 if current[core] != class_id}
+
+        def cos_step(class_ids):
+            "Returns a step writing classes of service of given IDs."
+
+            return ('cos', {key: [class_id for class_id in ids
+                                  if class_id in class_ids]
+                            for key, ids in changed.items()
+                            if any(class_id in class_ids for class_id in ids)})
+
+        def assoc_step(class_ids):
+            "Returns a step moving cores to classes of service of given IDs."
+
+            return ('assoc', {core: class_id
+                              for core, class_id in moves.items()
+                              if class_id in class_ids})
+
+        all_ids = {class_id for ids in changed.values() for class_id in ids}
+        all_ids.update(moves.values())
+        steps = [cos_step(all_ids - narrowed),
+                 assoc_step(set(moves.values()) - narrowed)]
+
+        remaining = set(narrowed)
+        while remaining:
+            # a class can be narrowed once cores leaving it to other narrowed
+            # classes could be moved, i.e. their destination was written
+            ready = {class_id for class_id in remaining
+                     if not any(current[core] == class_id and
+                                dest in remaining and dest != class_id
+                                for core, dest in moves.items())}
+            if not ready:
+                ready = remaining
+            steps.append(cos_step(ready))
+            steps.append(assoc_step(ready))
+            remaining -= ready
+
+        return [step for step in steps if step[1]]
+
+    def _rollback(self, done, snapshot, current):
+        "Reverts steps done, in reverse order."
+
+        for kind, change in reversed(done):
+            try:
+                if kind == 'assoc':
+                    self.alloc.assoc_set_many(
+                        {core: current[core] for core in change},
+                        current=change)
+                else:
+                    for (technology, domain), class_ids in change.items():
+                        self._write(technology, domain,
+                                    [snapshot[(technology, domain)][class_id]
+                                     for class_id in class_ids])
+            except PqosError as ex:
+                self.rollback_errors.append(ex)
+
+    def apply(self):
+        """
+        Validates the plan and applies it. ValueError is raised, before
+        anything is written, if the plan is invalid. If a write fails,
+        configuration written so far is rolled back and PqosError is raised.
+        """
+
+        self.validate()
+        self.rollback_errors = []
+
+        snapshot = {key: self._read(*key) for key in self._coses}
+        current = {core: self.alloc.assoc_get(core) for core in self._assoc}
+        done = []
+
+        try:
+            for kind, change in self._schedule(snapshot, current):
+                if kind == 'assoc':
+                    done.append((kind, change))
+                    self.alloc.assoc_set_many(change, current=current)
+                    continue
+
+                for (technology, domain), class_ids in sorted(
+                        change.items(), key=_write_order):
+                    table = self._coses[(technology, domain)]
+                    done.append((kind, {(technology, domain): class_ids}))
+                    self._write(technology, domain,
+                                [table[class_id] for class_id in class_ids])
+        except PqosError:
+            self._rollback(done, snapshot, current)
+            raise
@@ -41,6 +41,7 @@ import ctypes
 import sys
 
 from pqos.common import pqos_handle_error
+from pqos.native_func import bind_functions
 from pqos.native_struct import CPqosConfig, CPqosSysconfig
 
 class Pqos(object):
@@ -56,6 +57,19 @@ class Pqos(object):
 
     _instance = None
 
+    lib = None
+
+    # Incremented when allocation configuration may have changed as a whole
+    # (allocation reset, library (re)initialization, backend change), so
+    # cached allocation state (pqos.shadow) can be invalidated
+    alloc_generation = 0
+
+    # Classes of service tables and core associations changed through
+    # the bindings: (technology, domain) or ('assoc', core) -> alloc_serial
+    # of the last change
+    alloc_serial = 0
+    alloc_changes = None
+
     @classmethod
     def set_instance(cls, instance):
         "Sets an instance of this class."
@@ -78,14 +92,40 @@ class Pqos(object):
 
         if instance is None:
             instance = object.__new__(cls)
+            instance.alloc_changes = {}
             cls.set_instance(instance)
 
         return cls.get_instance()
 
+    @classmethod
+    def set_backend(cls, lib):
+        """
+        Replaces the table of PQoS library functions used by the bindings,
+        e.g. with functions of a simulated library (pqos.sim.SimulatedPqos).
+
+        Parameters:
+            lib: PqosFunctions table or None, if None is given, then
+                 PQoS library is loaded when Pqos object is created
+        """
+
+        instance = cls.__new__(cls)
+        instance.cdll = None
+        instance.lib = lib
+        instance.alloc_changed()
+
     def __init__(self):
-        "Finds PQoS library and constructs a new object."
+        """
+        Finds PQoS library and constructs a new object.
 
-        self.lib = ctypes.cdll.LoadLibrary('libpqos.so.5')
+        The library is loaded and the table of prototyped functions (lib) is
+        built only once, when the singleton is created.
+        """
+
+        if self.lib is not None:
+            return
+
+        self.cdll = ctypes.cdll.LoadLibrary('libpqos.so.5')
+        self.lib = bind_functions(self.cdll)
 
     def init(self, interface, log_file=None, log_callback=None,
              log_context=None, verbose='default'):
@@ -158,14 +198,36 @@ class Pqos(object):
                              reserved=0)
 
         ret = self.lib.pqos_init(ctypes.byref(config))
+        self.alloc_changed()
         pqos_handle_error('pqos_init', ret)
 
     def fini(self):
         "Finalizes PQoS library."
 
         ret = self.lib.pqos_fini()
+        self.alloc_changed()
         pqos_handle_error('pqos_fini', ret)
 
+    def alloc_changed(self, keys=None):
+        """
+        Marks allocation configuration as changed, which invalidates cached
+        allocation state. Configuration is changed as a whole, e.g. by
+        allocation reset, unless keys are given.
+
+        Parameters:
+            keys: changed classes of service tables and core associations,
+                  ('l3ca', socket), ('l2ca', l2id), ('mba', socket)
+                  or ('assoc', core) (default None)
+        """
+
+        if keys is None:
+            self.alloc_generation += 1
+            return
+
+        self.alloc_serial += 1
+        for key in keys:
+            self.alloc_changes[key] = self.alloc_serial
+
     def get_sysconfig(self):
         "Returns system configuration."
 
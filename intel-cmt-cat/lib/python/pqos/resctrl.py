@@ -0,0 +1,393 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines ResctrlTasks, which associates many tasks (PIDs/TIDs)
+with classes of service by writing resctrl tasks files directly, bypassing
+the one task per call path of the PQoS library (assoc_set_pid()).
+
+Tasks are grouped by destination class of service, each tasks file is
+opened once and tasks are written comma separated, filling each write()
+up to the size the kernel accepts at once. Kernels which take a single
+task per write() are detected on the first write and handled with one
+write() per task on the same open file. Tasks which exit meanwhile are
+reported instead of failing the whole association.
+
+ResctrlCpus does the same for logical cores: cpus_list file of each class
+of service is written once with all cores moved to it, and associations of
+all cores are read with one read per class of service.
+
+Like the PQoS library, resctrl filesystem is locked for the time of the
+update, it has to be mounted, i.e. the library initialized with
+the OS interface.
+"""
+
+from __future__ import absolute_import, division, print_function
+import errno
+import fcntl
+import os
+import re
+import time
+
+from pqos.error import PqosError, PqosErrorBusy, PqosErrorParam
+
+
+RESCTRL_PATH = '/sys/fs/resctrl'
+
+# resctrl (kernfs) files take at most a page in a single write()
+WRITE_SIZE = 4096
+
+# the same timeout as the PQoS library uses to lock resctrl filesystem
+LOCK_TIMEOUT = 0.1
+
+
+def _lock(path):
+    "Locks resctrl filesystem, returns a descriptor to unlock it with."
+
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError as ex:
+        raise PqosError(f'Could not open {path} directory: '
+                        f'{ex.strerror}') from ex
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise PqosErrorBusy('Failed to acquire lock on resctrl '
+                                    'filesystem - timeout occurred') from None
+            time.sleep(0.001)
+
+
+def _unlock(fd):
+    "Unlocks resctrl filesystem locked with _lock()."
+
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def _group_dir(path, class_id):
+    "Returns resctrl group directory of a class of service."
+
+    if class_id == 0:
+        return path
+
+    return os.path.join(path, f'COS{class_id}')
+
+
+class ResctrlTasks(object):
+    """
+    Bulk association of tasks with classes of service through resctrl
+    tasks files. Field 'writes' counts write() calls made so far.
+    """
+
+    def __init__(self, path=RESCTRL_PATH, write_size=WRITE_SIZE):
+        """
+        Parameters:
+            path: resctrl filesystem mount point (default /sys/fs/resctrl)
+            write_size: maximum number of bytes written at once
+                        (default 4096)
+        """
+
+        self.path = path
+        self.write_size = write_size
+        self.writes = 0
+        # None until known if the kernel takes many tasks in one write()
+        self.multi_task = None
+
+    def tasks_file(self, class_id):
+        """
+        Returns path of tasks file of a class of service.
+
+        Parameters:
+            class_id: class of service
+
+        Returns:
+            path of tasks file
+        """
+
+        return os.path.join(_group_dir(self.path, class_id), 'tasks')
+
+    @staticmethod
+    def get_threads(pid):
+        """
+        Returns thread IDs of a process.
+
+        Parameters:
+            pid: process ID
+
+        Returns:
+            a list of thread IDs, empty if the process does not exist
+        """
+
+        try:
+            return sorted(int(tid) for tid in os.listdir(f'/proc/{pid}/task'))
+        except OSError:
+            return []
+
+    def _chunks(self, tasks):
+        "Splits tasks into comma separated chunks of at most write_size bytes."
+
+        chunk = []
+        size = 0
+        for task in tasks:
+            item = str(task).encode()
+            if chunk and size + 1 + len(item) > self.write_size:
+                yield chunk
+                chunk = []
+                size = 0
+            size += len(item) + (1 if chunk else 0)
+            chunk.append(task)
+
+        if chunk:
+            yield chunk
+
+    def _write(self, fd, tasks):
+        """
+        Writes tasks to a tasks file.
+
+        Returns:
+            None on success, or OSError raised by the kernel
+        """
+
+        self.writes += 1
+        try:
+            os.write(fd, ','.join(str(task) for task in tasks).encode())
+        except OSError as ex:
+            return ex
+
+        return None
+
+    def _write_one_by_one(self, fd, tasks, vanished):
+        "Writes tasks one per write(), collects tasks which do not exist."
+
+        for task in tasks:
+            error = self._write(fd, [task])
+            if error is None:
+                continue
+            if error.errno == errno.ESRCH:
+                vanished.append(task)
+                continue
+            raise PqosError(f'Failed to write task {task}: {error.strerror}')
+
+    def _write_tasks(self, fd, tasks, vanished):
+        "Writes tasks to an open tasks file with as few write() calls as possible."
+
+        if self.multi_task is False:
+            self._write_one_by_one(fd, tasks, vanished)
+            return
+
+        for chunk in self._chunks(tasks):
+            error = self._write(fd, chunk)
+            if error is None:
+                if len(chunk) > 1:
+                    self.multi_task = True
+                continue
+
+            if error.errno == errno.EINVAL and len(chunk) > 1 \
+                    and self.multi_task is None:
+                # the kernel takes a single task per write()
+                self.multi_task = False
+                self._write_one_by_one(fd, chunk, vanished)
+                continue
+
+            if error.errno != errno.ESRCH:
+                raise PqosError(f'Failed to write tasks: {error.strerror}')
+
+            if len(chunk) > 1:
+                self.multi_task = True
+
+            # the kernel stops at the first task that does not exist,
+            # tasks before it are moved already and can be written again
+            self._write_one_by_one(fd, chunk, vanished)
+
+    def assoc_set(self, assoc, threads=False):
+        """
+        Associates tasks with classes of service.
+
+        Parameters:
+            assoc: a dictionary mapping task IDs to classes of service
+            threads: if True, all threads of each given process are
+                     associated with the class of service of the process
+                     (default False)
+
+        Returns:
+            a sorted list of task IDs which did not exist, e.g. threads
+            which exited in the meantime
+        """
+
+        groups = {}
+        vanished = []
+        for pid, class_id in assoc.items():
+            tasks = [pid]
+            if threads:
+                tasks = self.get_threads(pid)
+                if not tasks:
+                    vanished.append(pid)
+            groups.setdefault(class_id, []).extend(tasks)
+
+        lock_fd = _lock(self.path)
+        try:
+            for class_id in sorted(groups):
+                path = self.tasks_file(class_id)
+                try:
+                    fd = os.open(path, os.O_WRONLY)
+                except OSError as ex:
+                    raise PqosErrorParam(f'Could not open tasks file {path} for '
+                                         f'COS {class_id}: {ex.strerror}') from ex
+                try:
+                    self._write_tasks(fd, groups[class_id], vanished)
+                finally:
+                    os.close(fd)
+        finally:
+            _unlock(lock_fd)
+
+        return sorted(set(vanished))
+
+
+def _parse_cpus(text):
+    "Parses cpus_list format, e.g. '0-3,8', into a set of cores."
+
+    cores = set()
+    for item in text.strip().split(','):
+        if not item:
+            continue
+        first, _, last = item.partition('-')
+        cores.update(range(int(first), int(last or first) + 1))
+
+    return cores
+
+
+def _format_cpus(cores):
+    "Formats cores in cpus_list format, e.g. '0-3,8'."
+
+    ranges = []
+    for core in sorted(cores):
+        if ranges and ranges[-1][1] == core - 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+
+    return ','.join(str(first) if first == last else f'{first}-{last}'
+                    for first, last in ranges)
+
+
+class ResctrlCpus(object):
+    """
+    Bulk association of logical cores with classes of service through
+    resctrl cpus_list files. Field 'writes' counts write() calls made so far.
+    """
+
+    def __init__(self, path=RESCTRL_PATH):
+        """
+        Parameters:
+            path: resctrl filesystem mount point (default /sys/fs/resctrl)
+        """
+
+        self.path = path
+        self.writes = 0
+
+    def cpus_file(self, class_id):
+        """
+        Returns path of cpus_list file of a class of service.
+
+        Parameters:
+            class_id: class of service
+
+        Returns:
+            path of cpus_list file
+        """
+
+        return os.path.join(_group_dir(self.path, class_id), 'cpus_list')
+
+    def _read(self, class_id):
+        "Reads cores of a class of service."
+
+        path = self.cpus_file(class_id)
+        try:
+            with open(path, encoding='ascii') as cpus_list:
+                return _parse_cpus(cpus_list.read())
+        except OSError as ex:
+            raise PqosErrorParam(f'Could not read cpus_list file {path} for '
+                                 f'COS {class_id}: {ex.strerror}') from ex
+
+    def assoc_get(self):
+        """
+        Reads associations of all cores.
+
+        Returns:
+            a dictionary mapping logical core numbers to classes of service
+        """
+
+        class_ids = [0] + sorted(
+            int(name[3:]) for name in os.listdir(self.path)
+            if re.fullmatch(r'COS[0-9]+', name))
+
+        lock_fd = _lock(self.path)
+        try:
+            return {core: class_id for class_id in class_ids
+                    for core in self._read(class_id)}
+        finally:
+            _unlock(lock_fd)
+
+    def assoc_set(self, class_id, cores):
+        """
+        Associates logical cores with a class of service. Cores of the class
+        of service are read and written back, together with the given cores,
+        in a single write() to its cpus_list file.
+
+        Parameters:
+            class_id: class of service
+            cores: a list of logical cores
+        """
+
+        path = self.cpus_file(class_id)
+
+        lock_fd = _lock(self.path)
+        try:
+            data = _format_cpus(self._read(class_id) | set(cores)).encode()
+            self.writes += 1
+            try:
+                fd = os.open(path, os.O_WRONLY)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+            except OSError as ex:
+                raise PqosError(f'Failed to write cpus_list file {path} for '
+                                f'COS {class_id}: {ex.strerror}') from ex
+        finally:
+            _unlock(lock_fd)
@@ -0,0 +1,201 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines TopologyRollup which aggregates per-core monitoring data
+into per-socket, per-NUMA node, per-L3 cluster and per-allocation domain
+totals.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+
+from pqos.cpuinfo import PqosCpuInfo
+from pqos.error import PqosErrorParam
+from pqos.session import EVENT_VALUES_DTYPE
+
+
+# Topology levels and corresponding PqosCoreInfo attributes. 'l3' is the L3
+# monitoring cluster, which is the SNC domain when Sub-NUMA Clustering is
+# enabled.
+LEVEL_ATTRS = {
+    'socket': 'socket',
+    'numa': 'numa',
+    'l3': 'l3_id',
+    'l2': 'l2_id',
+    'l3cat': 'l3cat_id',
+    'mba': 'mba_id'
+}
+
+LEVELS = ('socket', 'numa', 'l3', 'l2', 'l3cat', 'mba')
+
+# Number of 64-bit counters in pqos_event_values structure
+_NUM_COUNTERS = EVENT_VALUES_DTYPE.itemsize // 8
+
+
+class TopologyRollup(object):
+    """
+    Topology roll-up of per-core monitoring data.
+
+    Core to domain mapping of all requested levels is read once and stored as
+    a single stacked indicator matrix, so a sample (or a batch of samples) is
+    rolled up to every level with one matrix multiplication.
+    """
+
+    def __init__(self, cores, cpuinfo=None, levels=LEVELS):
+        """
+        Initializes topology roll-up.
+
+        Parameters:
+            cores: list of cores, i-th core is the core monitored by i-th
+                   monitoring group
+            cpuinfo: PqosCpuInfo object, if None a new one is created
+                     (default None)
+            levels: topology levels to roll up to (default LEVELS)
+        """
+
+        for level in levels:
+            if level not in LEVEL_ATTRS:
+                raise PqosErrorParam(f'Unknown topology level: {level}')
+
+        if cpuinfo is None:
+            cpuinfo = PqosCpuInfo()
+
+        coreinfos = {info.core: info for info in cpuinfo.get_cores_info()}
+
+        for core in cores:
+            if core not in coreinfos:
+                raise PqosErrorParam(f'Unknown core: {core}')
+
+        self.cores = list(cores)
+        self.levels = tuple(levels)
+
+        self._domains = {}
+        self._slices = {}
+        rows = []
+
+        for level in self.levels:
+            attr = LEVEL_ATTRS[level]
+            ids = np.array([getattr(coreinfos[core], attr)
+                            for core in self.cores], dtype=np.int64)
+            domains, index = np.unique(ids, return_inverse=True)
+
+            start = len(rows)
+            rows.extend(index == i for i in range(len(domains)))
+
+            self._domains[level] = domains.tolist()
+            self._slices[level] = slice(start, len(rows))
+
+        self._matrix = np.zeros((len(rows), len(self.cores)), dtype=np.uint64)
+        if rows:
+            self._matrix[:] = rows
+
+    def domains(self, level):
+        """
+        Returns domain IDs of a given topology level.
+
+        Parameters:
+            level: topology level
+
+        Returns:
+            list of domain IDs, i-th ID corresponds to i-th roll-up column
+        """
+
+        return self._domains[level]
+
+    def _reduce(self, values, matrix):
+        """
+        Rolls up event values with a core to domain indicator matrix.
+
+        Parameters:
+            values: NumPy structured array (... x N) of event values
+            matrix: NumPy array (D x N) of 0/1 indicators
+
+        Returns:
+            NumPy structured array (... x D) of event values
+        """
+
+        values = np.ascontiguousarray(values, dtype=EVENT_VALUES_DTYPE)
+
+        if values.shape[-1:] != (len(self.cores),):
+            raise PqosErrorParam(f'Expected {len(self.cores)} monitoring '
+                                 'groups')
+
+        counters = values.view(np.uint64).reshape(values.shape +
+                                                  (_NUM_COUNTERS,))
+        totals = np.matmul(matrix, counters)
+        totals = totals.view(EVENT_VALUES_DTYPE).reshape(totals.shape[:-1])
+
+        # IPC is the only non-additive value, calculate it from the totals
+        unhalted = totals['ipc_unhalted_delta']
+        ipc = np.zeros(unhalted.shape)
+        np.divide(totals['ipc_retired_delta'], unhalted, out=ipc,
+                  where=unhalted != 0)
+        totals['ipc'] = ipc
+
+        return totals
+
+    def rollup(self, values):
+        """
+        Rolls up event values to all topology levels.
+
+        Parameters:
+            values: NumPy structured array (... x N) of event values,
+                    for example MonitoringSession.values or a batch of
+                    samples read from MonitoringSampler
+
+        Returns:
+            dictionary mapping topology level to NumPy structured array
+            (... x D) of event values, where D is the number of domains
+            of the level
+        """
+
+        totals = self._reduce(values, self._matrix)
+
+        return {level: totals[..., self._slices[level]]
+                for level in self.levels}
+
+    def rollup_level(self, values, level):
+        """
+        Rolls up event values to a single topology level.
+
+        Parameters:
+            values: NumPy structured array (... x N) of event values
+            level: topology level
+
+        Returns:
+            NumPy structured array (... x D) of event values, where D is the
+            number of domains of the level
+        """
+
+        return self._reduce(values, self._matrix[self._slices[level]])
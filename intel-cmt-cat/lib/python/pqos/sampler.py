@@ -0,0 +1,265 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines MonitoringSampler which polls a monitoring session at
+a fixed rate in a background thread and stores timestamped samples in
+a preallocated ring buffer.
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import threading
+import time
+
+import numpy as np
+
+from pqos.session import EVENT_VALUES_DTYPE
+
+
+# A batch of samples:
+#   timestamps: NumPy array (T) of sample timestamps (time.monotonic_ns())
+#   values: NumPy structured array (T x N groups) of event values
+Samples = namedtuple('Samples', ['timestamps', 'values'])
+
+
+class MonitoringSampler(object):
+    """
+    Fixed-rate sampler of monitoring session.
+
+    Sampling deadlines are computed from the start time (not from the end
+    of the previous sample), so the schedule does not drift. When polling
+    falls behind by one or more intervals, the missed deadlines are
+    skipped and counted as overruns. When the consumer does not keep up and
+    the ring buffer is full, samples are dropped according to the policy and
+    counted as dropped.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    POLICY_DROP_OLDEST = 'drop_oldest'
+    POLICY_DROP_NEWEST = 'drop_newest'
+
+    def __init__(self, session, interval, capacity=1024,
+                 policy=POLICY_DROP_OLDEST):
+        """
+        Initializes sampler.
+
+        Parameters:
+            session: MonitoringSession object with started monitoring groups
+            interval: sampling interval in seconds
+            capacity: number of samples in the ring buffer (default 1024)
+            policy: what to do when the ring buffer is full, available
+                    options: 'drop_oldest', 'drop_newest'
+                    (default 'drop_oldest')
+        """
+
+        if interval <= 0:
+            raise ValueError('Sampling interval must be positive')
+
+        if capacity <= 0:
+            raise ValueError('Ring buffer capacity must be positive')
+
+        if policy not in (self.POLICY_DROP_OLDEST, self.POLICY_DROP_NEWEST):
+            raise ValueError(f'Unknown ring buffer policy: {policy}')
+
+        self.session = session
+        self.interval_ns = int(interval * 1e9)
+        self.capacity = capacity
+        self.policy = policy
+        self.num_groups = len(session)
+
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros((capacity, self.num_groups),
+                                dtype=EVENT_VALUES_DTYPE)
+        self._head = 0  # number of samples written
+        self._tail = 0  # number of samples read
+
+        self.overruns = 0  # sampling deadlines missed
+        self.dropped = 0   # samples lost due to full ring buffer
+        self.error = None  # exception raised by poll, stops the sampler
+
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._active = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __iter__(self):
+        return self.batches()
+
+    @property
+    def running(self):
+        "True if the sampler thread is running."
+
+        return self._active
+
+    @property
+    def backlog(self):
+        "Number of samples waiting to be read."
+
+        with self._cond:
+            return self._head - self._tail
+
+    def start(self):
+        """
+        Starts sampling in a background thread.
+        """
+
+        if self.running:
+            return
+
+        self._stop_event.clear()
+        self._active = True
+        self._thread = threading.Thread(target=self._run, name='pqos-sampler',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling. Samples already stored can still be read.
+        """
+
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        with self._cond:
+            self._active = False
+            self._cond.notify_all()
+
+    def _run(self):
+        "Sampling loop."
+
+        deadline = time.monotonic_ns()
+
+        while not self._stop_event.is_set():
+            try:
+                values = self.session.poll()
+            except Exception as ex:  # pylint: disable=broad-except
+                self.error = ex
+                self._stop_event.set()
+                break
+
+            self._store(time.monotonic_ns(), values)
+
+            deadline += self.interval_ns
+            now = time.monotonic_ns()
+            if now >= deadline:
+                missed = (now - deadline) // self.interval_ns + 1
+                self.overruns += missed
+                deadline += missed * self.interval_ns
+
+            self._stop_event.wait((deadline - now) / 1e9)
+
+        with self._cond:
+            self._active = False
+            self._cond.notify_all()
+
+    def _store(self, timestamp, values):
+        """
+        Stores a sample in the ring buffer.
+
+        Parameters:
+            timestamp: sample timestamp in nanoseconds
+            values: NumPy structured array of event values
+        """
+
+        with self._cond:
+            if self._head - self._tail >= self.capacity:
+                self.dropped += 1
+                if self.policy == self.POLICY_DROP_NEWEST:
+                    return
+                self._tail += 1
+
+            slot = self._head % self.capacity
+            self._timestamps[slot] = timestamp
+            self._values[slot] = values
+            self._head += 1
+            self._cond.notify_all()
+
+    def read(self, num, timeout=None):
+        """
+        Reads samples from the ring buffer, blocks until requested number
+        of samples is available, sampler is stopped or timeout expires.
+
+        Parameters:
+            num: number of samples to read
+            timeout: timeout in seconds or None to wait indefinitely
+                     (default None)
+
+        Returns:
+            Samples with up to num samples (oldest first)
+        """
+
+        num = min(num, self.capacity)
+
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._head - self._tail >= num or not self.running,
+                timeout)
+
+            count = min(num, self._head - self._tail)
+            slots = np.arange(self._tail, self._tail + count) % self.capacity
+            self._tail += count
+
+            return Samples(self._timestamps[slots], self._values[slots])
+
+    def batches(self, num=1, timeout=None):
+        """
+        Generator yielding batches of samples until the sampler is stopped
+        and all stored samples are consumed.
+
+        Parameters:
+            num: maximum number of samples in a batch (default 1)
+            timeout: maximum time in seconds to wait for a full batch,
+                     if it expires a partial batch is yielded
+                     (default None - wait for a full batch)
+
+        Yields:
+            Samples with up to num samples (oldest first)
+        """
+
+        while True:
+            samples = self.read(num, timeout)
+
+            if len(samples.timestamps):
+                yield samples
+            elif not self.running:
+                return
@@ -0,0 +1,208 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines MonitoringSession which polls a fixed set of monitoring
+groups and exposes their counters as a single NumPy structured array.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+
+import numpy as np
+
+from pqos.common import pqos_handle_error
+from pqos.error import PqosError, PqosErrorResource
+from pqos.monitoring import CPqosMonData, _get_event_mask
+from pqos.native_struct import CPqosEventValues
+from pqos.pqos import Pqos
+
+
+# NumPy equivalent of pqos_event_values structure
+EVENT_VALUES_DTYPE = np.dtype(CPqosEventValues)
+
+
+class MonitoringSession(object):
+    """
+    Monitoring session.
+
+    Monitoring groups are started directly in a preallocated, contiguous
+    array of pqos_mon_data structures owned by the session, so the array of
+    group pointers passed to pqos_mon_poll() is built only once and event
+    values of all groups can be read through one NumPy view without copying.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initializes monitoring session.
+
+        Parameters:
+            capacity: maximum number of monitoring groups in the session
+        """
+
+        self.pqos = Pqos()
+        self.capacity = capacity
+        self.num_groups = 0
+
+        self._groups = (CPqosMonData * capacity)()
+        self._groups_ptrs = (ctypes.POINTER(CPqosMonData) * capacity)()
+        for i in range(capacity):
+            self._groups_ptrs[i] = ctypes.pointer(self._groups[i])
+
+        self._values = np.ndarray(shape=(capacity,), dtype=EVENT_VALUES_DTYPE,
+                                  buffer=self._groups,
+                                  offset=CPqosMonData.values.offset,
+                                  strides=(ctypes.sizeof(CPqosMonData),))
+        self._values.flags.writeable = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __len__(self):
+        return self.num_groups
+
+    def _next_group(self):
+        "Returns a reference to the next free monitoring group."
+
+        if self.num_groups >= self.capacity:
+            raise PqosErrorResource('Monitoring session is full')
+
+        return ctypes.byref(self._groups[self.num_groups])
+
+    def start_cores(self, cores, events, context=None):
+        """
+        Starts resource monitoring on selected group of cores.
+
+        Parameters:
+            cores: a list of core IDs
+            events: a list of events, available options: 'l3_occup', 'lmem_bw',
+                    'tmem_bw', 'rmem_bw', 'perf_llc_miss', 'perf_ipc', 'perf_llc_ref'
+            context: a pointer to additional information, by default None
+
+        Returns:
+            index of the monitoring group in the session
+        """
+
+        group_ref = self._next_group()
+        num_cores = len(cores)
+        cores_arr = (ctypes.c_uint * num_cores)(*cores)
+        event = _get_event_mask(events)
+        ret = self.pqos.lib.pqos_mon_start(num_cores, cores_arr, event, context,
+                                           group_ref)
+        pqos_handle_error('pqos_mon_start', ret)
+        self.num_groups += 1
+        return self.num_groups - 1
+
+    def start_pids(self, pids, events, context=None):
+        """
+        Starts resource monitoring of a selected processes.
+
+        Parameters:
+            pids: a list of process IDs
+            events: a list of events, available options: 'l3_occup', 'lmem_bw',
+                    'tmem_bw', 'rmem_bw', 'perf_llc_miss', 'perf_ipc'
+            context: a pointer to additional information, by default None
+
+        Returns:
+            index of the monitoring group in the session
+        """
+
+        group_ref = self._next_group()
+        num_pids = len(pids)
+        pids_arr = (ctypes.c_uint * num_pids)(*pids)
+        event = _get_event_mask(events)
+        ret = self.pqos.lib.pqos_mon_start_pids(num_pids, pids_arr, event,
+                                                context, group_ref)
+        pqos_handle_error('pqos_mon_start_pids', ret)
+        self.num_groups += 1
+        return self.num_groups - 1
+
+    def poll(self):
+        """
+        Polls and updates monitoring data for all groups in the session.
+
+        Returns:
+            NumPy structured array with event values of all groups
+        """
+
+        ret = self.pqos.lib.pqos_mon_poll(self._groups_ptrs, self.num_groups)
+        pqos_handle_error('pqos_mon_poll', ret)
+        return self.values
+
+    @property
+    def values(self):
+        """
+        NumPy structured array (one record per monitoring group) viewing
+        event values in library memory. Its content is updated in place
+        by poll().
+        """
+
+        return self._values[:self.num_groups]
+
+    def get_group(self, index):
+        """
+        Gets a monitoring group.
+
+        Parameters:
+            index: index of the monitoring group in the session
+
+        Returns:
+            CPqosMonData monitoring data
+        """
+
+        if not 0 <= index < self.num_groups:
+            raise IndexError('Monitoring group index out of range')
+
+        return self._groups[index]
+
+    def stop(self):
+        """
+        Stops monitoring of all groups in the session.
+        """
+
+        num_groups = self.num_groups
+        self.num_groups = 0
+        error = None
+
+        # stop all groups even if one of them fails, report the first error
+        for i in range(num_groups):
+            ret = self.pqos.lib.pqos_mon_stop(self._groups_ptrs[i])
+            try:
+                pqos_handle_error('pqos_mon_stop', ret)
+            except PqosError as ex:
+                error = error or ex
+
+        if error:
+            raise error
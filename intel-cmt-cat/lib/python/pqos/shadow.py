@@ -0,0 +1,539 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines AllocationShadow, a write-through cache of allocation
+configuration. Classes of service that would be written with the values
+already programmed, and associations that would not change, are not
+written again, so a control loop can re-assert its whole configuration
+without paying the MSR/resctrl write cost on every iteration.
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import ctypes
+import threading
+
+from pqos.allocation import PqosAlloc
+from pqos.capability import PqosCap
+from pqos.common import pqos_handle_error
+from pqos.error import PqosErrorPartial
+from pqos.l2ca import PqosCatL2
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.native_struct import CPqosL2Ca, CPqosL3Ca, CPqosMba
+from pqos.pqos import Pqos
+
+
+# Allocation technology handled by the shadow
+_Technology = namedtuple('_Technology', ['cos_cls', 'ctype', 'set_func',
+                                         'get_func', 'cos_num_func'])
+
+_TECHNOLOGIES = {
+    'l3ca': _Technology(PqosCatL3.COS, CPqosL3Ca, 'pqos_l3ca_set',
+                        'pqos_l3ca_get', 'get_l3ca_cos_num'),
+    'l2ca': _Technology(PqosCatL2.COS, CPqosL2Ca, 'pqos_l2ca_set',
+                        'pqos_l2ca_get', 'get_l2ca_cos_num'),
+    'mba': _Technology(PqosMba.COS, CPqosMba, 'pqos_mba_set',
+                       'pqos_mba_get', 'get_mba_cos_num')
+}
+
+
+def _cat_key(cos):
+    "Returns a comparable representation of a cache allocation COS."
+
+    if cos.cdp:
+        return (True, cos.code_mask, cos.data_mask)
+
+    return (False, cos.mask, cos.mask)
+
+
+def _cat_fill(entry, class_id, key):
+    "Fills pqos_l3ca/pqos_l2ca structure in place."
+
+    cdp, code_mask, data_mask = key
+    entry.class_id = class_id
+    entry.cdp = int(cdp)
+
+    if cdp:
+        entry.u.s.code_mask = code_mask
+        entry.u.s.data_mask = data_mask
+    else:
+        entry.u.ways_mask = code_mask
+
+
+def _cat_read(entry):
+    "Reads pqos_l3ca/pqos_l2ca structure."
+
+    if entry.cdp:
+        return (True, entry.u.s.code_mask, entry.u.s.data_mask)
+
+    return (False, entry.u.ways_mask, entry.u.ways_mask)
+
+
+def _cat_cos(cos_cls, class_id, key):
+    "Creates a cache allocation COS object."
+
+    cdp, code_mask, data_mask = key
+
+    if cdp:
+        return cos_cls(class_id, code_mask=code_mask, data_mask=data_mask)
+
+    return cos_cls(class_id, code_mask)
+
+
+def _mba_key(cos):
+    "Returns a comparable representation of an MBA COS."
+
+    return (cos.mb_max, bool(cos.ctrl), bool(cos.smba))
+
+
+def _mba_fill(entry, class_id, key):
+    "Fills pqos_mba structure in place."
+
+    entry.class_id = class_id
+    entry.mb_max, entry.ctrl, entry.smba = key
+
+
+def _mba_read(entry):
+    "Reads pqos_mba structure."
+
+    return (entry.mb_max, bool(entry.ctrl), bool(entry.smba))
+
+
+class AllocationShadow(object):
+    """
+    Write-through cache (shadow) of allocation configuration.
+
+    The shadow keeps class of service tables of L3 CAT, L2 CAT and MBA
+    domains (sockets, L2 IDs) and core associations, as written or read
+    through it. A write of values equal to the shadow is suppressed. ctypes
+    arrays passed to the library are preallocated and reused.
+
+    The whole shadow is dropped when allocation configuration is reset
+    (PqosAlloc.reset(), PqosAlloc.reset_config()) or when the library is
+    initialized or finalized, as the interface, CDP and MBA controller state
+    may change. Domains and cores changed bypassing the shadow, through
+    PqosCatL3, PqosCatL2, PqosMba or PqosAlloc, are dropped (see
+    Pqos.alloc_changed()). A domain is dropped when a write to it fails,
+    because the write may be partially applied. Changes made bypassing
+    the bindings are not detected, invalidate() must be called then.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self):
+        "Initializes an empty shadow."
+
+        self.pqos = Pqos()
+        self.writes = 0   # classes of service and associations written
+        self.skipped = 0  # writes suppressed as unchanged
+
+        self._lock = threading.RLock()
+        self._generation = self.pqos.alloc_generation
+        self._serial = self.pqos.alloc_serial
+        self._tables = {}   # (technology, domain) -> {class_id: key}
+        self._actual = {}   # ('mba', domain) -> {class_id: actual key}
+        self._assoc = {}    # core -> class_id
+        self._cos_num = {}  # technology -> number of classes of service
+        self._buffers = {}  # (technology, role) -> preallocated array
+        self._alloc = PqosAlloc()
+
+    def invalidate(self):
+        "Drops the whole shadow."
+
+        with self._lock:
+            self._generation = self.pqos.alloc_generation
+            self._serial = self.pqos.alloc_serial
+            self._tables.clear()
+            self._actual.clear()
+            self._assoc.clear()
+            self._cos_num.clear()
+
+    def invalidate_domain(self, technology, domain):
+        """
+        Drops the shadow of a single domain.
+
+        Parameters:
+            technology: 'l3ca', 'l2ca' or 'mba'
+            domain: socket or L2 ID
+        """
+
+        with self._lock:
+            self._tables.pop((technology, domain), None)
+            self._actual.pop((technology, domain), None)
+
+    def _check_generation(self):
+        """
+        Drops the shadow if allocation configuration was changed as a whole,
+        or domains and cores changed bypassing the shadow.
+        """
+
+        if self._generation != self.pqos.alloc_generation:
+            self.invalidate()
+            return
+
+        if self._serial == self.pqos.alloc_serial:
+            return
+
+        for (technology, item), serial in list(self.pqos.alloc_changes.items()):
+            if serial <= self._serial:
+                continue
+            if technology == 'assoc':
+                self._assoc.pop(item, None)
+            else:
+                self.invalidate_domain(technology, item)
+
+        self._serial = self.pqos.alloc_serial
+
+    def _buffer(self, technology, role, size):
+        """
+        Returns a preallocated array of at least size elements, arrays are
+        sized for all classes of service of a technology when first used.
+        """
+
+        key = (technology, role)
+        buf = self._buffers.get(key)
+
+        if buf is None or len(buf) < size:
+            ctype = _TECHNOLOGIES[technology].ctype
+            buf = (ctype * max(size, self._get_cos_num(technology)))()
+            self._buffers[key] = buf
+
+        return buf
+
+    def _get_cos_num(self, technology):
+        "Returns number of classes of service, read once per generation."
+
+        cos_num = self._cos_num.get(technology)
+
+        if cos_num is None:
+            cap = PqosCap()
+            cos_num = getattr(cap, _TECHNOLOGIES[technology].cos_num_func)()
+            self._cos_num[technology] = cos_num
+
+        return cos_num
+
+    def _changed(self, technology, domain, requested):
+        """
+        Returns {class_id: key} of requested classes of service differing
+        from the shadow.
+        """
+
+        table = self._tables.get((technology, domain), {})
+        changed = {}
+
+        for class_id, key in requested.items():
+            if table.get(class_id) != key:
+                changed[class_id] = key
+
+        self.skipped += len(requested) - len(changed)
+        return changed
+
+    def _cat_set(self, technology, domain, coses):
+        "Implements set_l3ca() and set_l2ca()."
+
+        spec = _TECHNOLOGIES[technology]
+        requested = {cos.class_id: _cat_key(cos) for cos in coses}
+
+        with self._lock:
+            self._check_generation()
+            changed = self._changed(technology, domain, requested)
+
+            if not changed:
+                return
+
+            buf = self._buffer(technology, 'set', len(changed))
+            for entry, (class_id, key) in zip(buf, changed.items()):
+                _cat_fill(entry, class_id, key)
+
+            func = getattr(self.pqos.lib, spec.set_func)
+            ret = func(domain, len(changed), buf)
+
+            if ret != 0:
+                self.invalidate_domain(technology, domain)
+                pqos_handle_error(spec.set_func, ret)
+
+            self.writes += len(changed)
+            self._tables.setdefault((technology, domain), {}).update(changed)
+
+    def _is_complete(self, technology, domain):
+        "Returns True if the shadow holds all classes of service of a domain."
+
+        table = self._tables.get((technology, domain))
+        return table is not None and \
+            len(table) >= self._get_cos_num(technology)
+
+    def _read(self, technology, domain, read_entry):
+        """
+        Reads all classes of service of a domain from the library.
+
+        Returns:
+            {class_id: key} of the domain
+        """
+
+        spec = _TECHNOLOGIES[technology]
+        cos_num = self._get_cos_num(technology)
+        buf = self._buffer(technology, 'get', cos_num)
+        num_ca = ctypes.c_uint(0)
+        func = getattr(self.pqos.lib, spec.get_func)
+        ret = func(domain, cos_num, ctypes.byref(num_ca), buf)
+        pqos_handle_error(spec.get_func, ret)
+
+        return {buf[i].class_id: read_entry(buf[i])
+                for i in range(num_ca.value)}
+
+    def _cat_get(self, technology, domain):
+        "Implements get_l3ca() and get_l2ca()."
+
+        cos_cls = _TECHNOLOGIES[technology].cos_cls
+
+        with self._lock:
+            self._check_generation()
+
+            if not self._is_complete(technology, domain):
+                self._tables[(technology, domain)] = \
+                    self._read(technology, domain, _cat_read)
+
+            table = self._tables[(technology, domain)]
+            return [_cat_cos(cos_cls, class_id, table[class_id])
+                    for class_id in sorted(table)]
+
+    def set_l3ca(self, socket, coses):
+        """
+        Sets L3 classes of service on a socket, only classes of service
+        differing from the shadow are written.
+
+        Parameters:
+            socket: a socket number
+            coses: a list of PqosCatL3.COS objects
+        """
+
+        self._cat_set('l3ca', socket, coses)
+
+    def get_l3ca(self, socket):
+        """
+        Reads L3 classes of service of a socket, from the shadow if complete.
+
+        Parameters:
+            socket: a socket number
+
+        Returns:
+            a list of PqosCatL3.COS objects
+        """
+
+        return self._cat_get('l3ca', socket)
+
+    def set_l2ca(self, l2id, coses):
+        """
+        Sets L2 classes of service on an L2 cluster, only classes of service
+        differing from the shadow are written.
+
+        Parameters:
+            l2id: L2 cache ID
+            coses: a list of PqosCatL2.COS objects
+        """
+
+        self._cat_set('l2ca', l2id, coses)
+
+    def get_l2ca(self, l2id):
+        """
+        Reads L2 classes of service of an L2 cluster, from the shadow if
+        complete.
+
+        Parameters:
+            l2id: L2 cache ID
+
+        Returns:
+            a list of PqosCatL2.COS objects
+        """
+
+        return self._cat_get('l2ca', l2id)
+
+    def set_mba(self, socket, requested):
+        """
+        Sets MBA classes of service on a socket. Classes of service requested
+        with the same values as the last time are not written again.
+
+        Parameters:
+            socket: socket ID
+            requested: a list of PqosMba.COS objects
+
+        Returns:
+            a list of PqosMba.COS objects with actual MBA configuration
+        """
+
+        spec = _TECHNOLOGIES['mba']
+        requested_keys = {cos.class_id: _mba_key(cos) for cos in requested}
+
+        with self._lock:
+            self._check_generation()
+            changed = self._changed('mba', socket, requested_keys)
+
+            if changed:
+                buf = self._buffer('mba', 'set', len(changed))
+                actual_buf = self._buffer('mba', 'actual', len(changed))
+                for entry, (class_id, key) in zip(buf, changed.items()):
+                    _mba_fill(entry, class_id, key)
+
+                ret = self.pqos.lib.pqos_mba_set(socket, len(changed), buf,
+                                                 actual_buf)
+
+                if ret != 0:
+                    self.invalidate_domain('mba', socket)
+                    pqos_handle_error(spec.set_func, ret)
+
+                self.writes += len(changed)
+                self._tables.setdefault(('mba', socket), {}).update(changed)
+                actual = self._actual.setdefault(('mba', socket), {})
+                for i in range(len(changed)):
+                    actual[actual_buf[i].class_id] = _mba_read(actual_buf[i])
+
+            actual = self._actual.get(('mba', socket), {})
+            return [PqosMba.COS(cos.class_id, *actual[cos.class_id])
+                    for cos in requested]
+
+    def get_mba(self, socket):
+        """
+        Reads MBA classes of service of a socket, from the shadow if complete.
+
+        Parameters:
+            socket: socket ID
+
+        Returns:
+            a list of PqosMba.COS objects with actual MBA configuration
+        """
+
+        with self._lock:
+            self._check_generation()
+
+            if not self._is_complete('mba', socket):
+                # the shadow keeps requested values, which may differ from
+                # actual ones, as long as actual values did not change
+                table = self._tables.get(('mba', socket), {})
+                old_actual = self._actual.get(('mba', socket), {})
+                actual = self._read('mba', socket, _mba_read)
+                self._tables[('mba', socket)] = {
+                    class_id: table[class_id]
+                    if class_id in table and old_actual.get(class_id) == key
+                    else key for class_id, key in actual.items()}
+                self._actual[('mba', socket)] = actual
+
+            actual = self._actual[('mba', socket)]
+            return [PqosMba.COS(class_id, *actual[class_id])
+                    for class_id in sorted(actual)]
+
+    def assoc_set(self, core, class_id):
+        """
+        Associates a logical core with a class of service, unless the core is
+        already associated with it.
+
+        Parameters:
+            core: a logical core number
+            class_id: class of service
+        """
+
+        with self._lock:
+            self._check_generation()
+
+            if self._assoc.get(core) == class_id:
+                self.skipped += 1
+                return
+
+            ret = self.pqos.lib.pqos_alloc_assoc_set(core, class_id)
+
+            if ret != 0:
+                self._assoc.pop(core, None)
+                pqos_handle_error('pqos_alloc_assoc_set', ret)
+
+            self.writes += 1
+            self._assoc[core] = class_id
+
+    def assoc_set_many(self, assoc):
+        """
+        Associates logical cores with classes of service, cores already
+        associated with them are not written. Other cores are written with
+        PqosAlloc.assoc_set_many(), grouped per class of service.
+
+        Parameters:
+            assoc: a dictionary mapping logical core numbers to classes
+                   of service
+
+        Returns:
+            a dictionary of associations that were changed
+        """
+
+        with self._lock:
+            self._check_generation()
+
+            current = {core: self._assoc[core] for core in assoc
+                       if core in self._assoc}
+
+            try:
+                changed = self._alloc.assoc_set_many(assoc, current=current)
+            except PqosErrorPartial as ex:
+                self._check_generation()
+                self._assoc.update(ex.changed)
+                self.writes += len(ex.changed)
+                raise
+
+            # cores written are marked changed by PqosAlloc
+            self._check_generation()
+            self._assoc.update(assoc)
+            self.writes += len(changed)
+            self.skipped += len(assoc) - len(changed)
+            return changed
+
+    def assoc_get(self, core):
+        """
+        Reads class of service associated with a logical core, from
+        the shadow if known.
+
+        Parameters:
+            core: a logical core number
+
+        Returns:
+            class of service
+        """
+
+        with self._lock:
+            self._check_generation()
+            class_id = self._assoc.get(core)
+
+            if class_id is None:
+                class_id_c = ctypes.c_uint(0)
+                ret = self.pqos.lib.pqos_alloc_assoc_get(
+                    core, ctypes.byref(class_id_c))
+                pqos_handle_error('pqos_alloc_assoc_get', ret)
+                class_id = class_id_c.value
+                self._assoc[core] = class_id
+
+            return class_id
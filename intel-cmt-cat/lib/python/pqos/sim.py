@@ -0,0 +1,351 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Simulated PQoS library.
+
+SimulatedPqos implements the PQoS library functions used by the bindings in
+pure Python on top of a configurable platform model. Once installed with
+install(), the wrappers (PqosCap, PqosCpuInfo, PqosCatL3, PqosCatL2, PqosMba,
+PqosAlloc, PqosMon and MonitoringSession) run against it unchanged, so code
+built on the bindings can be tested and benchmarked without RDT capable
+hardware.
+
+Monitoring counters are generated by a synthetic workload model which reacts
+to L3 cache and memory bandwidth allocation. Each library call can be delayed
+to mimic the cost of MSR or resctrl interface.
+
+Example:
+    sim = SimulatedPqos(SimulatedPlatform(num_sockets=2), latency='auto')
+    sim.install()
+    Pqos().init('MSR')
+
+Library functions are grouped in mixins: capabilities and CPU information
+(pqos.sim_topology), workload model (pqos.sim_workload), allocation
+(pqos.sim_allocation) and monitoring (pqos.sim_monitoring).
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import Counter
+import ctypes
+import random
+import threading
+import time
+
+from pqos.native_func import PqosFunctions
+from pqos.native_struct import CPqosCapability, CPqosConfig, CPqosSysconfig
+from pqos.pqos import Pqos
+from pqos.sim_allocation import AllocationMixin
+from pqos.sim_common import (
+    LATENCY_PROFILES, RETVAL_INIT, RETVAL_OK, RETVAL_PARAM, RETVAL_RESOURCE,
+    deref, delay, library_function
+)
+from pqos.sim_monitoring import MonitoringMixin
+from pqos.sim_topology import SimulatedPlatform, TopologyMixin
+from pqos.sim_workload import SimulatedWorkload, WorkloadMixin, WorkloadRates
+
+
+class SimulatedPqos(TopologyMixin, WorkloadMixin, AllocationMixin,
+                    MonitoringMixin):
+    """
+    Simulated PQoS library.
+
+    Library state (allocation configuration, core and task association,
+    monitoring groups) is kept in Python objects and structures returned
+    to the bindings are owned by the simulator. Tasks are either cores,
+    ('core', lcore), or processes, ('pid', pid). Processes are modelled as
+    running on the first core of socket 0.
+
+    Like PQoS library, calls are serialized with a lock, call delays included.
+    """
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+
+    def __init__(self, platform=None, workload=None, latency=None,
+                 clock=time.monotonic, seed=None):
+        """
+        Initializes simulated library.
+
+        Parameters:
+            platform: SimulatedPlatform object (default 2 sockets, 8 cores each)
+            workload: SimulatedWorkload object used by tasks without their own
+                      workload (default SimulatedWorkload())
+            latency: call delays, None (no delays), 'msr', 'resctrl', 'auto'
+                     (selected by interface on initialization) or a dict
+                     of function name -> (seconds per call, seconds per item)
+            clock: function returning time in seconds used by the workload
+                   model (default time.monotonic)
+            seed: seed of random number generator used for noise
+        """
+
+        self.platform = platform if platform is not None \
+            else SimulatedPlatform()
+        self.workload = workload if workload is not None \
+            else SimulatedWorkload()
+        self.calls = Counter()
+
+        if latency is not None and not isinstance(latency, dict) \
+                and latency != 'auto' and latency not in LATENCY_PROFILES:
+            raise ValueError(f'Unknown latency profile: {latency}')
+
+        self._latency_cfg = latency
+        self._latency = {}
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+        self._initialized = False
+        self._interface = None
+        self._workloads = {}
+        self._counters = {}
+        self._timestamp = clock()
+        self._groups = {}
+
+        self._l3_cdp_on = False
+        self._l2_cdp_on = False
+        self._mba_ctrl_on = False
+        self._core_cos = []
+        self._pid_cos = {}
+        self._core_rmid = []
+        self._free_rmids = []
+        self._l3ca = {}
+        self._l2ca = {}
+        self._mba = {}
+
+        self._build_cpuinfo()
+        self._build_cap()
+        self._sysconfig = CPqosSysconfig(cap=ctypes.pointer(self._cap),
+                                         cpu=ctypes.pointer(self._cpu))
+        self._reset_alloc()
+        self._reset_mon()
+
+    # Simulator interface
+
+    def functions(self):
+        """
+        Returns a table of simulated library functions.
+
+        Returns:
+            PqosFunctions table
+        """
+
+        return PqosFunctions(*[getattr(self, name)
+                               for name in PqosFunctions._fields])
+
+    def install(self):
+        """
+        Makes the bindings use the simulated library instead of PQoS library.
+
+        Returns:
+            the simulator
+        """
+
+        Pqos.set_backend(self.functions())
+        return self
+
+    @staticmethod
+    def uninstall():
+        "Makes the bindings use PQoS library again."
+
+        Pqos.set_backend(None)
+
+    def set_workload(self, workload, cores=None, pids=None):
+        """
+        Sets a workload of cores and processes.
+
+        Parameters:
+            workload: SimulatedWorkload object
+            cores: a list of cores (default None)
+            pids: a list of process IDs (default None)
+        """
+
+        with self._lock:
+            self._update()
+            for core in cores or []:
+                self._workloads[('core', core)] = workload
+            for pid in pids or []:
+                self._workloads[('pid', pid)] = workload
+                self._counters.setdefault(('pid', pid), self._zero())
+
+    def set_latency(self, name, per_call, per_item=0.0):
+        """
+        Overrides a delay of a library function.
+
+        Parameters:
+            name: function name
+            per_call: delay of a call in seconds
+            per_item: delay per item passed to the function in seconds
+        """
+
+        if name not in PqosFunctions._fields:
+            raise ValueError(f'Unknown function: {name}')
+
+        with self._lock:
+            self._latency = dict(self._latency)
+            self._latency[name] = (per_call, per_item)
+
+    # Internal helpers
+
+    def _enter(self, name, items=0):
+        "Counts an accepted call and delays it as configured."
+
+        self.calls[name] += 1
+        per_call, per_item = self._latency.get(name, (0.0, 0.0))
+        delay(per_call + per_item * items)
+
+    def _is_os(self):
+        "Returns True if an OS interface is selected."
+
+        return self._interface in (CPqosConfig.PQOS_INTER_OS,
+                                   CPqosConfig.PQOS_INTER_OS_RESCTRL_MON)
+
+    def _valid_core(self, core):
+        "Returns True if a core exists."
+
+        return 0 <= core < self.platform.num_cores
+
+    def _l3_num_classes(self):
+        "Number of L3 CAT classes of service."
+
+        if not self.platform.l3ca:
+            return 0
+
+        num_classes = self.platform.l3_num_classes
+        return num_classes // 2 if self._l3_cdp_on else num_classes
+
+    def _l2_num_classes(self):
+        "Number of L2 CAT classes of service."
+
+        if not self.platform.l2ca:
+            return 0
+
+        num_classes = self.platform.l2_num_classes
+        return num_classes // 2 if self._l2_cdp_on else num_classes
+
+    def _mba_num_classes(self):
+        "Number of MBA classes of service."
+
+        return self.platform.mba_num_classes if self.platform.mba else 0
+
+    def _max_classes(self, technologies=None):
+        """
+        Returns number of classes of service usable with given technologies
+        (bit mask of capability types) or with any technology if None.
+        """
+
+        counts = [(CPqosCapability.PQOS_CAP_TYPE_L3CA, self._l3_num_classes()),
+                  (CPqosCapability.PQOS_CAP_TYPE_L2CA, self._l2_num_classes()),
+                  (CPqosCapability.PQOS_CAP_TYPE_MBA, self._mba_num_classes())]
+
+        if technologies is None:
+            return max(count for _, count in counts)
+
+        selected = [count for cap_type, count in counts
+                    if technologies & (1 << cap_type)]
+        return min(selected) if selected else 0
+
+    @staticmethod
+    def _zero():
+        "Returns zeroed counters."
+
+        return [0.0] * len(WorkloadRates._fields)
+
+    # Initialization
+
+    def pqos_init(self, config_ref):
+        "pqos_init()"
+
+        with self._lock:
+            if self._initialized:
+                return RETVAL_INIT
+
+            interface = deref(config_ref).interface
+            if interface == CPqosConfig.PQOS_INTER_AUTO:
+                interface = CPqosConfig.PQOS_INTER_OS
+            elif interface not in (CPqosConfig.PQOS_INTER_MSR,
+                                   CPqosConfig.PQOS_INTER_OS,
+                                   CPqosConfig.PQOS_INTER_OS_RESCTRL_MON):
+                return RETVAL_PARAM
+
+            self._enter('pqos_init')
+            self._interface = interface
+            self._initialized = True
+
+            if self._latency_cfg == 'auto':
+                profile = 'resctrl' if self._is_os() else 'msr'
+                self._latency = LATENCY_PROFILES[profile]
+            elif isinstance(self._latency_cfg, dict):
+                self._latency = self._latency_cfg
+            elif self._latency_cfg is not None:
+                self._latency = LATENCY_PROFILES[self._latency_cfg]
+
+            if not self._is_os() and self._mba_ctrl_on:
+                self._mba_ctrl_on = False
+                self._reset_alloc()
+
+            self._update_cap()
+            return RETVAL_OK
+
+    def pqos_fini(self):
+        "pqos_fini()"
+
+        with self._lock:
+            if not self._initialized:
+                return RETVAL_INIT
+
+            self._enter('pqos_fini')
+            self._reset_mon()
+            self._initialized = False
+            self._interface = None
+            return RETVAL_OK
+
+    @library_function
+    def pqos_sysconfig_get(self, sysconfig_ref):
+        "pqos_sysconfig_get()"
+
+        self._enter('pqos_sysconfig_get')
+        deref(sysconfig_ref).contents = self._sysconfig
+        return RETVAL_OK
+
+    @library_function
+    def pqos_inter_get(self, interface_ref):
+        "pqos_inter_get()"
+
+        self._enter('pqos_inter_get')
+        deref(interface_ref).value = self._interface
+        return RETVAL_OK
+
+    def _unsupported(self, _name):
+        "Implements functions of technologies which are not simulated."
+
+        with self._lock:
+            return RETVAL_RESOURCE if self._initialized else RETVAL_INIT
@@ -0,0 +1,537 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Allocation functions of the simulated PQoS library.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+
+from pqos.native_struct import (
+    CPqosCapability, CPqosFeatureConfig, CPqosMbaConfig
+)
+from pqos.sim_common import (
+    MBA_MAX_MBPS, RETVAL_ERROR, RETVAL_OK, RETVAL_PARAM, RETVAL_RESOURCE,
+    alloc_array, deref, is_contiguous, library_function, store
+)
+
+
+class AllocationMixin(object):
+    """
+    Cache allocation, memory bandwidth allocation and association functions
+    of the simulated library.
+    """
+    # attributes are a part of SimulatedPqos state
+    # pylint: disable=too-many-instance-attributes
+
+    def _reset_alloc(self):
+        "Restores default allocation configuration and association."
+
+        platform = self.platform
+        sockets = range(platform.num_sockets)
+        l2ids = sorted({core.l2_id for core in platform.cores})
+        l3_full = (1 << platform.l3_num_ways) - 1
+        l2_full = (1 << platform.l2_num_ways) - 1
+        mba_max = MBA_MAX_MBPS if self._mba_ctrl_on else 100
+
+        self._l3ca = {socket: [(l3_full, l3_full)] * platform.l3_num_classes
+                      for socket in sockets}
+        self._l2ca = {l2id: [(l2_full, l2_full)] * platform.l2_num_classes
+                      for l2id in l2ids}
+        self._mba = {socket: [mba_max] * platform.mba_num_classes
+                     for socket in sockets}
+        self._core_cos = [0] * platform.num_cores
+        self._pid_cos = {}
+
+    # Allocation - CAT
+
+    def _cat_set(self, name, config, num_classes, cdp_on, num_ways,
+                 domain, num_cos, cos_arr):
+        "Implements pqos_l3ca_set() and pqos_l2ca_set()."
+        # pylint: disable=too-many-arguments
+
+        if num_classes == 0:
+            return RETVAL_RESOURCE
+
+        if num_cos == 0 or cos_arr is None or domain not in config:
+            return RETVAL_PARAM
+
+        full = (1 << num_ways) - 1
+        updates = []
+        for i in range(num_cos):
+            cos = cos_arr[i]
+            if cos.class_id >= num_classes or (cos.cdp and not cdp_on):
+                return RETVAL_PARAM
+
+            if cos.cdp:
+                masks = (cos.u.s.data_mask, cos.u.s.code_mask)
+            else:
+                masks = (cos.u.ways_mask, cos.u.ways_mask)
+
+            for mask in masks:
+                if not is_contiguous(mask) or mask & ~full:
+                    return RETVAL_PARAM
+
+            updates.append((cos.class_id, masks))
+
+        self._enter(name, num_cos)
+        self._update()
+        for class_id, masks in updates:
+            config[domain][class_id] = masks
+
+        return RETVAL_OK
+
+    def _cat_get(self, name, config, num_classes, cdp_on, domain, max_num_cos,
+                 num_cos_ref, cos_arr):
+        "Implements pqos_l3ca_get() and pqos_l2ca_get()."
+        # pylint: disable=too-many-arguments
+
+        if num_classes == 0:
+            return RETVAL_RESOURCE
+
+        if domain not in config or cos_arr is None:
+            return RETVAL_PARAM
+
+        if max_num_cos < num_classes:
+            return RETVAL_ERROR
+
+        self._enter(name, num_classes)
+        for class_id in range(num_classes):
+            data_mask, code_mask = config[domain][class_id]
+            cos = cos_arr[class_id]
+            cos.class_id = class_id
+            cos.cdp = int(cdp_on)
+            if cdp_on:
+                cos.u.s.data_mask = data_mask
+                cos.u.s.code_mask = code_mask
+            else:
+                cos.u.ways_mask = data_mask
+
+        store(num_cos_ref, num_classes)
+        return RETVAL_OK
+
+    @library_function
+    def pqos_l3ca_set(self, l3cat_id, num_cos, cos_arr):
+        "pqos_l3ca_set()"
+
+        return self._cat_set('pqos_l3ca_set', self._l3ca,
+                             self._l3_num_classes(), self._l3_cdp_on,
+                             self.platform.l3_num_ways, l3cat_id,
+                             num_cos, cos_arr)
+
+    @library_function
+    def pqos_l3ca_get(self, l3cat_id, max_num_cos, num_cos_ref, cos_arr):
+        "pqos_l3ca_get()"
+
+        return self._cat_get('pqos_l3ca_get', self._l3ca,
+                             self._l3_num_classes(), self._l3_cdp_on,
+                             l3cat_id, max_num_cos, num_cos_ref, cos_arr)
+
+    @library_function
+    def pqos_l3ca_get_min_cbm_bits(self, min_cbm_bits_ref):
+        "pqos_l3ca_get_min_cbm_bits()"
+
+        if not self.platform.l3ca:
+            return RETVAL_RESOURCE
+
+        self._enter('pqos_l3ca_get_min_cbm_bits')
+        store(min_cbm_bits_ref, 1)
+        return RETVAL_OK
+
+    @library_function
+    def pqos_l2ca_set(self, l2_id, num_cos, cos_arr):
+        "pqos_l2ca_set()"
+
+        return self._cat_set('pqos_l2ca_set', self._l2ca,
+                             self._l2_num_classes(), self._l2_cdp_on,
+                             self.platform.l2_num_ways, l2_id,
+                             num_cos, cos_arr)
+
+    @library_function
+    def pqos_l2ca_get(self, l2_id, max_num_cos, num_cos_ref, cos_arr):
+        "pqos_l2ca_get()"
+
+        return self._cat_get('pqos_l2ca_get', self._l2ca,
+                             self._l2_num_classes(), self._l2_cdp_on,
+                             l2_id, max_num_cos, num_cos_ref, cos_arr)
+
+    @library_function
+    def pqos_l2ca_get_min_cbm_bits(self, min_cbm_bits_ref):
+        "pqos_l2ca_get_min_cbm_bits()"
+
+        if not self.platform.l2ca:
+            return RETVAL_RESOURCE
+
+        self._enter('pqos_l2ca_get_min_cbm_bits')
+        store(min_cbm_bits_ref, 1)
+        return RETVAL_OK
+
+    # Allocation - MBA
+
+    def _mba_value(self, cos):
+        """
+        Returns MBA rate (rounded to throttle step) or MBps limit requested
+        by a class of service, None if the request is not valid.
+        """
+
+        if cos.class_id >= self._mba_num_classes() or cos.smba or \
+                bool(cos.ctrl) != self._mba_ctrl_on:
+            return None
+
+        if cos.ctrl:
+            return cos.mb_max or None
+
+        if cos.mb_max > 100:
+            return None
+
+        step = self.platform.mba_throttle_step
+        return max(step, (cos.mb_max + step // 2) // step * step)
+
+    @library_function
+    def pqos_mba_set(self, mba_id, num_cos, requested, actual):
+        "pqos_mba_set()"
+
+        if not self.platform.mba:
+            return RETVAL_RESOURCE
+
+        if num_cos == 0 or requested is None or mba_id not in self._mba:
+            return RETVAL_PARAM
+
+        updates = []
+        for i in range(num_cos):
+            value = self._mba_value(requested[i])
+            if value is None:
+                return RETVAL_PARAM
+
+            updates.append((requested[i].class_id, value))
+
+        self._enter('pqos_mba_set', num_cos)
+        self._update()
+        for i, (class_id, value) in enumerate(updates):
+            self._mba[mba_id][class_id] = value
+            if actual is not None:
+                actual[i].class_id = class_id
+                actual[i].mb_max = value
+                actual[i].ctrl = int(self._mba_ctrl_on)
+                actual[i].smba = 0
+
+        return RETVAL_OK
+
+    @library_function
+    def pqos_mba_get(self, mba_id, max_num_cos, num_cos_ref, cos_arr):
+        "pqos_mba_get()"
+
+        num_classes = self._mba_num_classes()
+        if num_classes == 0:
+            return RETVAL_RESOURCE
+
+        if mba_id not in self._mba or cos_arr is None:
+            return RETVAL_PARAM
+
+        if max_num_cos < num_classes:
+            return RETVAL_ERROR
+
+        self._enter('pqos_mba_get', num_classes)
+        for class_id in range(num_classes):
+            cos = cos_arr[class_id]
+            cos.class_id = class_id
+            cos.mb_max = self._mba[mba_id][class_id]
+            cos.ctrl = int(self._mba_ctrl_on)
+            cos.smba = 0
+
+        store(num_cos_ref, num_classes)
+        return RETVAL_OK
+
+    # Allocation - association
+
+    @library_function
+    def pqos_alloc_assoc_set(self, lcore, class_id):
+        "pqos_alloc_assoc_set()"
+
+        if not self._valid_core(lcore) or \
+                class_id >= self._max_classes():
+            return RETVAL_PARAM
+
+        self._enter('pqos_alloc_assoc_set')
+        if self._core_cos[lcore] != class_id:
+            self._update()
+            self._core_cos[lcore] = class_id
+
+        return RETVAL_OK
+
+    @library_function
+    def pqos_alloc_assoc_get(self, lcore, class_id_ref):
+        "pqos_alloc_assoc_get()"
+
+        if not self._valid_core(lcore) or class_id_ref is None:
+            return RETVAL_PARAM
+
+        self._enter('pqos_alloc_assoc_get')
+        store(class_id_ref, self._core_cos[lcore])
+        return RETVAL_OK
+
+    @library_function
+    def pqos_alloc_assoc_set_pid(self, pid, class_id):
+        "pqos_alloc_assoc_set_pid()"
+
+        if not self._is_os():
+            return RETVAL_RESOURCE
+
+        if pid <= 0 or class_id >= self._max_classes():
+            return RETVAL_PARAM
+
+        self._enter('pqos_alloc_assoc_set_pid')
+        self._update()
+        self._counters.setdefault(('pid', pid), self._zero())
+        self._pid_cos[pid] = class_id
+        return RETVAL_OK
+
+    @library_function
+    def pqos_alloc_assoc_get_pid(self, pid, class_id_ref):
+        "pqos_alloc_assoc_get_pid()"
+
+        if not self._is_os():
+            return RETVAL_RESOURCE
+
+        if pid <= 0 or class_id_ref is None:
+            return RETVAL_PARAM
+
+        self._enter('pqos_alloc_assoc_get_pid')
+        store(class_id_ref, self._pid_cos.get(pid, 0))
+        return RETVAL_OK
+
+    def _unused_class(self, technologies, used):
+        "Returns the highest class of service not in use or None."
+
+        for class_id in range(self._max_classes(technologies) - 1, 0, -1):
+            if class_id not in used:
+                return class_id
+
+        return None
+
+    @library_function
+    def pqos_alloc_assign(self, technologies, core_arr, num_cores,
+                          class_id_ref):
+        "pqos_alloc_assign()"
+
+        if num_cores == 0 or core_arr is None or class_id_ref is None:
+            return RETVAL_PARAM
+
+        cores = [core_arr[i] for i in range(num_cores)]
+        if not all(self._valid_core(core) for core in cores):
+            return RETVAL_PARAM
+
+        # cores must share L2 cluster for L2 CAT, socket otherwise
+        if technologies & (1 << CPqosCapability.PQOS_CAP_TYPE_L2CA):
+            attr = 'l2_id'
+        else:
+            attr = 'socket'
+
+        domains = {getattr(self.platform.cores[core], attr)
+                   for core in cores}
+        if len(domains) != 1:
+            return RETVAL_PARAM
+
+        domain = domains.pop()
+        used = {self._core_cos[core.lcore] for core in self.platform.cores
+                if getattr(core, attr) == domain}
+        if self._is_os():
+            used.update(self._core_cos)
+            used.update(self._pid_cos.values())
+
+        class_id = self._unused_class(technologies, used)
+        if class_id is None:
+            return RETVAL_RESOURCE
+
+        self._enter('pqos_alloc_assign', num_cores)
+        self._update()
+        for core in cores:
+            self._core_cos[core] = class_id
+
+        store(class_id_ref, class_id)
+        return RETVAL_OK
+
+    @library_function
+    def pqos_alloc_release(self, core_arr, num_cores):
+        "pqos_alloc_release()"
+
+        if num_cores == 0 or core_arr is None:
+            return RETVAL_PARAM
+
+        cores = [core_arr[i] for i in range(num_cores)]
+        if not all(self._valid_core(core) for core in cores):
+            return RETVAL_PARAM
+
+        self._enter('pqos_alloc_release', num_cores)
+        self._update()
+        for core in cores:
+            self._core_cos[core] = 0
+
+        return RETVAL_OK
+
+    @library_function
+    def pqos_alloc_assign_pid(self, technologies, pid_arr, num_pids,
+                              class_id_ref):
+        "pqos_alloc_assign_pid()"
+
+        if not self._is_os():
+            return RETVAL_RESOURCE
+
+        if num_pids == 0 or pid_arr is None or class_id_ref is None:
+            return RETVAL_PARAM
+
+        used = set(self._core_cos) | set(self._pid_cos.values())
+        class_id = self._unused_class(technologies, used)
+        if class_id is None:
+            return RETVAL_RESOURCE
+
+        self._enter('pqos_alloc_assign_pid', num_pids)
+        self._update()
+        for i in range(num_pids):
+            self._counters.setdefault(('pid', pid_arr[i]), self._zero())
+            self._pid_cos[pid_arr[i]] = class_id
+
+        store(class_id_ref, class_id)
+        return RETVAL_OK
+
+    @library_function
+    def pqos_alloc_release_pid(self, pid_arr, num_pids):
+        "pqos_alloc_release_pid()"
+
+        if not self._is_os():
+            return RETVAL_RESOURCE
+
+        if num_pids == 0 or pid_arr is None:
+            return RETVAL_PARAM
+
+        self._enter('pqos_alloc_release_pid', num_pids)
+        self._update()
+        for i in range(num_pids):
+            self._pid_cos.pop(pid_arr[i], None)
+
+        return RETVAL_OK
+
+    def pqos_pid_get_pid_assoc(self, class_id, count_ref):
+        "pqos_pid_get_pid_assoc()"
+
+        with self._lock:
+            if not self._initialized or not self._is_os():
+                self._enter('pqos_pid_get_pid_assoc')
+                store(count_ref, 0)
+                return ctypes.POINTER(ctypes.c_uint)()
+
+            pids = sorted(pid for pid, cos in self._pid_cos.items()
+                          if cos == class_id)
+            self._enter('pqos_pid_get_pid_assoc', len(pids))
+            store(count_ref, len(pids))
+            return alloc_array(ctypes.c_uint, pids)
+
+    @library_function
+    def pqos_alloc_reset(self, l3_cdp_cfg, l2_cdp_cfg, mba_cfg):
+        "pqos_alloc_reset()"
+
+        features = (CPqosFeatureConfig.PQOS_FEATURE_ANY,
+                    CPqosFeatureConfig.PQOS_FEATURE_OFF,
+                    CPqosFeatureConfig.PQOS_FEATURE_ON)
+        mba_configs = (CPqosMbaConfig.PQOS_MBA_ANY,
+                       CPqosMbaConfig.PQOS_MBA_DEFAULT,
+                       CPqosMbaConfig.PQOS_MBA_CTRL)
+
+        if l3_cdp_cfg not in features or l2_cdp_cfg not in features or \
+                mba_cfg not in mba_configs:
+            return RETVAL_PARAM
+
+        feature_on = CPqosFeatureConfig.PQOS_FEATURE_ON
+        if l3_cdp_cfg == feature_on and \
+                not (self.platform.l3ca and self.platform.l3_cdp):
+            return RETVAL_RESOURCE
+
+        if l2_cdp_cfg == feature_on and \
+                not (self.platform.l2ca and self.platform.l2_cdp):
+            return RETVAL_RESOURCE
+
+        if mba_cfg == CPqosMbaConfig.PQOS_MBA_CTRL and \
+                not (self.platform.mba and self._mba_cap.ctrl):
+            return RETVAL_RESOURCE
+
+        self._enter('pqos_alloc_reset')
+        self._update()
+
+        if l3_cdp_cfg != CPqosFeatureConfig.PQOS_FEATURE_ANY:
+            self._l3_cdp_on = l3_cdp_cfg == feature_on
+
+        if l2_cdp_cfg != CPqosFeatureConfig.PQOS_FEATURE_ANY:
+            self._l2_cdp_on = l2_cdp_cfg == feature_on
+
+        if mba_cfg != CPqosMbaConfig.PQOS_MBA_ANY:
+            self._mba_ctrl_on = mba_cfg == CPqosMbaConfig.PQOS_MBA_CTRL
+
+        self._reset_alloc()
+        self._update_cap()
+        return RETVAL_OK
+
+    def pqos_alloc_reset_config(self, config_ptr):
+        "pqos_alloc_reset_config()"
+
+        # both definitions of pqos_alloc_config start with the same fields
+        if config_ptr:
+            config = deref(config_ptr)
+            return self.pqos_alloc_reset(config.l3_cdp, config.l2_cdp,
+                                         config.mba)
+
+        return self.pqos_alloc_reset(CPqosFeatureConfig.PQOS_FEATURE_ANY,
+                                     CPqosFeatureConfig.PQOS_FEATURE_ANY,
+                                     CPqosMbaConfig.PQOS_MBA_ANY)
+
+    def pqos_alloc_assoc_set_channel(self, _channel, _class_id):
+        "pqos_alloc_assoc_set_channel()"
+
+        return self._unsupported('pqos_alloc_assoc_set_channel')
+
+    def pqos_alloc_assoc_get_channel(self, _channel, _class_id_ref):
+        "pqos_alloc_assoc_get_channel()"
+
+        return self._unsupported('pqos_alloc_assoc_get_channel')
+
+    def pqos_alloc_assoc_set_dev(self, _segment, _bdf, _virtual_channel,
+                                 _class_id):
+        "pqos_alloc_assoc_set_dev()"
+
+        return self._unsupported('pqos_alloc_assoc_set_dev')
+
+    def pqos_alloc_assoc_get_dev(self, _segment, _bdf, _virtual_channel,
+                                 _class_id_ref):
+        "pqos_alloc_assoc_get_dev()"
+
+        return self._unsupported('pqos_alloc_assoc_get_dev')
@@ -0,0 +1,224 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Constants and helpers shared by modules of the simulated PQoS library.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+import ctypes.util
+import functools
+import time
+
+from pqos.native_struct import CPqosMonitor
+
+
+# PQoS library return codes
+RETVAL_OK = 0
+RETVAL_ERROR = 1
+RETVAL_PARAM = 2
+RETVAL_RESOURCE = 3
+RETVAL_INIT = 4
+
+# Marker of a started monitoring group, as set by PQoS library
+GROUP_VALID_MARKER = 0x00DEAD00
+
+# Default MBA controller limit (no limit), in MBps
+MBA_MAX_MBPS = 0xFFFFFFFF
+
+ALL_EVENTS = (CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP |
+              CPqosMonitor.PQOS_MON_EVENT_LMEM_BW |
+              CPqosMonitor.PQOS_MON_EVENT_TMEM_BW |
+              CPqosMonitor.PQOS_MON_EVENT_RMEM_BW |
+              CPqosMonitor.PQOS_PERF_EVENT_LLC_MISS |
+              CPqosMonitor.PQOS_PERF_EVENT_IPC |
+              CPqosMonitor.PQOS_PERF_EVENT_LLC_REF)
+
+# Cost of library calls: function name -> (seconds per call, seconds per
+# item), where an item is a class of service, a core, a task or a monitoring
+# group passed to the function. The figures are orders of magnitude of
+# register access through the msr driver and of file access in resctrl
+# filesystem, not measurements of any particular platform.
+MSR_LATENCY = {
+    'pqos_l3ca_set': (2e-6, 2e-6),
+    'pqos_l3ca_get': (2e-6, 2e-6),
+    'pqos_l2ca_set': (2e-6, 2e-6),
+    'pqos_l2ca_get': (2e-6, 2e-6),
+    'pqos_mba_set': (2e-6, 4e-6),
+    'pqos_mba_get': (2e-6, 2e-6),
+    'pqos_alloc_assoc_set': (3e-6, 0),
+    'pqos_alloc_assoc_get': (2e-6, 0),
+    'pqos_alloc_assign': (5e-6, 4e-6),
+    'pqos_alloc_release': (1e-6, 3e-6),
+    'pqos_alloc_reset': (2e-4, 0),
+    'pqos_alloc_reset_config': (2e-4, 0),
+    'pqos_mon_start': (5e-6, 3e-6),
+    'pqos_mon_start_cores': (5e-6, 3e-6),
+    'pqos_mon_stop': (2e-6, 3e-6),
+    'pqos_mon_poll': (1e-6, 8e-6),
+    'pqos_mon_reset': (1e-4, 0),
+}
+
+RESCTRL_LATENCY = {
+    'pqos_l3ca_set': (100e-6, 20e-6),
+    'pqos_l3ca_get': (40e-6, 10e-6),
+    'pqos_l2ca_set': (100e-6, 20e-6),
+    'pqos_l2ca_get': (40e-6, 10e-6),
+    'pqos_mba_set': (100e-6, 20e-6),
+    'pqos_mba_get': (40e-6, 10e-6),
+    'pqos_alloc_assoc_set': (60e-6, 0),
+    'pqos_alloc_assoc_get': (30e-6, 0),
+    'pqos_alloc_assoc_set_pid': (40e-6, 0),
+    'pqos_alloc_assoc_get_pid': (150e-6, 0),
+    'pqos_alloc_assign': (200e-6, 60e-6),
+    'pqos_alloc_release': (60e-6, 60e-6),
+    'pqos_alloc_assign_pid': (200e-6, 40e-6),
+    'pqos_alloc_release_pid': (40e-6, 40e-6),
+    'pqos_pid_get_pid_assoc': (50e-6, 1e-6),
+    'pqos_alloc_reset': (5e-3, 0),
+    'pqos_alloc_reset_config': (5e-3, 0),
+    'pqos_mon_start': (100e-6, 60e-6),
+    'pqos_mon_start_cores': (100e-6, 60e-6),
+    'pqos_mon_start_pids': (100e-6, 40e-6),
+    'pqos_mon_start_pids2': (100e-6, 40e-6),
+    'pqos_mon_add_pids': (10e-6, 40e-6),
+    'pqos_mon_remove_pids': (10e-6, 40e-6),
+    'pqos_mon_stop': (100e-6, 0),
+    'pqos_mon_poll': (2e-6, 30e-6),
+    'pqos_mon_reset': (2e-3, 0),
+}
+
+LATENCY_PROFILES = {
+    'msr': MSR_LATENCY,
+    'resctrl': RESCTRL_LATENCY
+}
+
+_LIBC_MALLOC = []
+
+
+def _get_libc_malloc():
+    "Returns libc malloc() function, libc is loaded only once."
+
+    if not _LIBC_MALLOC:
+        libc_path = ctypes.util.find_library('c')
+
+        if not libc_path:
+            raise OSError('Cannot find libc')
+
+        libc_malloc = ctypes.CDLL(libc_path).malloc
+        libc_malloc.restype = ctypes.c_void_p
+        libc_malloc.argtypes = [ctypes.c_size_t]
+        _LIBC_MALLOC.append(libc_malloc)
+
+    return _LIBC_MALLOC[0]
+
+
+def alloc_array(ctype, values):
+    """
+    Copies values to an array allocated with malloc(), the way PQoS library
+    returns arrays, so the bindings can release it with free().
+
+    Returns:
+        a pointer to the array or NULL pointer if there are no values
+    """
+
+    if not values:
+        return ctypes.POINTER(ctype)()
+
+    address = _get_libc_malloc()(ctypes.sizeof(ctype) * len(values))
+
+    if not address:
+        raise MemoryError('Cannot allocate array')
+
+    (ctype * len(values)).from_address(address)[:] = values
+    return ctypes.cast(address, ctypes.POINTER(ctype))
+
+
+def deref(ref):
+    """
+    Returns an object passed by reference (with byref() or as a pointer),
+    None for NULL pointer.
+    """
+
+    if isinstance(ref, ctypes._Pointer):  # pylint: disable=protected-access
+        return ref.contents if ref else None
+
+    return ref._obj  # pylint: disable=protected-access
+
+
+def store(ref, value):
+    "Stores a value in a ctypes object passed by reference, if given."
+
+    if ref is not None:
+        deref(ref).value = value
+
+
+def is_contiguous(mask):
+    "Returns True if a bitmask is a non-empty contiguous run of bits."
+
+    return mask != 0 and ((mask + (mask & -mask)) & mask) == 0
+
+
+def delay(seconds):
+    "Waits for a given time, delays shorter than 1ms are busy-waited."
+
+    if seconds <= 0:
+        return
+
+    if seconds >= 1e-3:
+        time.sleep(seconds)
+        return
+
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def library_function(func):
+    """
+    Decorates a function of the simulated library. Like in PQoS library,
+    calls are serialized with the library lock and fail with RETVAL_INIT
+    if the library is not initialized.
+    """
+
+    @functools.wraps(func)
+    def call(sim, *args):
+        # pylint: disable=protected-access
+        with sim._lock:
+            if not sim._initialized:
+                return RETVAL_INIT
+
+            return func(sim, *args)
+
+    return call
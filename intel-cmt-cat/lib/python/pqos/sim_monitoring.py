@@ -0,0 +1,424 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Monitoring functions of the simulated PQoS library.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+
+from pqos.monitoring import CPqosMonData
+from pqos.native_struct import CPqosMonitor
+from pqos.sim_common import (
+    GROUP_VALID_MARKER, RETVAL_OK, RETVAL_PARAM, RETVAL_RESOURCE, deref,
+    library_function, store
+)
+from pqos.sim_workload import WorkloadRates
+
+
+class _MonGroup(object):
+    "State of a simulated monitoring group."
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, data, rmid, tasks, owned):
+        self.data = data        # CPqosMonData structure
+        self.rmid = rmid        # RMID of the group
+        self.tasks = {}         # task -> counters when added to the group
+        self.retired = [0.0] * len(WorkloadRates._fields)
+        self.last = None        # counters at the last poll
+        self.owned = owned      # True if allocated by the library
+        self.arrays = []        # arrays referenced by the structure
+        for task in tasks:
+            self.tasks[task] = None
+
+
+class MonitoringMixin(object):
+    """
+    Monitoring functions of the simulated library.
+    """
+
+    def _reset_mon(self):
+        "Stops all monitoring groups and frees RMIDs."
+
+        for group in self._groups.values():
+            group.data.valid = 0
+
+        self._groups = {}
+        self._core_rmid = [0] * self.platform.num_cores
+        self._free_rmids = list(range(self.platform.max_rmid - 1, 0, -1))
+
+    @library_function
+    def pqos_mon_reset(self):
+        "pqos_mon_reset()"
+
+        self._enter('pqos_mon_reset')
+        self._reset_mon()
+        return RETVAL_OK
+
+    def pqos_mon_reset_config(self, _config_ptr):
+        "pqos_mon_reset_config()"
+
+        return self.pqos_mon_reset()
+
+    @library_function
+    def pqos_mon_assoc_get(self, lcore, rmid_ref):
+        "pqos_mon_assoc_get()"
+
+        if not self._valid_core(lcore) or rmid_ref is None:
+            return RETVAL_PARAM
+
+        self._enter('pqos_mon_assoc_get')
+        store(rmid_ref, self._core_rmid[lcore])
+        return RETVAL_OK
+
+    def pqos_mon_assoc_get_channel(self, _channel, _rmid_ref):
+        "pqos_mon_assoc_get_channel()"
+
+        return self._unsupported('pqos_mon_assoc_get_channel')
+
+    def pqos_mon_assoc_get_dev(self, _segment, _bdf, _virtual_channel,
+                               _rmid_ref):
+        "pqos_mon_assoc_get_dev()"
+
+        return self._unsupported('pqos_mon_assoc_get_dev')
+
+    def _check_events(self, event):
+        "Returns a return code of event validation."
+
+        if event == 0 or event & ~self.platform.events:
+            return RETVAL_PARAM
+
+        return RETVAL_OK if self.platform.mon else RETVAL_RESOURCE
+
+    def _start_group(self, data, event, tasks, owned):
+        "Starts a monitoring group in a given pqos_mon_data structure."
+        # pylint: disable=too-many-arguments
+
+        if not self._free_rmids:
+            return RETVAL_RESOURCE
+
+        self._update()
+        group = _MonGroup(data, self._free_rmids.pop(), tasks, owned)
+        for task in tasks:
+            counters = self._counters.setdefault(task, self._zero())
+            group.tasks[task] = list(counters)
+
+        data.valid = GROUP_VALID_MARKER
+        data.event = event
+        data.values = type(data.values)()
+        self._set_group_members(group)
+        self._groups[ctypes.addressof(data)] = group
+        return RETVAL_OK
+
+    @staticmethod
+    def _set_group_members(group):
+        "Sets cores or PIDs of a group in its pqos_mon_data structure."
+
+        cores = [task_id for kind, task_id in group.tasks if kind == 'core']
+        pids = [task_id for kind, task_id in group.tasks if kind == 'pid']
+        cores_arr = (ctypes.c_uint * len(cores))(*cores)
+        pids_arr = (ctypes.c_uint * len(pids))(*pids)
+        group.arrays = [cores_arr, pids_arr]
+
+        data = group.data
+        data.num_cores = len(cores)
+        data.cores = ctypes.cast(cores_arr, ctypes.POINTER(ctypes.c_uint))
+        data.num_pids = len(pids)
+        data.pids = ctypes.cast(pids_arr, ctypes.POINTER(ctypes.c_uint))
+
+    def _start_cores(self, name, num_cores, core_arr, event, context, data,
+                     owned):
+        "Implements pqos_mon_start() and pqos_mon_start_cores()."
+        # pylint: disable=too-many-arguments
+
+        if num_cores == 0 or core_arr is None:
+            return RETVAL_PARAM
+
+        ret = self._check_events(event)
+        if ret != RETVAL_OK:
+            return ret
+
+        cores = [core_arr[i] for i in range(num_cores)]
+        if not all(self._valid_core(core) for core in cores):
+            return RETVAL_PARAM
+
+        if any(self._core_rmid[core] for core in cores):
+            return RETVAL_RESOURCE
+
+        self._enter(name, num_cores)
+        ret = self._start_group(data, event,
+                                [('core', core) for core in cores], owned)
+        if ret == RETVAL_OK:
+            data.context = context
+            rmid = self._groups[ctypes.addressof(data)].rmid
+            for core in cores:
+                self._core_rmid[core] = rmid
+
+        return ret
+
+    def _start_pids(self, name, num_pids, pid_arr, event, context, data,
+                    owned):
+        "Implements pqos_mon_start_pids() and pqos_mon_start_pids2()."
+        # pylint: disable=too-many-arguments
+
+        if not self._is_os():
+            return RETVAL_RESOURCE
+
+        if num_pids == 0 or pid_arr is None:
+            return RETVAL_PARAM
+
+        ret = self._check_events(event)
+        if ret != RETVAL_OK:
+            return ret
+
+        self._enter(name, num_pids)
+        ret = self._start_group(data, event,
+                                [('pid', pid_arr[i]) for i in range(num_pids)],
+                                owned)
+        if ret == RETVAL_OK:
+            data.context = context
+
+        return ret
+
+    @library_function
+    def pqos_mon_start(self, num_cores, core_arr, event, context, group_ref):
+        "pqos_mon_start()"
+        # pylint: disable=too-many-arguments
+
+        data = deref(group_ref)
+        if data.valid == GROUP_VALID_MARKER:
+            return RETVAL_PARAM
+
+        return self._start_cores('pqos_mon_start', num_cores, core_arr,
+                                 event, context, data, False)
+
+    @library_function
+    def pqos_mon_start_cores(self, num_cores, core_arr, event, context,
+                         group_ref):
+        "pqos_mon_start_cores()"
+        # pylint: disable=too-many-arguments
+
+        data = CPqosMonData()
+        ret = self._start_cores('pqos_mon_start_cores', num_cores,
+                                core_arr, event, context, data, True)
+        if ret == RETVAL_OK:
+            deref(group_ref).contents = data
+
+        return ret
+
+    @library_function
+    def pqos_mon_start_pids(self, num_pids, pid_arr, event, context,
+                        group_ref):
+        "pqos_mon_start_pids()"
+        # pylint: disable=too-many-arguments
+
+        data = deref(group_ref)
+        if data.valid == GROUP_VALID_MARKER:
+            return RETVAL_PARAM
+
+        return self._start_pids('pqos_mon_start_pids', num_pids, pid_arr,
+                                event, context, data, False)
+
+    @library_function
+    def pqos_mon_start_pids2(self, num_pids, pid_arr, event, context,
+                         group_ref):
+        "pqos_mon_start_pids2()"
+        # pylint: disable=too-many-arguments
+
+        data = CPqosMonData()
+        ret = self._start_pids('pqos_mon_start_pids2', num_pids, pid_arr,
+                               event, context, data, True)
+        if ret == RETVAL_OK:
+            deref(group_ref).contents = data
+
+        return ret
+
+    def pqos_mon_start_channels(self, _num_channels, _channel_arr, _event,
+                                _context, _group_ref):
+        "pqos_mon_start_channels()"
+        # pylint: disable=too-many-arguments
+
+        return self._unsupported('pqos_mon_start_channels')
+
+    def pqos_mon_start_dev(self, _segment, _bdf, _virtual_channel, _event,
+                           _context, _group_ref):
+        "pqos_mon_start_dev()"
+        # pylint: disable=too-many-arguments
+
+        return self._unsupported('pqos_mon_start_dev')
+
+    def _find_group(self, group_ref):
+        "Returns a started monitoring group passed by reference or None."
+
+        data = deref(group_ref) if group_ref is not None else None
+        if data is None or data.valid != GROUP_VALID_MARKER:
+            return None
+
+        return self._groups.get(ctypes.addressof(data))
+
+    def _group_counters(self, group):
+        "Returns counters accumulated by a group since it was started."
+
+        totals = list(group.retired)
+        for task, base in group.tasks.items():
+            counters = self._counters[task]
+            totals[0] += counters[0]
+            for i in range(1, len(counters)):
+                totals[i] += counters[i] - base[i]
+
+        return totals
+
+    def _poll_group(self, group):
+        "Updates event values of a group."
+
+        counters = self._group_counters(group)
+        last = group.last if group.last is not None else \
+            [0.0] * len(counters)
+        group.last = counters
+
+        rates = WorkloadRates(*counters)
+        deltas = WorkloadRates(*[max(0.0, new - old)
+                                 for new, old in zip(counters, last)])
+        values = group.data.values
+        event = group.data.event
+
+        if event & CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP:
+            values.llc = int(rates.occupancy)
+
+        if event & CPqosMonitor.PQOS_MON_EVENT_LMEM_BW:
+            values.mbm_local = int(rates.mbm_local)
+            values.mbm_local_delta = int(deltas.mbm_local)
+
+        if event & CPqosMonitor.PQOS_MON_EVENT_RMEM_BW:
+            values.mbm_remote = int(rates.mbm_remote)
+            values.mbm_remote_delta = int(deltas.mbm_remote)
+
+        if event & CPqosMonitor.PQOS_MON_EVENT_TMEM_BW:
+            values.mbm_total = int(rates.mbm_local + rates.mbm_remote)
+            values.mbm_total_delta = int(deltas.mbm_local +
+                                         deltas.mbm_remote)
+
+        if event & CPqosMonitor.PQOS_PERF_EVENT_IPC:
+            values.ipc_retired = int(rates.instructions)
+            values.ipc_retired_delta = int(deltas.instructions)
+            values.ipc_unhalted = int(rates.cycles)
+            values.ipc_unhalted_delta = int(deltas.cycles)
+            values.ipc = deltas.instructions / deltas.cycles \
+                if deltas.cycles else 0.0
+
+        if event & CPqosMonitor.PQOS_PERF_EVENT_LLC_MISS:
+            values.llc_misses = int(rates.llc_misses)
+            values.llc_misses_delta = int(deltas.llc_misses)
+
+        if event & CPqosMonitor.PQOS_PERF_EVENT_LLC_REF:
+            values.llc_references = int(rates.llc_references)
+            values.llc_references_delta = int(deltas.llc_references)
+
+    @library_function
+    def pqos_mon_poll(self, group_arr, num_groups):
+        "pqos_mon_poll()"
+
+        if num_groups == 0 or group_arr is None:
+            return RETVAL_PARAM
+
+        groups = [self._find_group(group_arr[i])
+                  for i in range(num_groups)]
+        if None in groups:
+            return RETVAL_PARAM
+
+        self._enter('pqos_mon_poll', num_groups)
+        self._update()
+        for group in groups:
+            self._poll_group(group)
+
+        return RETVAL_OK
+
+    @library_function
+    def pqos_mon_stop(self, group_ref):
+        "pqos_mon_stop()"
+
+        group = self._find_group(group_ref)
+        if group is None:
+            return RETVAL_PARAM
+
+        self._enter('pqos_mon_stop', len(group.tasks))
+        for kind, task_id in group.tasks:
+            if kind == 'core':
+                self._core_rmid[task_id] = 0
+
+        self._free_rmids.append(group.rmid)
+        del self._groups[ctypes.addressof(group.data)]
+        group.data.valid = 0
+        return RETVAL_OK
+
+    @library_function
+    def _change_pids(self, name, num_pids, pid_arr, group_ref, add):
+        "Implements pqos_mon_add_pids() and pqos_mon_remove_pids()."
+        # pylint: disable=too-many-arguments
+
+        if not self._is_os():
+            return RETVAL_RESOURCE
+
+        group = self._find_group(group_ref)
+        if group is None or num_pids == 0 or pid_arr is None or \
+                any(kind != 'pid' for kind, _ in group.tasks):
+            return RETVAL_PARAM
+
+        self._enter(name, num_pids)
+        self._update()
+        for i in range(num_pids):
+            task = ('pid', pid_arr[i])
+            if add and task not in group.tasks:
+                counters = self._counters.setdefault(task, self._zero())
+                group.tasks[task] = list(counters)
+            elif not add and task in group.tasks:
+                base = group.tasks.pop(task)
+                counters = self._counters[task]
+                for j in range(1, len(counters)):
+                    group.retired[j] += counters[j] - base[j]
+
+        self._set_group_members(group)
+        return RETVAL_OK
+
+    def pqos_mon_add_pids(self, num_pids, pid_arr, group_ref):
+        "pqos_mon_add_pids()"
+
+        return self._change_pids('pqos_mon_add_pids', num_pids, pid_arr,
+                                 group_ref, True)
+
+    def pqos_mon_remove_pids(self, num_pids, pid_arr, group_ref):
+        "pqos_mon_remove_pids()"
+
+        return self._change_pids('pqos_mon_remove_pids', num_pids, pid_arr,
+                                 group_ref, False)
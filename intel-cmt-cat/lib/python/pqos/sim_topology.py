@@ -0,0 +1,554 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Platform model of the simulated PQoS library: core topology, capabilities
+and CPU information.
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+import ctypes
+
+from pqos.native_struct import (
+    CPqosCacheInfo, CPqosCap, CPqosCapability, CPqosCapabilityL2,
+    CPqosCapabilityL3, CPqosCapabilityMBA, CPqosCapabilityMonitoring,
+    CPqosChannel, CPqosCpuInfo, CPqosCoreInfo, CPqosMonitor, PqosChannelT
+)
+from pqos.sim_common import (
+    ALL_EVENTS, RETVAL_ERROR, RETVAL_OK, RETVAL_PARAM, RETVAL_RESOURCE,
+    alloc_array, deref, library_function, store
+)
+
+
+# Resource features of a simulated platform and their defaults
+PLATFORM_FEATURES = {
+    'mon': True,
+    'max_rmid': 128,
+    'events': ALL_EVENTS,
+    'l3ca': True,
+    'l3_num_ways': 12,
+    'l3_way_size': 2 * 1024 * 1024,
+    'l3_num_classes': 16,
+    'l3_cdp': True,
+    'l2ca': True,
+    'l2_num_ways': 16,
+    'l2_way_size': 64 * 1024,
+    'l2_num_classes': 8,
+    'l2_cdp': True,
+    'mba': True,
+    'mba_num_classes': 8,
+    'mba_throttle_step': 10,
+    'mba_ctrl': True
+}
+
+# Core topology of a simulated platform
+SimulatedCore = namedtuple('SimulatedCore',
+                           ['lcore', 'socket', 'l3_id', 'l2_id', 'numa'])
+
+
+class SimulatedPlatform(object):
+    """
+    Configuration of a simulated platform.
+
+    Cores are numbered socket by socket. L3 cache, L3 CAT and MBA domains are
+    sockets, L2 clusters group consecutive cores of a socket.
+    """
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+
+    def __init__(self, num_sockets=2, cores_per_socket=8, l2_cluster_size=2,
+                 numa_per_socket=1, vendor='intel', **features):
+        """
+        Initializes platform configuration.
+
+        Parameters:
+            num_sockets: number of sockets (default 2)
+            cores_per_socket: number of logical cores per socket (default 8)
+            l2_cluster_size: number of cores sharing L2 cache (default 2)
+            numa_per_socket: number of NUMA nodes per socket (default 1)
+            vendor: CPU vendor, 'intel' or 'amd' (default 'intel')
+            features: overrides of resource features, see PLATFORM_FEATURES
+                      for available keys and defaults
+        """
+
+        if num_sockets <= 0 or cores_per_socket <= 0:
+            raise ValueError('Number of sockets and cores must be positive')
+
+        if l2_cluster_size <= 0 or cores_per_socket % l2_cluster_size:
+            raise ValueError('Cores of a socket must split into L2 clusters')
+
+        if numa_per_socket <= 0 or cores_per_socket % numa_per_socket:
+            raise ValueError('Cores of a socket must split into NUMA nodes')
+
+        if vendor not in ('intel', 'amd'):
+            raise ValueError(f'Unknown vendor: {vendor}')
+
+        unknown = set(features) - set(PLATFORM_FEATURES)
+        if unknown:
+            raise ValueError(f'Unknown platform features: {sorted(unknown)}')
+
+        features = dict(PLATFORM_FEATURES, **features)
+
+        self.mon = features['mon']
+        self.max_rmid = features['max_rmid']
+        self.events = features['events']
+
+        self.l3ca = features['l3ca']
+        self.l3_num_ways = features['l3_num_ways']
+        self.l3_way_size = features['l3_way_size']
+        self.l3_num_classes = features['l3_num_classes']
+        self.l3_cdp = features['l3_cdp']
+
+        self.l2ca = features['l2ca']
+        self.l2_num_ways = features['l2_num_ways']
+        self.l2_way_size = features['l2_way_size']
+        self.l2_num_classes = features['l2_num_classes']
+        self.l2_cdp = features['l2_cdp']
+
+        self.mba = features['mba']
+        self.mba_num_classes = features['mba_num_classes']
+        self.mba_throttle_step = features['mba_throttle_step']
+        self.mba_ctrl = features['mba_ctrl']
+
+        self.num_sockets = num_sockets
+        self.cores_per_socket = cores_per_socket
+        self.l2_cluster_size = l2_cluster_size
+        self.numa_per_socket = numa_per_socket
+        self.vendor = vendor
+
+        self.cores = []
+        for lcore in range(num_sockets * cores_per_socket):
+            socket, index = divmod(lcore, cores_per_socket)
+            numa = socket * numa_per_socket + \
+                index * numa_per_socket // cores_per_socket
+            self.cores.append(SimulatedCore(lcore=lcore, socket=socket,
+                                            l3_id=socket,
+                                            l2_id=lcore // l2_cluster_size,
+                                            numa=numa))
+
+    @property
+    def num_cores(self):
+        "Number of logical cores."
+
+        return len(self.cores)
+
+    @property
+    def l3_size(self):
+        "L3 cache size in bytes."
+
+        return self.l3_num_ways * self.l3_way_size
+
+    @property
+    def l2_size(self):
+        "L2 cache size in bytes."
+
+        return self.l2_num_ways * self.l2_way_size
+
+
+class TopologyMixin(object):
+    """
+    Capability and CPU information functions of the simulated library.
+    """
+    # attributes are a part of SimulatedPqos state
+    # pylint: disable=too-many-instance-attributes
+
+    # Structures
+
+    def _build_cpuinfo(self):
+        "Builds pqos_cpuinfo structure."
+
+        platform = self.platform
+        num_cores = platform.num_cores
+        size = ctypes.sizeof(CPqosCpuInfo) + \
+            num_cores * ctypes.sizeof(CPqosCoreInfo)
+
+        self._cpu_buf = ctypes.create_string_buffer(size)
+        cpu = CPqosCpuInfo.from_buffer(self._cpu_buf)
+        cpu.mem_size = size
+        cpu.vendor = CPqosCpuInfo.PQOS_VENDOR_INTEL \
+            if platform.vendor == 'intel' else CPqosCpuInfo.PQOS_VENDOR_AMD
+        cpu.num_cores = num_cores
+        cpu.l2 = self._cacheinfo(platform.l2_num_ways, platform.l2_way_size)
+        cpu.l3 = self._cacheinfo(platform.l3_num_ways, platform.l3_way_size)
+
+        self._cpu = cpu
+        self._cores = (CPqosCoreInfo * num_cores).from_address(
+            ctypes.addressof(cpu) + CPqosCpuInfo.cores.offset)
+
+        for core, info in zip(platform.cores, self._cores):
+            info.lcore = core.lcore
+            info.socket = core.socket
+            info.l3_id = core.l3_id
+            info.l2_id = core.l2_id
+            info.l3cat_id = core.socket
+            info.mba_id = core.socket
+            info.numa = core.numa
+            info.smba_id = core.socket
+
+    @staticmethod
+    def _cacheinfo(num_ways, way_size):
+        "Builds pqos_cacheinfo structure."
+
+        line_size = 64
+        return CPqosCacheInfo(detected=1, num_ways=num_ways,
+                              num_sets=way_size // line_size,
+                              num_partitions=1, line_size=line_size,
+                              total_size=num_ways * way_size,
+                              way_size=way_size)
+
+    def _build_cap(self):
+        "Builds pqos_cap structure, fields depending on state are updated later."
+
+        platform = self.platform
+        items = []
+
+        if platform.mon:
+            events = [event for event in (1 << bit for bit in range(17))
+                      if event & platform.events]
+            size = ctypes.sizeof(CPqosCapabilityMonitoring) + \
+                len(events) * ctypes.sizeof(CPqosMonitor)
+            self._mon_buf = ctypes.create_string_buffer(size)
+            mon = CPqosCapabilityMonitoring.from_buffer(self._mon_buf)
+            mon.mem_size = size
+            mon.max_rmid = platform.max_rmid
+            mon.l3_size = platform.l3_size
+            mon.num_events = len(events)
+            mon.snc_num = 1
+            monitors = (CPqosMonitor * len(events)).from_address(
+                ctypes.addressof(mon) + CPqosCapabilityMonitoring.events.offset)
+            for monitor, event in zip(monitors, events):
+                monitor.type = event
+                monitor.max_rmid = platform.max_rmid
+                monitor.scale_factor = 1
+                monitor.counter_length = 24
+            items.append((CPqosCapability.PQOS_CAP_TYPE_MON, 'mon', mon))
+
+        if platform.l3ca:
+            self._l3_cap = CPqosCapabilityL3(
+                mem_size=ctypes.sizeof(CPqosCapabilityL3),
+                num_ways=platform.l3_num_ways, way_size=platform.l3_way_size,
+                cdp=int(platform.l3_cdp))
+            items.append((CPqosCapability.PQOS_CAP_TYPE_L3CA, 'l3ca',
+                          self._l3_cap))
+
+        if platform.l2ca:
+            self._l2_cap = CPqosCapabilityL2(
+                mem_size=ctypes.sizeof(CPqosCapabilityL2),
+                num_ways=platform.l2_num_ways, way_size=platform.l2_way_size,
+                cdp=int(platform.l2_cdp))
+            items.append((CPqosCapability.PQOS_CAP_TYPE_L2CA, 'l2ca',
+                          self._l2_cap))
+
+        if platform.mba:
+            self._mba_cap = CPqosCapabilityMBA(
+                mem_size=ctypes.sizeof(CPqosCapabilityMBA),
+                num_classes=platform.mba_num_classes,
+                throttle_max=100 - platform.mba_throttle_step,
+                throttle_step=platform.mba_throttle_step, is_linear=1)
+            items.append((CPqosCapability.PQOS_CAP_TYPE_MBA, 'mba',
+                          self._mba_cap))
+
+        size = ctypes.sizeof(CPqosCap) + \
+            len(items) * ctypes.sizeof(CPqosCapability)
+        self._cap_buf = ctypes.create_string_buffer(size)
+        cap = CPqosCap.from_buffer(self._cap_buf)
+        cap.mem_size = size
+        cap.num_cap = len(items)
+
+        self._cap = cap
+        self._cap_items = (CPqosCapability * len(items)).from_address(
+            ctypes.addressof(cap) + CPqosCap.capabilities.offset)
+        self._cap_structs = []
+
+        for item, (cap_type, field, struct) in zip(self._cap_items, items):
+            item.type = cap_type
+            setattr(item.u, field, ctypes.pointer(struct))
+            self._cap_structs.append(struct)
+
+        self._update_cap()
+
+    def _update_cap(self):
+        "Updates capability fields depending on library state."
+
+        if self.platform.l3ca:
+            self._l3_cap.num_classes = self._l3_num_classes()
+            self._l3_cap.cdp_on = int(self._l3_cdp_on)
+
+        if self.platform.l2ca:
+            self._l2_cap.num_classes = self._l2_num_classes()
+            self._l2_cap.cdp_on = int(self._l2_cdp_on)
+
+        if self.platform.mba:
+            self._mba_cap.ctrl = int(self.platform.mba_ctrl and
+                                     (self._is_os() or not self._initialized))
+            self._mba_cap.ctrl_on = int(self._mba_ctrl_on)
+
+    def _find_cap(self, cap_type):
+        "Returns a capability of a given type or None."
+
+        for item in self._cap_items:
+            if item.type == cap_type:
+                return item
+
+        return None
+
+    # Capabilities
+
+    @library_function
+    def pqos_cap_get(self, cap_ref, cpu_ref):
+        "pqos_cap_get()"
+
+        if cap_ref is None and cpu_ref is None:
+            return RETVAL_PARAM
+
+        self._enter('pqos_cap_get')
+
+        if cap_ref is not None:
+            deref(cap_ref).contents = self._cap
+
+        if cpu_ref is not None:
+            deref(cpu_ref).contents = self._cpu
+
+        return RETVAL_OK
+
+    def pqos_cap_get_type(self, _p_cap, cap_type, item_ref):
+        "pqos_cap_get_type()"
+
+        self._enter('pqos_cap_get_type')
+        item = self._find_cap(cap_type)
+
+        if item is None:
+            return RETVAL_RESOURCE
+
+        deref(item_ref).contents = item
+        return RETVAL_OK
+
+    def _get_cos_num(self, name, cap_type, num_classes, ref):
+        "Implements pqos_*_get_cos_num() functions."
+
+        self._enter(name)
+        if self._find_cap(cap_type) is None:
+            return RETVAL_RESOURCE
+
+        store(ref, num_classes)
+        return RETVAL_OK
+
+    def pqos_l3ca_get_cos_num(self, _p_cap, cos_num_ref):
+        "pqos_l3ca_get_cos_num()"
+
+        return self._get_cos_num('pqos_l3ca_get_cos_num',
+                                 CPqosCapability.PQOS_CAP_TYPE_L3CA,
+                                 self._l3_num_classes(), cos_num_ref)
+
+    def pqos_l2ca_get_cos_num(self, _p_cap, cos_num_ref):
+        "pqos_l2ca_get_cos_num()"
+
+        return self._get_cos_num('pqos_l2ca_get_cos_num',
+                                 CPqosCapability.PQOS_CAP_TYPE_L2CA,
+                                 self._l2_num_classes(), cos_num_ref)
+
+    def pqos_mba_get_cos_num(self, _p_cap, cos_num_ref):
+        "pqos_mba_get_cos_num()"
+
+        return self._get_cos_num('pqos_mba_get_cos_num',
+                                 CPqosCapability.PQOS_CAP_TYPE_MBA,
+                                 self._mba_num_classes(), cos_num_ref)
+
+    def _feature_enabled(self, name, cap_type, supported, enabled,
+                         supported_ref, enabled_ref):
+        "Implements pqos_*_enabled() functions."
+        # pylint: disable=too-many-arguments
+
+        self._enter(name)
+        if self._find_cap(cap_type) is None:
+            return RETVAL_RESOURCE
+
+        store(supported_ref, int(supported))
+        store(enabled_ref, int(enabled))
+        return RETVAL_OK
+
+    def pqos_l3ca_cdp_enabled(self, _p_cap, supported_ref, enabled_ref):
+        "pqos_l3ca_cdp_enabled()"
+
+        return self._feature_enabled('pqos_l3ca_cdp_enabled',
+                                     CPqosCapability.PQOS_CAP_TYPE_L3CA,
+                                     self.platform.l3_cdp, self._l3_cdp_on,
+                                     supported_ref, enabled_ref)
+
+    def pqos_l3ca_iordt_enabled(self, _p_cap, supported_ref, enabled_ref):
+        "pqos_l3ca_iordt_enabled()"
+
+        return self._feature_enabled('pqos_l3ca_iordt_enabled',
+                                     CPqosCapability.PQOS_CAP_TYPE_L3CA,
+                                     False, False, supported_ref, enabled_ref)
+
+    def pqos_l2ca_cdp_enabled(self, _p_cap, supported_ref, enabled_ref):
+        "pqos_l2ca_cdp_enabled()"
+
+        return self._feature_enabled('pqos_l2ca_cdp_enabled',
+                                     CPqosCapability.PQOS_CAP_TYPE_L2CA,
+                                     self.platform.l2_cdp, self._l2_cdp_on,
+                                     supported_ref, enabled_ref)
+
+    def pqos_mba_ctrl_enabled(self, _p_cap, supported_ref, enabled_ref):
+        "pqos_mba_ctrl_enabled()"
+
+        return self._feature_enabled('pqos_mba_ctrl_enabled',
+                                     CPqosCapability.PQOS_CAP_TYPE_MBA,
+                                     self._mba_cap.ctrl if self.platform.mba
+                                     else False, self._mba_ctrl_on,
+                                     supported_ref, enabled_ref)
+
+    # CPU information
+
+    def _core_values(self, attr, cores=None):
+        "Returns sorted unique values of a core attribute."
+
+        cores = self.platform.cores if cores is None else cores
+        return sorted({getattr(core, attr) for core in cores})
+
+    def _array_result(self, name, count_ref, values, ctype=ctypes.c_uint):
+        "Returns values as an array allocated with malloc()."
+
+        self._enter(name)
+        store(count_ref, len(values))
+        return alloc_array(ctype, values)
+
+    def pqos_get_vendor(self, _p_cpu):
+        "pqos_get_vendor()"
+
+        self._enter('pqos_get_vendor')
+        return self._cpu.vendor
+
+    def pqos_cpu_get_sockets(self, _p_cpu, count_ref):
+        "pqos_cpu_get_sockets()"
+
+        return self._array_result('pqos_cpu_get_sockets', count_ref,
+                                  self._core_values('socket'))
+
+    def pqos_cpu_get_l2ids(self, _p_cpu, count_ref):
+        "pqos_cpu_get_l2ids()"
+
+        return self._array_result('pqos_cpu_get_l2ids', count_ref,
+                                  self._core_values('l2_id'))
+
+    def pqos_cpu_get_cores_l3id(self, _p_cpu, l3_id, count_ref):
+        "pqos_cpu_get_cores_l3id()"
+
+        cores = [core.lcore for core in self.platform.cores
+                 if core.l3_id == l3_id]
+        return self._array_result('pqos_cpu_get_cores_l3id', count_ref, cores)
+
+    def pqos_cpu_get_cores(self, _p_cpu, socket, count_ref):
+        "pqos_cpu_get_cores()"
+
+        cores = [core.lcore for core in self.platform.cores
+                 if core.socket == socket]
+        return self._array_result('pqos_cpu_get_cores', count_ref, cores)
+
+    def pqos_cpu_get_core_info(self, _p_cpu, core):
+        "pqos_cpu_get_core_info()"
+
+        self._enter('pqos_cpu_get_core_info')
+        if not self._valid_core(core):
+            return ctypes.POINTER(CPqosCoreInfo)()
+
+        return ctypes.pointer(self._cores[core])
+
+    def _find_core(self, name, result_ref, predicate):
+        "Implements functions returning one core or core attribute."
+
+        self._enter(name)
+        for core in self.platform.cores:
+            result = predicate(core)
+            if result is not None:
+                store(result_ref, result)
+                return RETVAL_OK
+
+        return RETVAL_ERROR
+
+    def pqos_cpu_get_one_core(self, _p_cpu, socket, core_ref):
+        "pqos_cpu_get_one_core()"
+
+        return self._find_core('pqos_cpu_get_one_core', core_ref,
+                               lambda core: core.lcore
+                               if core.socket == socket else None)
+
+    def pqos_cpu_get_one_by_l2id(self, _p_cpu, l2_id, core_ref):
+        "pqos_cpu_get_one_by_l2id()"
+
+        return self._find_core('pqos_cpu_get_one_by_l2id', core_ref,
+                               lambda core: core.lcore
+                               if core.l2_id == l2_id else None)
+
+    def pqos_cpu_check_core(self, _p_cpu, core):
+        "pqos_cpu_check_core()"
+
+        self._enter('pqos_cpu_check_core')
+        return RETVAL_OK if self._valid_core(core) else RETVAL_PARAM
+
+    def pqos_cpu_get_socketid(self, _p_cpu, lcore, socket_ref):
+        "pqos_cpu_get_socketid()"
+
+        return self._find_core('pqos_cpu_get_socketid', socket_ref,
+                               lambda core: core.socket
+                               if core.lcore == lcore else None)
+
+    def pqos_cpu_get_clusterid(self, _p_cpu, lcore, cluster_ref):
+        "pqos_cpu_get_clusterid()"
+
+        return self._find_core('pqos_cpu_get_clusterid', cluster_ref,
+                               lambda core: core.l3_id
+                               if core.lcore == lcore else None)
+
+    # Device information, I/O RDT is not simulated
+
+    def pqos_devinfo_get_channel_id(self, _p_devinfo, _segment, _bdf,
+                                    _virtual_channel):
+        "pqos_devinfo_get_channel_id()"
+
+        self._enter('pqos_devinfo_get_channel_id')
+        return 0
+
+    def pqos_devinfo_get_channel_ids(self, _p_devinfo, _segment, _bdf,
+                                     count_ref):
+        "pqos_devinfo_get_channel_ids()"
+
+        return self._array_result('pqos_devinfo_get_channel_ids', count_ref,
+                                  [], PqosChannelT)
+
+    def pqos_devinfo_get_channel(self, _p_devinfo, _channel):
+        "pqos_devinfo_get_channel()"
+
+        self._enter('pqos_devinfo_get_channel')
+        return ctypes.POINTER(CPqosChannel)()
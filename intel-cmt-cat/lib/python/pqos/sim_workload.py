@@ -0,0 +1,263 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+
+"""
+Workload model of the simulated PQoS library.
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import namedtuple
+
+
+# Event rates of a workload: LLC occupancy in bytes, other fields per second
+WorkloadRates = namedtuple('WorkloadRates',
+                           ['occupancy', 'mbm_local', 'mbm_remote',
+                            'instructions', 'cycles', 'llc_references',
+                            'llc_misses'])
+
+
+class SimulatedWorkload(object):
+    """
+    Synthetic workload running on a core or as a task.
+
+    The model is deliberately simple. The part of the cache footprint that
+    does not fit in the LLC capacity available to the workload turns into
+    LLC misses, which demand memory bandwidth. IPC drops by up to a half
+    when the footprint does not fit in LLC at all and by up to another half
+    when memory bandwidth is throttled.
+    """
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+
+    def __init__(self, footprint=8 * 1024 * 1024, bandwidth=2e9,
+                 remote_ratio=0.1, ipc=2.0, frequency=2e9, llc_ref_rate=5e7,
+                 min_miss_ratio=0.05, noise=0.0):
+        """
+        Initializes workload model.
+
+        Parameters:
+            footprint: cache footprint in bytes (default 8MiB)
+            bandwidth: memory bandwidth demand in bytes per second when no
+                       part of the footprint fits in LLC (default 2e9)
+            remote_ratio: part of memory traffic going to a remote NUMA node
+                          (default 0.1)
+            ipc: instructions per cycle when running unconstrained
+                 (default 2.0)
+            frequency: core frequency in Hz (default 2e9)
+            llc_ref_rate: LLC references per second when running
+                          unconstrained (default 5e7)
+            min_miss_ratio: LLC miss ratio when the whole footprint fits
+                            in LLC (default 0.05)
+            noise: relative standard deviation of rates (default 0.0)
+        """
+        # pylint: disable=too-many-arguments
+
+        self.footprint = footprint
+        self.bandwidth = bandwidth
+        self.remote_ratio = remote_ratio
+        self.ipc = ipc
+        self.frequency = frequency
+        self.llc_ref_rate = llc_ref_rate
+        self.min_miss_ratio = min_miss_ratio
+        self.noise = noise
+
+    def miss_ratio(self, l3_bytes):
+        """
+        Returns LLC miss ratio.
+
+        Parameters:
+            l3_bytes: LLC capacity available to the workload in bytes
+
+        Returns:
+            LLC miss ratio
+        """
+
+        hit = min(1.0, l3_bytes / self.footprint) if self.footprint else 1.0
+        return self.min_miss_ratio + (1.0 - self.min_miss_ratio) * (1.0 - hit)
+
+    def demand(self, l3_bytes):
+        """
+        Returns memory bandwidth demand.
+
+        Parameters:
+            l3_bytes: LLC capacity available to the workload in bytes
+
+        Returns:
+            memory bandwidth demand in bytes per second
+        """
+
+        return self.bandwidth * self.miss_ratio(l3_bytes)
+
+    def rates(self, l3_bytes, throttle=1.0, rng=None):
+        """
+        Returns event rates of the workload.
+
+        Parameters:
+            l3_bytes: LLC capacity available to the workload in bytes
+            throttle: part of bandwidth demand allowed by MBA (default 1.0)
+            rng: random.Random object used to apply noise (default None)
+
+        Returns:
+            WorkloadRates object
+        """
+
+        miss_ratio = self.miss_ratio(l3_bytes)
+        hit = (1.0 - miss_ratio) / (1.0 - self.min_miss_ratio) \
+            if self.min_miss_ratio < 1.0 else 0.0
+        bandwidth = self.bandwidth * miss_ratio * throttle
+        progress = (0.5 + 0.5 * hit) * (0.5 + 0.5 * throttle)
+        references = self.llc_ref_rate * progress
+
+        scale = 1.0
+        if self.noise and rng is not None:
+            scale = max(0.0, rng.gauss(1.0, self.noise))
+
+        return WorkloadRates(
+            occupancy=min(self.footprint, l3_bytes),
+            mbm_local=bandwidth * (1.0 - self.remote_ratio) * scale,
+            mbm_remote=bandwidth * self.remote_ratio * scale,
+            instructions=self.ipc * progress * self.frequency * scale,
+            cycles=self.frequency,
+            llc_references=references * scale,
+            llc_misses=references * miss_ratio * scale)
+
+
+class WorkloadMixin(object):
+    """
+    Event counters of cores and tasks of the simulated library.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def _tasks(self):
+        "Returns all tasks: cores and known processes."
+
+        tasks = [('core', core) for core in range(self.platform.num_cores)]
+        tasks.extend(task for task in self._counters if task[0] == 'pid')
+        return tasks
+
+    def _task_placement(self, task):
+        "Returns (L3 CAT id, MBA id, COS) of a task."
+
+        kind, task_id = task
+        if kind == 'core':
+            socket = self.platform.cores[task_id].socket
+            return socket, socket, self._core_cos[task_id]
+
+        return 0, 0, self._pid_cos.get(task_id, 0)
+
+    def _l3_mask(self, l3cat_id, cos):
+        "Returns ways used by a class of service (code and data)."
+
+        if not self.platform.l3ca:
+            return (1 << self.platform.l3_num_ways) - 1
+
+        if cos >= self._l3_num_classes():
+            cos = 0
+
+        data_mask, code_mask = self._l3ca[l3cat_id][cos]
+        return data_mask | code_mask
+
+    def _rates(self):
+        "Returns event rates of all tasks."
+
+        platform = self.platform
+        tasks = self._tasks()
+        placement = {task: self._task_placement(task) for task in tasks}
+        masks = {task: self._l3_mask(l3cat_id, cos)
+                 for task, (l3cat_id, _, cos) in placement.items()}
+
+        # LLC ways are shared equally between tasks using them
+        sharers = {}
+        for task, (l3cat_id, _, _) in placement.items():
+            mask = masks[task]
+            for way in range(platform.l3_num_ways):
+                if mask & (1 << way):
+                    key = (l3cat_id, way)
+                    sharers[key] = sharers.get(key, 0) + 1
+
+        l3_bytes = {}
+        for task, (l3cat_id, _, _) in placement.items():
+            mask = masks[task]
+            l3_bytes[task] = sum(platform.l3_way_size / sharers[(l3cat_id, way)]
+                                 for way in range(platform.l3_num_ways)
+                                 if mask & (1 << way))
+
+        throttle = self._throttle(placement, l3_bytes)
+
+        return {task: self._workloads.get(task, self.workload).rates(
+            l3_bytes[task], throttle[task], self._rng) for task in tasks}
+
+    def _throttle(self, placement, l3_bytes):
+        "Returns part of bandwidth demand allowed by MBA for each task."
+
+        throttle = dict.fromkeys(placement, 1.0)
+        if not self.platform.mba:
+            return throttle
+
+        if not self._mba_ctrl_on:
+            for task, (_, mba_id, cos) in placement.items():
+                if cos < self._mba_num_classes():
+                    throttle[task] = self._mba[mba_id][cos] / 100.0
+            return throttle
+
+        # MBps limit applies to all tasks of a class in an MBA domain
+        demand = {}
+        for task, (_, mba_id, cos) in placement.items():
+            workload = self._workloads.get(task, self.workload)
+            key = (mba_id, cos)
+            demand[key] = demand.get(key, 0.0) + \
+                workload.demand(l3_bytes[task])
+
+        for task, (_, mba_id, cos) in placement.items():
+            if cos >= self._mba_num_classes() or not demand[(mba_id, cos)]:
+                continue
+            limit = self._mba[mba_id][cos] * 1024.0 * 1024.0
+            throttle[task] = min(1.0, limit / demand[(mba_id, cos)])
+
+        return throttle
+
+    def _update(self):
+        "Advances counters of all tasks to the current time."
+
+        now = self._clock()
+        elapsed = max(0.0, now - self._timestamp)
+        self._timestamp = now
+
+        # counters are read only through monitoring groups
+        if not self._groups:
+            return
+
+        for task, rates in self._rates().items():
+            counters = self._counters.setdefault(task, self._zero())
+            counters[0] = rates.occupancy
+            for i in range(1, len(rates)):
+                counters[i] += rates[i] * elapsed
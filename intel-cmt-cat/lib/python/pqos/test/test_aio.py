@@ -0,0 +1,210 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for aio module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from pqos.aio import AsyncPqos
+from pqos.error import PqosErrorParam
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+
+
+def _record_thread(names, result=None):
+    "Builds a side effect which records the name of the calling thread."
+
+    def side_effect(*_args):
+        names.append(threading.current_thread().name)
+        return result
+
+    return side_effect
+
+
+@patch('pqos.aio.PqosMba')
+@patch('pqos.aio.PqosCatL2')
+@patch('pqos.aio.PqosCatL3')
+@patch('pqos.aio.PqosAlloc')
+@patch('pqos.aio.PqosMon')
+class TestAsyncPqos(unittest.IsolatedAsyncioTestCase):
+    "Tests for AsyncPqos class."
+
+    async def test_poll(self, pqos_mon_cls, *_):
+        "Tests coalescing of poll requests."
+
+        threads = []
+        pqos_mon = pqos_mon_cls.return_value
+        pqos_mon.poll.side_effect = _record_thread(threads)
+
+        group1, group2, group3 = MagicMock(), MagicMock(), MagicMock()
+
+        async with AsyncPqos() as apqos:
+            await asyncio.gather(apqos.poll([group1, group2]),
+                                 apqos.poll([group2, group3]))
+            await apqos.poll([group1])
+
+        self.assertEqual(pqos_mon.poll.call_count, 2)
+        first_groups = pqos_mon.poll.call_args_list[0][0][0]
+        self.assertEqual(first_groups, [group1, group2, group3])
+        pqos_mon.poll.assert_called_with([group1])
+
+        self.assertTrue(all(name.startswith('pqos-aio') for name in threads))
+
+    async def test_poll_error(self, pqos_mon_cls, *_):
+        "Tests that an error is raised in all coalesced requests."
+
+        pqos_mon = pqos_mon_cls.return_value
+        pqos_mon.poll.side_effect = PqosErrorParam('error')
+
+        async with AsyncPqos() as apqos:
+            results = await asyncio.gather(apqos.poll([MagicMock()]),
+                                           apqos.poll([MagicMock()]),
+                                           return_exceptions=True)
+
+        self.assertEqual(pqos_mon.poll.call_count, 1)
+        for result in results:
+            self.assertIsInstance(result, PqosErrorParam)
+
+    async def test_l3ca_set(self, _pqos_mon_cls, _pqos_alloc_cls,
+                            pqos_l3ca_cls, *_):
+        "Tests coalescing of L3 CAT requests."
+
+        pqos_l3ca = pqos_l3ca_cls.return_value
+
+        async with AsyncPqos() as apqos:
+            await asyncio.gather(
+                apqos.l3ca_set(0, [PqosCatL3.COS(1, 0xf),
+                                   PqosCatL3.COS(2, 0xf)]),
+                apqos.l3ca_set(0, [PqosCatL3.COS(1, 0x3)]),
+                apqos.l3ca_set(1, [PqosCatL3.COS(1, 0x1)]))
+
+        self.assertEqual(pqos_l3ca.set.call_count, 2)
+
+        socket, coses = pqos_l3ca.set.call_args_list[0][0]
+        self.assertEqual(socket, 0)
+        self.assertEqual([(cos.class_id, cos.mask) for cos in coses],
+                         [(1, 0x3), (2, 0xf)])
+
+        socket, coses = pqos_l3ca.set.call_args_list[1][0]
+        self.assertEqual(socket, 1)
+        self.assertEqual(len(coses), 1)
+
+    async def test_mba_set(self, *mocks):
+        "Tests coalescing of MBA requests."
+
+        pqos_mba = mocks[4].return_value
+        pqos_mba.set.side_effect = lambda socket, coses: [
+            PqosMba.COS(cos.class_id, 10 * cos.class_id) for cos in coses]
+
+        async with AsyncPqos() as apqos:
+            actual1, actual2 = await asyncio.gather(
+                apqos.mba_set(0, [PqosMba.COS(1, 50)]),
+                apqos.mba_set(0, [PqosMba.COS(2, 50), PqosMba.COS(3, 50)]))
+
+        pqos_mba.set.assert_called_once()
+        self.assertEqual([cos.mb_max for cos in actual1], [10])
+        self.assertEqual([cos.mb_max for cos in actual2], [20, 30])
+
+    async def test_assoc_set(self, _pqos_mon_cls, pqos_alloc_cls, *_):
+        "Tests coalescing of core association requests."
+
+        def assoc_set(core, _class_id):
+            if core == 3:
+                raise PqosErrorParam('error')
+
+        pqos_alloc = pqos_alloc_cls.return_value
+        pqos_alloc.assoc_set.side_effect = assoc_set
+
+        async with AsyncPqos() as apqos:
+            results = await asyncio.gather(apqos.assoc_set(1, 1),
+                                           apqos.assoc_set(2, 1),
+                                           apqos.assoc_set(1, 2),
+                                           apqos.assoc_set(3, 2),
+                                           return_exceptions=True)
+
+        self.assertEqual(results[:3], [None, None, None])
+        self.assertIsInstance(results[3], PqosErrorParam)
+        self.assertEqual([call[0] for call in
+                          pqos_alloc.assoc_set.call_args_list],
+                         [(1, 2), (2, 1), (3, 2)])
+
+    async def test_assoc_set_pid(self, _pqos_mon_cls, pqos_alloc_cls, *_):
+        "Tests process association requests."
+
+        pqos_alloc = pqos_alloc_cls.return_value
+        pqos_alloc.assoc_set_pid.side_effect = [None, PqosErrorParam('error')]
+
+        async with AsyncPqos() as apqos:
+            await apqos.assoc_set_pid(1000, 3)
+
+            with self.assertRaises(PqosErrorParam):
+                await apqos.assoc_set_pid(1001, 3)
+
+        self.assertEqual([call[0] for call in
+                          pqos_alloc.assoc_set_pid.call_args_list],
+                         [(1000, 3), (1001, 3)])
+
+    async def test_run(self, *_):
+        "Tests calling an arbitrary function on the executor thread."
+
+        async with AsyncPqos() as apqos:
+            name = await apqos.run(lambda: threading.current_thread().name)
+
+        self.assertTrue(name.startswith('pqos-aio'))
+
+    async def test_stream(self, *_):
+        "Tests asynchronous sample stream."
+
+        session = MagicMock()
+        values = np.zeros(2)
+        session.poll.return_value = values
+
+        samples = []
+        async with AsyncPqos() as apqos:
+            async for timestamp, sample in apqos.stream(session, 0.001):
+                samples.append((timestamp, sample))
+                values += 1
+                if len(samples) == 3:
+                    break
+
+        self.assertEqual([sample[1].tolist() for sample in samples],
+                         [[0, 0], [1, 1], [2, 2]])
+        self.assertLessEqual(samples[0][0], samples[1][0])
+        self.assertEqual(session.poll.call_count, 3)
@@ -38,13 +38,16 @@ from __future__ import absolute_import, division, print_function
 import ctypes
 import unittest
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
-from pqos.test.helper import ctypes_ref_set_uint, ctypes_build_array
+from pqos.test.helper import (
+    ctypes_ref_set_int, ctypes_ref_set_uint, ctypes_build_array
+)
 from pqos.allocation import PqosAlloc
+from pqos.error import PqosErrorBusy, PqosErrorPartial
 from pqos.native_struct import (
-    CPqosAllocConfig, CPqosCapability, CPqosCdpConfig, CPqosIordtConfig,
-    CPqosMbaConfig, CPqosFeatureConfig
+    CPqosAllocConfig, CPqosCapability, CPqosCdpConfig, CPqosConfig,
+    CPqosIordtConfig, CPqosMbaConfig, CPqosFeatureConfig
 )
 
 class TestPqosAlloc(unittest.TestCase):
@@ -83,6 +86,110 @@ class TestPqosAlloc(unittest.TestCase):
         lib.pqos_alloc_assoc_get.assert_called_once()
         self.assertEqual(class_id, 5)
 
+    @patch('pqos.allocation.Pqos')
+    def test_assoc_set_many(self, pqos_mock_cls):
+        "Tests assoc_set_many() method."
+
+        current = {0: 0, 1: 2, 2: 2, 3: 1}
+
+        def pqos_alloc_assoc_get_m(core, class_id_ref):
+            "Mock pqos_alloc_assoc_get()."
+
+            ctypes_ref_set_uint(class_id_ref, current[core])
+            return 0
+
+        def pqos_alloc_release_m(core_array, core_num):
+            "Mock pqos_alloc_release()."
+
+            self.assertEqual(core_array[:core_num], [1, 3])
+            return 0
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_inter_get = MagicMock(return_value=0)
+        lib.pqos_alloc_assoc_get = MagicMock(side_effect=pqos_alloc_assoc_get_m)
+        lib.pqos_alloc_assoc_set = MagicMock(return_value=0)
+        lib.pqos_alloc_release = MagicMock(side_effect=pqos_alloc_release_m)
+
+        alloc = PqosAlloc()
+        changed = alloc.assoc_set_many({0: 2, 1: 0, 2: 2, 3: 0})
+
+        self.assertEqual(changed, {0: 2, 1: 0, 3: 0})
+        self.assertEqual(lib.pqos_alloc_assoc_get.call_count, 4)
+        lib.pqos_alloc_assoc_set.assert_called_once_with(0, 2)
+        lib.pqos_alloc_release.assert_called_once()
+
+    @patch('pqos.allocation.Pqos')
+    def test_assoc_set_many_current(self, pqos_mock_cls):
+        "Tests assoc_set_many() method with known associations."
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_inter_get = MagicMock(return_value=0)
+        lib.pqos_alloc_assoc_get = MagicMock(return_value=0)
+        lib.pqos_alloc_assoc_set = MagicMock(return_value=0)
+
+        alloc = PqosAlloc()
+        changed = alloc.assoc_set_many({4: 1, 5: 3, 6: 3},
+                                       current={4: 1, 5: 3, 6: 0})
+
+        self.assertEqual(changed, {6: 3})
+        lib.pqos_alloc_assoc_get.assert_not_called()
+        lib.pqos_alloc_assoc_set.assert_called_once_with(6, 3)
+
+    @patch('pqos.allocation.Pqos')
+    def test_assoc_set_many_partial(self, pqos_mock_cls):
+        "Tests assoc_set_many() method reporting cores changed before an error."
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_inter_get = MagicMock(return_value=0)
+        lib.pqos_alloc_release = MagicMock(return_value=0)
+        lib.pqos_alloc_assoc_set = MagicMock(
+            side_effect=lambda core, class_id: 1 if core == 5 else 0)
+
+        alloc = PqosAlloc()
+        with self.assertRaises(PqosErrorPartial) as context:
+            alloc.assoc_set_many({1: 0, 4: 2, 5: 2, 6: 3},
+                                 current={1: 2, 4: 0, 5: 0, 6: 0})
+
+        self.assertEqual(context.exception.changed, {1: 0, 4: 2})
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(lib.pqos_alloc_assoc_set.call_count, 2)
+
+    @patch('pqos.allocation.ResctrlCpus')
+    @patch('pqos.allocation.Pqos')
+    def test_assoc_set_many_os(self, pqos_mock_cls, resctrl_mock_cls):
+        "Tests assoc_set_many() method with the OS interface."
+
+        def pqos_inter_get_m(interface_ref):
+            "Mock pqos_inter_get()."
+
+            ctypes_ref_set_int(interface_ref, CPqosConfig.PQOS_INTER_OS)
+            return 0
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_inter_get = MagicMock(side_effect=pqos_inter_get_m)
+        resctrl = resctrl_mock_cls.return_value
+        resctrl.assoc_get.return_value = {0: 0, 1: 2, 2: 2, 3: 1, 4: 1}
+
+        alloc = PqosAlloc()
+        changed = alloc.assoc_set_many({0: 2, 1: 0, 2: 2, 3: 2, 4: 0})
+
+        self.assertEqual(changed, {0: 2, 1: 0, 3: 2, 4: 0})
+        resctrl.assoc_get.assert_called_once_with()
+        self.assertEqual(resctrl.assoc_set.call_args_list,
+                         [call(0, [1, 4]), call(2, [0, 3])])
+        lib.pqos_alloc_assoc_get.assert_not_called()
+        lib.pqos_alloc_assoc_set.assert_not_called()
+        lib.pqos_alloc_release.assert_not_called()
+
+        # the first class of service is written, the second one fails
+        resctrl.assoc_set.side_effect = [None, PqosErrorBusy('busy', 7)]
+        with self.assertRaises(PqosErrorPartial) as context:
+            alloc.assoc_set_many({5: 1, 6: 3}, current={5: 0, 6: 0})
+
+        self.assertEqual(context.exception.changed, {5: 1})
+        self.assertEqual(context.exception.code, 7)
+        self.assertIsInstance(context.exception.__cause__, PqosErrorBusy)
+
     @patch('pqos.allocation.Pqos')
     def test_assoc_set_pid(self, pqos_mock_cls):
         "Tests assoc_set_pid() method."
@@ -225,12 +332,10 @@ class TestPqosAlloc(unittest.TestCase):
 
         lib.pqos_alloc_release_pid.assert_called_once()
 
-    @patch('pqos.allocation.Pqos')
-    def test_get_pids(self, pqos_mock_cls):
-        "Tests get_pids() method."
+    def _mock_get_pid_assoc(self, lib, pids):
+        "Mocks pqos_pid_get_pid_assoc() returning given process IDs."
 
-        pids_uint = [ctypes.c_uint(pid) for pid in [1000, 1500, 3000, 5600]]
-        pid_array = ctypes_build_array(pids_uint)
+        pid_array = ctypes_build_array([ctypes.c_uint(pid) for pid in pids])
 
         def pqos_pid_get_pid_assoc_m(class_id, count_ref):
             "Mock pqos_pid_get_pid_assoc()."
@@ -240,22 +345,53 @@ class TestPqosAlloc(unittest.TestCase):
             ctypes_ref_set_uint(count_ref, len(pid_array))
             return ctypes.cast(pid_array, ctypes.POINTER(ctypes.c_uint))
 
-        lib = pqos_mock_cls.return_value.lib
         func_mock = MagicMock(side_effect=pqos_pid_get_pid_assoc_m)
         lib.pqos_pid_get_pid_assoc = func_mock
 
+        return pid_array
+
+    @patch('pqos.allocation.Pqos')
+    def test_get_pids(self, pqos_mock_cls):
+        "Tests get_pids() method."
+
+        lib = pqos_mock_cls.return_value.lib
+        pid_array = self._mock_get_pid_assoc(lib, [1000, 1500, 3000, 5600])
+
         alloc = PqosAlloc()
 
-        with patch('pqos.allocation.free_memory'):
+        with patch('pqos.allocation.free_memory') as free_memory_mock:
             pids = alloc.get_pids(7)
 
         lib.pqos_pid_get_pid_assoc.assert_called_once()
 
-        self.assertEqual(len(pids), 4)
-        self.assertEqual(pids[0], 1000)
-        self.assertEqual(pids[1], 1500)
-        self.assertEqual(pids[2], 3000)
-        self.assertEqual(pids[3], 5600)
+        self.assertEqual(pids, [1000, 1500, 3000, 5600])
+        self.assertIsInstance(pids, list)
+        free_memory_mock.assert_called_once_with(ctypes.addressof(pid_array))
+
+    @patch('pqos.allocation.Pqos')
+    def test_get_pids_buffer(self, pqos_mock_cls):
+        "Tests get_pids_buffer() method."
+
+        lib = pqos_mock_cls.return_value.lib
+        pid_array = self._mock_get_pid_assoc(lib, [1000, 1500, 3000, 5600])
+
+        alloc = PqosAlloc()
+
+        with patch('pqos.allocation.free_memory') as free_memory_mock:
+            pids = alloc.get_pids_buffer(7)
+
+            lib.pqos_pid_get_pid_assoc.assert_called_once()
+
+            self.assertEqual(len(pids), 4)
+            self.assertEqual(pids[0], 1000)
+            self.assertEqual(pids[1], 1500)
+            self.assertEqual(pids[2], 3000)
+            self.assertEqual(pids[3], 5600)
+
+            free_memory_mock.assert_not_called()
+            pids.release()
+            free_memory_mock.assert_called_once_with(
+                ctypes.addressof(pid_array))
 
     @patch('pqos.allocation.Pqos')
     def test_reset(self, pqos_mock_cls):
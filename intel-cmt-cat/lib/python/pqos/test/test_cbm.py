@@ -0,0 +1,246 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for cbm module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from pqos import Pqos
+from pqos.cbm import CbmSolver
+from pqos.sim import SimulatedPlatform, SimulatedPqos
+
+
+def _ways(mask):
+    "Returns the number of ways in a mask."
+
+    return bin(mask).count('1')
+
+
+def _is_contiguous(mask):
+    "Returns True if a mask is contiguous."
+
+    return '01' not in bin(mask)[2:].rstrip('0')
+
+
+class TestCbmSolver(unittest.TestCase):
+    "Tests for CbmSolver class."
+
+    def test_exclusive(self):
+        "Tests that pools get contiguous, non-overlapping masks."
+
+        solver = CbmSolver(11)
+        solver.add('db', min_ways=4, exclusive=True)
+        solver.add('web', min_ways=2, max_ways=3)
+        solver.add('batch', min_ways=1, max_ways=2)
+
+        masks = solver.solve()
+
+        self.assertEqual(masks['db'] & (masks['web'] | masks['batch']), 0)
+        self.assertEqual(masks['web'] & masks['batch'], 0)
+        self.assertGreaterEqual(_ways(masks['db']), 4)
+        self.assertIn(_ways(masks['web']), [2, 3])
+        self.assertIn(_ways(masks['batch']), [1, 2])
+        for mask in masks.values():
+            self.assertTrue(_is_contiguous(mask))
+
+        # unbounded pool takes all ways left
+        self.assertEqual(masks['db'] | masks['web'] | masks['batch'], 0x7ff)
+
+    def test_share(self):
+        "Tests that shareable pools share ways only if needed."
+
+        solver = CbmSolver(8)
+        solver.add('a', min_ways=4, max_ways=4, exclusive=True)
+        solver.add('b', min_ways=3, max_ways=3)
+        solver.add('c', min_ways=3, max_ways=3)
+
+        masks = solver.solve()
+
+        self.assertEqual(masks['a'] & (masks['b'] | masks['c']), 0)
+        self.assertEqual(_ways(masks['b'] & masks['c']), 2)
+
+    def test_groups(self):
+        "Tests that pools of different isolation groups do not share ways."
+
+        solver = CbmSolver(6)
+        solver.add('a1', min_ways=2, max_ways=2, group='a')
+        solver.add('a2', min_ways=2, max_ways=2, group='a')
+        solver.add('b1', min_ways=3, max_ways=3, group='b')
+        solver.add('b2', min_ways=2, max_ways=2, group='b')
+
+        masks = solver.solve()
+
+        self.assertEqual((masks['a1'] | masks['a2']) &
+                         (masks['b1'] | masks['b2']), 0)
+
+        solver.add('c', min_ways=2, group='c')
+        with self.assertRaises(ValueError):
+            solver.solve()
+
+        solver.remove('c')
+        self.assertEqual(solver.solve(), masks)
+
+    def test_min_cbm_bits(self):
+        "Tests that masks have at least minimum number of bits set."
+
+        solver = CbmSolver(12, min_cbm_bits=2)
+        solver.add('a', max_ways=2)
+        solver.add('b', max_ways=5)
+
+        masks = solver.solve()
+
+        self.assertEqual(_ways(masks['a']), 2)
+        self.assertEqual(_ways(masks['b']), 5)
+
+        with self.assertRaises(ValueError):
+            solver.add('c', max_ways=1)
+
+    def test_non_contiguous(self):
+        "Tests that fragmented free ways are used if supported."
+
+        for non_contiguous in [False, True]:
+            solver = CbmSolver(6, non_contiguous=non_contiguous)
+            solver.add('a', min_ways=2, max_ways=2, exclusive=True)
+            solver.add('b', min_ways=1, max_ways=1, exclusive=True)
+            solver.add('c', min_ways=3, max_ways=3, exclusive=True)
+
+            masks = solver.solve()
+
+            self.assertEqual(masks['a'] | masks['b'] | masks['c'], 0x3f)
+
+        solver = CbmSolver(6, non_contiguous=True)
+        solver.add('a', min_ways=1, max_ways=1)
+        solver.add('b', min_ways=4, max_ways=4)
+        solver.add('c', min_ways=1, max_ways=1)
+
+        masks = solver.solve()
+        self.assertEqual(masks['a'] | masks['b'] | masks['c'], 0x3f)
+        self.assertEqual(masks['a'] & masks['b'], 0)
+
+    def test_bytes(self):
+        "Tests sizes given in bytes."
+
+        solver = CbmSolver(12, way_size=1024)
+        solver.add('a', min_bytes=2500, max_bytes=4000)
+
+        self.assertEqual(_ways(solver.solve()['a']), 3)
+
+        with self.assertRaises(ValueError):
+            CbmSolver(12).add('a', min_bytes=1024)
+
+    def test_cdp(self):
+        "Tests separate code and data masks."
+
+        solver = CbmSolver(10)
+        solver.add('a', min_ways=4, max_ways=4, exclusive=True,
+                   code={'min_ways': 2, 'max_ways': 2})
+        solver.add('b', min_ways=4)
+
+        masks = solver.solve()
+        code, data = masks['a']
+
+        self.assertEqual((_ways(code), _ways(data)), (2, 4))
+        self.assertEqual((code | data) & masks['b'], 0)
+
+    def test_infeasible(self):
+        "Tests requirements exceeding cache size."
+
+        solver = CbmSolver(4)
+        solver.add('a', min_ways=3, exclusive=True)
+        solver.add('b', min_ways=2)
+
+        with self.assertRaises(ValueError):
+            solver.solve()
+
+        with self.assertRaises(ValueError):
+            solver.add('a', min_ways=1)
+
+        with self.assertRaises(ValueError):
+            CbmSolver(4).add('c', min_ways=3, max_ways=2)
+
+    def test_infeasible_fast(self):
+        "Tests that infeasible requirements are rejected without a search."
+
+        solver = CbmSolver(19)
+        for pool in range(10):
+            solver.add(pool, min_ways=2, exclusive=True)
+
+        start = time.monotonic()
+        with self.assertRaises(ValueError):
+            solver.solve()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        # pools of a group share ways with each other only
+        solver = CbmSolver(6)
+        solver.add('a', min_ways=4, group=1)
+        solver.add('b', min_ways=3, group=1)
+        solver.add('c', min_ways=2, group=2)
+        self.assertEqual(len(solver.solve()), 3)
+
+        solver.add('d', min_ways=1, exclusive=True)
+        with self.assertRaises(ValueError):
+            solver.solve()
+
+    def test_search_limit(self):
+        "Tests that the search stops when no placement is found in time."
+
+        solver = CbmSolver(8)
+        for pool in range(4):
+            solver.add(pool, min_ways=2, exclusive=True)
+
+        with patch('pqos.cbm._MAX_NODES', 2):
+            with self.assertRaises(ValueError):
+                solver.solve()
+
+    def test_from_capability(self):
+        "Tests creating a solver from platform capabilities."
+
+        platform = SimulatedPlatform(l3_num_ways=20, l2_num_ways=8)
+        with open(os.devnull, 'w', encoding='utf-8') as log_file:
+            SimulatedPqos(platform).install()
+            Pqos().init('MSR', log_file=log_file)
+            try:
+                l3_solver = CbmSolver.from_capability('l3ca')
+                l2_solver = CbmSolver.from_capability('l2ca')
+            finally:
+                SimulatedPqos.uninstall()
+
+        self.assertEqual(l3_solver.num_ways, 20)
+        self.assertEqual(l3_solver.way_size, 2 * 1024 * 1024)
+        self.assertEqual(l2_solver.num_ways, 8)
+        self.assertFalse(l2_solver.non_contiguous)
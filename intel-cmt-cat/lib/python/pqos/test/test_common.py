@@ -0,0 +1,152 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for common module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pqos.common import PqosBuffer, free_memory
+
+
+def _build_buffer(items, ctype=ctypes.c_uint):
+    "Builds a buffer over a ctypes array and a mock free function."
+
+    array = (ctype * len(items))(*items)
+    free = MagicMock()
+    buf = PqosBuffer(ctypes.cast(array, ctypes.POINTER(ctype)), len(items),
+                     ctype, free)
+    return array, buf, free
+
+
+class TestPqosBuffer(unittest.TestCase):
+    "Tests for PqosBuffer class."
+
+    def test_sequence(self):
+        "Tests element access."
+
+        _array, buf, _free = _build_buffer([7, 2, 3, 5])
+
+        self.assertEqual(len(buf), 4)
+        self.assertEqual(buf[0], 7)
+        self.assertEqual(buf[-1], 5)
+        self.assertEqual(list(buf), [7, 2, 3, 5])
+        self.assertEqual(buf.tolist(), [7, 2, 3, 5])
+        self.assertEqual(buf, [7, 2, 3, 5])
+        self.assertIn(3, buf)
+
+    def test_zero_copy(self):
+        "Tests that the buffer shares memory with the array."
+
+        array, buf, _free = _build_buffer([1, 2], ctypes.c_uint64)
+
+        array[1] = 1 << 40
+        self.assertEqual(buf[1], 1 << 40)
+
+    def test_release(self):
+        "Tests that memory is freed exactly once."
+
+        array, buf, free = _build_buffer([1, 2, 3])
+
+        free.assert_not_called()
+
+        with buf:
+            pass
+
+        free.assert_called_once_with(ctypes.addressof(array))
+        self.assertEqual(len(buf), 0)
+
+        buf.release()
+        free.assert_called_once()
+
+    def test_garbage_collected(self):
+        "Tests that memory is freed when the buffer is garbage-collected."
+
+        _array, buf, free = _build_buffer([1, 2, 3])
+        self.assertFalse(free.called)
+
+        del buf
+
+        free.assert_called_once()
+
+    def test_as_array(self):
+        "Tests NumPy view outliving the buffer."
+
+        array, buf, free = _build_buffer([1, 2, 3])
+
+        values = buf.as_array()
+        buf.release()
+
+        free.assert_not_called()
+        self.assertEqual(values.tolist(), [1, 2, 3])
+        self.assertFalse(values.flags.writeable)
+
+        array[0] = 9
+        self.assertEqual(values[0], 9)
+
+        del values
+        free.assert_called_once()
+
+    def test_null(self):
+        "Tests NULL pointer."
+
+        free = MagicMock()
+        buf = PqosBuffer(ctypes.POINTER(ctypes.c_uint)(), 0, ctypes.c_uint,
+                         free)
+
+        self.assertEqual(len(buf), 0)
+        self.assertEqual(buf.tolist(), [])
+        self.assertEqual(buf.as_array().size, 0)
+
+        buf.release()
+        free.assert_not_called()
+
+
+class TestFreeMemory(unittest.TestCase):
+    "Tests for free_memory() function."
+
+    @patch('pqos.common._LIBC_FREE', [])
+    @patch('ctypes.util.find_library', return_value='libc.so.6')
+    @patch('ctypes.CDLL')
+    def test_libc_loaded_once(self, cdll_mock, find_library_mock):
+        "Tests that libc is looked up and loaded only once."
+
+        free_memory(0x1000)
+        free_memory(0x2000)
+
+        find_library_mock.assert_called_once_with('c')
+        cdll_mock.assert_called_once_with('libc.so.6')
+        self.assertEqual(cdll_mock.return_value.free.call_count, 2)
@@ -74,8 +74,10 @@ class PqosCpuInfoMockBuilder(object):
     def build_core_infos(self):  # pylint: disable=no-self-use
         "Builds core information."
 
-        core_info1 = CPqosCoreInfo(lcore=0, socket=0, l3_id=0, l2_id=0, l3cat_id=0, mba_id=0)
-        core_info2 = CPqosCoreInfo(lcore=1, socket=0, l3_id=0, l2_id=1, l3cat_id=0, mba_id=0)
+        core_info1 = CPqosCoreInfo(lcore=0, socket=0, l3_id=0, l2_id=0, l3cat_id=0, mba_id=0,
+                                   numa=0)
+        core_info2 = CPqosCoreInfo(lcore=1, socket=0, l3_id=0, l2_id=1, l3cat_id=0, mba_id=0,
+                                   numa=1)
         return [core_info1, core_info2]
 
     def build(self):
@@ -301,6 +303,34 @@ class TestPqosCpuInfo(unittest.TestCase):
 
         lib.pqos_cpu_get_core_info.assert_called_once()
 
+    @patch('pqos.cpuinfo.Pqos')
+    def test_get_cores_info(self, pqos_mock_cls):
+        "Tests get_cores_info() method."
+
+        builder = PqosCpuInfoMockBuilder()
+        p_cpu = builder.build()
+
+        def pqos_cap_get_mock(_cap_ref, cpu_ref):
+            "Mock pqos_cap_get()."
+
+            ctypes.memmove(cpu_ref, ctypes.addressof(p_cpu),
+                           ctypes.sizeof(p_cpu))
+            return 0
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_cap_get = MagicMock(side_effect=pqos_cap_get_mock)
+
+        cpu = PqosCpuInfo()
+        coreinfos = cpu.get_cores_info()
+
+        self.assertEqual(len(coreinfos), 2)
+        self.assertEqual(coreinfos[0].core, 0)
+        self.assertEqual(coreinfos[1].core, 1)
+        self.assertEqual(coreinfos[1].l2_id, 1)
+        self.assertEqual(coreinfos[1].numa, 1)
+
+        lib.pqos_cpu_get_core_info.assert_not_called()
+
     @patch('pqos.cpuinfo.Pqos')
     def test_get_one_core(self, pqos_mock_cls):
         "Tests get_one_core() method."
@@ -0,0 +1,116 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for fanout module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import threading
+import unittest
+
+from pqos.error import PqosError, PqosErrorParam
+from pqos.fanout import PqosDomainError, apply_domains
+
+
+class TestApplyDomains(unittest.TestCase):
+    "Tests for apply_domains() function."
+
+    def test_serial(self):
+        "Tests serial apply in the calling thread."
+
+        threads = set()
+
+        def func(domain):
+            threads.add(threading.current_thread())
+            return domain * 2
+
+        self.assertEqual(apply_domains(func, [3, 1, 2]), {3: 6, 1: 2, 2: 4})
+        self.assertEqual(threads, {threading.current_thread()})
+
+    def test_parallel(self):
+        "Tests that domains are applied by concurrent workers."
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def func(domain):
+            barrier.wait()
+            return domain
+
+        result = apply_domains(func, [0, 1, 2], max_workers=8)
+
+        self.assertEqual(result, {0: 0, 1: 1, 2: 2})
+
+    def test_bounded(self):
+        "Tests that concurrency is bounded by max_workers."
+
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def func(_domain):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            threading.Event().wait(0.005)
+            with lock:
+                active[0] -= 1
+
+        apply_domains(func, range(12), max_workers=3)
+
+        self.assertLessEqual(active[1], 3)
+
+    def test_errors(self):
+        "Tests that errors of all domains are aggregated."
+
+        calls = []
+
+        def func(domain):
+            calls.append(domain)
+            if domain % 2:
+                raise PqosErrorParam(f'domain {domain}', 2)
+
+        for max_workers in [1, 4]:
+            calls.clear()
+            with self.assertRaises(PqosDomainError) as context:
+                apply_domains(func, [0, 1, 2, 3], max_workers)
+
+            self.assertEqual(sorted(calls), [0, 1, 2, 3])
+            self.assertEqual(list(context.exception.errors), [1, 3])
+            self.assertEqual(context.exception.code, 2)
+            self.assertIsInstance(context.exception, PqosError)
+            self.assertIn('1: domain 1; 3: domain 3',
+                          context.exception.args[0])
+
+    def test_empty(self):
+        "Tests applying no domains."
+
+        self.assertEqual(apply_domains(lambda domain: domain, [], 4), {})
@@ -0,0 +1,120 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for metrics module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import math
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pqos.metrics import DerivedMetrics, METRICS_DTYPE
+from pqos.sampler import Samples
+from pqos.session import EVENT_VALUES_DTYPE
+
+
+class TestDerivedMetrics(unittest.TestCase):
+    "Tests for DerivedMetrics class."
+
+    @patch('pqos.metrics.PqosCpuInfo')
+    def test_init(self, pqos_cpuinfo_cls):
+        "Tests reading L3 cache size from CPU information."
+
+        pqos_cpuinfo_cls.return_value.get_cache_info.return_value.total_size = 1024
+
+        metrics = DerivedMetrics()
+
+        self.assertEqual(metrics.l3_size, 1024)
+        pqos_cpuinfo_cls.return_value.get_cache_info.assert_called_once_with(3)
+
+    def test_intervals(self):
+        "Tests intervals() method."
+
+        timestamps = np.array([1000000000, 1500000000, 2500000000])
+
+        intervals = DerivedMetrics.intervals(timestamps)
+        self.assertTrue(math.isnan(intervals[0]))
+        self.assertEqual(intervals[1:].tolist(), [0.5, 1.0])
+
+        intervals = DerivedMetrics.intervals(timestamps, 0)
+        self.assertEqual(intervals.tolist(), [1.0, 0.5, 1.0])
+
+        self.assertEqual(DerivedMetrics.intervals([]).shape, (0,))
+
+    def test_compute(self):
+        "Tests compute() method."
+
+        mega = 1024 * 1024
+        timestamps = np.array([1000000000, 1500000000])
+        values = np.zeros((2, 2), dtype=EVENT_VALUES_DTYPE)
+        values['mbm_local_delta'] = [[mega, 0], [mega, 2 * mega]]
+        values['mbm_total_delta'] = [[3 * mega, 0], [2 * mega, mega]]
+        values['llc'] = [[256, 512], [1024, 0]]
+        values['ipc_retired_delta'] = [[200, 0], [300, 1000]]
+        values['ipc_unhalted_delta'] = [[100, 0], [200, 500]]
+        values['llc_misses_delta'] = [[10, 0], [5, 50]]
+        values['llc_references_delta'] = [[100, 0], [20, 100]]
+
+        metrics = DerivedMetrics(l3_size=1024).compute(timestamps, values,
+                                                       prev_timestamp=0)
+
+        self.assertEqual(metrics.dtype, METRICS_DTYPE)
+        self.assertEqual(metrics.shape, (2, 2))
+        self.assertEqual(metrics['mbm_local'].tolist(), [[1.0, 0.0], [2.0, 4.0]])
+        self.assertEqual(metrics['mbm_total'].tolist(), [[3.0, 0.0], [4.0, 2.0]])
+        self.assertEqual(metrics['mbm_remote'].tolist(), [[2.0, 0.0], [2.0, 0.0]])
+        self.assertEqual(metrics['llc'].tolist(), [[0.25, 0.5], [1.0, 0.0]])
+        self.assertEqual(metrics['ipc'][1].tolist(), [1.5, 2.0])
+        self.assertEqual(metrics['llc_miss_ratio'][1].tolist(), [0.25, 0.5])
+        self.assertEqual(metrics['llc_mpki'][1].tolist(),
+                         [5 * 1000 / 300, 50.0])
+
+        # no instructions/references counted
+        self.assertTrue(math.isnan(metrics['ipc'][0][1]))
+        self.assertTrue(math.isnan(metrics['llc_miss_ratio'][0][1]))
+        self.assertTrue(math.isnan(metrics['llc_mpki'][0][1]))
+
+    def test_compute_samples(self):
+        "Tests compute_samples() without preceding timestamp."
+
+        values = np.zeros((3, 4), dtype=EVENT_VALUES_DTYPE)
+        values['mbm_local_delta'] = 1024 * 1024
+        samples = Samples(np.array([0, 1000000000, 2000000000]), values)
+
+        metrics = DerivedMetrics(l3_size=1).compute_samples(samples)
+
+        self.assertTrue(np.all(np.isnan(metrics['mbm_local'][0])))
+        self.assertTrue(np.all(metrics['mbm_local'][1:] == 1.0))
@@ -0,0 +1,248 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for multiplex module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pqos.error import PqosError, PqosErrorResource
+from pqos.multiplex import GroupEstimate, MonitoringMultiplexer
+from pqos.native_struct import CPqosEventValues
+
+
+class Clock(object):
+    "Fake monotonic clock."
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        "Returns current time."
+
+        return self.now
+
+
+class TestGroupEstimate(unittest.TestCase):
+    "Tests for GroupEstimate class."
+
+    def test_update(self):
+        "Tests update() method and derived estimates."
+
+        estimate = GroupEstimate(0.0)
+        values = CPqosEventValues(llc=4096, mbm_local_delta=1000,
+                                  mbm_total_delta=3000, mbm_remote_delta=2000)
+
+        estimate.update(values, 1.0, 2.0)
+        estimate.update(values, 5.0, 7.0)
+
+        self.assertEqual(estimate.num_slices, 2)
+        self.assertEqual(estimate.observed_time, 3.0)
+        self.assertEqual(estimate.last_update, 7.0)
+        self.assertEqual(estimate.mbm_total_bytes, 6000)
+        self.assertEqual(estimate.mbm_local_rate, 500.0)
+        self.assertEqual(estimate.mbm_total_rate, 1500.0)
+        self.assertEqual(estimate.mbm_remote_rate, 1000.0)
+        self.assertEqual(estimate.llc, 4096)
+        self.assertAlmostEqual(estimate.coverage(10.0), 0.3)
+        self.assertAlmostEqual(estimate.scaled_mbm_total_bytes(12.0), 24000)
+
+    def test_not_monitored(self):
+        "Tests estimates of a group that has not been monitored yet."
+
+        estimate = GroupEstimate(5.0)
+
+        self.assertEqual(estimate.coverage(5.0), 0.0)
+        self.assertEqual(estimate.coverage(8.0), 0.0)
+        self.assertIsNone(estimate.scaled_mbm_total_bytes(8.0))
+        self.assertIsNone(estimate.mbm_local_rate)
+
+
+class TestMonitoringMultiplexer(unittest.TestCase):
+    "Tests for MonitoringMultiplexer class."
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = patch('pqos.multiplex.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _start_mock(ids, _events):
+        "Mock PqosMon.start_cores() and PqosMon.start_pids()."
+
+        group = MagicMock()
+        group.ids = ids
+        group.values = CPqosEventValues(llc=ids[0], mbm_local_delta=10 * ids[0],
+                                        mbm_total_delta=20 * ids[0])
+        return group
+
+    @patch('pqos.multiplex.PqosCap')
+    @patch('pqos.multiplex.PqosMon')
+    def test_num_slots(self, _pqos_mon_cls, pqos_cap_cls):
+        "Tests number of slots derived from monitoring capability."
+
+        pqos_cap_cls.return_value.get_type.return_value.max_rmid = 4
+        mux = MonitoringMultiplexer(['lmem_bw'])
+        self.assertEqual(mux.num_slots, 3)
+        pqos_cap_cls.return_value.get_type.assert_called_once_with('mon')
+
+        pqos_cap_cls.return_value.get_type.return_value.max_rmid = 1
+        with self.assertRaises(PqosErrorResource):
+            MonitoringMultiplexer(['lmem_bw'])
+
+    @patch('pqos.multiplex.PqosMon')
+    def test_tick(self, pqos_mon_cls):
+        "Tests time-slicing of groups across RMIDs."
+
+        mon = pqos_mon_cls.return_value
+        mon.start_cores.side_effect = self._start_mock
+        mon.start_pids.side_effect = self._start_mock
+
+        mux = MonitoringMultiplexer(['lmem_bw', 'tmem_bw'], num_slots=2)
+        mux.add_cores('a', [1])
+        mux.add_cores('b', [2])
+        mux.add_pids('c', [3])
+
+        mux.tick()
+        started = [call[0][0] for call in mon.start_cores.call_args_list]
+        self.assertEqual(started, [[1], [2]])
+        self.assertEqual(mon.poll.call_count, 1)
+
+        self.clock.now += 0.5
+        mux.tick()
+        self.assertEqual(mon.start_pids.call_args_list[0][0][0], [3])
+        self.assertEqual(mon.start_cores.call_args_list[-1][0][0], [1])
+        self.assertEqual(mux.num_rounds, 1)
+
+        estimate_b = mux.get_estimate('b')
+        self.assertEqual(estimate_b.num_slices, 1)
+        self.assertEqual(estimate_b.mbm_local_rate, 40.0)
+        self.assertEqual(estimate_b.mbm_total_rate, 80.0)
+        self.assertEqual(estimate_b.llc, 2)
+        self.assertAlmostEqual(estimate_b.coverage(self.clock.now), 1.0)
+        self.assertEqual(mux.get_estimate('c').num_slices, 0)
+
+        self.clock.now += 0.5
+        mux.stop()
+        self.assertEqual(mux.get_estimate('a').num_slices, 2)
+        self.assertEqual(mux.get_estimate('c').num_slices, 1)
+        self.assertAlmostEqual(mux.get_estimate('c').coverage(self.clock.now),
+                               0.5)
+
+    @patch('pqos.multiplex.PqosMon')
+    def test_tick_out_of_rmids(self, pqos_mon_cls):
+        "Tests if number of slots shrinks when RMIDs run out."
+
+        mon = pqos_mon_cls.return_value
+        mon.start_cores.side_effect = [self._start_mock([1], None),
+                                       PqosErrorResource('no RMID'),
+                                       self._start_mock([2], None)]
+
+        mux = MonitoringMultiplexer(['l3_occup'], num_slots=8)
+        mux.add_cores('a', [1])
+        mux.add_cores('b', [2])
+        mux.add_cores('c', [3])
+
+        mux.tick()
+        self.assertEqual(mux.num_slots, 1)
+
+        mux.tick()
+        self.assertEqual(mon.start_cores.call_args_list[-1][0][0], [2])
+
+    @patch('pqos.multiplex.PqosMon')
+    def test_tick_no_rmids(self, pqos_mon_cls):
+        "Tests tick() when no group can be started."
+
+        mon = pqos_mon_cls.return_value
+        mon.start_cores.side_effect = PqosErrorResource('no RMID')
+
+        mux = MonitoringMultiplexer(['l3_occup'], num_slots=2)
+        mux.add_cores('a', [1])
+
+        with self.assertRaises(PqosErrorResource):
+            mux.tick()
+
+    @patch('pqos.multiplex.PqosMon')
+    def test_tick_start_error(self, pqos_mon_cls):
+        "Tests if a group failing to start is skipped."
+
+        mon = pqos_mon_cls.return_value
+        mon.start_cores.side_effect = [self._start_mock([1], None),
+                                       PqosError('invalid core'),
+                                       self._start_mock([3], None),
+                                       PqosError('invalid core')]
+
+        mux = MonitoringMultiplexer(['l3_occup'], num_slots=2)
+        mux.add_cores('a', [1])
+        mux.add_cores('b', [2])
+        mux.add_cores('c', [3])
+
+        mux.tick()
+        self.assertEqual(len(mon.poll.call_args_list[0][0][0]), 1)
+        self.assertIsInstance(mux.get_estimate('b').error, PqosError)
+        self.assertEqual(mux.num_slots, 2)
+
+        # round-robin moves past the failed group
+        self.clock.now += 1.0
+        mux.tick()
+        started = [call[0][0] for call in mon.start_cores.call_args_list]
+        self.assertEqual(started, [[1], [2], [3], [1]])
+        self.assertEqual(mux.num_rounds, 1)
+        self.assertEqual(mux.get_estimate('a').num_slices, 1)
+        self.assertIsInstance(mux.get_estimate('a').error, PqosError)
+
+    @patch('pqos.multiplex.PqosMon')
+    def test_remove(self, pqos_mon_cls):
+        "Tests removing a group being monitored."
+
+        mon = pqos_mon_cls.return_value
+        mon.start_cores.side_effect = self._start_mock
+
+        mux = MonitoringMultiplexer(['l3_occup'], num_slots=2)
+        mux.add_cores('a', [1])
+        mux.add_cores('b', [2])
+        mux.tick()
+
+        mux.remove('a')
+        self.clock.now += 1.0
+        mux.tick()
+
+        stopped = [group for call in mon.poll.call_args_list
+                   for group in call[0][0]]
+        self.assertTrue(all(group.stop.called for group in stopped[:2]))
+        self.assertNotIn('a', mux.estimates)
+        self.assertEqual(mux.get_estimate('b').num_slices, 1)
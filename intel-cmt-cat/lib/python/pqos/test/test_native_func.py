@@ -0,0 +1,104 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for native_func module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import os
+import re
+import unittest
+from unittest.mock import MagicMock
+
+from pqos.native_func import PQOS_FUNCTIONS, bind_functions
+
+
+class LibMock(object):
+    "ctypes.CDLL mock, item access creates a new function object."
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.funcs = {}
+
+    def __getitem__(self, name):
+        func = MagicMock()
+        func.__name__ = name
+        self.funcs[name] = func
+        return func
+
+
+class TestNativeFunc(unittest.TestCase):
+    "Tests for native_func module."
+
+    def test_bind_functions(self):
+        "Tests creation of the table of prototyped functions."
+
+        lib = LibMock()
+        table = bind_functions(lib)
+
+        self.assertEqual(len(table), len(PQOS_FUNCTIONS))
+
+        for name, restype, argtypes in PQOS_FUNCTIONS:
+            func = getattr(table, name)
+            self.assertIs(func, lib.funcs[name])
+            self.assertIs(func.restype, restype)
+            self.assertEqual(func.argtypes, argtypes)
+
+    def test_immutable(self):
+        "Tests that the table cannot be modified."
+
+        table = bind_functions(LibMock())
+
+        with self.assertRaises(AttributeError):
+            table.pqos_init = MagicMock()
+
+    def test_unique(self):
+        "Tests that every function is declared once."
+
+        names = [name for name, _, _ in PQOS_FUNCTIONS]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_declared_in_header(self):
+        "Tests that every function is declared in pqos.h."
+
+        header = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                              'pqos.h')
+        if not os.path.exists(header):
+            self.skipTest('pqos.h not available')
+
+        with open(header, encoding='utf-8') as header_file:
+            declared = set(re.findall(r'\b(pqos_\w+)\s*\(',
+                                      header_file.read()))
+
+        for name, _, _ in PQOS_FUNCTIONS:
+            self.assertIn(name, declared)
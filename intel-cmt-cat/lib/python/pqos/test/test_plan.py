@@ -0,0 +1,220 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for plan module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pqos import Pqos
+from pqos.allocation import PqosAlloc
+from pqos.error import PqosErrorParam
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.plan import AllocationPlan
+from pqos.sim import SimulatedPqos
+
+
+class TestAllocationPlan(unittest.TestCase):
+    "Tests for AllocationPlan class."
+
+    def setUp(self):
+        self.log_file = open(os.devnull, 'w',  # pylint: disable=consider-using-with
+                             encoding='utf-8')
+        self.sim = SimulatedPqos().install()
+        Pqos().init('MSR', log_file=self.log_file)
+
+        PqosCatL3().set(0, [PqosCatL3.COS(1, 0xff0), PqosCatL3.COS(2, 0x00f)])
+        PqosAlloc().assoc_set_many({0: 1, 1: 1, 2: 0})
+
+        self.plan = AllocationPlan()
+        self.steps = []
+
+    def tearDown(self):
+        SimulatedPqos.uninstall()
+        self.log_file.close()
+
+    def record(self, fail_on=None):
+        """
+        Records writes of the plan, optionally failing the first write of
+        a technology.
+        """
+
+        write = self.plan._write  # pylint: disable=protected-access
+        assoc_set_many = self.plan.alloc.assoc_set_many
+        failed = []
+
+        def write_m(technology, domain, coses):
+            self.steps.append((technology, domain,
+                               [cos.class_id for cos in coses]))
+            if technology == fail_on:
+                failed.append(technology)
+                if len(failed) == 1:
+                    raise PqosErrorParam('Test')
+            write(technology, domain, coses)
+
+        def assoc_set_many_m(assoc, current=None):
+            self.steps.append(('assoc', assoc))
+            return assoc_set_many(assoc, current)
+
+        for target, attribute, mock in [(self.plan, '_write', write_m),
+                                        (self.plan.alloc, 'assoc_set_many',
+                                         assoc_set_many_m)]:
+            patcher = patch.object(target, attribute, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_validate(self):
+        "Tests that all problems of a plan are reported."
+
+        self.plan.set_l3ca(0, [PqosCatL3.COS(1, 0x505),
+                               PqosCatL3.COS(16, 0x1),
+                               PqosCatL3.COS(2, 0x1000),
+                               PqosCatL3.COS(3, code_mask=0x1, data_mask=0x2)])
+        self.plan.set_l3ca(5, [PqosCatL3.COS(1, 0x1)])
+        self.plan.set_mba(0, [PqosMba.COS(1, 0), PqosMba.COS(2, 500, ctrl=True)])
+        self.plan.assoc_set_many({100: 1, 3: 16})
+
+        with self.assertRaises(ValueError) as context:
+            self.plan.apply()
+
+        message = str(context.exception)
+        for error in ['l3ca socket 0 COS1: mask 0x505 is not contiguous',
+                      'l3ca socket 0 COS16: only 16 classes',
+                      'l3ca socket 0 COS2: mask 0x1000 out of range',
+                      'l3ca socket 0 COS3: CDP is not enabled',
+                      'l3ca socket 5: no such domain',
+                      'mba socket 0 COS1: MBA rate 0 out of range',
+                      'mba socket 0 COS2: MBA controller is not enabled',
+                      'core 100: no such core',
+                      'core 3: only 16 classes']:
+            self.assertIn(error, message)
+
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 1)
+        self.assertEqual(self.sim.calls['pqos_mba_set'], 0)
+
+    def test_apply_order(self):
+        "Tests that cores leave a class of service before it is narrowed."
+
+        self.record()
+        self.plan.set_l3ca(0, [PqosCatL3.COS(1, 0x0f0),
+                               PqosCatL3.COS(2, 0x03f),
+                               PqosCatL3.COS(3, 0xfff)])
+        self.plan.set_mba(0, [PqosMba.COS(2, 100)])
+        self.plan.assoc_set_many({0: 1, 1: 2, 2: 1})
+        self.plan.apply()
+
+        # COS3 and MBA COS2 keep their default configuration
+        self.assertEqual(self.steps, [('l3ca', 0, [2]),
+                                      ('assoc', {1: 2}),
+                                      ('l3ca', 0, [1]),
+                                      ('assoc', {2: 1})])
+        self.assertEqual([cos.mask for cos in PqosCatL3().get(0)[1:4]],
+                         [0x0f0, 0x03f, 0xfff])
+        self.assertEqual([PqosAlloc().assoc_get(core) for core in range(3)],
+                         [1, 2, 1])
+
+    def test_apply_swap(self):
+        "Tests swapping cores between narrowed classes of service."
+
+        PqosAlloc().assoc_set(4, 2)
+        self.record()
+        self.plan.set_l3ca(0, [PqosCatL3.COS(1, 0x0f0),
+                               PqosCatL3.COS(2, 0x003)])
+        self.plan.set_l3ca(1, [PqosCatL3.COS(1, 0x0f0)])
+        self.plan.assoc_set_many({0: 2, 4: 1})
+        self.plan.apply()
+
+        self.assertEqual(self.steps, [('l3ca', 0, [1, 2]),
+                                      ('l3ca', 1, [1]),
+                                      ('assoc', {0: 2, 4: 1})])
+        self.assertEqual(PqosAlloc().assoc_get(0), 2)
+        self.assertEqual(PqosAlloc().assoc_get(4), 1)
+
+    def test_skip_unchanged(self):
+        "Tests that a plan matching configuration writes nothing."
+
+        self.plan.set_l3ca(0, [PqosCatL3.COS(1, 0xff0)])
+        self.plan.assoc_set_many({0: 1, 2: 0})
+        self.plan.apply()
+
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 1)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_set'], 2)
+        self.assertEqual(self.sim.calls['pqos_alloc_release'], 0)
+
+    def test_rollback(self):
+        "Tests that a failed apply restores previous configuration."
+
+        self.record(fail_on='mba')
+        self.plan.set_l3ca(0, [PqosCatL3.COS(1, 0xf00),
+                               PqosCatL3.COS(2, 0x0ff)])
+        self.plan.set_mba(0, [PqosMba.COS(1, 50)])
+        self.plan.assoc_set_many({0: 2, 2: 2})
+
+        with self.assertRaises(PqosErrorParam):
+            self.plan.apply()
+
+        self.assertEqual(self.steps, [('l3ca', 0, [2]),
+                                      ('assoc', {0: 2, 2: 2}),
+                                      ('l3ca', 0, [1]),
+                                      ('mba', 0, [1]),
+                                      # rollback
+                                      ('mba', 0, [1]),
+                                      ('l3ca', 0, [1]),
+                                      ('assoc', {0: 1, 2: 0}),
+                                      ('l3ca', 0, [2])])
+        self.assertEqual([cos.mask for cos in PqosCatL3().get(0)[1:3]],
+                         [0xff0, 0x00f])
+        self.assertEqual(PqosMba().get(0)[1].mb_max, 100)
+        self.assertEqual([PqosAlloc().assoc_get(core) for core in range(3)],
+                         [1, 1, 0])
+        self.assertEqual(self.plan.rollback_errors, [])
+
+    def test_rollback_errors(self):
+        "Tests that errors of rollback are collected."
+
+        self.record()
+        self.plan.set_l3ca(0, [PqosCatL3.COS(1, 0xf00)])
+        self.plan.set_l3ca(1, [PqosCatL3.COS(1, 0xf00)])
+        self.plan.l3ca.set = MagicMock(side_effect=[None, PqosErrorParam('1'),
+                                                    PqosErrorParam('2'),
+                                                    None])
+
+        with self.assertRaises(PqosErrorParam):
+            self.plan.apply()
+
+        self.assertEqual(len(self.plan.rollback_errors), 1)
+        self.assertEqual(self.plan.l3ca.set.call_count, 4)
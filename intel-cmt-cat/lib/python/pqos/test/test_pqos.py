@@ -48,6 +48,43 @@ from pqos.native_struct import (
 class TestPqos(unittest.TestCase):
     "Tests for Pqos class."
 
+    def setUp(self):
+        # Construct a new singleton with a mutable mock function table
+        Pqos.set_instance(None)
+        self.addCleanup(Pqos.set_instance, None)
+
+        patcher = patch('pqos.pqos.bind_functions',
+                        side_effect=lambda _cdll: MagicMock())
+        self.bind_functions = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('ctypes.cdll.LoadLibrary')
+    def test_bind_once(self, load_lib):
+        "Tests if the library is loaded and prototyped only once."
+
+        pqos = Pqos()
+        lib = pqos.lib
+        Pqos()
+
+        load_lib.assert_called_once_with('libpqos.so.5')
+        self.bind_functions.assert_called_once_with(load_lib.return_value)
+        self.assertIs(Pqos().lib, lib)
+
+    @patch('ctypes.cdll.LoadLibrary')
+    def test_set_backend(self, load_lib):
+        "Tests replacing the library with another backend."
+
+        backend = MagicMock()
+        Pqos.set_backend(backend)
+
+        self.assertIs(Pqos().lib, backend)
+        load_lib.assert_not_called()
+
+        Pqos.set_backend(None)
+
+        self.assertIsNot(Pqos().lib, backend)
+        load_lib.assert_called_once_with('libpqos.so.5')
+
     @patch('ctypes.cdll.LoadLibrary')
     def test_singleton(self, _load_lib):
         "Tests if the same object is constructed each time Pqos() is invoked."
@@ -101,6 +138,21 @@ class TestPqos(unittest.TestCase):
         pqos.lib.pqos_init.assert_called_once()
         pqos.lib.pqos_fini.assert_called_once()
 
+    @patch('ctypes.cdll.LoadLibrary')
+    def test_alloc_generation(self, _load_lib):
+        "Tests that (re)initialization marks allocation state as changed."
+
+        pqos = Pqos()
+        pqos.lib.pqos_init = MagicMock(return_value=0)
+        pqos.lib.pqos_fini = MagicMock(return_value=0)
+        generation = pqos.alloc_generation
+
+        pqos.init('MSR')
+        self.assertEqual(pqos.alloc_generation, generation + 1)
+
+        pqos.fini()
+        self.assertEqual(pqos.alloc_generation, generation + 2)
+
     def _test_init_verbose(self, verbose, expected_verbose):
         """
         Tests if verbosity level is correctly validated during library
@@ -0,0 +1,276 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for resctrl module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import errno
+import fcntl
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pqos.error import PqosErrorBusy, PqosErrorParam
+from pqos.resctrl import ResctrlCpus, ResctrlTasks
+
+
+class FakeKernel(object):
+    """
+    Emulates writes to resctrl tasks files: tasks are moved one by one,
+    a write stops at the first task which does not exist (ESRCH).
+    """
+
+    def __init__(self, vanished=(), multi_task=True):
+        self.vanished = set(vanished)
+        self.multi_task = multi_task
+        self.real_write = os.write
+        self.calls = 0
+
+    def write(self, fd, data):
+        "Mock os.write()."
+
+        self.calls += 1
+        text = data.decode()
+        if ',' in text and not self.multi_task:
+            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL))
+
+        for task in text.split(','):
+            if int(task) in self.vanished:
+                raise OSError(errno.ESRCH, os.strerror(errno.ESRCH))
+            self.real_write(fd, f'{task}\n'.encode())
+
+        return len(data)
+
+
+class TestResctrlTasks(unittest.TestCase):
+    "Tests for ResctrlTasks class."
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+        for class_id in range(4):
+            tasks = ResctrlTasks(self.path).tasks_file(class_id)
+            os.makedirs(os.path.dirname(tasks), exist_ok=True)
+            with open(tasks, 'w', encoding='utf-8'):
+                pass
+
+    def read_tasks(self, class_id):
+        "Returns tasks written to a tasks file."
+
+        with open(ResctrlTasks(self.path).tasks_file(class_id),
+                  encoding='utf-8') as tasks:
+            return [int(task) for task in tasks.read().split()]
+
+    @staticmethod
+    def assoc_set(tasks, assoc, kernel, **kwargs):
+        "Associates tasks through emulated kernel."
+
+        with patch('pqos.resctrl.os.write', side_effect=kernel.write):
+            return tasks.assoc_set(assoc, **kwargs)
+
+    def test_tasks_file(self):
+        "Tests paths of tasks files."
+
+        tasks = ResctrlTasks('/sys/fs/resctrl')
+
+        self.assertEqual(tasks.tasks_file(0), '/sys/fs/resctrl/tasks')
+        self.assertEqual(tasks.tasks_file(3), '/sys/fs/resctrl/COS3/tasks')
+
+    def test_assoc_set(self):
+        "Tests that tasks are grouped per class and written at once."
+
+        tasks = ResctrlTasks(self.path)
+        kernel = FakeKernel()
+        assoc = {100: 1, 101: 2, 102: 1, 103: 0, 104: 1}
+
+        vanished = self.assoc_set(tasks, assoc, kernel)
+
+        self.assertEqual(vanished, [])
+        self.assertEqual(self.read_tasks(0), [103])
+        self.assertEqual(self.read_tasks(1), [100, 102, 104])
+        self.assertEqual(self.read_tasks(2), [101])
+        self.assertEqual(kernel.calls, 3)
+        self.assertEqual(tasks.writes, 3)
+        self.assertTrue(tasks.multi_task)
+
+    def test_write_size(self):
+        "Tests that writes are split on task boundaries."
+
+        tasks = ResctrlTasks(self.path, write_size=16)
+        kernel = FakeKernel()
+        pids = list(range(1000, 1010))
+
+        self.assoc_set(tasks, dict.fromkeys(pids, 1), kernel)
+
+        # 3 tasks (14 bytes) per write
+        self.assertEqual(kernel.calls, 4)
+        self.assertEqual(self.read_tasks(1), pids)
+
+    def test_vanished(self):
+        "Tests that tasks which exited are reported."
+
+        tasks = ResctrlTasks(self.path)
+        kernel = FakeKernel(vanished=[101, 104])
+        assoc = dict.fromkeys(range(100, 106), 2)
+
+        vanished = self.assoc_set(tasks, assoc, kernel)
+
+        self.assertEqual(vanished, [101, 104])
+        self.assertEqual(sorted(set(self.read_tasks(2))), [100, 102, 103, 105])
+
+    def test_single_task_kernel(self):
+        "Tests fallback to a task per write() when the kernel requires it."
+
+        tasks = ResctrlTasks(self.path)
+        kernel = FakeKernel(vanished=[7], multi_task=False)
+
+        vanished = self.assoc_set(tasks, {5: 1, 6: 1, 7: 1, 8: 2}, kernel)
+
+        self.assertEqual(vanished, [7])
+        self.assertFalse(tasks.multi_task)
+        self.assertEqual(self.read_tasks(1), [5, 6])
+        self.assertEqual(self.read_tasks(2), [8])
+        # failed batch, then one write per task
+        self.assertEqual(kernel.calls, 5)
+
+    @patch('pqos.resctrl.ResctrlTasks.get_threads')
+    def test_threads(self, get_threads):
+        "Tests association of all threads of processes."
+
+        get_threads.side_effect = {10: [10, 11, 12], 20: [], 30: [30]}.get
+        tasks = ResctrlTasks(self.path)
+
+        vanished = self.assoc_set(tasks, {10: 1, 20: 1, 30: 3}, FakeKernel(),
+                                  threads=True)
+
+        self.assertEqual(vanished, [20])
+        self.assertEqual(self.read_tasks(1), [10, 11, 12])
+        self.assertEqual(self.read_tasks(3), [30])
+
+    def test_get_threads(self):
+        "Tests listing threads of the current process."
+
+        self.assertIn(os.getpid(), ResctrlTasks.get_threads(os.getpid()))
+
+    def test_missing_class(self):
+        "Tests error on a class of service without resctrl group."
+
+        tasks = ResctrlTasks(self.path)
+
+        with self.assertRaises(PqosErrorParam):
+            self.assoc_set(tasks, {1: 9}, FakeKernel())
+
+    def test_locked(self):
+        "Tests error when resctrl filesystem stays locked."
+
+        fd = os.open(self.path, os.O_RDONLY | os.O_DIRECTORY)
+        self.addCleanup(os.close, fd)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        with self.assertRaises(PqosErrorBusy):
+            ResctrlTasks(self.path).assoc_set({1: 1})
+
+
+class TestResctrlCpus(unittest.TestCase):
+    "Tests for ResctrlCpus class."
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+        cpus = {0: '0,5-7', 1: '1-2', 2: '', 3: '3-4'}
+        for class_id, cpus_list in cpus.items():
+            self.write_cpus(class_id, cpus_list)
+
+    def write_cpus(self, class_id, cpus_list):
+        "Creates cpus_list file of a class of service."
+
+        path = ResctrlCpus(self.path).cpus_file(class_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='ascii') as cpus_file:
+            cpus_file.write(f'{cpus_list}\n')
+
+    def read_cpus(self, class_id):
+        "Returns content of cpus_list file of a class of service."
+
+        with open(ResctrlCpus(self.path).cpus_file(class_id),
+                  encoding='ascii') as cpus_file:
+            return cpus_file.read()
+
+    def test_cpus_file(self):
+        "Tests paths of cpus_list files."
+
+        cpus = ResctrlCpus('/sys/fs/resctrl')
+
+        self.assertEqual(cpus.cpus_file(0), '/sys/fs/resctrl/cpus_list')
+        self.assertEqual(cpus.cpus_file(3), '/sys/fs/resctrl/COS3/cpus_list')
+
+    def test_assoc_get(self):
+        "Tests reading associations of all cores."
+
+        os.makedirs(os.path.join(self.path, 'info'))
+
+        self.assertEqual(ResctrlCpus(self.path).assoc_get(),
+                         {0: 0, 1: 1, 2: 1, 3: 3, 4: 3, 5: 0, 6: 0, 7: 0})
+
+    def test_assoc_set(self):
+        "Tests that cores are added to cores of a class in a single write."
+
+        cpus = ResctrlCpus(self.path)
+
+        cpus.assoc_set(1, [3, 8, 0])
+        cpus.assoc_set(2, [9])
+
+        self.assertEqual(self.read_cpus(1), '0-3,8')
+        self.assertEqual(self.read_cpus(2), '9')
+        self.assertEqual(cpus.writes, 2)
+
+    def test_missing_class(self):
+        "Tests error on a class of service without resctrl group."
+
+        with self.assertRaises(PqosErrorParam):
+            ResctrlCpus(self.path).assoc_set(9, [1])
+
+    def test_locked(self):
+        "Tests error when resctrl filesystem stays locked."
+
+        fd = os.open(self.path, os.O_RDONLY | os.O_DIRECTORY)
+        self.addCleanup(os.close, fd)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        with self.assertRaises(PqosErrorBusy):
+            ResctrlCpus(self.path).assoc_set(1, [1])
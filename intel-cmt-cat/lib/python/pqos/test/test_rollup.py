@@ -0,0 +1,138 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for rollup module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from pqos.cpuinfo import PqosCoreInfo
+from pqos.error import PqosErrorParam
+from pqos.rollup import TopologyRollup
+from pqos.session import EVENT_VALUES_DTYPE
+
+
+def _build_cpuinfo():
+    "Builds CPU information mock object with 2 sockets, 2 SNC domains each."
+
+    coreinfos = []
+    for core in range(8):
+        socket = core // 4
+        cluster = core // 2
+        coreinfos.append(PqosCoreInfo(core=core, socket=socket,
+                                      l3_id=cluster, l2_id=core,
+                                      l3cat_id=socket, mba_id=socket,
+                                      numa=cluster))
+
+    cpuinfo = MagicMock()
+    cpuinfo.get_cores_info.return_value = coreinfos
+    return cpuinfo
+
+
+class TestTopologyRollup(unittest.TestCase):
+    "Tests for TopologyRollup class."
+
+    def test_init(self):
+        "Tests domain discovery."
+
+        cpuinfo = _build_cpuinfo()
+        rollup = TopologyRollup([7, 0, 1, 5], cpuinfo=cpuinfo)
+
+        self.assertEqual(rollup.domains('socket'), [0, 1])
+        self.assertEqual(rollup.domains('numa'), [0, 2, 3])
+        self.assertEqual(rollup.domains('l3'), [0, 2, 3])
+        self.assertEqual(rollup.domains('l2'), [0, 1, 5, 7])
+        cpuinfo.get_cores_info.assert_called_once_with()
+
+    def test_init_invalid(self):
+        "Tests unknown core and unknown level."
+
+        with self.assertRaises(PqosErrorParam):
+            TopologyRollup([0, 8], cpuinfo=_build_cpuinfo())
+
+        with self.assertRaises(PqosErrorParam):
+            TopologyRollup([0], cpuinfo=_build_cpuinfo(), levels=['die'])
+
+    def test_rollup(self):
+        "Tests roll-up of a single sample."
+
+        rollup = TopologyRollup(range(8), cpuinfo=_build_cpuinfo(),
+                                levels=['socket', 'l3'])
+
+        values = np.zeros(8, dtype=EVENT_VALUES_DTYPE)
+        values['llc'] = np.arange(8) * 1000
+        values['mbm_local_delta'] = 10
+        values['ipc_retired_delta'] = np.arange(8) * 100
+        values['ipc_unhalted_delta'] = 100
+        values['ipc'] = np.arange(8)
+
+        totals = rollup.rollup(values)
+
+        self.assertEqual(sorted(totals.keys()), ['l3', 'socket'])
+
+        socket = totals['socket']
+        self.assertEqual(socket.dtype, EVENT_VALUES_DTYPE)
+        self.assertEqual(socket['llc'].tolist(), [6000, 22000])
+        self.assertEqual(socket['mbm_local_delta'].tolist(), [40, 40])
+        self.assertEqual(socket['ipc'].tolist(), [1.5, 5.5])
+
+        cluster = totals['l3']
+        self.assertEqual(cluster['llc'].tolist(), [1000, 5000, 9000, 13000])
+        self.assertEqual(cluster['ipc'].tolist(), [0.5, 2.5, 4.5, 6.5])
+
+    def test_rollup_batch(self):
+        "Tests roll-up of a batch of samples."
+
+        rollup = TopologyRollup([0, 4, 5], cpuinfo=_build_cpuinfo())
+
+        values = np.zeros((3, 3), dtype=EVENT_VALUES_DTYPE)
+        values['mbm_total_delta'] = [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+        socket = rollup.rollup_level(values, 'socket')
+
+        self.assertEqual(socket.shape, (3, 2))
+        self.assertEqual(socket['mbm_total_delta'].tolist(),
+                         [[1, 5], [4, 11], [7, 17]])
+        self.assertEqual(socket['ipc'].tolist(), [[0, 0]] * 3)
+
+    def test_rollup_invalid(self):
+        "Tests roll-up of values of a wrong number of groups."
+
+        rollup = TopologyRollup([0, 1], cpuinfo=_build_cpuinfo())
+
+        with self.assertRaises(PqosErrorParam):
+            rollup.rollup(np.zeros(3, dtype=EVENT_VALUES_DTYPE))
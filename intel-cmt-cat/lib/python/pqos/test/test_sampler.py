@@ -0,0 +1,180 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for sampler module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from pqos.sampler import MonitoringSampler
+from pqos.session import EVENT_VALUES_DTYPE
+
+
+class SessionMock(object):
+    "Monitoring session mock, each poll increments LLC occupancy."
+
+    def __init__(self, num_groups, delay=0, fail_after=None):
+        self.values = np.zeros(num_groups, dtype=EVENT_VALUES_DTYPE)
+        self.delay = delay
+        self.fail_after = fail_after
+        self.num_polls = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def poll(self):
+        "Mock MonitoringSession.poll()."
+
+        if self.fail_after is not None and self.num_polls >= self.fail_after:
+            raise RuntimeError('poll failed')
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        self.num_polls += 1
+        self.values['llc'] = self.num_polls
+        return self.values
+
+
+class TestMonitoringSampler(unittest.TestCase):
+    "Tests for MonitoringSampler class."
+    # pylint: disable=protected-access
+
+    def test_init_invalid(self):
+        "Tests sampler construction with invalid parameters."
+
+        session = SessionMock(2)
+
+        with self.assertRaises(ValueError):
+            MonitoringSampler(session, 0)
+
+        with self.assertRaises(ValueError):
+            MonitoringSampler(session, 0.01, capacity=0)
+
+        with self.assertRaises(ValueError):
+            MonitoringSampler(session, 0.01, policy='block')
+
+    def test_read(self):
+        "Tests blocking read() of samples."
+
+        session = SessionMock(3)
+
+        with MonitoringSampler(session, 0.001) as sampler:
+            samples = sampler.read(5)
+
+        self.assertEqual(samples.timestamps.shape, (5,))
+        self.assertEqual(samples.values.shape, (5, 3))
+        self.assertTrue(np.all(np.diff(samples.timestamps) > 0))
+        self.assertEqual(samples.values['llc'][:, 0].tolist(), [1, 2, 3, 4, 5])
+        self.assertFalse(sampler.running)
+
+    def test_read_timeout(self):
+        "Tests read() when not enough samples are available."
+
+        sampler = MonitoringSampler(SessionMock(1), 0.001)
+        sampler._store(10, np.ones(1, dtype=EVENT_VALUES_DTYPE))
+
+        samples = sampler.read(4, timeout=0.01)
+
+        self.assertEqual(samples.timestamps.tolist(), [10])
+        self.assertEqual(sampler.backlog, 0)
+
+    def test_drop_oldest(self):
+        "Tests ring buffer overflow with drop_oldest policy."
+
+        sampler = MonitoringSampler(SessionMock(1), 0.001, capacity=4)
+        for i in range(6):
+            sampler._store(i, np.full(1, i, dtype=EVENT_VALUES_DTYPE))
+
+        self.assertEqual(sampler.dropped, 2)
+        self.assertEqual(sampler.backlog, 4)
+
+        samples = sampler.read(4)
+        self.assertEqual(samples.timestamps.tolist(), [2, 3, 4, 5])
+        self.assertEqual(samples.values['llc'][:, 0].tolist(), [2, 3, 4, 5])
+
+    def test_drop_newest(self):
+        "Tests ring buffer overflow with drop_newest policy."
+
+        sampler = MonitoringSampler(SessionMock(1), 0.001, capacity=4,
+                                    policy=MonitoringSampler.POLICY_DROP_NEWEST)
+        for i in range(6):
+            sampler._store(i, np.full(1, i, dtype=EVENT_VALUES_DTYPE))
+
+        self.assertEqual(sampler.dropped, 2)
+
+        samples = sampler.read(4)
+        self.assertEqual(samples.timestamps.tolist(), [0, 1, 2, 3])
+
+    def test_overruns(self):
+        "Tests counting of missed sampling deadlines."
+
+        session = SessionMock(1, delay=0.005)
+
+        with MonitoringSampler(session, 0.001) as sampler:
+            sampler.read(3)
+
+        self.assertGreaterEqual(sampler.overruns, 3 * 3)
+
+    def test_batches(self):
+        "Tests batches() generator."
+
+        session = SessionMock(2, fail_after=10)
+        sampler = MonitoringSampler(session, 0.001)
+        sampler.start()
+
+        batches = list(sampler.batches(4))
+
+        self.assertEqual([len(batch.timestamps) for batch in batches],
+                         [4, 4, 2])
+        self.assertIsInstance(sampler.error, RuntimeError)
+        self.assertFalse(sampler.running)
+
+    def test_consumer_wakeup_on_stop(self):
+        "Tests if a blocked reader is woken up when the sampler is stopped."
+
+        sampler = MonitoringSampler(SessionMock(1), 0.001, capacity=2000)
+        sampler.start()
+
+        timer = threading.Timer(0.02, sampler.stop)
+        timer.start()
+        samples = sampler.read(1000)
+        timer.join()
+
+        self.assertLess(len(samples.timestamps), 1000)
+        self.assertFalse(sampler.running)
@@ -0,0 +1,197 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for session module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import ctypes
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pqos.error import PqosError, PqosErrorResource
+from pqos.monitoring import CPqosMonData
+from pqos.native_struct import CPqosEventValues, CPqosMonitor
+from pqos.session import MonitoringSession
+
+
+class TestMonitoringSession(unittest.TestCase):
+    "Tests for MonitoringSession class."
+
+    @patch('pqos.session.Pqos')
+    def test_start_cores(self, pqos_mock_cls):
+        "Tests start_cores() method."
+
+        def pqos_mon_start_mock(num_cores, cores_arr, event, _context,
+                                group_ref):
+            "Mock pqos_mon_start()."
+
+            self.assertEqual(cores_arr[:num_cores], [1, 3])
+            self.assertEqual(event, CPqosMonitor.PQOS_MON_EVENT_L3_OCCUP |
+                             CPqosMonitor.PQOS_MON_EVENT_LMEM_BW)
+
+            group = CPqosMonData(event=event,
+                                 values=CPqosEventValues(llc=123))
+            ctypes.memmove(group_ref, ctypes.addressof(group),
+                           ctypes.sizeof(group))
+            return 0
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_mon_start = MagicMock(side_effect=pqos_mon_start_mock)
+
+        session = MonitoringSession(4)
+        index = session.start_cores([1, 3], ['l3_occup', 'lmem_bw'])
+
+        lib.pqos_mon_start.assert_called_once()
+        self.assertEqual(index, 0)
+        self.assertEqual(len(session), 1)
+        self.assertEqual(session.get_group(0).values.llc, 123)
+        self.assertEqual(session.values['llc'].tolist(), [123])
+
+    @patch('pqos.session.Pqos')
+    def test_start_pids(self, pqos_mock_cls):
+        "Tests start_pids() method."
+
+        def pqos_mon_start_pids_mock(num_pids, pids_arr, _event, _context,
+                                     _group_ref):
+            "Mock pqos_mon_start_pids()."
+
+            self.assertEqual(num_pids, 1)
+            self.assertEqual(pids_arr[0], 1286)
+            return 0
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_mon_start = MagicMock(return_value=0)
+        lib.pqos_mon_start_pids = MagicMock(side_effect=pqos_mon_start_pids_mock)
+
+        session = MonitoringSession(2)
+        session.start_cores([0], ['l3_occup'])
+        index = session.start_pids([1286], ['l3_occup'])
+
+        lib.pqos_mon_start_pids.assert_called_once()
+        self.assertEqual(index, 1)
+        self.assertEqual(len(session), 2)
+
+    @patch('pqos.session.Pqos')
+    def test_start_full(self, pqos_mock_cls):
+        "Tests start_cores() method when session capacity is exhausted."
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_mon_start = MagicMock(return_value=0)
+
+        session = MonitoringSession(1)
+        session.start_cores([0], ['l3_occup'])
+
+        with self.assertRaises(PqosErrorResource):
+            session.start_cores([1], ['l3_occup'])
+
+        lib.pqos_mon_start.assert_called_once()
+
+    @patch('pqos.session.Pqos')
+    def test_poll(self, pqos_mock_cls):
+        "Tests poll() method."
+
+        groups_addr = []
+
+        def pqos_mon_poll_mock(groups_arr, num_groups):
+            "Mock pqos_mon_poll()."
+
+            self.assertEqual(num_groups, 3)
+            groups_addr.append(ctypes.addressof(groups_arr))
+
+            for i in range(num_groups):
+                group = groups_arr[i].contents
+                group.values.llc += 100 * (i + 1)
+                group.values.mbm_local_delta = 10 * (i + 1)
+                group.values.ipc = 0.5 * (i + 1)
+
+            return 0
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_mon_start = MagicMock(return_value=0)
+        lib.pqos_mon_poll = MagicMock(side_effect=pqos_mon_poll_mock)
+
+        session = MonitoringSession(8)
+        for core in range(3):
+            session.start_cores([core], ['l3_occup', 'lmem_bw'])
+
+        values = session.poll()
+        self.assertEqual(values['llc'].tolist(), [100, 200, 300])
+        self.assertEqual(values['mbm_local_delta'].tolist(), [10, 20, 30])
+        self.assertEqual(values['ipc'].tolist(), [0.5, 1.0, 1.5])
+
+        # values view is updated in place by subsequent polls
+        session.poll()
+        self.assertEqual(values['llc'].tolist(), [200, 400, 600])
+
+        # group pointer array is built only once
+        self.assertEqual(lib.pqos_mon_poll.call_count, 2)
+        self.assertEqual(groups_addr[0], groups_addr[1])
+
+        # values view must not be modified by the user
+        with self.assertRaises(ValueError):
+            values['llc'][0] = 0
+
+    @patch('pqos.session.Pqos')
+    def test_stop(self, pqos_mock_cls):
+        "Tests stop() method."
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_mon_start = MagicMock(return_value=0)
+        lib.pqos_mon_stop = MagicMock(side_effect=[1, 0])
+
+        session = MonitoringSession(2)
+        session.start_cores([0], ['l3_occup'])
+        session.start_cores([1], ['l3_occup'])
+
+        with self.assertRaises(PqosError):
+            session.stop()
+
+        # all groups are stopped even if one of them fails
+        self.assertEqual(lib.pqos_mon_stop.call_count, 2)
+        self.assertEqual(len(session), 0)
+        self.assertEqual(len(session.values), 0)
+
+    @patch('pqos.session.Pqos')
+    def test_context_manager(self, pqos_mock_cls):
+        "Tests if monitoring is stopped on exit from context manager."
+
+        lib = pqos_mock_cls.return_value.lib
+        lib.pqos_mon_start = MagicMock(return_value=0)
+        lib.pqos_mon_stop = MagicMock(return_value=0)
+
+        with MonitoringSession(1) as session:
+            session.start_cores([0], ['l3_occup'])
+
+        lib.pqos_mon_stop.assert_called_once()
+        self.assertEqual(len(session), 0)
@@ -0,0 +1,272 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for shadow module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import os
+import unittest
+
+from pqos import Pqos
+from pqos.allocation import PqosAlloc
+from pqos.error import PqosErrorParam, PqosErrorPartial
+from pqos.l2ca import PqosCatL2
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.native_struct import CPqosAllocConfig
+from pqos.shadow import AllocationShadow
+from pqos.sim import SimulatedPqos
+
+
+class TestAllocationShadow(unittest.TestCase):
+    "Tests for AllocationShadow class."
+
+    def setUp(self):
+        self.log_file = open(os.devnull, 'w',  # pylint: disable=consider-using-with
+                             encoding='utf-8')
+        self.sim = SimulatedPqos().install()
+        Pqos().init('MSR', log_file=self.log_file)
+        self.shadow = AllocationShadow()
+
+    def tearDown(self):
+        SimulatedPqos.uninstall()
+        self.log_file.close()
+
+    def test_l3ca_skip_unchanged(self):
+        "Tests that unchanged L3 classes of service are not written again."
+
+        coses = [PqosCatL3.COS(1, 0x0f), PqosCatL3.COS(2, 0xf0)]
+
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.set_l3ca(0, [PqosCatL3.COS(1, 0x0f),
+                                 PqosCatL3.COS(2, 0x30)])
+
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 2)
+        self.assertEqual(self.shadow.writes, 3)
+        self.assertEqual(self.shadow.skipped, 3)
+        self.assertEqual(PqosCatL3().get(0)[2].mask, 0x30)
+
+        # the same classes on another socket are written
+        self.shadow.set_l3ca(1, coses)
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 3)
+
+    def test_l3ca_cdp(self):
+        "Tests that CDP and non-CDP configuration are distinguished."
+
+        PqosAlloc().reset('on', 'any', 'any')
+        self.shadow.set_l3ca(0, [PqosCatL3.COS(1, code_mask=0x3,
+                                               data_mask=0x3)])
+        self.shadow.set_l3ca(0, [PqosCatL3.COS(1, code_mask=0x3,
+                                               data_mask=0x3)])
+        self.shadow.set_l3ca(0, [PqosCatL3.COS(1, code_mask=0x3,
+                                               data_mask=0xc)])
+
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 2)
+        cos = self.shadow.get_l3ca(0)[1]
+        self.assertEqual((cos.code_mask, cos.data_mask), (0x3, 0xc))
+
+    def test_get_complete(self):
+        "Tests that a domain is read from the library only once."
+
+        coses = self.shadow.get_l2ca(1)
+        self.shadow.set_l2ca(1, [PqosCatL2.COS(1, 0x3)])
+        coses = self.shadow.get_l2ca(1)
+
+        self.assertEqual(self.sim.calls['pqos_l2ca_get'], 1)
+        self.assertEqual(len(coses), 8)
+        self.assertEqual(coses[1].mask, 0x3)
+
+        # values read are not written again
+        self.shadow.set_l2ca(1, [PqosCatL2.COS(2, coses[2].mask)])
+        self.assertEqual(self.sim.calls['pqos_l2ca_set'], 1)
+
+    def test_buffer_reuse(self):
+        "Tests that ctypes arrays are reused between writes."
+
+        self.shadow.set_l3ca(0, [PqosCatL3.COS(1, 0x1)])
+        buffers = dict(self.shadow._buffers)  # pylint: disable=protected-access
+        self.shadow.set_l3ca(0, [PqosCatL3.COS(1, 0x3), PqosCatL3.COS(2, 0x3)])
+        self.shadow.set_l3ca(1, [PqosCatL3.COS(3, 0x7)])
+
+        # pylint: disable=protected-access
+        self.assertIs(self.shadow._buffers[('l3ca', 'set')],
+                      buffers[('l3ca', 'set')])
+
+    def test_invalidate_reset(self):
+        "Tests that allocation reset invalidates the shadow."
+
+        coses = [PqosCatL3.COS(1, 0x0f)]
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.assoc_set(2, 1)
+
+        PqosAlloc().reset('any', 'any', 'any')
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.assoc_set(2, 1)
+
+        cfg = CPqosAllocConfig()
+        cfg.set_l3_cdp('any')
+        cfg.set_l2_cdp('any')
+        cfg.set_mba('any')
+        PqosAlloc().reset_config(cfg)
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.assoc_set(2, 1)
+
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 3)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_set'], 3)
+        self.assertEqual(PqosCatL3().get(0)[1].mask, 0x0f)
+        self.assertEqual(PqosAlloc().assoc_get(2), 1)
+
+    def test_invalidate_interface(self):
+        "Tests that library reinitialization invalidates the shadow."
+
+        coses = [PqosCatL3.COS(1, 0x0f)]
+        self.shadow.set_l3ca(0, coses)
+
+        Pqos().fini()
+        Pqos().init('OS', log_file=self.log_file)
+        self.shadow.set_l3ca(0, coses)
+
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 2)
+
+    def test_invalidate_manual(self):
+        "Tests explicit invalidation of the shadow."
+
+        coses = [PqosCatL3.COS(1, 0x0f)]
+        self.shadow.set_l3ca(0, coses)
+        PqosCatL3().set(0, [PqosCatL3.COS(1, 0xf0)])
+
+        self.shadow.invalidate_domain('l3ca', 0)
+        self.shadow.set_l3ca(0, coses)
+        self.assertEqual(PqosCatL3().get(0)[1].mask, 0x0f)
+
+        self.shadow.invalidate()
+        self.shadow.set_l3ca(0, coses)
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 4)
+
+    def test_error(self):
+        "Tests that a failed write drops the shadow of a domain."
+
+        coses = [PqosCatL3.COS(1, 0x0f)]
+        self.shadow.set_l3ca(0, coses)
+
+        with self.assertRaises(PqosErrorParam):
+            self.shadow.set_l3ca(0, [PqosCatL3.COS(1, 0x0f),
+                                     PqosCatL3.COS(2, 0x5)])
+
+        self.shadow.set_l3ca(0, coses)
+        self.assertEqual(self.shadow.writes, 2)
+
+        with self.assertRaises(PqosErrorParam):
+            self.shadow.assoc_set(0, 16)
+
+    def test_mba(self):
+        "Tests that MBA requested and actual values are tracked separately."
+
+        actual = self.shadow.set_mba(0, [PqosMba.COS(1, 47)])
+        self.assertEqual(actual[0].mb_max, 50)
+
+        actual = self.shadow.set_mba(0, [PqosMba.COS(1, 47)])
+        self.assertEqual(actual[0].mb_max, 50)
+        self.assertEqual(self.sim.calls['pqos_mba_set'], 1)
+
+        coses = self.shadow.get_mba(0)
+        self.assertEqual(coses[1].mb_max, 50)
+
+        # the requested value is still known after the table was read
+        self.shadow.set_mba(0, [PqosMba.COS(1, 47)])
+        self.assertEqual(self.sim.calls['pqos_mba_set'], 1)
+
+        self.shadow.set_mba(0, [PqosMba.COS(1, 50)])
+        self.shadow.set_mba(0, [PqosMba.COS(2, 20)])
+        self.assertEqual(self.sim.calls['pqos_mba_set'], 3)
+
+    def test_assoc(self):
+        "Tests core association shadow."
+
+        self.assertEqual(self.shadow.assoc_get(3), 0)
+        self.shadow.assoc_set(3, 0)
+        self.shadow.assoc_set(3, 2)
+        self.shadow.assoc_set(3, 2)
+
+        self.assertEqual(self.shadow.assoc_get(3), 2)
+        self.assertEqual(PqosAlloc().assoc_get(3), 2)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_get'], 2)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_set'], 1)
+
+    def test_invalidate_bindings(self):
+        "Tests that changes made through the bindings drop the shadow."
+
+        coses = [PqosCatL3.COS(1, 0x0f)]
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.set_l3ca(1, coses)
+        PqosCatL3().set(0, [PqosCatL3.COS(1, 0xf0)])
+
+        self.shadow.set_l3ca(0, coses)
+        self.shadow.set_l3ca(1, coses)
+        self.assertEqual(PqosCatL3().get(0)[1].mask, 0x0f)
+        self.assertEqual(self.sim.calls['pqos_l3ca_set'], 4)
+
+        self.shadow.assoc_set(3, 2)
+        self.shadow.assoc_set(4, 2)
+        PqosAlloc().release([3])
+
+        self.assertEqual(self.shadow.assoc_get(3), 0)
+        self.assertEqual(self.shadow.assoc_get(4), 2)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_get'], 1)
+
+    def test_assoc_set_many(self):
+        "Tests bulk core association through the shadow."
+
+        changed = self.shadow.assoc_set_many({1: 2, 2: 2, 3: 0})
+
+        self.assertEqual(changed, {1: 2, 2: 2})
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_get'], 3)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_set'], 2)
+
+        self.assertEqual(self.shadow.assoc_set_many({1: 2, 2: 2, 3: 0}), {})
+        self.assertEqual(self.shadow.assoc_get(2), 2)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_get'], 3)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_set'], 2)
+        self.assertEqual(self.shadow.writes, 2)
+        self.assertEqual(self.shadow.skipped, 4)
+
+        # core written before the error is known, the failed one is not
+        with self.assertRaises(PqosErrorPartial) as context:
+            self.shadow.assoc_set_many({1: 3, 2: 16})
+
+        self.assertEqual(context.exception.changed, {1: 3})
+        self.assertEqual(self.shadow.assoc_get(1), 3)
+        self.assertEqual(self.shadow.assoc_get(2), 2)
+        self.assertEqual(self.sim.calls['pqos_alloc_assoc_get'], 4)
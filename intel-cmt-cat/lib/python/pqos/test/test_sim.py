@@ -0,0 +1,389 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for sim module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import os
+import time
+import unittest
+
+from pqos import Pqos
+from pqos.allocation import PqosAlloc
+from pqos.capability import PqosCap
+from pqos.cpuinfo import PqosCpuInfo
+from pqos.error import PqosErrorInit, PqosErrorParam, PqosErrorResource
+from pqos.l2ca import PqosCatL2
+from pqos.l3ca import PqosCatL3
+from pqos.mba import PqosMba
+from pqos.monitoring import PqosMon
+from pqos.native_func import PqosFunctions
+from pqos.session import MonitoringSession
+from pqos.sim import SimulatedPlatform, SimulatedPqos, SimulatedWorkload
+
+
+class FakeClock(object):
+    "Manually advanced clock."
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SimTestCase(unittest.TestCase):
+    "Base class of tests running the bindings against simulated library."
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sim = None
+        self.log_file = open(os.devnull, 'w',  # pylint: disable=consider-using-with
+                             encoding='utf-8')
+
+    def tearDown(self):
+        SimulatedPqos.uninstall()
+        self.log_file.close()
+
+    def init(self, interface='MSR', **kwargs):
+        "Installs simulated library and initializes it."
+
+        kwargs.setdefault('clock', self.clock)
+        self.sim = SimulatedPqos(**kwargs).install()
+        Pqos().init(interface, log_file=self.log_file)
+        return self.sim
+
+
+class TestSimulatedPlatform(unittest.TestCase):
+    "Tests for SimulatedPlatform class."
+
+    def test_topology(self):
+        "Tests core topology."
+
+        platform = SimulatedPlatform(num_sockets=2, cores_per_socket=4,
+                                     l2_cluster_size=2, numa_per_socket=2)
+
+        self.assertEqual(platform.num_cores, 8)
+        self.assertEqual([core.socket for core in platform.cores],
+                         [0, 0, 0, 0, 1, 1, 1, 1])
+        self.assertEqual([core.l2_id for core in platform.cores],
+                         [0, 0, 1, 1, 2, 2, 3, 3])
+        self.assertEqual([core.numa for core in platform.cores],
+                         [0, 0, 1, 1, 2, 2, 3, 3])
+
+    def test_invalid(self):
+        "Tests invalid configuration."
+
+        with self.assertRaises(ValueError):
+            SimulatedPlatform(cores_per_socket=3, l2_cluster_size=2)
+
+        with self.assertRaises(ValueError):
+            SimulatedPlatform(l3_ways=8)
+
+
+class TestSimulatedWorkload(unittest.TestCase):
+    "Tests for SimulatedWorkload class."
+
+    def test_rates(self):
+        "Tests that the workload reacts to LLC capacity and throttling."
+
+        workload = SimulatedWorkload(footprint=8 << 20, bandwidth=1e9,
+                                     remote_ratio=0.0)
+
+        fits = workload.rates(8 << 20)
+        misses = workload.rates(1 << 20)
+        throttled = workload.rates(1 << 20, throttle=0.5)
+
+        self.assertEqual(fits.occupancy, 8 << 20)
+        self.assertEqual(misses.occupancy, 1 << 20)
+        self.assertLess(fits.mbm_local, misses.mbm_local)
+        self.assertGreater(fits.instructions, misses.instructions)
+        self.assertAlmostEqual(throttled.mbm_local, misses.mbm_local / 2)
+        self.assertGreater(misses.instructions, throttled.instructions)
+
+
+class TestSimulatedPqos(SimTestCase):
+    "Tests for SimulatedPqos class."
+
+    def test_functions(self):
+        "Tests that all library functions are simulated."
+
+        functions = SimulatedPqos().functions()
+
+        self.assertIsInstance(functions, PqosFunctions)
+        self.assertTrue(all(callable(func) for func in functions))
+
+    def test_not_initialized(self):
+        "Tests calls before library initialization."
+
+        SimulatedPqos().install()
+
+        with self.assertRaises(PqosErrorInit):
+            PqosCap()
+
+    def test_capability(self):
+        "Tests capabilities."
+
+        self.init(platform=SimulatedPlatform(l2ca=False, mba_num_classes=4))
+        cap = PqosCap()
+
+        l3ca = cap.get_type('l3ca')
+        self.assertEqual(l3ca.num_classes, 16)
+        self.assertEqual(l3ca.num_ways, 12)
+        self.assertTrue(l3ca.cdp)
+        self.assertFalse(l3ca.cdp_on)
+        self.assertEqual(cap.get_mba_cos_num(), 4)
+        self.assertEqual(len(cap.get_type('mon').events), 7)
+
+        # MBA controller requires OS interface
+        self.assertFalse(cap.get_type('mba').ctrl)
+
+        with self.assertRaises(PqosErrorResource):
+            cap.get_type('l2ca')
+
+    def test_cpuinfo(self):
+        "Tests CPU information."
+
+        self.init(platform=SimulatedPlatform(num_sockets=2,
+                                             cores_per_socket=4))
+        cpu = PqosCpuInfo()
+
+        self.assertEqual(cpu.get_vendor(), 'INTEL')
+        self.assertEqual(cpu.get_sockets(), [0, 1])
+        self.assertEqual(cpu.get_l2ids(), [0, 1, 2, 3])
+        self.assertEqual(cpu.get_cores(1), [4, 5, 6, 7])
+        self.assertEqual(cpu.get_one_core(1), 4)
+        self.assertEqual(cpu.get_socketid(5), 1)
+        self.assertTrue(cpu.check_core(7))
+        self.assertFalse(cpu.check_core(8))
+        self.assertEqual(cpu.get_core_info(6).l2_id, 3)
+        self.assertEqual([core.core for core in cpu.get_cores_info()],
+                         list(range(8)))
+        self.assertEqual(cpu.get_cache_info(3).total_size, 24 << 20)
+
+    def test_cat(self):
+        "Tests L3 and L2 CAT configuration."
+
+        self.init()
+        l3ca = PqosCatL3()
+        l2ca = PqosCatL2()
+
+        l3ca.set(1, [PqosCatL3.COS(1, 0x0f), PqosCatL3.COS(2, 0xf0)])
+        l2ca.set(3, [PqosCatL2.COS(1, 0x3)])
+
+        self.assertEqual([cos.mask for cos in l3ca.get(1)[:3]],
+                         [0xfff, 0x0f, 0xf0])
+        self.assertEqual(l3ca.get(0)[1].mask, 0xfff)
+        self.assertEqual(l2ca.get(3)[1].mask, 0x3)
+        self.assertEqual(l3ca.get_min_cbm_bits(), 1)
+
+        for mask in [0x5, 0x1000]:
+            with self.assertRaises(PqosErrorParam):
+                l3ca.set(0, [PqosCatL3.COS(1, mask)])
+
+        with self.assertRaises(PqosErrorParam):
+            l3ca.set(0, [PqosCatL3.COS(16, 0x1)])
+
+        with self.assertRaises(PqosErrorParam):
+            l3ca.set(0, [PqosCatL3.COS(1, code_mask=0x1, data_mask=0x2)])
+
+    def test_cdp(self):
+        "Tests enabling L3 CDP with allocation reset."
+
+        self.init()
+        alloc = PqosAlloc()
+        l3ca = PqosCatL3()
+
+        alloc.assoc_set(2, 3)
+        alloc.reset('on', 'any', 'any')
+
+        self.assertEqual(PqosCap().get_l3ca_cos_num(), 8)
+        self.assertEqual(alloc.assoc_get(2), 0)
+
+        l3ca.set(0, [PqosCatL3.COS(1, code_mask=0x3, data_mask=0xc)])
+        cos = l3ca.get(0)[1]
+        self.assertEqual((cos.code_mask, cos.data_mask), (0x3, 0xc))
+
+    def test_mba(self):
+        "Tests MBA configuration."
+
+        self.init()
+        mba = PqosMba()
+
+        actual = mba.set(0, [PqosMba.COS(1, 47)])
+
+        self.assertEqual(actual[0].mb_max, 50)
+        self.assertEqual(mba.get(0)[1].mb_max, 50)
+
+        with self.assertRaises(PqosErrorParam):
+            mba.set(0, [PqosMba.COS(1, 1000, ctrl=True)])
+
+        with self.assertRaises(PqosErrorResource):
+            PqosAlloc().reset('any', 'any', 'ctrl')
+
+    def test_mba_ctrl(self):
+        "Tests MBA controller with OS interface."
+
+        self.init('OS')
+        mba = PqosMba()
+
+        PqosAlloc().reset('any', 'any', 'ctrl')
+        mba.set(0, [PqosMba.COS(1, 1000, ctrl=True)])
+
+        self.assertTrue(PqosCap().get_type('mba').ctrl_on)
+        self.assertEqual(mba.get(0)[1].mb_max, 1000)
+
+    def test_assoc(self):
+        "Tests core and task association."
+
+        self.init('OS')
+        alloc = PqosAlloc()
+
+        alloc.assoc_set(1, 5)
+        alloc.assoc_set_pid(1000, 6)
+
+        self.assertEqual(alloc.assoc_get(1), 5)
+        self.assertEqual(alloc.assoc_get_pid(1000), 6)
+        self.assertEqual(alloc.get_pids(6), [1000])
+        self.assertEqual(alloc.assign(['l3ca'], [2, 3]), 15)
+        self.assertEqual(alloc.assign_pid(['l3ca'], [1001]), 14)
+
+        alloc.release([2, 3])
+        self.assertEqual(alloc.assoc_get(2), 0)
+
+        with self.assertRaises(PqosErrorParam):
+            alloc.assoc_set(0, 16)
+
+        with self.assertRaises(PqosErrorParam):
+            alloc.assign(['l3ca'], [0, 8])
+
+    def test_assoc_pid_msr(self):
+        "Tests that task association requires OS interface."
+
+        self.init('MSR')
+
+        with self.assertRaises(PqosErrorResource):
+            PqosAlloc().assoc_set_pid(1000, 1)
+
+    def test_monitoring(self):
+        "Tests that monitoring counters follow allocation."
+
+        self.init(platform=SimulatedPlatform(num_sockets=1,
+                                             cores_per_socket=2),
+                  workload=SimulatedWorkload(footprint=16 << 20))
+        mon = PqosMon()
+        group0 = mon.start_cores([0], ['l3_occup', 'lmem_bw', 'perf_ipc'])
+        group1 = mon.start_cores([1], ['l3_occup', 'lmem_bw', 'perf_ipc'])
+
+        self.clock.now += 1.0
+        mon.poll([group0, group1])
+        shared = group0.values.mbm_local_delta
+
+        self.assertEqual(group0.values.llc, group1.values.llc)
+        self.assertEqual(group0.values.mbm_local, shared)
+        self.assertGreater(group0.values.ipc, 0)
+
+        # give core 1 most of the cache
+        PqosCatL3().set(0, [PqosCatL3.COS(0, 0x1), PqosCatL3.COS(1, 0xffe)])
+        PqosAlloc().assoc_set(1, 1)
+
+        self.clock.now += 1.0
+        mon.poll([group0, group1])
+
+        self.assertLess(group0.values.llc, group1.values.llc)
+        self.assertGreater(group0.values.mbm_local_delta, shared)
+        self.assertLess(group1.values.mbm_local_delta, shared)
+        self.assertEqual(group0.values.mbm_local,
+                         shared + group0.values.mbm_local_delta)
+
+        group0.stop()
+        group1.stop()
+
+    def test_monitoring_resources(self):
+        "Tests RMID exhaustion and cores monitored twice."
+
+        self.init(platform=SimulatedPlatform(max_rmid=2))
+        mon = PqosMon()
+        group = mon.start_cores([0], ['l3_occup'])
+
+        with self.assertRaises(PqosErrorResource):
+            mon.start_cores([0], ['l3_occup'])
+
+        with self.assertRaises(PqosErrorResource):
+            mon.start_cores([1], ['l3_occup'])
+
+        group.stop()
+        mon.start_cores([1], ['l3_occup']).stop()
+
+        with self.assertRaises(PqosErrorParam):
+            group.stop()
+
+    def test_session(self):
+        "Tests monitoring session."
+
+        self.init('OS')
+
+        with MonitoringSession(2) as session:
+            session.start_cores([0, 1], ['tmem_bw'])
+            session.start_pids([1000], ['tmem_bw'])
+
+            self.clock.now += 1.0
+            values = session.poll()
+
+            self.assertTrue(all(values['mbm_total_delta'] > 0))
+
+    def test_latency(self):
+        "Tests call delays and call counting."
+
+        sim = self.init(latency={'pqos_alloc_assoc_set': (0.0, 0.0)})
+        sim.set_latency('pqos_alloc_assoc_set', 0.02)
+        alloc = PqosAlloc()
+
+        start = time.perf_counter()
+        alloc.assoc_set(0, 1)
+        elapsed = time.perf_counter() - start
+
+        self.assertGreaterEqual(elapsed, 0.02)
+        self.assertEqual(sim.calls['pqos_alloc_assoc_set'], 1)
+
+        with self.assertRaises(ValueError):
+            sim.set_latency('pqos_unknown', 0.01)
+
+    def test_latency_auto(self):
+        "Tests latency profile selected by interface."
+
+        sim = self.init('OS', latency='auto')
+
+        self.assertGreater(sim._latency['pqos_l3ca_set'][0], 1e-5)  # pylint: disable=protected-access
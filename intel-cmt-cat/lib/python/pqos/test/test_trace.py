@@ -0,0 +1,225 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+Unit tests for trace module.
+"""
+
+from __future__ import absolute_import, division, print_function
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from pqos.session import EVENT_VALUES_DTYPE
+from pqos.sampler import Samples
+from pqos.trace import TraceReader, TraceWriter, varint_decode, varint_encode
+
+
+def _build_values(timestamp, num_groups=3):
+    "Builds event values of a sample."
+
+    values = np.zeros(num_groups, dtype=EVENT_VALUES_DTYPE)
+    values['llc'] = np.arange(num_groups) * 1000 + timestamp
+    values['mbm_total'] = (1 << 40) + timestamp * 64
+    values['mbm_local_delta'] = np.arange(num_groups)
+    values['ipc'] = timestamp / 4.0
+    return values
+
+
+class TestVarint(unittest.TestCase):
+    "Tests for varint encoding."
+
+    def test_roundtrip(self):
+        "Tests encoding and decoding of varints."
+
+        values = np.array([0, 1, 127, 128, 300, 1 << 63, (1 << 64) - 1],
+                          dtype=np.uint64)
+
+        encoded = varint_encode(values)
+
+        self.assertEqual(encoded[:4].tolist(), [0, 1, 127, 0x80])
+        self.assertEqual(varint_decode(encoded).tolist(), values.tolist())
+        self.assertEqual(varint_decode(encoded[:0]).size, 0)
+
+    def test_truncated(self):
+        "Tests decoding of truncated data."
+
+        with self.assertRaises(ValueError):
+            varint_decode(np.array([0x80], dtype=np.uint8))
+
+
+class TestTrace(unittest.TestCase):
+    "Tests for TraceWriter and TraceReader classes."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'mon.trace')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, encoding, num_samples=10, chunk_size=4):
+        "Writes a new trace file with timestamps 0, 10, 20..."
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        with TraceWriter(self.path, chunk_size=chunk_size,
+                         encoding=encoding) as writer:
+            for i in range(num_samples):
+                writer.append(i * 10, _build_values(i * 10))
+
+    def _check_roundtrip(self, encoding):
+        "Writes and reads back a trace file."
+
+        self._write(encoding)
+
+        with TraceReader(self.path) as reader:
+            self.assertEqual(reader.encoding, encoding)
+            self.assertEqual(len(reader), 30)
+            self.assertEqual(reader.num_chunks, 8)
+
+            data = reader.read()
+            self.assertEqual(data['timestamp'].tolist(),
+                             [i * 10 for i in range(10) for _ in range(3)])
+            self.assertEqual(data['group'].tolist(), [0, 1, 2] * 10)
+
+            expected = np.concatenate([_build_values(i * 10)
+                                       for i in range(10)])
+            for name in EVENT_VALUES_DTYPE.names:
+                self.assertEqual(data[name].tolist(), expected[name].tolist())
+
+    def test_roundtrip_raw(self):
+        "Tests raw encoding."
+
+        self._check_roundtrip('raw')
+
+    def test_roundtrip_delta_varint(self):
+        "Tests delta-varint encoding."
+
+        self._check_roundtrip('delta-varint')
+
+        size = os.path.getsize(self.path)
+        self._write('raw')
+        self.assertLess(size, os.path.getsize(self.path))
+
+    def test_raw_views(self):
+        "Tests that raw chunks are read without copying."
+
+        self._write('raw')
+
+        with TraceReader(self.path) as reader:
+            chunk = reader.chunk(0)
+
+            self.assertFalse(chunk['llc'].flags.owndata)
+            self.assertFalse(chunk['llc'].flags.writeable)
+            del chunk
+
+    def test_time_range(self):
+        "Tests time range reads."
+
+        for encoding in ('raw', 'delta-varint'):
+            self._write(encoding)
+
+            with TraceReader(self.path) as reader:
+                self.assertEqual(list(reader.find_chunks(35, 55)), [3, 4])
+                self.assertEqual(list(reader.find_chunks(200)), [])
+
+                data = reader.read(35, 55, columns=['timestamp', 'llc'])
+                self.assertEqual(sorted(data.keys()), ['llc', 'timestamp'])
+                self.assertEqual(data['timestamp'].tolist(),
+                                 [40, 40, 40, 50, 50, 50])
+                self.assertEqual(data['llc'].tolist(),
+                                 [40, 1040, 2040, 50, 1050, 2050])
+
+                data = reader.read(200)
+                self.assertEqual(data['timestamp'].size, 0)
+
+    def test_append(self):
+        "Tests appending to an existing file."
+
+        self._write('delta-varint', num_samples=2)
+
+        # settings of an existing file take precedence
+        with TraceWriter(self.path, chunk_size=100) as writer:
+            self.assertEqual(writer.chunk_size, 4)
+            self.assertEqual(writer.last_timestamp, 10)
+
+            with self.assertRaises(ValueError):
+                writer.append(0, _build_values(0))
+
+            samples = Samples(np.array([20, 30]),
+                              np.stack([_build_values(20), _build_values(30)]))
+            writer.append_samples(samples)
+
+        with TraceReader(self.path) as reader:
+            self.assertEqual(reader.read()['timestamp'].tolist(),
+                             [0, 0, 0, 10, 10, 10, 20, 20, 20, 30, 30, 30])
+
+    def test_truncated_chunk(self):
+        "Tests that an incomplete chunk is ignored."
+
+        self._write('raw')
+
+        size = os.path.getsize(self.path)
+        with open(self.path, 'r+b') as trace_file:
+            trace_file.truncate(size - 8)
+
+        with TraceReader(self.path) as reader:
+            self.assertEqual(reader.num_chunks, 7)
+            self.assertEqual(len(reader), 28)
+
+        with TraceWriter(self.path) as writer:
+            writer.append(100, _build_values(100))
+
+        with TraceReader(self.path) as reader:
+            self.assertEqual(reader.num_chunks, 8)
+            self.assertEqual(reader.last_timestamps[-1], 100)
+
+    def test_invalid_file(self):
+        "Tests opening a file which is not a trace file."
+
+        with open(self.path, 'wb') as trace_file:
+            trace_file.write(b'not a trace file')
+
+        with self.assertRaises(ValueError):
+            TraceReader(self.path)
+
+        # the file is not modified
+        with self.assertRaises(ValueError):
+            TraceWriter(self.path)
+
+        with open(self.path, 'rb') as trace_file:
+            self.assertEqual(trace_file.read(), b'not a trace file')
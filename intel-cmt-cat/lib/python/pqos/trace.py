@@ -0,0 +1,699 @@
+################################################################################
+# BSD LICENSE
+#
+# Copyright(c) 2023 Intel Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#   * Redistributions of source code must retain the above copyright
+#     notice, this list of conditions and the following disclaimer.
+#   * Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in
+#     the documentation and/or other materials provided with the
+#     distribution.
+#   * Neither the name of Intel Corporation nor the names of its
+#     contributors may be used to endorse or promote products derived
+#     from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+################################################################################
+
+"""
+The module defines TraceWriter and TraceReader which store monitoring
+samples in a compact, append-only binary trace file and read them back
+through a memory map.
+
+Trace file layout (all integers are little-endian):
+
+    file header:  magic (8 bytes), format version (u32), JSON header
+                  length (u32), JSON header padded to 8 bytes
+    chunk:        chunk header, column sizes (u64 per column),
+                  columns, each padded to 8 bytes
+
+The JSON header describes the columns (name and NumPy type), the chunk size
+and the encoding. Records are stored column-wise in chunks. Every chunk
+header holds the number of records and the first and last timestamp, so
+chunk headers form a sparse time index of the file. Columns of 'raw' chunks
+are read without copying. Integer columns of 'delta-varint' chunks are
+stored as zig-zag varints of deltas between consecutive records of the same
+monitoring group.
+"""
+
+from __future__ import absolute_import, division, print_function
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from pqos.session import EVENT_VALUES_DTYPE
+
+
+TRACE_MAGIC = b'PQOSTRC\x00'
+TRACE_VERSION = 1
+
+CHUNK_MAGIC = b'PQCK'
+
+ENCODING_RAW = 'raw'
+ENCODING_DELTA_VARINT = 'delta-varint'
+
+_ENCODINGS = (ENCODING_RAW, ENCODING_DELTA_VARINT)
+
+# File header: magic, version, JSON header length
+_FILE_HEADER = struct.Struct('<8sII')
+
+# Chunk header: magic, number of records, reserved, first timestamp,
+# last timestamp, chunk payload size
+_CHUNK_HEADER = struct.Struct('<4sIIIqqQ')
+
+# A single trace record: timestamp, monitoring group and all event values
+TRACE_DTYPE = np.dtype([('timestamp', '<i8'), ('group', '<u4')] +
+                       [(name, EVENT_VALUES_DTYPE.fields[name][0])
+                        for name in EVENT_VALUES_DTYPE.names])
+
+
+def _align(size):
+    "Rounds size up to a multiple of 8 bytes."
+
+    return (size + 7) & ~7
+
+
+def varint_encode(values):
+    """
+    Encodes unsigned integers as LEB128 varints.
+
+    Parameters:
+        values: NumPy array of uint64
+
+    Returns:
+        NumPy array of uint8
+    """
+
+    values = np.asarray(values, dtype=np.uint64)
+
+    lengths = np.ones(values.shape, dtype=np.int64)
+    for i in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * i))
+
+    offsets = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+
+    for i in range(10):
+        mask = lengths > i
+        if not mask.any():
+            break
+        byte = (values[mask] >> np.uint64(7 * i)) & np.uint64(0x7f)
+        byte |= np.where(lengths[mask] > i + 1, np.uint64(0x80), np.uint64(0))
+        out[offsets[mask] + i] = byte
+
+    return out
+
+
+def varint_decode(data):
+    """
+    Decodes LEB128 varints.
+
+    Parameters:
+        data: NumPy array of uint8
+
+    Returns:
+        NumPy array of uint64
+    """
+
+    data = np.asarray(data, dtype=np.uint8)
+    if not data.size:
+        return np.zeros(0, dtype=np.uint64)
+
+    ends = np.flatnonzero(data < 0x80)
+    if not ends.size or ends[-1] != data.size - 1:
+        raise ValueError('Truncated varint data')
+
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    positions = np.arange(data.size) - np.repeat(starts, ends - starts + 1)
+    if positions.max() > 9:
+        raise ValueError('Varint too long')
+
+    parts = (data & 0x7f).astype(np.uint64) << (positions * 7).astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def _group_order(groups):
+    "Returns order of records sorted by group, stable in time."
+
+    return np.argsort(groups, kind='stable')
+
+
+def _delta_encode(column, order):
+    """
+    Computes zig-zag encoded deltas of a column.
+
+    Parameters:
+        column: NumPy array of integers
+        order: order of records, consecutive records of the same group
+               are adjacent
+
+    Returns:
+        NumPy array of uint64
+    """
+
+    values = column[order].astype(np.uint64)
+    deltas = np.diff(values, prepend=np.uint64(0)).view(np.int64)
+    return ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+
+def _delta_decode(encoded, order, dtype):
+    """
+    Reverts _delta_encode().
+
+    Parameters:
+        encoded: NumPy array of uint64
+        order: order of records used for encoding
+        dtype: NumPy type of the column
+
+    Returns:
+        NumPy array of dtype
+    """
+
+    deltas = (encoded >> np.uint64(1)) ^ (np.uint64(0) - (encoded & np.uint64(1)))
+    values = np.empty(encoded.shape, dtype=np.uint64)
+    values[order] = np.cumsum(deltas, dtype=np.uint64)
+    return values.view(np.int64).astype(dtype) if dtype.kind == 'i' \
+        else values.astype(dtype)
+
+
+def _read_header(buf):
+    """
+    Parses trace file header.
+
+    Parameters:
+        buf: file contents (bytes-like object)
+
+    Returns:
+        tuple of JSON header (dict) and offset of the first chunk
+    """
+
+    if len(buf) < _FILE_HEADER.size:
+        raise ValueError('Not a trace file')
+
+    magic, version, length = _FILE_HEADER.unpack_from(buf, 0)
+    if magic != TRACE_MAGIC:
+        raise ValueError('Not a trace file')
+
+    if version != TRACE_VERSION:
+        raise ValueError(f'Unsupported trace file version: {version}')
+
+    start = _FILE_HEADER.size
+    header = json.loads(bytes(buf[start:start + length]).decode('utf-8'))
+
+    return header, _align(start + length)
+
+
+def _scan_chunks(buf, offset, num_columns):
+    """
+    Reads chunk headers. Stops on the first incomplete chunk, which is the
+    result of an interrupted write.
+
+    Parameters:
+        buf: file contents (bytes-like object)
+        offset: offset of the first chunk
+        num_columns: number of columns
+
+    Returns:
+        list of (offset, number of records, first timestamp, last timestamp)
+        tuples
+    """
+
+    chunks = []
+    sizes_len = 8 * num_columns
+
+    while offset + _CHUNK_HEADER.size + sizes_len <= len(buf):
+        magic, count, _, _, first, last, size = \
+            _CHUNK_HEADER.unpack_from(buf, offset)
+
+        if magic != CHUNK_MAGIC or offset + size > len(buf):
+            break
+
+        chunks.append((offset, count, first, last))
+        offset += size
+
+    return chunks
+
+
+class _ChunkIndex(object):
+    """
+    Sparse time index of a trace file, one entry per chunk.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, chunks):
+        """
+        Initializes the index.
+
+        Parameters:
+            chunks: a list of tuples returned by _scan_chunks()
+        """
+
+        self.offsets = np.array([chunk[0] for chunk in chunks], dtype=np.int64)
+        self.counts = np.array([chunk[1] for chunk in chunks], dtype=np.int64)
+        self.first_timestamps = np.array([chunk[2] for chunk in chunks],
+                                         dtype=np.int64)
+        self.last_timestamps = np.array([chunk[3] for chunk in chunks],
+                                        dtype=np.int64)
+
+    def find(self, start, end):
+        """
+        Finds chunks overlapping a time range.
+
+        Parameters:
+            start: start of the time range in nanoseconds (inclusive) or None
+            end: end of the time range in nanoseconds (exclusive) or None
+
+        Returns:
+            range of chunk indexes
+        """
+
+        first = 0
+        last = len(self.offsets)
+
+        if start is not None:
+            first = int(np.searchsorted(self.last_timestamps, start,
+                                        side='left'))
+        if end is not None:
+            last = int(np.searchsorted(self.first_timestamps, end,
+                                       side='left'))
+
+        return range(first, max(first, last))
+
+
+class TraceWriter(object):
+    """
+    Trace file writer.
+
+    Records are buffered and written one chunk at a time. An existing trace
+    file is appended to, with the chunk size and the encoding stored in its
+    header.
+    """
+
+    def __init__(self, path, chunk_size=4096, encoding=ENCODING_RAW):
+        """
+        Initializes trace writer.
+
+        Parameters:
+            path: trace file path
+            chunk_size: number of records in a chunk (default 4096)
+            encoding: chunk encoding, available options: 'raw',
+                      'delta-varint' (default 'raw')
+        """
+
+        if chunk_size <= 0:
+            raise ValueError('Chunk size must be positive')
+
+        if encoding not in _ENCODINGS:
+            raise ValueError(f'Unknown trace encoding: {encoding}')
+
+        self.path = path
+        self.last_timestamp = None
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'r+b' if exists else 'w+b')  # pylint: disable=consider-using-with
+
+        if exists:
+            try:
+                self._open_existing()
+            except ValueError:
+                self._file.close()
+                raise
+        else:
+            self.chunk_size = chunk_size
+            self.encoding = encoding
+            self._write_header()
+
+        self._buffer = np.zeros(self.chunk_size, dtype=TRACE_DTYPE)
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _write_header(self):
+        "Writes file header."
+
+        header = json.dumps({
+            'columns': [[name, TRACE_DTYPE.fields[name][0].str]
+                        for name in TRACE_DTYPE.names],
+            'chunk_size': self.chunk_size,
+            'encoding': self.encoding
+        }).encode('utf-8')
+
+        data = _FILE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, len(header))
+        data += header
+        data += b'\x00' * (_align(len(data)) - len(data))
+        self._file.write(data)
+
+    def _open_existing(self):
+        "Validates header of an existing file and seeks to the end of data."
+
+        # only the header and chunk headers are read, as by TraceReader
+        with mmap.mmap(self._file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as data:
+            header, offset = _read_header(data)
+
+            columns = [tuple(column) for column in header['columns']]
+            if columns != [(name, TRACE_DTYPE.fields[name][0].str)
+                           for name in TRACE_DTYPE.names]:
+                raise ValueError('Incompatible trace file columns')
+
+            self.chunk_size = header['chunk_size']
+            self.encoding = header['encoding']
+
+            chunks = _scan_chunks(data, offset, len(TRACE_DTYPE.names))
+            if chunks:
+                last_offset = chunks[-1][0]
+                offset = last_offset + \
+                    _CHUNK_HEADER.unpack_from(data, last_offset)[6]
+                self.last_timestamp = chunks[-1][3]
+
+        # drop incomplete chunk left by an interrupted write
+        self._file.seek(offset)
+        self._file.truncate()
+
+    def append(self, timestamp, values, groups=None):
+        """
+        Appends a sample of monitoring groups.
+
+        Parameters:
+            timestamp: sample timestamp in nanoseconds, timestamps must not
+                       decrease
+            values: NumPy structured array (N) of event values
+            groups: monitoring group IDs, if None values are assigned
+                    IDs 0..N-1 (default None)
+        """
+
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            raise ValueError('Trace timestamps must not decrease')
+
+        values = np.asarray(values, dtype=EVENT_VALUES_DTYPE).reshape(-1)
+        if groups is None:
+            groups = np.arange(values.size)
+
+        self.last_timestamp = timestamp
+
+        written = 0
+        while written < values.size:
+            num = min(values.size - written, self.chunk_size - self._count)
+            records = self._buffer[self._count:self._count + num]
+
+            records['timestamp'] = timestamp
+            records['group'] = groups[written:written + num]
+            for name in EVENT_VALUES_DTYPE.names:
+                records[name] = values[name][written:written + num]
+
+            self._count += num
+            written += num
+
+            if self._count == self.chunk_size:
+                self.flush()
+
+    def append_samples(self, samples, groups=None):
+        """
+        Appends a batch of samples read from MonitoringSampler.
+
+        Parameters:
+            samples: Samples object
+            groups: monitoring group IDs, if None values are assigned
+                    IDs 0..N-1 (default None)
+        """
+
+        for timestamp, values in zip(samples.timestamps, samples.values):
+            self.append(int(timestamp), values, groups)
+
+    def flush(self):
+        """
+        Writes buffered records as a chunk.
+        """
+
+        if not self._count:
+            return
+
+        records = self._buffer[:self._count]
+
+        delta = self.encoding == ENCODING_DELTA_VARINT
+        if delta:
+            order = _group_order(records['group'])
+
+        columns = []
+        for name in TRACE_DTYPE.names:
+            column = records[name]
+            if delta and column.dtype.kind in 'iu':
+                # group IDs are needed to decode other columns, so they are
+                # delta-encoded in record order
+                column = varint_encode(_delta_encode(
+                    column, np.arange(self._count) if name == 'group'
+                    else order))
+            columns.append(np.ascontiguousarray(column).tobytes())
+
+        sizes = [len(column) for column in columns]
+        payload = b''.join(column + b'\x00' * (_align(len(column)) - len(column))
+                           for column in columns)
+        size = _CHUNK_HEADER.size + 8 * len(columns) + len(payload)
+
+        header = _CHUNK_HEADER.pack(CHUNK_MAGIC, self._count, 0, 0,
+                                    int(records['timestamp'][0]),
+                                    int(records['timestamp'][-1]), size)
+        self._file.write(header + struct.pack(f'<{len(sizes)}Q', *sizes) +
+                         payload)
+        self._file.flush()
+
+        self._count = 0
+
+    def close(self):
+        """
+        Writes buffered records and closes the file.
+        """
+
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._file.close()
+
+
+class TraceReader(object):
+    """
+    Trace file reader.
+
+    The file is memory-mapped and only chunk headers are read when the file
+    is opened. Column data is accessed chunk by chunk on demand.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes trace reader.
+
+        Parameters:
+            path: trace file path
+        """
+
+        self.path = path
+
+        with open(path, 'rb') as trace_file:
+            self._mmap = mmap.mmap(trace_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+
+        header, offset = _read_header(self._mmap)
+
+        self.columns = [name for name, _ in header['columns']]
+        self.dtypes = [np.dtype(dtype) for _, dtype in header['columns']]
+        self.encoding = header['encoding']
+        self.chunk_size = header['chunk_size']
+
+        if self.encoding not in _ENCODINGS:
+            raise ValueError(f'Unknown trace encoding: {self.encoding}')
+
+        self._index = _ChunkIndex(_scan_chunks(self._mmap, offset,
+                                               len(self.columns)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return int(self._index.counts.sum())
+
+    @property
+    def num_chunks(self):
+        "Number of chunks in the file."
+
+        return len(self._index.offsets)
+
+    @property
+    def first_timestamps(self):
+        "Timestamps of the first record of each chunk."
+
+        return self._index.first_timestamps
+
+    @property
+    def last_timestamps(self):
+        "Timestamps of the last record of each chunk."
+
+        return self._index.last_timestamps
+
+    def close(self):
+        """
+        Unmaps the file. If views returned by the reader are still alive,
+        the file is unmapped when the last of them is released.
+        """
+
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def chunk(self, index):
+        """
+        Reads a chunk.
+
+        Parameters:
+            index: chunk index
+
+        Returns:
+            dictionary mapping column name to NumPy array, arrays of 'raw'
+            chunks are read-only views of the memory-mapped file
+        """
+
+        offset = int(self._index.offsets[index])
+        count = int(self._index.counts[index])
+        num_columns = len(self.columns)
+
+        offset += _CHUNK_HEADER.size
+        sizes = struct.unpack_from(f'<{num_columns}Q', self._mmap, offset)
+        offset += 8 * num_columns
+
+        raw = {}
+        for name, dtype, size in zip(self.columns, self.dtypes, sizes):
+            if self.encoding == ENCODING_DELTA_VARINT and dtype.kind in 'iu':
+                raw[name] = np.frombuffer(self._mmap, dtype=np.uint8,
+                                          count=size, offset=offset)
+            else:
+                raw[name] = np.frombuffer(self._mmap, dtype=dtype, count=count,
+                                          offset=offset)
+            offset += _align(size)
+
+        if self.encoding == ENCODING_RAW:
+            return raw
+
+        # group IDs are delta-encoded in record order, other columns in
+        # group order
+        groups = _delta_decode(varint_decode(raw['group']), np.arange(count),
+                               np.dtype(np.uint32))
+        order = _group_order(groups)
+
+        columns = {}
+        for name, dtype in zip(self.columns, self.dtypes):
+            if name == 'group':
+                columns[name] = groups
+            elif dtype.kind in 'iu':
+                columns[name] = _delta_decode(varint_decode(raw[name]), order,
+                                              dtype)
+            else:
+                columns[name] = raw[name]
+
+        return columns
+
+    def find_chunks(self, start=None, end=None):
+        """
+        Finds chunks overlapping a time range using the sparse index.
+
+        Parameters:
+            start: start of the time range in nanoseconds (inclusive) or
+                   None (default None)
+            end: end of the time range in nanoseconds (exclusive) or None
+                 (default None)
+
+        Returns:
+            range of chunk indexes
+        """
+
+        return self._index.find(start, end)
+
+    def chunks(self, start=None, end=None):
+        """
+        Iterates over chunks in a time range. Chunks at the range boundaries
+        are trimmed to the range.
+
+        Parameters:
+            start: start of the time range in nanoseconds (inclusive) or
+                   None (default None)
+            end: end of the time range in nanoseconds (exclusive) or None
+                 (default None)
+
+        Returns:
+            generator of dictionaries mapping column name to NumPy array
+        """
+
+        for index in self.find_chunks(start, end):
+            columns = self.chunk(index)
+            timestamps = columns['timestamp']
+
+            lower = 0
+            upper = len(timestamps)
+            if start is not None:
+                lower = int(np.searchsorted(timestamps, start, side='left'))
+            if end is not None:
+                upper = int(np.searchsorted(timestamps, end, side='left'))
+
+            if lower == 0 and upper == len(timestamps):
+                yield columns
+            elif lower < upper:
+                yield {name: column[lower:upper]
+                       for name, column in columns.items()}
+
+    def read(self, start=None, end=None, columns=None):
+        """
+        Reads records in a time range.
+
+        Parameters:
+            start: start of the time range in nanoseconds (inclusive) or
+                   None (default None)
+            end: end of the time range in nanoseconds (exclusive) or None
+                 (default None)
+            columns: names of columns to read, if None all columns are read
+                     (default None)
+
+        Returns:
+            dictionary mapping column name to NumPy array
+        """
+
+        if columns is None:
+            columns = self.columns
+
+        parts = list(self.chunks(start, end))
+
+        result = {}
+        for name, dtype in zip(self.columns, self.dtypes):
+            if name not in columns:
+                continue
+            if len(parts) == 1:
+                result[name] = parts[0][name]
+            else:
+                result[name] = np.concatenate([part[name] for part in parts]) \
+                    if parts else np.zeros(0, dtype=dtype)
+
+        return result